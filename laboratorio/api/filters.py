@@ -58,11 +58,10 @@ class GerminacionFilter(filters.FilterSet):
     tipo_registro = filters.CharFilter(method='filter_tipo_registro')
 
     def filter_tipo_registro(self, queryset, name, value):
-        from django.db.models import Q
         if value == 'nuevos':
-            return queryset.filter(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
+            return queryset.filter(es_importado=False)
         elif value == 'historicos':
-            return queryset.exclude(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
+            return queryset.filter(es_importado=True)
         return queryset
 
     class Meta:
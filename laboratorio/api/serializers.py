@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
 from datetime import date, timedelta
 from ..core.models import (
     Genero, Especie, Variedad, Ubicacion, Polinizacion,
@@ -8,6 +9,161 @@ from ..core.models import (
     PrediccionPolinizacion, CondicionesClimaticas, HistorialPredicciones
 )
 
+class ProyeccionValores:
+    """
+    Serialización de solo lectura sobre .values() equivalente a un serializer.
+
+    Se compila una vez por serializer y selección de campos: columnas a leer
+    y, para cada campo, la conversión que aplica su to_representation (fechas,
+    decimales, choices...). Los campos cuyo valor de la BD ya es su
+    representación (textos, enteros, booleanos, PK de relaciones) se copian
+    tal cual. El resultado es idéntico al del serializer, sin instanciar
+    modelos ni recorrer la maquinaria de campos de DRF por cada fila.
+    """
+    # Campos cuya representación es el propio valor leído de la BD
+    CAMPOS_DIRECTOS = (
+        serializers.CharField, serializers.IntegerField,
+        serializers.BooleanField, serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, serializer_class, campos=None):
+        serializer = serializer_class(fields=campos)
+        opciones = serializer_class.Meta.model._meta
+        self.salida = []
+        for nombre, campo in serializer.fields.items():
+            if campo.write_only:
+                continue
+            if isinstance(campo, serializers.PrimaryKeyRelatedField) and campo.pk_field is not None:
+                raise ValueError(f"Campo no soportado en la proyección: {nombre}")
+            campo_modelo = opciones.get_field(campo.source)
+            if not campo_modelo.concrete:
+                raise ValueError(f"Campo no soportado en la proyección: {nombre}")
+            conversion = None if isinstance(campo, self.CAMPOS_DIRECTOS) else campo.to_representation
+            self.salida.append((nombre, campo_modelo.name, conversion))
+        self.columnas = tuple(dict.fromkeys(columna for _, columna, _ in self.salida))
+
+    def valores(self, queryset, extra=()):
+        """Queryset de diccionarios con las columnas de la proyección (y las `extra`)"""
+        columnas = self.columnas + tuple(c for c in extra if c not in self.columnas)
+        return queryset.select_related(None).prefetch_related(None).values(*columnas)
+
+    def representar(self, fila):
+        datos = {}
+        for nombre, columna, conversion in self.salida:
+            valor = fila[columna]
+            datos[nombre] = valor if valor is None or conversion is None else conversion(valor)
+        return datos
+
+    def serializar(self, filas):
+        return [self.representar(fila) for fila in filas]
+
+
+_proyecciones = {}
+
+
+class DynamicFieldsMixin:
+    """
+    Permite elegir los campos serializados con ?fields=, ?omit= y ?preset=.
+
+    - preset: nombre de un conjunto predefinido en FIELD_PRESETS
+      ('full' equivale a todos los campos)
+    - fields: lista separada por comas de los campos a incluir (con preset,
+      campos que se agregan al preset)
+    - omit: lista separada por comas de los campos a excluir
+
+    La misma selección sirve para leer solo las columnas necesarias con
+    optimizar_queryset() (.only()), de modo que los listados no traen ni
+    serializan los campos grandes (JSON de predicción, observaciones...).
+    """
+    FIELD_PRESETS = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            permitidos = set(fields)
+            for nombre in list(self.fields):
+                if nombre not in permitidos:
+                    self.fields.pop(nombre)
+
+    @classmethod
+    def resolver_campos(cls, fields=None, omit=None, preset=None):
+        """
+        Devuelve la lista de campos a serializar, o None si son todos.
+        Lanza ValidationError si se piden campos o presets inexistentes.
+        """
+        if not fields and not omit and (not preset or preset == 'full'):
+            return None
+
+        disponibles = list(cls.Meta.fields)
+        if preset and preset != 'full':
+            if preset not in cls.FIELD_PRESETS:
+                raise serializers.ValidationError({
+                    'preset': f"Preset desconocido: {preset}. Opciones: {', '.join(['full', *cls.FIELD_PRESETS])}"
+                })
+            seleccion = list(cls.FIELD_PRESETS[preset])
+        else:
+            seleccion = disponibles
+
+        if fields:
+            desconocidos = [campo for campo in fields if campo not in disponibles]
+            if desconocidos:
+                raise serializers.ValidationError({'fields': f"Campos desconocidos: {', '.join(desconocidos)}"})
+            # Sin preset, `fields` es la selección exacta; con preset, la amplía
+            seleccion = fields if seleccion is disponibles else seleccion + [c for c in fields if c not in seleccion]
+        if omit:
+            seleccion = [campo for campo in seleccion if campo not in set(omit)]
+        return seleccion
+
+    @classmethod
+    def resolver_campos_request(cls, request):
+        """Lee fields/omit/preset de los parámetros GET de la petición"""
+        def lista(parametro):
+            valor = request.GET.get(parametro, '')
+            return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+        return cls.resolver_campos(
+            fields=lista('fields'), omit=lista('omit'),
+            preset=request.GET.get('preset', '').strip() or None
+        )
+
+    @classmethod
+    def campos_modelo(cls, campos):
+        """Columnas del modelo que necesita la selección de campos (incluida la PK)"""
+        opciones = cls.Meta.model._meta
+        columnas = [opciones.pk.name]
+        for nombre in campos:
+            declarado = cls._declared_fields.get(nombre)
+            origen = getattr(declarado, 'source', None) or nombre
+            try:
+                campo = opciones.get_field(origen)
+            except FieldDoesNotExist:
+                continue
+            if campo.concrete and campo.name not in columnas:
+                columnas.append(campo.name)
+        return columnas
+
+    @classmethod
+    def optimizar_queryset(cls, queryset, campos):
+        """Limita el queryset a las columnas de la selección (sin joins innecesarios)"""
+        if campos is None:
+            return queryset
+        return queryset.select_related(None).prefetch_related(None).only(*cls.campos_modelo(campos))
+
+    @classmethod
+    def proyeccion_valores(cls, campos=None):
+        """
+        ProyeccionValores (cacheada) para la selección de campos, o None si
+        algún campo no se puede leer directamente de una columna
+        """
+        clave = (cls, tuple(campos) if campos is not None else None)
+        if clave not in _proyecciones:
+            try:
+                _proyecciones[clave] = ProyeccionValores(cls, campos)
+            except (FieldDoesNotExist, ValueError):
+                _proyecciones[clave] = None
+        return _proyecciones[clave]
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -35,9 +191,23 @@ class UbicacionSerializer(serializers.ModelSerializer):
         model = Ubicacion
         fields = '__all__'
 
-class PolinizacionSerializer(serializers.ModelSerializer):
+class PolinizacionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     creado_por = serializers.PrimaryKeyRelatedField(read_only=True)
 
+    FIELD_PRESETS = {
+        # Tabla de listado
+        'list': [
+            'numero', 'codigo', 'fechapol', 'fechamad', 'tipo_polinizacion',
+            'genero', 'especie', 'responsable', 'estado', 'estado_polinizacion',
+            'progreso_polinizacion', 'fecha_creacion',
+        ],
+        # Tarjeta del cliente móvil
+        'card': [
+            'numero', 'codigo', 'fechapol', 'genero', 'especie', 'estado_polinizacion',
+            'progreso_polinizacion', 'fecha_maduracion_predicha',
+        ],
+    }
+
     class Meta:
         model = Polinizacion
         fields = [
@@ -244,9 +414,23 @@ class PolinizacionHistoricaSerializer(serializers.ModelSerializer):
         
         return data
 
-class GerminacionSerializer(serializers.ModelSerializer):
+class GerminacionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     creado_por = serializers.PrimaryKeyRelatedField(read_only=True)
-    
+
+    FIELD_PRESETS = {
+        # Tabla de listado
+        'list': [
+            'id', 'codigo', 'fecha_siembra', 'genero', 'especie_variedad', 'clima',
+            'responsable', 'no_capsulas', 'estado_capsula', 'estado_germinacion',
+            'progreso_germinacion', 'fecha_creacion',
+        ],
+        # Tarjeta del cliente móvil
+        'card': [
+            'id', 'codigo', 'fecha_siembra', 'genero', 'especie_variedad',
+            'estado_germinacion', 'progreso_germinacion', 'prediccion_fecha_estimada',
+        ],
+    }
+
     class Meta:
         model = Germinacion
         fields = [
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from ..auth import views as auth_views
 from ..integrations import csv_handler as csv_views
+from ..integrations.calendar_integration import CalendarViewSet
 
 # Importar todas las vistas desde el archivo principal y módulos específicos
 from .. import views
@@ -13,7 +14,7 @@ from ..view_modules.notification_views import NotificationViewSet
 from ..view_modules.utils_views import (
     generar_reporte_germinaciones, generar_reporte_polinizaciones,
     estadisticas_germinaciones, estadisticas_polinizaciones,
-    estadisticas_usuario, generar_reporte_con_estadisticas
+    estadisticas_usuario, generar_reporte_con_estadisticas, dashboard
 )
 from ..view_modules.prediccion_views import (
     prediccion_germinacion, prediccion_polinizacion, prediccion_completa,
@@ -42,6 +43,7 @@ router.register(r'inventarios', views.InventarioViewSet)
 router.register(r'user-profiles', UserProfileViewSet)
 router.register(r'user-management', UserManagementViewSet)
 router.register(r'user-metas', UserMetasViewSet, basename='usermetas')
+router.register(r'calendar', CalendarViewSet, basename='calendar')
 
 urlpatterns = [
     # Rutas de autenticación
@@ -71,9 +73,13 @@ urlpatterns = [
     path('api/estadisticas/polinizaciones/', estadisticas_polinizaciones, name='estadisticas_polinizaciones'),
     path('api/estadisticas/usuario/', estadisticas_usuario, name='estadisticas_usuario'),
 
+    # Resumen de la pantalla de inicio
+    path('api/dashboard/', dashboard, name='dashboard'),
+
     # Rutas para importación de CSV
     path('api/upload/polinizaciones/', csv_views.upload_csv_polinizaciones, name='upload_csv_polinizaciones'),
     path('api/upload/germinaciones/', csv_views.upload_csv_germinaciones, name='upload_csv_germinaciones'),
+    path('api/importaciones/<int:pk>/', csv_views.estado_importacion, name='estado_importacion'),
     path('api/csv-templates/', csv_views.get_csv_templates, name='get_csv_templates'),
     
     # Ruta para reportes con estadísticas dinámicas
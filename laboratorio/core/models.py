@@ -42,6 +42,29 @@ class Ubicacion(models.Model):
     def __str__(self):
         return self.nombre
 
+def es_importado_desde(archivo_origen):
+    """Un registro es importado (histórico) si tiene archivo de origen"""
+    return bool(archivo_origen)
+
+
+# Campo guardado -> campo derivado que se recalcula con él en save()/pre_save
+CAMPOS_DERIVADOS = {
+    'archivo_origen': 'es_importado',
+    'responsable': 'responsable_usuario',
+}
+
+
+def campos_con_derivados(update_fields):
+    """
+    Agrega a update_fields los campos derivados de los que se guardan
+    (es_importado con archivo_origen, responsable_usuario con responsable)
+    """
+    if update_fields is None:
+        return update_fields
+    derivados = {CAMPOS_DERIVADOS[campo] for campo in update_fields if campo in CAMPOS_DERIVADOS}
+    return {*update_fields, *derivados} if derivados else update_fields
+
+
 class Polinizacion(models.Model):
     ESTADOS_POLINIZACION = [
         ('INGRESADO', 'Ingresado'),
@@ -104,6 +127,8 @@ class Polinizacion(models.Model):
     disponible = models.BooleanField(default=True)
     estado = models.CharField(max_length=20, choices=ESTADOS_POLINIZACION, default='INGRESADO', verbose_name='Estado de la polinización')
     creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='polinizaciones_creadas', verbose_name='Creado por')
+    # Usuario al que corresponde el texto de `responsable` (ver responsable_service)
+    responsable_usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='polinizaciones_a_cargo', verbose_name='Usuario responsable')
     fecha_creacion = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True, null=True, blank=True)
     
@@ -119,6 +144,12 @@ class Polinizacion(models.Model):
 
     cantidad = models.PositiveIntegerField(default=1)
     archivo_origen = models.CharField(max_length=255, blank=True)
+    # Derivado de archivo_origen en save() (ver es_importado_desde)
+    es_importado = models.BooleanField(default=False, editable=False, db_index=True, verbose_name='Importado')
+    # Fila del archivo de la que viene un registro importado y hash de su
+    # contenido normalizado (ver ImportacionService.marcar_origen)
+    clave_origen = models.CharField(max_length=300, blank=True, default='', editable=False)
+    hash_origen = models.CharField(max_length=64, blank=True, default='', editable=False)
     observaciones = models.TextField(verbose_name='Observaciones', blank=True)
     
     # Campo Tipo para predicción ML (SELF, SIBBLING, HYBRID)
@@ -197,13 +228,20 @@ class Polinizacion(models.Model):
         else:
             self.estado_polinizacion = 'EN_PROCESO'
 
-    def save(self, *args, **kwargs):
+    def preparar_guardado(self):
+        """Normaliza los campos derivados; también lo usan las inserciones con bulk_create"""
         # Validar que el progreso esté entre 0 y 100
         if self.progreso_polinizacion < 0:
             self.progreso_polinizacion = 0
         elif self.progreso_polinizacion > 100:
             self.progreso_polinizacion = 100
-        
+
+        self.es_importado = es_importado_desde(self.archivo_origen)
+
+    def save(self, *args, **kwargs):
+        self.preparar_guardado()
+        kwargs['update_fields'] = campos_con_derivados(kwargs.get('update_fields'))
+
         # Guarda primero para tener ID
         super().save(*args, **kwargs)
         # Ya no ejecuta predicción
@@ -217,6 +255,15 @@ class Polinizacion(models.Model):
             models.Index(fields=['creado_por']),
             models.Index(fields=['fecha_creacion']),
             models.Index(fields=['genero', 'especie']),  # Índice compuesto
+            models.Index(fields=['creado_por', 'es_importado', '-fecha_creacion']),
+            # Reimportaciones: registro de cada fila de origen y su hash
+            models.Index(fields=['clave_origen', 'creado_por', 'hash_origen']),
+            # Alertas de maduración: solo las polinizaciones pendientes con predicción
+            models.Index(
+                fields=['creado_por', 'prediccion_fecha_estimada'],
+                condition=models.Q(fechamad__isnull=True, prediccion_fecha_estimada__isnull=False),
+                name='pol_alerta_pendiente_idx',
+            ),
         ]
         verbose_name = 'Polinización'
         verbose_name_plural = 'Polinizaciones'
@@ -237,6 +284,15 @@ class Germinacion(models.Model):
             models.Index(fields=['responsable']),
             models.Index(fields=['codigo']),
             models.Index(fields=['fecha_siembra']),
+            models.Index(fields=['creado_por', 'es_importado', '-fecha_creacion']),
+            # Reimportaciones: registro de cada fila de origen y su hash
+            models.Index(fields=['clave_origen', 'creado_por', 'hash_origen']),
+            # Alertas de germinación: solo las germinaciones pendientes con predicción
+            models.Index(
+                fields=['creado_por', 'prediccion_fecha_estimada'],
+                condition=models.Q(fecha_germinacion__isnull=True, prediccion_fecha_estimada__isnull=False),
+                name='germ_alerta_pendiente_idx',
+            ),
         ]
         verbose_name = 'Germinación'
         verbose_name_plural = 'Germinaciones'
@@ -312,6 +368,12 @@ class Germinacion(models.Model):
 
     # Archivo de origen (para datos importados de CSV)
     archivo_origen = models.CharField(max_length=255, blank=True, default='', verbose_name='Archivo de origen')
+    # Derivado de archivo_origen en save() (ver es_importado_desde)
+    es_importado = models.BooleanField(default=False, editable=False, db_index=True, verbose_name='Importado')
+    # Fila del archivo de la que viene un registro importado y hash de su
+    # contenido normalizado (ver ImportacionService.marcar_origen)
+    clave_origen = models.CharField(max_length=300, blank=True, default='', editable=False)
+    hash_origen = models.CharField(max_length=64, blank=True, default='', editable=False)
 
     # Estado de validación de datos
     estado_validacion = models.CharField(max_length=50, blank=True, default='', verbose_name='Estado de validación')
@@ -320,6 +382,8 @@ class Germinacion(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True, null=True, blank=True)
     creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='germinaciones_creadas', verbose_name='Creado por')
+    # Usuario al que corresponde el texto de `responsable` (ver responsable_service)
+    responsable_usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='germinaciones_a_cargo', verbose_name='Usuario responsable')
     
     # Campos legacy para compatibilidad
     fecha_germinacion = models.DateField(verbose_name='Fecha de germinación', null=True, blank=True)
@@ -400,10 +464,10 @@ class Germinacion(models.Model):
         else:
             self.estado_germinacion = 'EN_PROCESO'
     
-    def save(self, *args, **kwargs):
+    def preparar_guardado(self):
+        """Normaliza los campos derivados; también lo usan las inserciones con bulk_create"""
         # Calcular días de polinización automáticamente si no se proporciona
         if not self.dias_polinizacion and self.fecha_ingreso and self.fecha_polinizacion:
-            from datetime import date
             self.dias_polinizacion = (self.fecha_ingreso - self.fecha_polinizacion).days
         
         # Validar que el progreso esté entre 0 y 100
@@ -411,7 +475,13 @@ class Germinacion(models.Model):
             self.progreso_germinacion = 0
         elif self.progreso_germinacion > 100:
             self.progreso_germinacion = 100
-        
+
+        self.es_importado = es_importado_desde(self.archivo_origen)
+
+    def save(self, *args, **kwargs):
+        self.preparar_guardado()
+        kwargs['update_fields'] = campos_con_derivados(kwargs.get('update_fields'))
+
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -688,55 +758,16 @@ class UserProfile(models.Model):
         return errores
     
     def actualizar_progreso_mensual(self):
-        """Actualiza el progreso mensual basado en las actividades del usuario"""
-        from django.utils import timezone
-        
-        # Obtener el primer día del mes actual
-        hoy = timezone.now().date()
-        primer_dia_mes = hoy.replace(day=1)
-        
-        # Contar polinizaciones del mes actual (sin import circular)
-        if self.puede_tener_meta_polinizaciones():
-            self.polinizaciones_actuales = Polinizacion.objects.filter(
-                creado_por=self.user,
-                fechapol__gte=primer_dia_mes
-            ).count()
-        else:
-            self.polinizaciones_actuales = 0
-        
-        # Contar germinaciones del mes actual (sin import circular)
-        if self.puede_tener_meta_germinaciones():
-            self.germinaciones_actuales = Germinacion.objects.filter(
-                creado_por=self.user,
-                fecha_siembra__gte=primer_dia_mes
-            ).count()
-        else:
-            self.germinaciones_actuales = 0
-        
-        # Calcular tasa de éxito real
-        total_actividades = self.polinizaciones_actuales + self.germinaciones_actuales
-        
-        if total_actividades > 0:
-            # Calcular tasa de éxito basada en actividades exitosas
-            polinizaciones_exitosas = Polinizacion.objects.filter(
-                creado_por=self.user,
-                fechapol__gte=primer_dia_mes,
-                estado='LISTA'
-            ).count()
-            
-            germinaciones_exitosas = Germinacion.objects.filter(
-                creado_por=self.user,
-                fecha_siembra__gte=primer_dia_mes,
-                estado_capsula='ABIERTA'
-            ).count()
-            
-            total_exitosas = polinizaciones_exitosas + germinaciones_exitosas
-            self.tasa_exito_actual = round((total_exitosas / total_actividades) * 100, 2)
-        else:
-            self.tasa_exito_actual = 0.00
-        
+        """
+        Actualiza el progreso mensual a partir de los contadores por mes
+        (ProgresoMensual), sin recontar polinizaciones ni germinaciones
+        """
+        from ..services.progreso_service import progreso_service
+
+        for campo, valor in progreso_service.valores_perfil(self).items():
+            setattr(self, campo, valor)
         self.save()
-    
+
     def obtener_progreso_meta_polinizaciones(self):
         """Obtiene el porcentaje de progreso de la meta de polinizaciones"""
         if self.meta_polinizaciones > 0:
@@ -795,32 +826,8 @@ def guardar_perfil_usuario(sender, instance, **kwargs):
             logger = logging.getLogger(__name__)
             logger.error(f"Error guardando perfil de usuario {instance.username}: {e}")
 
-# Señales para actualizar progreso automáticamente
-@receiver(post_save, sender=Polinizacion)
-def actualizar_progreso_polinizacion(sender, instance, created, **kwargs):
-    """
-    Actualiza el progreso del usuario cuando se crea o actualiza una polinización
-    """
-    if instance.responsable:
-        try:
-            user = User.objects.get(username=instance.responsable)
-            if hasattr(user, 'profile'):
-                user.profile.actualizar_progreso_mensual()
-        except User.DoesNotExist:
-            pass
-
-@receiver(post_save, sender=Germinacion)
-def actualizar_progreso_germinacion(sender, instance, created, **kwargs):
-    """
-    Actualiza el progreso del usuario cuando se crea o actualiza una germinación
-    """
-    if instance.responsable:
-        try:
-            user = User.objects.get(username=instance.responsable)
-            if hasattr(user, 'profile'):
-                user.profile.actualizar_progreso_mensual()
-        except User.DoesNotExist:
-            pass
+# El progreso de metas se mantiene con contadores por mes (ProgresoMensual)
+# desde laboratorio/signals.py
 
 
 # ============================================================================
@@ -1061,6 +1068,12 @@ class HistorialPredicciones(models.Model):
     predicciones_aceptables = models.PositiveIntegerField(default=0, verbose_name='Predicciones aceptables (60-75%)')
     predicciones_pobres = models.PositiveIntegerField(default=0, verbose_name='Predicciones pobres (<60%)')
     
+    # Medidas aditivas para extender el período en modo incremental (nulas
+    # en los historiales anteriores, que no se pueden extender)
+    suma_precision = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, verbose_name='Suma de precisiones')
+    suma_confianza = models.BigIntegerField(null=True, blank=True, verbose_name='Suma de confianzas')
+    conteo_especies = models.JSONField(null=True, blank=True, verbose_name='Predicciones por especie')
+    
     # Usuario que generó el reporte
     usuario_generador = models.ForeignKey(User, on_delete=models.CASCADE, related_name='historiales_generados')
     fecha_generacion = models.DateTimeField(auto_now_add=True)
@@ -1073,63 +1086,95 @@ class HistorialPredicciones(models.Model):
     def __str__(self):
         return f"Historial {self.fecha_inicio} - {self.fecha_fin} ({self.total_predicciones} predicciones)"
     
+    # Medidas que se suman al extender un historial
+    MEDIDAS = (
+        'total_predicciones', 'predicciones_validadas', 'suma_precision', 'suma_confianza',
+        'predicciones_iniciales', 'predicciones_refinadas', 'predicciones_excelentes',
+        'predicciones_buenas', 'predicciones_aceptables', 'predicciones_pobres',
+    )
+    
     @classmethod
-    def generar_historial(cls, fecha_inicio, fecha_fin, usuario):
+    def medir_predicciones(cls, fecha_inicio, fecha_fin):
         """
-        Genera un nuevo historial de predicciones para el período especificado
+        Medidas aditivas y conteo por especie de las predicciones creadas en
+        el período: una consulta agregada condicional y una agrupada
         """
-        from django.db.models import Avg, Count, Q
+        from django.db.models import Count, Q, Sum
         
-        # Obtener predicciones del período
         predicciones = PrediccionPolinizacion.objects.filter(
             fecha_creacion__date__gte=fecha_inicio,
             fecha_creacion__date__lte=fecha_fin
         )
+        medidas = predicciones.aggregate(
+            total_predicciones=Count('pk'),
+            predicciones_validadas=Count('pk', filter=Q(estado='validada')),
+            suma_precision=Sum('precision'),
+            suma_confianza=Sum('confianza'),
+            predicciones_iniciales=Count('pk', filter=Q(tipo_prediccion='inicial')),
+            predicciones_refinadas=Count('pk', filter=Q(tipo_prediccion='refinada')),
+            predicciones_excelentes=Count('pk', filter=Q(precision__gte=90)),
+            predicciones_buenas=Count('pk', filter=Q(precision__gte=75, precision__lt=90)),
+            predicciones_aceptables=Count('pk', filter=Q(precision__gte=60, precision__lt=75)),
+            predicciones_pobres=Count('pk', filter=Q(precision__lt=60)),
+        )
+        especies = dict(
+            predicciones.order_by().values('especie').annotate(cantidad=Count('pk')).values_list('especie', 'cantidad')
+        )
+        return {medida: medidas[medida] or 0 for medida in cls.MEDIDAS}, especies
+    
+    @classmethod
+    def anterior_extensible(cls, fecha_inicio, fecha_fin):
+        """
+        Historial más reciente del mismo inicio que termina antes de
+        `fecha_fin` y se generó con su último día ya cerrado
+        """
+        from django.db.models import F
+        from django.db.models.functions import TruncDate
         
-        # Calcular estadísticas
-        total = predicciones.count()
-        validadas = predicciones.filter(estado='validada').count()
-        
-        # Precisión promedio (solo de las validadas)
-        precision_avg = predicciones.filter(
-            precision__isnull=False
-        ).aggregate(Avg('precision'))['precision__avg'] or 0
-        
-        # Confianza promedio
-        confianza_avg = predicciones.aggregate(Avg('confianza'))['confianza__avg'] or 0
+        return cls.objects.annotate(dia_generacion=TruncDate('fecha_generacion')).filter(
+            fecha_inicio=fecha_inicio,
+            fecha_fin__lt=fecha_fin,
+            suma_confianza__isnull=False,
+        ).filter(fecha_fin__lt=F('dia_generacion')).order_by('-fecha_fin', '-fecha_generacion').first()
+    
+    @classmethod
+    def generar_historial(cls, fecha_inicio, fecha_fin, usuario, incremental=False):
+        """
+        Genera un nuevo historial de predicciones para el período especificado.
         
-        # Contar por tipo
-        iniciales = predicciones.filter(tipo_prediccion='inicial').count()
-        refinadas = predicciones.filter(tipo_prediccion='refinada').count()
+        Con `incremental` extiende el historial anterior del mismo inicio
+        (ver anterior_extensible) midiendo solo los días posteriores a su
+        fin. Los cambios posteriores en predicciones de días ya medidos
+        (validaciones tardías) solo se reflejan al regenerar sin
+        `incremental`.
+        """
+        anterior = cls.anterior_extensible(fecha_inicio, fecha_fin) if incremental else None
+        desde = anterior.fecha_fin + timedelta(days=1) if anterior else fecha_inicio
+        medidas, especies = cls.medir_predicciones(desde, fecha_fin)
         
-        # Especie más predicha
-        especie_top = predicciones.values('especie').annotate(
-            count=Count('especie')
-        ).order_by('-count').first()
+        if anterior:
+            for medida in cls.MEDIDAS:
+                medidas[medida] += getattr(anterior, medida)
+            for especie, cantidad in anterior.conteo_especies.items():
+                especies[especie] = especies.get(especie, 0) + cantidad
         
-        # Métricas de calidad
-        excelentes = predicciones.filter(precision__gte=90).count()
-        buenas = predicciones.filter(precision__gte=75, precision__lt=90).count()
-        aceptables = predicciones.filter(precision__gte=60, precision__lt=75).count()
-        pobres = predicciones.filter(precision__lt=60, precision__isnull=False).count()
+        total = medidas['total_predicciones']
+        con_precision = sum(medidas[medida] for medida in (
+            'predicciones_excelentes', 'predicciones_buenas', 'predicciones_aceptables', 'predicciones_pobres'
+        ))
+        especie_top = max(especies.items(), key=lambda item: item[1]) if especies else None
         
         # Crear el historial
         historial = cls.objects.create(
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
-            total_predicciones=total,
-            predicciones_validadas=validadas,
-            precision_promedio=round(precision_avg, 2),
-            confianza_promedio=round(confianza_avg, 2),
-            predicciones_iniciales=iniciales,
-            predicciones_refinadas=refinadas,
-            especie_mas_predicha=especie_top['especie'] if especie_top else '',
-            cantidad_especie_top=especie_top['count'] if especie_top else 0,
-            predicciones_excelentes=excelentes,
-            predicciones_buenas=buenas,
-            predicciones_aceptables=aceptables,
-            predicciones_pobres=pobres,
-            usuario_generador=usuario
+            precision_promedio=round(medidas['suma_precision'] / con_precision, 2) if con_precision else 0,
+            confianza_promedio=round(medidas['suma_confianza'] / total, 2) if total else 0,
+            especie_mas_predicha=especie_top[0] if especie_top else '',
+            cantidad_especie_top=especie_top[1] if especie_top else 0,
+            conteo_especies=especies,
+            usuario_generador=usuario,
+            **medidas
         )
         
         return historial
@@ -1169,4 +1214,272 @@ class PasswordResetToken(models.Model):
         return timezone.now() > self.created_at + timedelta(minutes=15)
 
     def __str__(self):
-        return f"Reset token for {self.user.username}"
\ No newline at end of file
+        return f"Reset token for {self.user.username}"
+
+class SearchDocument(models.Model):
+    """
+    Documento de búsqueda de texto completo de un registro (polinización, germinación).
+    El contenido es el texto normalizado de los campos buscables; el índice
+    específico del motor (tsvector + GIN en PostgreSQL, tabla FTS5 en SQLite)
+    se mantiene a partir de esta tabla. Ver services/search_backend.py.
+    """
+    modelo = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    contenido = models.TextField(blank=True, default='')
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Documento de Búsqueda'
+        verbose_name_plural = 'Documentos de Búsqueda'
+        constraints = [
+            models.UniqueConstraint(fields=['modelo', 'object_id'], name='searchdocument_modelo_objeto_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo}#{self.object_id}"
+
+
+class CodigoAutocompletado(models.Model):
+    """
+    Catálogo compacto de códigos para autocompletado (uno por código y fuente).
+    Se mantiene desde los signals de Polinizacion/Germinacion y se carga en
+    memoria por services/codigo_autocomplete_service.py. Las bajas se marcan
+    con activo=False para que los demás procesos las detecten al sincronizar.
+    """
+    FUENTES = [
+        ('polinizacion', 'Polinización'),
+        ('germinacion', 'Germinación'),
+    ]
+
+    fuente = models.CharField(max_length=20, choices=FUENTES)
+    codigo = models.CharField(max_length=50)
+    clave = models.CharField(max_length=50, blank=True, default='')
+    genero = models.CharField(max_length=100, blank=True, default='')
+    especie = models.CharField(max_length=255, blank=True, default='')
+    especie_clave = models.CharField(max_length=255, blank=True, default='')
+    clima = models.CharField(max_length=50, blank=True, default='')
+    activo = models.BooleanField(default=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Código de Autocompletado'
+        verbose_name_plural = 'Códigos de Autocompletado'
+        constraints = [
+            models.UniqueConstraint(fields=['fuente', 'codigo'], name='codigoautocompletado_fuente_codigo_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['fuente', 'actualizado']),
+        ]
+
+    def __str__(self):
+        return f"{self.fuente}:{self.codigo}"
+
+
+class FacetaFiltro(models.Model):
+    """
+    Catálogo materializado de valores distintos (facetas) de los campos usados
+    en los filtros, con el número de registros que tienen cada valor.
+    `contexto` acota la faceta a un valor de otro campo (p. ej. las mesas de un
+    vivero) y `orden` guarda la clave de ordenamiento natural precalculada.
+    Se mantiene desde los signals de Polinizacion/Germinacion; ver
+    services/faceta_service.py.
+    """
+    modelo = models.CharField(max_length=20)
+    campo = models.CharField(max_length=50)
+    contexto = models.CharField(max_length=100, blank=True, default='')
+    valor = models.CharField(max_length=255, blank=True, default='')
+    total = models.IntegerField(default=0)
+    orden = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        verbose_name = 'Faceta de Filtro'
+        verbose_name_plural = 'Facetas de Filtros'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['modelo', 'campo', 'contexto', 'valor'],
+                name='facetafiltro_modelo_campo_valor_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['modelo', 'contexto', 'campo', 'orden']),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo}.{self.campo}={self.valor} ({self.total})"
+
+
+class ProgresoMensual(models.Model):
+    """
+    Contadores de actividad por usuario y mes (polinizaciones por fechapol y
+    germinaciones por fecha_siembra). Se actualizan con deltas F() desde los
+    signals; el progreso de metas del perfil se calcula a partir de ellos.
+    Ver services/progreso_service.py.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='progreso_mensual')
+    mes = models.DateField(verbose_name='Primer día del mes')
+    polinizaciones = models.IntegerField(default=0)
+    polinizaciones_exitosas = models.IntegerField(default=0)
+    germinaciones = models.IntegerField(default=0)
+    germinaciones_exitosas = models.IntegerField(default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Progreso Mensual'
+        verbose_name_plural = 'Progresos Mensuales'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'mes'], name='progresomensual_usuario_mes_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.mes:%Y-%m}"
+
+
+class EstadisticaDiaria(models.Model):
+    """
+    Tabla de hechos diaria de polinizaciones y germinaciones para las
+    estadísticas: una fila por (modelo, día, usuario, género, especie,
+    estado, importado) con medidas aditivas. `dia` es la fecha de la
+    tendencia (fechapol en polinizaciones, fecha de creación en
+    germinaciones). Se actualiza con deltas F() desde los signals y se
+    compacta cada noche; ver services/estadistica_service.py.
+    """
+    modelo = models.CharField(max_length=20)
+    dia = models.DateField(null=True, blank=True)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='estadisticas_diarias')
+    genero = models.CharField(max_length=100, null=True, blank=True)
+    especie = models.CharField(max_length=255, null=True, blank=True)
+    estado = models.CharField(max_length=20, null=True, blank=True)
+    es_importado = models.BooleanField(default=False)
+    total = models.IntegerField(default=0)
+    exitosas = models.IntegerField(default=0)
+    completadas = models.IntegerField(default=0)
+    suma_cantidad = models.BigIntegerField(default=0)
+    con_cantidad = models.IntegerField(default=0)
+    suma_dias = models.BigIntegerField(default=0)
+    con_dias = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Estadística Diaria'
+        verbose_name_plural = 'Estadísticas Diarias'
+        indexes = [
+            models.Index(fields=['modelo', 'es_importado', 'dia']),
+            models.Index(fields=['usuario', 'modelo', 'es_importado']),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} {self.dia} {self.usuario_id} {self.estado} ({self.total})"
+
+
+class MetricaModeloDiaria(models.Model):
+    """
+    Snapshot diario de las métricas de precisión del modelo de predicción
+    de germinación: conteos y sumas del error en días (fecha real menos
+    fecha estimada) de las predicciones validadas, de las que se derivan
+    MAE, RMSE, exactitud a ±7/±14 días y la distribución de precisión.
+    `version` es la versión de la tabla de germinaciones con la que se
+    calculó; ver services/metrica_service.py.
+    """
+    dia = models.DateField(unique=True)
+    total_germinaciones = models.IntegerField(default=0)
+    con_prediccion = models.IntegerField(default=0)
+    validadas = models.IntegerField(default=0)
+    suma_error_abs = models.BigIntegerField(default=0)
+    suma_error_cuadrado = models.BigIntegerField(default=0)
+    hasta_3_dias = models.IntegerField(default=0)
+    hasta_7_dias = models.IntegerField(default=0)
+    hasta_14_dias = models.IntegerField(default=0)
+    version = models.CharField(max_length=64, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Métrica Diaria del Modelo'
+        verbose_name_plural = 'Métricas Diarias del Modelo'
+        ordering = ['-dia']
+
+    def __str__(self):
+        return f"{self.dia} ({self.validadas} validadas)"
+
+
+class ContadorNotificaciones(models.Model):
+    """
+    Contadores de notificaciones por usuario (total, no leídas, favoritas y
+    archivadas). Se actualizan con deltas F() desde los signals y desde las
+    operaciones masivas; las estadísticas y el contador de no leídas se leen
+    de aquí. Ver services/contador_notificacion_service.py.
+    """
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, related_name='contador_notificaciones')
+    total = models.IntegerField(default=0)
+    no_leidas = models.IntegerField(default=0)
+    favoritas = models.IntegerField(default=0)
+    archivadas = models.IntegerField(default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Contador de Notificaciones'
+        verbose_name_plural = 'Contadores de Notificaciones'
+
+    def __str__(self):
+        return f"{self.usuario_id} ({self.no_leidas} no leídas)"
+
+
+class ImportJob(models.Model):
+    """
+    Importación de un CSV en segundo plano. La carga guarda el archivo y
+    devuelve el id; el worker (job del scheduler o comando
+    procesar_importaciones) lo procesa por lotes y confirma con cada lote
+    la última fila procesada, de modo que un fallo reanuda desde ahí. Ver
+    services/import_job_service.py.
+    """
+    MODELOS = [
+        ('polinizacion', 'Polinizaciones'),
+        ('germinacion', 'Germinaciones'),
+    ]
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='importaciones')
+    modelo = models.CharField(max_length=20, choices=MODELOS)
+    archivo = models.FileField(upload_to='importaciones/%Y/%m/', blank=True)
+    nombre_archivo = models.CharField(max_length=255, blank=True, default='')
+    # Sincroniza con una carga anterior del mismo archivo en lugar de insertar todas las filas
+    sincronizar = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+    # Última fila del CSV confirmada (la 1 es la cabecera): punto de reanudación
+    ultima_fila = models.IntegerField(default=1)
+    creados = models.IntegerField(default=0)
+    actualizados = models.IntegerField(default=0)
+    sin_cambios = models.IntegerField(default=0)
+    total_errores = models.IntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True)
+    # Segundos de procesamiento acumulados entre intentos
+    segundos = models.FloatField(default=0)
+    intentos = models.IntegerField(default=0)
+    mensaje_error = models.TextField(blank=True, default='')
+    creado = models.DateTimeField(auto_now_add=True)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    finalizado = models.DateTimeField(null=True, blank=True)
+    # Latido del worker: un trabajo EN_PROCESO sin latidos se da por caído
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Importación'
+        verbose_name_plural = 'Importaciones'
+        ordering = ['-creado']
+        indexes = [
+            models.Index(fields=['estado', 'actualizado']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_modelo_display()} #{self.pk} ({self.estado})"
+
+    @property
+    def filas_procesadas(self):
+        return self.ultima_fila - 1
+
+    @property
+    def filas_por_segundo(self):
+        return round(self.filas_procesadas / self.segundos, 1) if self.segundos else 0.0
@@ -1,5 +1,3 @@
-import csv
-import io
 from datetime import datetime
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
@@ -7,10 +5,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from ..core.models import (
-    Genero, Especie, Variedad, Ubicacion, Polinizacion, 
-    Germinacion, SeguimientoGerminacion
-)
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from ..core.models import Polinizacion, Germinacion, ImportJob
+from ..services.import_job_service import import_job_service
+from ..services.importacion_service import entero, importacion_service
 from django.contrib.auth.models import User
 
 # PELIGRO: NO EJECUTAR ESTOS COMANDOS - BORRAN TODOS LOS DATOS
@@ -20,121 +19,132 @@ from django.contrib.auth.models import User
 #Especie.objects.all().delete()
 #Genero.objects.all().delete()
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def upload_csv_polinizaciones(request):
+
+def _texto(row, campo, defecto=''):
+    return (row.get(campo) or defecto).strip()
+
+
+def _fecha(row, campo, requerida=False):
+    """Fecha AAAA-MM-DD de la plantilla; las requeridas fallan si faltan"""
+    valor = _texto(row, campo)
+    if not valor and not requerida:
+        return None
+    return datetime.strptime(valor, '%Y-%m-%d').date()
+
+
+def polinizacion_desde_fila(row, responsable, creado_por=None):
     """
-    Sube e importa datos de polinizaciones desde un archivo CSV
+    Construye (sin guardar) una polinización a partir de una fila de la
+    plantilla CSV. Género, especie y ubicación se guardan como texto; las
+    entradas de catálogo las crea CatalogoImportacion.preparar
     """
-    if 'file' not in request.FILES:
-        return Response(
-            {'error': 'No se proporcionó ningún archivo'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    csv_file = request.FILES['file']
-    
-    if not csv_file.name.endswith('.csv'):
-        return Response(
-            {'error': 'El archivo debe ser un CSV'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    try:
-        # Decodificar el archivo CSV
-        decoded_file = csv_file.read().decode('utf-8')
-        csv_data = csv.DictReader(io.StringIO(decoded_file))
-        
-        imported_count = 0
-        errors = []
-        
-        for row in csv_data:
+    especie = ' '.join(filter(None, [_texto(row, 'especie'), _texto(row, 'variedad')]))
+    return importacion_service.con_origen(Polinizacion, dict(
+        fechapol=_fecha(row, 'fecha_pol', requerida=True),
+        fechamad=_fecha(row, 'fecha_mad'),
+        codigo=_texto(row, 'codigo'),
+        genero=_texto(row, 'genero'),
+        especie=especie,
+        ubicacion=_texto(row, 'ubicacion'),
+        responsable=responsable,
+        creado_por=creado_por,
+        cantidad=entero(row.get('cantidad'), 1),
+        disponible=_texto(row, 'disponible', 'True').lower() == 'true',
+        archivo_origen=_texto(row, 'archivo_origen'),
+        cantidad_solicitada=entero(row.get('cantidad_solicitada'), 0),
+        estado=_texto(row, 'estado') or 'EN_PROCESO',
+        observaciones=_texto(row, 'observaciones'),
+    ))
+
+
+def germinacion_desde_fila(row, polinizaciones, responsable, creado_por=None):
+    """
+    Construye (sin guardar) una germinación a partir de una fila de la
+    plantilla CSV. `polinizaciones` es {código: [ids]} (ver
+    ImportacionService.pks_por_codigo)
+    """
+    polinizacion_id = None
+    codigo_polinizacion = _texto(row, 'codigo_polinizacion')
+    if codigo_polinizacion:
+        pks = polinizaciones.get(codigo_polinizacion, [])
+        if len(pks) > 1:
+            raise ValueError(f'Hay varias polinizaciones con el código {codigo_polinizacion}')
+        polinizacion_id = pks[0] if pks else None
+
+    fecha_ingreso = _fecha(row, 'fecha_ingreso', requerida=True)
+    fecha_polinizacion = _fecha(row, 'fecha_polinizacion', requerida=True)
+    return importacion_service.con_origen(Germinacion, dict(
+        fecha_ingreso=fecha_ingreso,
+        fecha_polinizacion=fecha_polinizacion,
+        dias_polinizacion=(fecha_ingreso - fecha_polinizacion).days,
+        nombre=_texto(row, 'nombre'),
+        detalles_padres=_texto(row, 'detalles_padres'),
+        tipo_polinizacion=_texto(row, 'tipo_polinizacion'),
+        finca=_texto(row, 'finca'),
+        numero_vivero=_texto(row, 'numero_vivero'),
+        numero_capsulas=entero(row.get('numero_capsulas'), 0),
+        estado_capsulas=_texto(row, 'estado_capsulas') or 'BUENO',
+        cantidad_solicitada=entero(row.get('cantidad_solicitada'), 0),
+        entrega_capsulas=_texto(row, 'entrega_capsulas'),
+        recibe_capsulas=_texto(row, 'recibe_capsulas'),
+        etapa_actual=_texto(row, 'etapa_actual') or 'SIEMBRA',
+        polinizacion_id=polinizacion_id,
+        observaciones=_texto(row, 'observaciones'),
+        responsable=responsable,
+        creado_por=creado_por,
+    ))
+
+
+def construir_polinizaciones(lotes, responsable, creado_por=None, errores=None, archivo=''):
+    """
+    Construye las polinizaciones de los lotes de filas numeradas (ver
+    lector_csv.lotes_de_filas), creando antes las entradas de catálogo de
+    cada lote. Es un generador: el motor consume un lote por vez. Las filas
+    inválidas se registran en `errores` (ErroresFilas); con `archivo`, cada
+    registro lleva su fila de origen (ver ImportacionService.marcar_origen)
+    """
+    catalogos = importacion_service.catalogos()
+    for lote in lotes:
+        catalogos.preparar(row for _, row in lote)
+        for numero, row in lote:
             try:
-                # Crear o obtener género
-                genero, created = Genero.objects.get_or_create(
-                    nombre=row.get('genero', '').strip()
-                )
-                
-                # Crear o obtener especie
-                especie, created = Especie.objects.get_or_create(
-                    nombre=row.get('especie', '').strip(),
-                    genero=genero
-                )
-                
-                # Crear o obtener variedad
-                variedad, created = Variedad.objects.get_or_create(
-                    nombre=row.get('variedad', '').strip(),
-                    especie=especie,
-                    defaults={
-                        'temporada_inicio': row.get('temporada_inicio', 'PRIMAVERA'),
-                        'temporada_polinizacion': row.get('temporada_polinizacion', 'PRIMAVERA'),
-                        'dias_germinacion_min': int(row.get('dias_germinacion_min', 30)),
-                        'dias_germinacion_max': int(row.get('dias_germinacion_max', 60))
-                    }
-                )
-                
-                # Crear o obtener ubicación
-                ubicacion = None
-                if row.get('ubicacion'):
-                    ubicacion, created = Ubicacion.objects.get_or_create(
-                        nombre=row.get('ubicacion', '').strip()
-                    )
-                
-                # Crear polinización
-                fecha_pol = datetime.strptime(row.get('fecha_pol', ''), '%Y-%m-%d').date()
-                fecha_mad = None
-                if row.get('fecha_mad'):
-                    fecha_mad = datetime.strptime(row.get('fecha_mad', ''), '%Y-%m-%d').date()
-                
-                fecha_siembra = None
-                if row.get('fecha_siembra'):
-                    fecha_siembra = datetime.strptime(row.get('fecha_siembra', ''), '%Y-%m-%d').date()
-                
-                fecha_replante = None
-                if row.get('fecha_replante'):
-                    fecha_replante = datetime.strptime(row.get('fecha_replante', ''), '%Y-%m-%d').date()
-                
-                polinizacion = Polinizacion.objects.create(
-                    fecha_pol=fecha_pol,
-                    fecha_mad=fecha_mad,
-                    codigo=row.get('codigo', '').strip(),
-                    variedad=variedad,
-                    ubicacion=ubicacion,
-                    responsable=request.user.get_full_name() or request.user.username,
-                    creado_por=request.user,
-                    cantidad=int(row.get('cantidad', 1)),
-                    disponible=row.get('disponible', 'True').lower() == 'true',
-                    archivo_origen=row.get('archivo_origen', ''),
-                    fecha_siembra=fecha_siembra,
-                    fecha_replante=fecha_replante,
-                    clima=row.get('clima', ''),
-                    cantidad_solicitada=int(row.get('cantidad_solicitada', 0)),
-                    estado=row.get('estado', 'EN_PROCESO'),
-                    observaciones=row.get('observaciones', '')
-                )
-                
-                imported_count += 1
-                
+                instance = polinizacion_desde_fila(row, responsable, creado_por)
             except Exception as e:
-                errors.append(f"Error en fila {imported_count + 1}: {str(e)}")
-        
-        return Response({
-            'message': f'Se importaron {imported_count} polinizaciones exitosamente',
-            'imported_count': imported_count,
-            'errors': errors
-        }, status=status.HTTP_200_OK)
-        
-    except Exception as e:
-        return Response(
-            {'error': f'Error procesando el archivo: {str(e)}'}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                if errores is not None:
+                    errores.agregar(numero, str(e))
+                continue
+            if archivo:
+                importacion_service.marcar_origen(instance, archivo, numero)
+            yield instance
+
+
+def construir_germinaciones(lotes, responsable, creado_por=None, errores=None, archivo=''):
+    """
+    Construye las germinaciones de los lotes de filas numeradas resolviendo
+    los códigos de polinización con una consulta por lote. Es un generador;
+    las filas inválidas se registran en `errores` (ErroresFilas) y con
+    `archivo` cada registro lleva su fila de origen
+    """
+    for lote in lotes:
+        polinizaciones = importacion_service.pks_por_codigo(
+            Polinizacion, (row.get('codigo_polinizacion') for _, row in lote)
         )
+        for numero, row in lote:
+            try:
+                instance = germinacion_desde_fila(row, polinizaciones, responsable, creado_por)
+            except Exception as e:
+                if errores is not None:
+                    errores.agregar(numero, str(e))
+                continue
+            if archivo:
+                importacion_service.marcar_origen(instance, archivo, numero)
+            yield instance
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def upload_csv_germinaciones(request):
+
+def _encolar_importacion(request, modelo, nombre):
     """
-    Sube e importa datos de germinaciones desde un archivo CSV
+    Valida el archivo subido y encola su importación en segundo plano
+    (import_job_service); responde de inmediato con el id del trabajo
     """
     if 'file' not in request.FILES:
         return Response(
@@ -151,63 +161,15 @@ def upload_csv_germinaciones(request):
         )
     
     try:
-        # Decodificar el archivo CSV
-        decoded_file = csv_file.read().decode('utf-8')
-        csv_data = csv.DictReader(io.StringIO(decoded_file))
-        
-        imported_count = 0
-        errors = []
-        
-        for row in csv_data:
-            try:
-                # Buscar polinización por código si se proporciona
-                polinizacion = None
-                if row.get('codigo_polinizacion'):
-                    try:
-                        polinizacion = Polinizacion.objects.get(
-                            codigo=row.get('codigo_polinizacion', '').strip()
-                        )
-                    except Polinizacion.DoesNotExist:
-                        pass
-                
-                # Procesar fechas
-                fecha_ingreso = datetime.strptime(row.get('fecha_ingreso', ''), '%Y-%m-%d').date()
-                fecha_polinizacion = datetime.strptime(row.get('fecha_polinizacion', ''), '%Y-%m-%d').date()
-                
-                # Calcular días desde polinización
-                dias_polinizacion = (fecha_ingreso - fecha_polinizacion).days
-                
-                germinacion = Germinacion.objects.create(
-                    fecha_ingreso=fecha_ingreso,
-                    fecha_polinizacion=fecha_polinizacion,
-                    dias_polinizacion=dias_polinizacion,
-                    nombre=row.get('nombre', '').strip(),
-                    detalles_padres=row.get('detalles_padres', '').strip(),
-                    tipo_polinizacion=row.get('tipo_polinizacion', ''),
-                    finca=row.get('finca', ''),
-                    numero_vivero=row.get('numero_vivero', ''),
-                    numero_capsulas=int(row.get('numero_capsulas', 0)),
-                    estado_capsulas=row.get('estado_capsulas', 'BUENO'),
-                    cantidad_solicitada=int(row.get('cantidad_solicitada', 0)),
-                    entrega_capsulas=row.get('entrega_capsulas', ''),
-                    recibe_capsulas=row.get('recibe_capsulas', ''),
-                    etapa_actual=row.get('etapa_actual', 'SIEMBRA'),
-                    polinizacion=polinizacion,
-                    observaciones=row.get('observaciones', ''),
-                    creado_por=request.user,
-                    responsable=request.user.get_full_name() or request.user.username
-                )
-                
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Error en fila {imported_count + 1}: {str(e)}")
-        
+        sincronizar = str(request.data.get('sincronizar', '')).lower() in ('1', 'true', 'si', 'sí')
+        job = import_job_service.crear(request.user, modelo, csv_file, sincronizar=sincronizar)
+
         return Response({
-            'message': f'Se importaron {imported_count} germinaciones exitosamente',
-            'imported_count': imported_count,
-            'errors': errors
-        }, status=status.HTTP_200_OK)
+            'message': f'Importación de {nombre} en cola',
+            'job_id': job.pk,
+            'estado': job.estado,
+            'status_url': reverse('estado_importacion', args=[job.pk]),
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response(
@@ -215,6 +177,36 @@ def upload_csv_germinaciones(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_csv_polinizaciones(request):
+    """
+    Sube un CSV de polinizaciones y encola su importación
+    """
+    return _encolar_importacion(request, 'polinizacion', 'polinizaciones')
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_csv_germinaciones(request):
+    """
+    Sube un CSV de germinaciones y encola su importación
+    """
+    return _encolar_importacion(request, 'germinacion', 'germinaciones')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def estado_importacion(request, pk):
+    """
+    Estado y avance de una importación en segundo plano (filas procesadas,
+    filas por segundo, errores); solo para quien la subió o un administrador
+    """
+    trabajos = ImportJob.objects.all()
+    if not request.user.is_staff:
+        trabajos = trabajos.filter(usuario=request.user)
+    job = get_object_or_404(trabajos, pk=pk)
+    return Response(import_job_service.resumen(job))
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_csv_templates(request):
@@ -0,0 +1,165 @@
+"""
+Lectura de archivos CSV por bloques con memoria acotada
+
+En lugar de leer el archivo completo, decodificarlo y envolverlo en un
+StringIO (tres copias en memoria), el archivo se recorre en bloques de
+TAMANO_BLOQUE bytes:
+
+- Codificación: un BOM UTF-8 se descarta; el resto se decodifica como
+  UTF-8 con un decodificador incremental (un carácter partido entre dos
+  bloques se completa con el siguiente). Si aparece un byte inválido,
+  desde ese bloque se pasa a cp1252 (CSV guardados desde Excel).
+- Delimitador: se detecta con csv.Sniffer sobre las primeras líneas
+  completas (coma, punto y coma, tabulador o barra vertical).
+- Las filas se entregan numeradas (la 1 es la cabecera) en lotes de
+  TAMANO_LOTE; las que traen más columnas que la cabecera se descartan
+  como error.
+
+Así la memoria usada depende del tamaño del bloque y del lote, no del
+archivo.
+"""
+import codecs
+import csv
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from ..services.search_backend import TAMANO_LOTE
+
+TAMANO_BLOQUE = 64 * 1024
+DELIMITADORES = ',;\t|'
+# Bytes iniciales con los que se detecta el delimitador
+TAMANO_MUESTRA = 16 * 1024
+CODIFICACION_ALTERNATIVA = 'cp1252'
+MAX_ERRORES = 100
+
+
+class ErroresFilas:
+    """Primeros MAX_ERRORES mensajes de error y total de filas con error"""
+
+    def __init__(self, maximo: int = MAX_ERRORES):
+        self.maximo = maximo
+        self.mensajes: List[str] = []
+        self.total = 0
+
+    def agregar(self, numero: int, error):
+        self.total += 1
+        if len(self.mensajes) < self.maximo:
+            self.mensajes.append(f"Error en fila {numero}: {error}")
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return iter(self.mensajes)
+
+
+def bloques_de(archivo, tamano: int = TAMANO_BLOQUE) -> Iterator[bytes]:
+    """Bloques de bytes de un archivo subido (UploadedFile) o abierto en modo binario"""
+    if hasattr(archivo, 'chunks'):
+        yield from archivo.chunks(tamano)
+        return
+    yield from iter(lambda: archivo.read(tamano), b'')
+
+
+class DecodificadorCSV:
+    """Decodificador incremental UTF-8 (con o sin BOM) con paso a cp1252"""
+
+    def __init__(self):
+        self.codificacion = None
+        self._decoder = None
+
+    def decode(self, bloque: bytes, final: bool = False) -> str:
+        if self._decoder is None:
+            self.codificacion = 'utf-8-sig' if bloque.startswith(codecs.BOM_UTF8) else 'utf-8'
+            self._decoder = codecs.getincrementaldecoder(self.codificacion)()
+        estado = self._decoder.getstate()
+        try:
+            return self._decoder.decode(bloque, final)
+        except UnicodeDecodeError:
+            if self.codificacion == CODIFICACION_ALTERNATIVA:
+                raise
+            # Los bytes pendientes del bloque anterior se decodifican con el resto
+            self.codificacion = CODIFICACION_ALTERNATIVA
+            self._decoder = codecs.getincrementaldecoder(CODIFICACION_ALTERNATIVA)(errors='replace')
+            return self._decoder.decode(estado[0] + bloque, final)
+
+
+def detectar_delimitador(muestra: str) -> str:
+    """Delimitador de las líneas completas de la muestra; coma si no se reconoce"""
+    lineas = muestra.splitlines()[:20]
+    if len(lineas) > 1 and not muestra.endswith(('\n', '\r')):
+        lineas = lineas[:-1]
+    try:
+        return csv.Sniffer().sniff('\n'.join(lineas), delimiters=DELIMITADORES).delimiter
+    except csv.Error:
+        return ','
+
+
+def lineas_de(bloques: Iterable[bytes], decodificador: DecodificadorCSV,
+              formato: Optional[dict] = None) -> Iterator[str]:
+    """
+    Líneas de texto (con su salto) a partir de los bloques de bytes. Antes
+    de la primera línea guarda en `formato` el delimitador detectado
+    """
+    pendiente = ''
+    muestra_lista = False
+    for bloque in bloques:
+        pendiente += decodificador.decode(bloque)
+        if not muestra_lista:
+            if len(pendiente) < TAMANO_MUESTRA:
+                continue
+            muestra_lista = True
+            if formato is not None:
+                formato['delimitador'] = detectar_delimitador(pendiente)
+        *completas, pendiente = pendiente.split('\n')
+        for linea in completas:
+            yield linea + '\n'
+    pendiente += decodificador.decode(b'', final=True)
+    if not muestra_lista and formato is not None:
+        formato['delimitador'] = detectar_delimitador(pendiente)
+    for linea in pendiente.split('\n'):
+        if linea:
+            yield linea + '\n'
+
+
+def leer_filas(archivo, tamano_bloque: int = TAMANO_BLOQUE, errores: Optional[ErroresFilas] = None,
+               desde: int = 1) -> Iterator[Tuple[int, dict]]:
+    """
+    Filas del CSV como (número de fila, {columna: valor}), leyendo el
+    archivo por bloques. Las filas con más columnas que la cabecera se
+    registran en `errores` y se omiten; las filas hasta `desde` (ya
+    procesadas al reanudar una importación) se saltan sin validarlas
+    """
+    decodificador = DecodificadorCSV()
+    formato = {}
+    lineas = lineas_de(bloques_de(archivo, tamano_bloque), decodificador, formato)
+    primera = next(lineas, None)
+    if primera is None:
+        return
+
+    def todas():
+        yield primera
+        yield from lineas
+
+    lector = csv.DictReader(todas(), delimiter=formato.get('delimitador', ','))
+    for numero, fila in enumerate(lector, start=2):
+        if numero <= desde:
+            continue
+        if None in fila:
+            if errores is not None:
+                errores.agregar(numero, 'la fila tiene más columnas que la cabecera')
+            continue
+        yield numero, {
+            (columna or '').strip(): valor for columna, valor in fila.items()
+        }
+
+
+def lotes_de_filas(filas: Iterable[Tuple[int, dict]], tamano: int = TAMANO_LOTE) -> Iterator[List[Tuple[int, dict]]]:
+    """Agrupa las filas numeradas en lotes de `tamano`"""
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
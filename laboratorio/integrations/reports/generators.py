@@ -98,6 +98,7 @@ class ReportGenerator:
                     # Filtrar por creado_por o por responsable como fallback
                     queryset = queryset.filter(
                         Q(creado_por=user) |
+                        Q(responsable_usuario=user) |
                         Q(responsable__iexact=username) |
                         Q(responsable__icontains=f"{user.first_name} {user.last_name}".strip())
                     )
@@ -150,6 +151,7 @@ class ReportGenerator:
                     # Filtrar por creado_por o por responsable como fallback
                     queryset = queryset.filter(
                         Q(creado_por=user) |
+                        Q(responsable_usuario=user) |
                         Q(responsable__iexact=username) |
                         Q(responsable__icontains=f"{user.first_name} {user.last_name}".strip())
                     )
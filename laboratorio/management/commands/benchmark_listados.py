@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Compara el tiempo de serialización de los listados de polinizaciones y
+germinaciones con el serializer de DRF (instancias del modelo) y con la
+lectura rápida por .values() (ProyeccionValores). Verifica además que
+ambas salidas sean idénticas byte a byte.
+
+Uso:
+    python manage.py benchmark_listados
+    python manage.py benchmark_listados --filas 100 --repeticiones 50 --preset list
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Mide la serialización de listados: serializer DRF vs lectura por .values().'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=100, help='Filas por página (por defecto 100).')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Repeticiones por medición.')
+        parser.add_argument('--preset', default=None, help='Preset de campos (list, card, full).')
+
+    def medir(self, funcion, repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            resultado = funcion()
+        return (time.perf_counter() - inicio) / repeticiones * 1000, resultado
+
+    def handle(self, *args, **options):
+        from rest_framework.renderers import JSONRenderer
+        from laboratorio.api.serializers import PolinizacionSerializer, GerminacionSerializer
+        from laboratorio.models import Polinizacion, Germinacion
+
+        filas, repeticiones = options['filas'], options['repeticiones']
+        renderer = JSONRenderer()
+
+        for Model, serializer_class in ((Polinizacion, PolinizacionSerializer), (Germinacion, GerminacionSerializer)):
+            campos = serializer_class.resolver_campos(preset=options['preset'])
+            proyeccion = serializer_class.proyeccion_valores(campos)
+            if proyeccion is None:
+                raise CommandError(f'{serializer_class.__name__} no admite la lectura por .values()')
+            queryset = Model.objects.order_by('-fecha_creacion')[:filas]
+
+            ms_drf, datos_drf = self.medir(
+                lambda: serializer_class(list(queryset), many=True, fields=campos).data, repeticiones
+            )
+            ms_valores, datos_valores = self.medir(
+                lambda: proyeccion.serializar(proyeccion.valores(queryset)), repeticiones
+            )
+
+            identicos = renderer.render(datos_drf) == renderer.render(datos_valores)
+            aceleracion = ms_drf / ms_valores if ms_valores else 0
+            self.stdout.write(
+                f'{Model.__name__}: {len(datos_drf)} filas | serializer {ms_drf:.2f} ms | '
+                f'.values() {ms_valores:.2f} ms | x{aceleracion:.1f} | '
+                f'salida idéntica: {"sí" if identicos else "NO"}'
+            )
+            if not identicos:
+                raise CommandError(f'La salida de {Model.__name__} no coincide con la del serializer')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completado.'))
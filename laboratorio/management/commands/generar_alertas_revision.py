@@ -5,7 +5,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import date
 from laboratorio.core.models import Polinizacion, Germinacion, Notification
-from django.contrib.auth.models import User
+from laboratorio.services.responsable_service import responsable_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -61,22 +61,25 @@ class Command(BaseCommand):
         )
         
         alertas_creadas = 0
+        # Mapa responsable -> usuario, una vez por ejecución
+        usuarios = responsable_service.mapa()
         
         for polinizacion in polinizaciones_pendientes:
             try:
-                # Determinar el usuario destinatario
-                usuario_destinatario = polinizacion.creado_por
+                # Determinar el usuario destinatario: creado_por o, si no hay,
+                # el usuario del responsable (FK vinculada o mapa en memoria)
+                usuario_destinatario = (
+                    polinizacion.creado_por_id
+                    or polinizacion.responsable_usuario_id
+                    or responsable_service.resolver(polinizacion.responsable, usuarios)
+                )
                 if not usuario_destinatario:
-                    # Buscar por responsable si no hay creado_por
-                    try:
-                        usuario_destinatario = User.objects.get(username=polinizacion.responsable)
-                    except User.DoesNotExist:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'⚠️ No se encontró usuario para polinización {polinizacion.numero}'
-                            )
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'⚠️ No se encontró usuario para polinización {polinizacion.numero}'
                         )
-                        continue
+                    )
+                    continue
                 
                 # Calcular días transcurridos
                 dias_transcurridos = (hoy - polinizacion.fecha_creacion.date()).days if polinizacion.fecha_creacion else 0
@@ -96,7 +99,7 @@ class Command(BaseCommand):
                 if not dry_run:
                     # Crear la notificación
                     notificacion = Notification.objects.create(
-                        usuario=usuario_destinatario,
+                        usuario_id=usuario_destinatario,
                         polinizacion=polinizacion,
                         tipo='RECORDATORIO_REVISION',
                         titulo=titulo,
@@ -122,7 +125,7 @@ class Command(BaseCommand):
                 
                 self.stdout.write(
                     f'📧 {"[DRY-RUN] " if dry_run else ""}Alerta creada para polinización {polinizacion.numero} '
-                    f'(Usuario: {usuario_destinatario.username})'
+                    f'(Usuario: {responsable_service.nombre_usuario(usuario_destinatario)})'
                 )
                 
             except Exception as e:
@@ -145,22 +148,25 @@ class Command(BaseCommand):
         )
         
         alertas_creadas = 0
+        # Mapa responsable -> usuario, una vez por ejecución
+        usuarios = responsable_service.mapa()
         
         for germinacion in germinaciones_pendientes:
             try:
-                # Determinar el usuario destinatario
-                usuario_destinatario = germinacion.creado_por
+                # Determinar el usuario destinatario: creado_por o, si no hay,
+                # el usuario del responsable (FK vinculada o mapa en memoria)
+                usuario_destinatario = (
+                    germinacion.creado_por_id
+                    or germinacion.responsable_usuario_id
+                    or responsable_service.resolver(germinacion.responsable, usuarios)
+                )
                 if not usuario_destinatario:
-                    # Buscar por responsable si no hay creado_por
-                    try:
-                        usuario_destinatario = User.objects.get(username=germinacion.responsable)
-                    except User.DoesNotExist:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'⚠️ No se encontró usuario para germinación {germinacion.id}'
-                            )
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'⚠️ No se encontró usuario para germinación {germinacion.id}'
                         )
-                        continue
+                    )
+                    continue
                 
                 # Calcular días transcurridos
                 dias_transcurridos = (hoy - germinacion.fecha_creacion.date()).days if germinacion.fecha_creacion else 0
@@ -181,7 +187,7 @@ class Command(BaseCommand):
                 if not dry_run:
                     # Crear la notificación
                     notificacion = Notification.objects.create(
-                        usuario=usuario_destinatario,
+                        usuario_id=usuario_destinatario,
                         germinacion=germinacion,
                         tipo='RECORDATORIO_REVISION',
                         titulo=titulo,
@@ -207,7 +213,7 @@ class Command(BaseCommand):
                 
                 self.stdout.write(
                     f'📧 {"[DRY-RUN] " if dry_run else ""}Alerta creada para germinación {germinacion.codigo} '
-                    f'(Usuario: {usuario_destinatario.username})'
+                    f'(Usuario: {responsable_service.nombre_usuario(usuario_destinatario)})'
                 )
                 
             except Exception as e:
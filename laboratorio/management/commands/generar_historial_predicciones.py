@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Genera el historial de predicciones de polinización desde una fecha de
+inicio hasta ayer (o --hasta). Por defecto extiende el último historial
+del mismo inicio midiendo solo los días nuevos; con --completo lo
+recalcula todo, para reflejar las validaciones tardías de días ya medidos.
+
+Uso:
+    python manage.py generar_historial_predicciones
+    python manage.py generar_historial_predicciones --desde 2024-01-01 --completo
+    python manage.py generar_historial_predicciones --usuario admin
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Genera (o extiende) el historial de predicciones de polinización.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=date.fromisoformat,
+            default=None,
+            help='Inicio del período (YYYY-MM-DD). Por defecto, el del último historial o la primera predicción.',
+        )
+        parser.add_argument(
+            '--hasta',
+            type=date.fromisoformat,
+            default=None,
+            help='Fin del período (YYYY-MM-DD). Por defecto, ayer.',
+        )
+        parser.add_argument(
+            '--usuario',
+            default=None,
+            help='Usuario generador del historial. Por defecto, el primer superusuario activo.',
+        )
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Recalcula todo el período en lugar de extender el historial anterior.',
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.models import HistorialPredicciones, PrediccionPolinizacion
+
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+        else:
+            usuario = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if usuario is None:
+            raise CommandError('No se encontró el usuario generador del historial.')
+
+        desde = options['desde']
+        if desde is None:
+            ultimo = HistorialPredicciones.objects.filter(suma_confianza__isnull=False).order_by('-fecha_fin').first()
+            primera = PrediccionPolinizacion.objects.order_by('fecha_creacion').values_list('fecha_creacion', flat=True).first()
+            if ultimo:
+                desde = ultimo.fecha_inicio
+            elif primera:
+                desde = timezone.localtime(primera).date()
+            else:
+                self.stdout.write(self.style.WARNING('No hay predicciones para generar el historial.'))
+                return
+        hasta = options['hasta'] or timezone.localdate() - timedelta(days=1)
+        if hasta < desde:
+            raise CommandError(f'El período {desde} - {hasta} está vacío.')
+
+        incremental = not options['completo']
+        historial = HistorialPredicciones.generar_historial(desde, hasta, usuario, incremental=incremental)
+        self.stdout.write(self.style.SUCCESS(
+            f'Historial {desde} - {hasta} generado ({"incremental" if incremental else "completo"}): '
+            f'{historial.total_predicciones} predicciones, {historial.predicciones_validadas} validadas.'
+        ))
@@ -1,4 +1,3 @@
-import csv
 import os
 import re
 from datetime import datetime
@@ -58,7 +57,15 @@ class Command(BaseCommand):
         parser.add_argument(
             '--update',
             action='store_true',
-            help='Actualizar registros existentes basados en el código'
+            help='Sincronizar con una importación anterior del mismo archivo: omite las filas sin cambios, '
+                 'actualiza las modificadas e inserta las nuevas'
+        )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Carga de históricos: COPY a una tabla de paso y fusión por conjuntos en PostgreSQL '
+                 '(motor por lotes del ORM en otros motores); descarta filas repetidas y etiqueta '
+                 'archivo_origen con el nombre del archivo'
         )
 
     def parse_date(self, date_str):
@@ -88,6 +95,79 @@ class Command(BaseCommand):
         )
         return None
 
+    def polinizaciones_de(self, filas, user, archivo):
+        """
+        Construye las polinizaciones de las filas numeradas a medida que el
+        motor de importación las consume (generador); cada una lleva su fila
+        de origen en `archivo`
+        """
+        from laboratorio.services.importacion_service import importacion_service
+
+        for row_num, row in filas:
+            try:
+                # Leer campos del CSV
+                codigo = row.get('codigo', '').strip()
+                genero = row.get('genero', '').strip()
+                especie = row.get('especie', '').strip()
+                ubicacion = row.get('ubicacion', '').strip()
+                responsable = row.get('responsable', '').strip()
+                cantidad = row.get('cantidad', '1').strip()
+                disponible_str = row.get('disponible', '0').strip()
+                archivo_origen = row.get('archivo_origen', '').strip()
+
+                # Validar código (campo requerido)
+                if not codigo:
+                    self.stdout.write(
+                        self.style.WARNING(f'  [!] Fila {row_num}: Sin codigo, omitiendo')
+                    )
+                    self.skipped_count += 1
+                    continue
+
+                # Parsear fechas
+                fechapol = self.parse_date(row.get('fechapol', ''))
+                fechamad = self.parse_date(row.get('fechamad', ''))
+
+                # Parsear cantidad y disponible
+                try:
+                    cantidad_int = int(cantidad) if cantidad else 1
+                except ValueError:
+                    cantidad_int = 1
+
+                try:
+                    disponible_bool = int(disponible_str) == 1
+                except ValueError:
+                    disponible_bool = False
+
+                # Parsear ubicación en vivero, mesa y pared
+                vivero, mesa, pared = self.parsear_ubicacion(ubicacion)
+
+                # Nuevo registro (permitir duplicados); se inserta por lotes
+                instance = importacion_service.con_origen(Polinizacion, dict(
+                    codigo=codigo,
+                    fechapol=fechapol,
+                    fechamad=fechamad,
+                    genero=genero,
+                    especie=especie,
+                    ubicacion=ubicacion,
+                    vivero=vivero or '',
+                    mesa=mesa or '',
+                    pared=pared or '',
+                    responsable=responsable,
+                    cantidad=cantidad_int,
+                    disponible=disponible_bool,
+                    archivo_origen=archivo_origen,
+                    creado_por=user,
+                ))
+                importacion_service.marcar_origen(instance, archivo, row_num)
+
+            except Exception as e:
+                self.errores.agregar(row_num, f"(codigo: {row.get('codigo', 'N/A')}) {str(e)}")
+                self.stdout.write(
+                    self.style.ERROR(f'  [X] Error en fila {row_num}: {str(e)}')
+                )
+                continue
+            yield instance
+
     def handle(self, *args, **options):
         # Obtener usuario
         try:
@@ -101,96 +181,40 @@ class Command(BaseCommand):
 
         if not os.path.exists(file_path):
             raise CommandError(f'El archivo {file_path} no existe')
+        if options['fast'] and options['update']:
+            raise CommandError('--fast es para cargas completas; no se combina con --update')
 
         self.stdout.write(f'\nImportando polinizaciones desde {file_path}...')
         self.stdout.write(f'Usuario: {user.username}\n')
 
-        imported_count = 0
-        updated_count = 0
-        skipped_count = 0
-        errors = []
+        from laboratorio.integrations.lector_csv import ErroresFilas, leer_filas
+        from laboratorio.services.carga_rapida_service import carga_rapida_service
+        from laboratorio.services.importacion_service import importacion_service
+
+        self.skipped_count = 0
+        self.errores = ErroresFilas()
+
+        def avance(total):
+            self.stdout.write(self.style.SUCCESS(f'  [+] Procesados {total} registros...'))
 
+        # Leer por bloques e insertar por lotes, sin signals por fila
         try:
-            with open(file_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-
-                for row_num, row in enumerate(reader, start=2):
-                    try:
-                        # Leer campos del CSV
-                        codigo = row.get('codigo', '').strip()
-                        genero = row.get('genero', '').strip()
-                        especie = row.get('especie', '').strip()
-                        ubicacion = row.get('ubicacion', '').strip()
-                        responsable = row.get('responsable', '').strip()
-                        cantidad = row.get('cantidad', '1').strip()
-                        disponible_str = row.get('disponible', '0').strip()
-                        archivo_origen = row.get('archivo_origen', '').strip()
-
-                        # Validar código (campo requerido)
-                        if not codigo:
-                            self.stdout.write(
-                                self.style.WARNING(f'  [!] Fila {row_num}: Sin codigo, omitiendo')
-                            )
-                            skipped_count += 1
-                            continue
-
-                        # Parsear fechas
-                        fechapol = self.parse_date(row.get('fechapol', ''))
-                        fechamad = self.parse_date(row.get('fechamad', ''))
-
-                        # Parsear cantidad y disponible
-                        try:
-                            cantidad_int = int(cantidad) if cantidad else 1
-                        except ValueError:
-                            cantidad_int = 1
-
-                        try:
-                            disponible_bool = int(disponible_str) == 1
-                        except ValueError:
-                            disponible_bool = False
-
-                        # Parsear ubicación en vivero, mesa y pared
-                        vivero, mesa, pared = self.parsear_ubicacion(ubicacion)
-
-                        # Preparar datos para crear
-                        data = {
-                            'fechapol': fechapol,
-                            'fechamad': fechamad,
-                            'genero': genero,
-                            'especie': especie,
-                            'ubicacion': ubicacion,
-                            'vivero': vivero or '',
-                            'mesa': mesa or '',
-                            'pared': pared or '',
-                            'responsable': responsable,
-                            'cantidad': cantidad_int,
-                            'disponible': disponible_bool,
-                            'archivo_origen': archivo_origen,
-                            'creado_por': user,
-                        }
-
-                        # Crear nuevo registro (permitir duplicados)
-                        polinizacion = Polinizacion.objects.create(
-                            codigo=codigo,
-                            **data
-                        )
-                        imported_count += 1
-
-                        # Mostrar progreso cada 1000 registros
-                        if imported_count % 1000 == 0:
-                            self.stdout.write(
-                                self.style.SUCCESS(f'  [+] Importados {imported_count} registros...')
-                            )
-
-                    except Exception as e:
-                        error_msg = f"Error en fila {row_num} (codigo: {row.get('codigo', 'N/A')}): {str(e)}"
-                        errors.append(error_msg)
-                        self.stdout.write(
-                            self.style.ERROR(f'  [X] {error_msg}')
-                        )
-
-        except Exception as e:
+            with open(file_path, 'rb') as csvfile:
+                instancias = self.polinizaciones_de(
+                    leer_filas(csvfile, errores=self.errores), user, os.path.basename(file_path)
+                )
+                if options['fast']:
+                    resultado = carga_rapida_service.cargar(
+                        Polinizacion, instancias, etiqueta=os.path.basename(file_path), progreso=avance
+                    )
+                else:
+                    resultado = importacion_service.importar(
+                        Polinizacion, instancias, usuario=user, progreso=avance, sincronizar=options['update']
+                    )
+        except (OSError, UnicodeDecodeError) as e:
             raise CommandError(f'Error leyendo el archivo CSV: {str(e)}')
+        imported_count = resultado['total']
+        skipped_count = self.skipped_count
 
         # Mostrar resumen
         self.stdout.write('\n' + '='*60)
@@ -199,15 +223,23 @@ class Command(BaseCommand):
         )
         self.stdout.write(f'  * {imported_count} polinizaciones nuevas importadas')
         if options['update']:
-            self.stdout.write(f'  * {updated_count} polinizaciones actualizadas')
+            self.stdout.write(f"  * {resultado['actualizados']} polinizaciones actualizadas")
+            self.stdout.write(f"  * {resultado['sin_cambios']} polinizaciones sin cambios")
         self.stdout.write(f'  * {skipped_count} registros omitidos')
+        self.stdout.write('  * Tiempos: ' + ', '.join(
+            f'{paso} {milisegundos} ms' for paso, milisegundos in resultado['tiempos'].items()
+        ))
+        if options['fast']:
+            self.stdout.write(
+                f"  * Carga rapida ({resultado['motor']}): {resultado['filas_por_segundo']} filas/s"
+            )
 
-        if errors:
+        if self.errores.total:
             self.stdout.write(
-                self.style.WARNING(f'  * {len(errors)} errores encontrados')
+                self.style.WARNING(f'  * {self.errores.total} errores encontrados')
             )
             self.stdout.write('\nPrimeros 5 errores:')
-            for error in errors[:5]:
+            for error in self.errores.mensajes[:5]:
                 self.stdout.write(f'    - {error}')
 
         self.stdout.write('='*60 + '\n')
@@ -4,6 +4,12 @@ Comando para iniciar el scheduler de tareas automáticas.
 Este scheduler ejecuta:
 1. Envío de recordatorios de 5 días - cada hora
 2. Verificación de alertas de revisión - diariamente a las 8:00 AM
+3. Reconciliación de contadores de progreso mensual - diariamente a las 00:05
+4. Compactación de estadísticas diarias - diariamente a las 00:15
+5. Snapshot de métricas del modelo de germinación - diariamente a las 23:50
+6. Historial de predicciones (incremental; completo los domingos) - diariamente a las 00:30
+7. Reconciliación de contadores de notificaciones - diariamente a las 00:45
+8. Importaciones de CSV en cola - cada 15 segundos
 
 IMPORTANTE: Este comando debe ejecutarse como proceso separado o
 configurarse para iniciar automáticamente con el servidor.
@@ -64,6 +70,116 @@ def verificar_alertas_revision_job():
         logger.error(f"Error en alertas de revision: {e}")
 
 
+def reconciliar_progreso_mensual_job():
+    """
+    Job que reconcilia los contadores de progreso mensual del mes actual y
+    el anterior. Se ejecuta diariamente a las 00:05 (también cubre el cambio
+    de mes en el progreso de los perfiles).
+    """
+    from django.core.management import call_command
+    from io import StringIO
+
+    logger.info("Ejecutando reconciliacion de progreso mensual...")
+
+    try:
+        out = StringIO()
+        call_command('rebuild_progreso_mensual', meses=2, stdout=out)
+        logger.info(out.getvalue())
+    except Exception as e:
+        logger.error(f"Error en reconciliacion de progreso mensual: {e}")
+
+
+def compactar_estadisticas_diarias_job():
+    """
+    Job que reconcilia las estadísticas diarias de los últimos 35 días y
+    compacta las filas repetidas o en cero. Se ejecuta diariamente a las 00:15.
+    """
+    from django.core.management import call_command
+    from io import StringIO
+
+    logger.info("Ejecutando compactacion de estadisticas diarias...")
+
+    try:
+        out = StringIO()
+        call_command('rebuild_estadisticas_diarias', dias=35, stdout=out)
+        logger.info(out.getvalue())
+    except Exception as e:
+        logger.error(f"Error en compactacion de estadisticas diarias: {e}")
+
+
+def registrar_metricas_modelo_job():
+    """
+    Job que guarda el snapshot diario de las métricas de precisión del
+    modelo de germinación. Se ejecuta diariamente a las 23:50.
+    """
+    from django.core.management import call_command
+    from io import StringIO
+
+    logger.info("Ejecutando snapshot de metricas del modelo...")
+
+    try:
+        out = StringIO()
+        call_command('registrar_metricas_modelo', stdout=out)
+        logger.info(out.getvalue())
+    except Exception as e:
+        logger.error(f"Error en snapshot de metricas del modelo: {e}")
+
+
+def generar_historial_predicciones_job():
+    """
+    Job que extiende el historial de predicciones con los días nuevos y lo
+    recalcula completo los domingos para reflejar las validaciones tardías.
+    Se ejecuta diariamente a las 00:30.
+    """
+    from django.core.management import call_command
+    from django.utils import timezone
+    from io import StringIO
+
+    logger.info("Ejecutando historial de predicciones...")
+
+    try:
+        out = StringIO()
+        call_command('generar_historial_predicciones', completo=timezone.localdate().weekday() == 6, stdout=out)
+        logger.info(out.getvalue())
+    except Exception as e:
+        logger.error(f"Error en historial de predicciones: {e}")
+
+
+def reconciliar_contador_notificaciones_job():
+    """
+    Job que reconcilia los contadores de notificaciones por usuario con la
+    tabla de notificaciones (corrige desvíos de escrituras sin signals).
+    Se ejecuta diariamente a las 00:45.
+    """
+    from django.core.management import call_command
+    from io import StringIO
+
+    logger.info("Ejecutando reconciliacion de contadores de notificaciones...")
+
+    try:
+        out = StringIO()
+        call_command('rebuild_contador_notificaciones', stdout=out)
+        logger.info(out.getvalue())
+    except Exception as e:
+        logger.error(f"Error en reconciliacion de contadores de notificaciones: {e}")
+
+
+def procesar_importaciones_job():
+    """
+    Job que procesa las importaciones de CSV en cola, reanudando las que
+    quedaron a medias. Se ejecuta cada PERIODO_WORKER segundos.
+    """
+    from django.core.management import call_command
+    from io import StringIO
+
+    try:
+        out = StringIO()
+        call_command('procesar_importaciones', stdout=out)
+        logger.debug(out.getvalue())
+    except Exception as e:
+        logger.error(f"Error procesando importaciones en cola: {e}")
+
+
 class Command(BaseCommand):
     help = 'Inicia el scheduler de tareas automáticas para notificaciones'
 
@@ -140,6 +256,98 @@ class Command(BaseCommand):
             f'✅ Job programado: Alertas de revisión a las {hora_revision}:00'
         ))
 
+        # Job 3: Reconciliación de progreso mensual (diariamente a las 00:05)
+        scheduler.add_job(
+            reconciliar_progreso_mensual_job,
+            trigger=CronTrigger(hour=0, minute=5),
+            id='reconciliar_progreso_mensual',
+            name='Reconciliación de progreso mensual',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Job programado: Reconciliación de progreso mensual a las 00:05'
+        ))
+
+        # Job 4: Compactación de estadísticas diarias (diariamente a las 00:15)
+        scheduler.add_job(
+            compactar_estadisticas_diarias_job,
+            trigger=CronTrigger(hour=0, minute=15),
+            id='compactar_estadisticas_diarias',
+            name='Compactación de estadísticas diarias',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Job programado: Compactación de estadísticas diarias a las 00:15'
+        ))
+
+        # Job 5: Snapshot de métricas del modelo (diariamente a las 23:50)
+        scheduler.add_job(
+            registrar_metricas_modelo_job,
+            trigger=CronTrigger(hour=23, minute=50),
+            id='registrar_metricas_modelo',
+            name='Snapshot de métricas del modelo',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Job programado: Snapshot de métricas del modelo a las 23:50'
+        ))
+
+        # Job 6: Historial de predicciones (diariamente a las 00:30)
+        scheduler.add_job(
+            generar_historial_predicciones_job,
+            trigger=CronTrigger(hour=0, minute=30),
+            id='generar_historial_predicciones',
+            name='Historial de predicciones',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Job programado: Historial de predicciones a las 00:30'
+        ))
+
+        # Job 7: Reconciliación de contadores de notificaciones (diariamente a las 00:45)
+        scheduler.add_job(
+            reconciliar_contador_notificaciones_job,
+            trigger=CronTrigger(hour=0, minute=45),
+            id='reconciliar_contador_notificaciones',
+            name='Reconciliación de contadores de notificaciones',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Job programado: Reconciliación de contadores de notificaciones a las 00:45'
+        ))
+
+        # Job 8: Importaciones de CSV en cola (cada PERIODO_WORKER segundos)
+        from laboratorio.services.import_job_service import PERIODO_WORKER
+
+        scheduler.add_job(
+            procesar_importaciones_job,
+            trigger=IntervalTrigger(seconds=PERIODO_WORKER),
+            id='procesar_importaciones',
+            name='Importaciones de CSV en cola',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Job programado: Importaciones en cola cada {PERIODO_WORKER} s'
+        ))
+
         # Ejecutar inmediatamente si se solicita
         if ejecutar_ahora:
             self.stdout.write(self.style.WARNING(
@@ -147,6 +355,12 @@ class Command(BaseCommand):
             ))
             enviar_recordatorios_job()
             verificar_alertas_revision_job()
+            reconciliar_progreso_mensual_job()
+            compactar_estadisticas_diarias_job()
+            registrar_metricas_modelo_job()
+            generar_historial_predicciones_job()
+            reconciliar_contador_notificaciones_job()
+            procesar_importaciones_job()
 
         # Iniciar scheduler
         scheduler.start()
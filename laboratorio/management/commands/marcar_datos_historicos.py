@@ -8,8 +8,9 @@ Uso:
     python manage.py marcar_datos_historicos --fecha-corte 2025-12-01
     python manage.py marcar_datos_historicos --fecha-corte 2025-12-01 --dry-run
 
-Los registros con fecha_creacion anterior a --fecha-corte y archivo_origen=''
-se consideran históricos y se les asigna archivo_origen='historico'.
+Los registros con fecha_creacion anterior a --fecha-corte y sin archivo de
+origen se consideran históricos y se les asigna archivo_origen='historico'
+(y es_importado=True, que update() no recalcula).
 """
 from django.core.management.base import BaseCommand, CommandError
 from django.utils.dateparse import parse_datetime
@@ -48,11 +49,11 @@ class Command(BaseCommand):
         from laboratorio.core.models import Polinizacion, Germinacion
 
         pol_qs = Polinizacion.objects.filter(
-            archivo_origen='',
+            es_importado=False,
             fecha_creacion__lt=fecha_corte,
         )
         germ_qs = Germinacion.objects.filter(
-            archivo_origen='',
+            es_importado=False,
             fecha_creacion__lt=fecha_corte,
         )
 
@@ -71,8 +72,20 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('No hay registros para marcar.'))
             return
 
-        pol_updated = pol_qs.update(archivo_origen='historico')
-        germ_updated = germ_qs.update(archivo_origen='historico')
+        from laboratorio.services.version_service import version_service
+
+        # update() no dispara signals: invalidar los ETags de los usuarios afectados
+        for tabla, qs in (('polinizacion', pol_qs), ('germinacion', germ_qs)):
+            version_service.incrementar_al_confirmar(
+                tabla, qs.values_list('creado_por_id', flat=True).distinct()
+            )
+
+        pol_updated = pol_qs.update(archivo_origen='historico', es_importado=True)
+        germ_updated = germ_qs.update(archivo_origen='historico', es_importado=True)
+
+        # update() tampoco pasa por los signals de las estadísticas diarias
+        from laboratorio.services.estadistica_service import estadistica_service
+        estadistica_service.rebuild()
 
         self.stdout.write(self.style.SUCCESS(
             f'Marcados como historico: {pol_updated} polinizaciones, {germ_updated} germinaciones.'
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Procesa las importaciones de CSV en cola (ImportJob): las pendientes y las
+que quedaron EN_PROCESO sin latido, reanudando desde su última fila
+confirmada. El scheduler lo ejecuta periódicamente; con --continuo queda
+como worker dedicado consultando la cola.
+
+Uso:
+    python manage.py procesar_importaciones
+    python manage.py procesar_importaciones --continuo --espera 5
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Procesa las importaciones de CSV en cola.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue consultando la cola hasta detenerlo (Ctrl+C)'
+        )
+        parser.add_argument(
+            '--espera',
+            type=int,
+            default=5,
+            help='Segundos entre consultas con la cola vacía (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.services.import_job_service import import_job_service
+
+        if not options['continuo']:
+            total = import_job_service.procesar_pendientes()
+            self.stdout.write(self.style.SUCCESS(f'Importaciones procesadas: {total}.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Worker de importaciones activo. Ctrl+C para detener.'))
+        try:
+            while True:
+                if not import_job_service.procesar_pendientes():
+                    time.sleep(options['espera'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker de importaciones detenido.'))
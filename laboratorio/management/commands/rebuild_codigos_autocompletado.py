@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Regenera el catálogo de autocompletado de códigos desde las tablas de
+polinizaciones y germinaciones, y crea su índice de trigramas si no existe.
+
+Uso:
+    python manage.py rebuild_codigos_autocompletado
+    python manage.py rebuild_codigos_autocompletado --fuente germinacion
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = 'Regenera el catálogo de autocompletado de códigos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fuente',
+            choices=['polinizacion', 'germinacion'],
+            help='Regenera solo los códigos de esta fuente.',
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.services.codigo_autocomplete_service import (
+            FUENTES, codigo_autocomplete_service, ensure_autocomplete_schema
+        )
+
+        if not ensure_autocomplete_schema():
+            self.stdout.write(self.style.WARNING(
+                'No se pudo crear el índice de trigramas; las búsquedas fuera de memoria usarán LIKE.'
+            ))
+
+        fuentes = [options['fuente']] if options['fuente'] else list(FUENTES)
+        for fuente in fuentes:
+            with transaction.atomic():
+                total = codigo_autocomplete_service.rebuild(fuente)
+            self.stdout.write(self.style.SUCCESS(f'{fuente}: {total} códigos en el catálogo.'))
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Reconcilia los contadores de notificaciones por usuario
+(ContadorNotificaciones) con la tabla de notificaciones: corrige las filas
+que difieren, crea las que faltan y pone a cero las de usuarios sin
+notificaciones.
+
+Uso:
+    python manage.py rebuild_contador_notificaciones
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Reconcilia los contadores de notificaciones por usuario.'
+
+    def handle(self, *args, **options):
+        from laboratorio.services.contador_notificacion_service import contador_notificacion_service
+
+        total = contador_notificacion_service.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Contadores de notificaciones reconciliados: {total} filas corregidas.'))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Reconcilia las estadísticas diarias pre-agregadas (EstadisticaDiaria) con
+las tablas de polinizaciones y germinaciones y compacta las filas
+repetidas o en cero. Sin opciones regenera todo el historial.
+
+Uso:
+    python manage.py rebuild_estadisticas_diarias
+    python manage.py rebuild_estadisticas_diarias --dias 35
+    python manage.py rebuild_estadisticas_diarias --solo-compactar
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Regenera, reconcilia o compacta las estadísticas diarias pre-agregadas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=None,
+            help='Reconcilia solo los últimos N días (incluido hoy).',
+        )
+        parser.add_argument(
+            '--solo-compactar',
+            action='store_true',
+            help='Solo une las filas repetidas y borra las que quedaron en cero.',
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.services.estadistica_service import estadistica_service
+
+        if not options['solo_compactar']:
+            total = estadistica_service.rebuild(dias=options['dias'])
+            alcance = f"últimos {options['dias']} días" if options['dias'] else 'todo el historial'
+            self.stdout.write(f'Estadísticas diarias reconciliadas ({alcance}): {total} filas.')
+        eliminadas = estadistica_service.compactar()
+        self.stdout.write(self.style.SUCCESS(f'Estadísticas diarias compactadas: {eliminadas} filas eliminadas.'))
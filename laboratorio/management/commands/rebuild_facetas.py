@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Regenera desde cero el catálogo de facetas de los filtros (valores distintos
+y conteos de polinizaciones y germinaciones).
+
+Uso:
+    python manage.py rebuild_facetas
+    python manage.py rebuild_facetas --modelo polinizacion
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Regenera el catálogo de facetas de los filtros.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo',
+            choices=['polinizacion', 'germinacion'],
+            help='Regenera solo las facetas de este modelo.',
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.services.faceta_service import FACETAS, faceta_service
+
+        modelos = [options['modelo']] if options['modelo'] else list(FACETAS)
+        for modelo in modelos:
+            total = faceta_service.rebuild(modelo)
+            self.stdout.write(self.style.SUCCESS(f'{modelo}: {total} facetas en el catálogo.'))
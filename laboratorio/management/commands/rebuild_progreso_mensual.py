@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Reconcilia los contadores de progreso mensual (ProgresoMensual) con las
+tablas de polinizaciones y germinaciones y recalcula el progreso de los
+perfiles. Sin opciones regenera todo el historial.
+
+Uso:
+    python manage.py rebuild_progreso_mensual
+    python manage.py rebuild_progreso_mensual --meses 2
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Regenera o reconcilia los contadores de progreso mensual.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses',
+            type=int,
+            default=None,
+            help='Reconcilia solo los últimos N meses (incluido el actual).',
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.services.progreso_service import progreso_service
+
+        total = progreso_service.rebuild(meses=options['meses'])
+        alcance = f"últimos {options['meses']} meses" if options['meses'] else 'todo el historial'
+        self.stdout.write(self.style.SUCCESS(f'Progreso mensual reconciliado ({alcance}): {total} filas.'))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Regenera los documentos de búsqueda de texto completo de polinizaciones
+y germinaciones, y crea el índice del motor si no existe.
+
+Uso:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --modelo polinizacion
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = 'Regenera el índice de búsqueda de texto completo (tsvector/FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo',
+            choices=['polinizacion', 'germinacion'],
+            help='Regenera solo el índice de este modelo.',
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.core.models import Polinizacion, Germinacion
+        from laboratorio.services.search_backend import get_search_backend, ensure_search_schema
+
+        backend = get_search_backend()
+        if ensure_search_schema():
+            self.stdout.write(self.style.SUCCESS('Índice de texto completo disponible.'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                'El motor no soporta el índice de texto completo; se usará búsqueda icontains.'
+            ))
+        backend.reset()
+
+        modelos = {'polinizacion': Polinizacion, 'germinacion': Germinacion}
+        if options['modelo']:
+            modelos = {options['modelo']: modelos[options['modelo']]}
+
+        for nombre, modelo in modelos.items():
+            with transaction.atomic():
+                total = backend.rebuild(modelo)
+            self.stdout.write(self.style.SUCCESS(f'{nombre}: {total} documentos indexados.'))
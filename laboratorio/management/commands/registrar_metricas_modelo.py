@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+Calcula las métricas de precisión del modelo de predicción de germinación
+y guarda el snapshot del día (MetricaModeloDiaria), para que la serie
+histórica tenga un punto por día aunque nadie consulte los endpoints.
+
+Uso:
+    python manage.py registrar_metricas_modelo
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Guarda el snapshot diario de las métricas de precisión del modelo de germinación.'
+
+    def handle(self, *args, **options):
+        from laboratorio.services.metrica_service import metrica_service
+
+        snapshot = metrica_service.registrar()
+        self.stdout.write(self.style.SUCCESS(
+            f'Métricas del modelo registradas para {snapshot.dia}: {snapshot.validadas} predicciones validadas.'
+        ))
@@ -1,18 +1,54 @@
+import os
+
 from django.core.management.base import BaseCommand
-import pandas as pd
 from laboratorio.core.models import Polinizacion, Germinacion
 from django.contrib.auth.models import User
 from django.utils.dateparse import parse_date
-import numpy as np
+
+ARCHIVO_POLINIZACIONES = 'data/datos_combinados_limpios.csv'
+ARCHIVO_GERMINACIONES = 'data/Germinacion_Consolidado - Consolidado.csv'
+
+
+def _texto(row, columna):
+    return (row.get(columna) or '').strip()
+
+
+def _fecha(row, columna):
+    valor = _texto(row, columna)
+    return parse_date(valor) if valor else None
+
+
+def _numero(row, columna):
+    """Entero de una columna numérica (acepta '3.0' de las exportaciones); None si está vacía"""
+    try:
+        return int(float(_texto(row, columna)))
+    except ValueError:
+        return None
+
 
 class Command(BaseCommand):
-    help = 'Reimporta los datos desde los CSV, eliminando los datos existentes en las tablas.'
+    help = ('Reimporta los datos desde los CSV. Sincroniza con la carga anterior: omite las filas sin cambios, '
+            'actualiza las modificadas e inserta las nuevas. Con --limpiar elimina antes los datos existentes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limpiar',
+            action='store_true',
+            help='Eliminar los datos existentes y cargar los archivos completos'
+        )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Carga completa (implica --limpiar): COPY a una tabla de paso y fusión por conjuntos en '
+                 'PostgreSQL (motor por lotes del ORM en otros motores)'
+        )
 
     def handle(self, *args, **options):
-        # Eliminar datos existentes
-        Polinizacion.objects.all().delete()
-        Germinacion.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('Datos existentes eliminados.'))
+        if options['limpiar'] or options['fast']:
+            # Eliminar datos existentes
+            Polinizacion.objects.all().delete()
+            Germinacion.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS('Datos existentes eliminados.'))
 
         # Obtener un superusuario para asignar a los registros
         admin_user = User.objects.filter(is_superuser=True).first()
@@ -21,85 +57,103 @@ class Command(BaseCommand):
 
         # Cargar y procesar datos de Polinización
         try:
-            df_polinizacion = pd.read_csv('data/datos_combinados_limpios.csv')
-            self.stdout.write(self.style.SUCCESS(f'Datos de polinización cargados: {len(df_polinizacion)} filas.'))
-
-            codigos_usados = set()
-            for _, row in df_polinizacion.iterrows():
-                # Limpieza y conversión de fechas
-                fechapol = parse_date(row['fechapol']) if pd.notna(row['fechapol']) else None
-                fechamad = parse_date(row['fechamad']) if pd.notna(row['fechamad']) else None
-
-                codigo = row.get('codigo', '')
-                if codigo in codigos_usados:
-                    i = 1
-                    while f'{codigo}_{i}' in codigos_usados:
-                        i += 1
-                    codigo = f'{codigo}_{i}'
-                codigos_usados.add(codigo)
-
-                disponible_val = row.get('disponible', True)
-                if isinstance(disponible_val, str):
-                    disponible = disponible_val.lower() in ['t', 'true', '1', '-1', '-2']
-                else:
-                    disponible = bool(disponible_val)
-
-                Polinizacion.objects.create(
-                    fechapol=fechapol,
-                    fechamad=fechamad,
-                    codigo=codigo,
-                    responsable=row.get('responsable', ''),
-                    disponible=disponible,
-                    genero=row.get('genero', ''),
-                    especie=row.get('especie', ''),
-                    ubicacion=row.get('ubicacion', ''),
-                    cantidad=row.get('cantidad', 1),
-                    archivo_origen=row.get('archivo_origen', ''),
-                    creado_por=admin_user
-                )
+            self._cargar(Polinizacion, ARCHIVO_POLINIZACIONES, self.polinizaciones_de, admin_user, options['fast'])
             self.stdout.write(self.style.SUCCESS('Datos de polinización importados correctamente.'))
 
         except FileNotFoundError:
-            self.stdout.write(self.style.ERROR("Error: El archivo 'data/datos_combinados_limpios.csv' no fue encontrado."))
+            self.stdout.write(self.style.ERROR(f"Error: El archivo '{ARCHIVO_POLINIZACIONES}' no fue encontrado."))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Error al importar datos de polinización: {e}"))
 
         # Cargar y procesar datos de Germinación
         try:
-            df_germinacion = pd.read_csv('data/Germinacion_Consolidado - Consolidado.csv')
-            self.stdout.write(self.style.SUCCESS(f'Datos de germinación cargados: {len(df_germinacion)} filas.'))
-
-            for _, row in df_germinacion.iterrows():
-                # Limpieza y conversión de fechas
-                fecha_ingreso = parse_date(row['FECHA DE INGRESO']) if pd.notna(row['FECHA DE INGRESO']) else None
-                fecha_polinizacion = parse_date(row['FECHA DE POLINIZACIÓN']) if pd.notna(row['FECHA DE POLINIZACIÓN']) else None
-                dias_polinizacion = row.get('No_dias_pol', None)
-                if pd.isna(dias_polinizacion):
-                    dias_polinizacion = None
-                
-                numero_capsulas = row.get('No_CAPSULAS', None)
-                if pd.isna(numero_capsulas):
-                    numero_capsulas = None
-
-                Germinacion.objects.create(
-                    fecha_ingreso=fecha_ingreso,
-                    fecha_polinizacion=fecha_polinizacion,
-                    dias_polinizacion=dias_polinizacion,
-                    nombre=row.get('NOMBRE', ''),
-                    detalles_padres=row.get('DETALLES DE PADRES DEL HIBRIDO', ''),
-                    tipo_polinizacion=row.get('TIPO POLINIZ', ''),
-                    finca=row.get('FINCA', ''),
-                    numero_vivero=row.get('No_VIVERO', ''),
-                    numero_capsulas=numero_capsulas,
-                    estado_capsula=row.get('ESTADO DE CAPSULAS', ''),
-                    entrega_capsulas=row.get('ENTREGA CAPSULAS', ''),
-                    recibe_capsulas=row.get('RECIBE CAPSULAS', ''),
-                    etapa_actual=row.get('Etapa', ''),
-                    creado_por=admin_user
-                )
+            self._cargar(Germinacion, ARCHIVO_GERMINACIONES, self.germinaciones_de, admin_user, options['fast'])
             self.stdout.write(self.style.SUCCESS('Datos de germinación importados correctamente.'))
 
         except FileNotFoundError:
-            self.stdout.write(self.style.ERROR("Error: El archivo 'data/Germinacion_Consolidado - Consolidado.csv' no fue encontrado."))
+            self.stdout.write(self.style.ERROR(f"Error: El archivo '{ARCHIVO_GERMINACIONES}' no fue encontrado."))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error al importar datos de germinación: {e}"))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f"Error al importar datos de germinación: {e}"))
+
+    def _cargar(self, modelo, ruta, construir, admin_user, rapido):
+        """
+        Lee el archivo por bloques y sincroniza sus registros por lotes con
+        los de la carga anterior (con --fast los inserta por COPY en
+        PostgreSQL); muestra los totales y el rendimiento
+        """
+        from laboratorio.integrations.lector_csv import leer_filas
+        from laboratorio.services.carga_rapida_service import carga_rapida_service
+        from laboratorio.services.importacion_service import importacion_service
+
+        with open(ruta, 'rb') as archivo:
+            instancias = construir(leer_filas(archivo), admin_user, os.path.basename(ruta))
+            if rapido:
+                resultado = carga_rapida_service.cargar(modelo, instancias)
+            else:
+                resultado = importacion_service.importar(modelo, instancias, notificar=False, sincronizar=True)
+
+        nombre = modelo._meta.verbose_name_plural.lower()
+        self.stdout.write(self.style.SUCCESS(f"Registros de {nombre} cargados: {resultado['total']}."))
+        if not rapido:
+            self.stdout.write(f"Actualizados: {resultado['actualizados']}, sin cambios: {resultado['sin_cambios']}.")
+        self.stdout.write('Tiempos: ' + ', '.join(
+            f'{paso} {milisegundos} ms' for paso, milisegundos in resultado['tiempos'].items()
+        ))
+        if rapido:
+            self.stdout.write(f"Carga rápida ({resultado['motor']}): {resultado['filas_por_segundo']} filas/s")
+
+    def polinizaciones_de(self, filas, admin_user, archivo):
+        """Polinizaciones de las filas; los códigos repetidos reciben un sufijo _N"""
+        from laboratorio.services.importacion_service import importacion_service
+
+        codigos_usados = set()
+        for numero, row in filas:
+            codigo = _texto(row, 'codigo')
+            if codigo in codigos_usados:
+                i = 1
+                while f'{codigo}_{i}' in codigos_usados:
+                    i += 1
+                codigo = f'{codigo}_{i}'
+            codigos_usados.add(codigo)
+
+            disponible = _texto(row, 'disponible').lower() in ['', 't', 'true', '1', '-1', '-2']
+
+            instance = importacion_service.con_origen(Polinizacion, dict(
+                fechapol=_fecha(row, 'fechapol'),
+                fechamad=_fecha(row, 'fechamad'),
+                codigo=codigo,
+                responsable=_texto(row, 'responsable'),
+                disponible=disponible,
+                genero=_texto(row, 'genero'),
+                especie=_texto(row, 'especie'),
+                ubicacion=_texto(row, 'ubicacion'),
+                cantidad=_numero(row, 'cantidad') or 1,
+                archivo_origen=_texto(row, 'archivo_origen'),
+                creado_por=admin_user
+            ))
+            importacion_service.marcar_origen(instance, archivo, numero)
+            yield instance
+
+    def germinaciones_de(self, filas, admin_user, archivo):
+        """Germinaciones de las filas del consolidado"""
+        from laboratorio.services.importacion_service import importacion_service
+
+        for numero, row in filas:
+            instance = importacion_service.con_origen(Germinacion, dict(
+                fecha_ingreso=_fecha(row, 'FECHA DE INGRESO'),
+                fecha_polinizacion=_fecha(row, 'FECHA DE POLINIZACIÓN'),
+                dias_polinizacion=_numero(row, 'No_dias_pol'),
+                nombre=_texto(row, 'NOMBRE'),
+                detalles_padres=_texto(row, 'DETALLES DE PADRES DEL HIBRIDO'),
+                tipo_polinizacion=_texto(row, 'TIPO POLINIZ'),
+                finca=_texto(row, 'FINCA'),
+                numero_vivero=_texto(row, 'No_VIVERO'),
+                numero_capsulas=_numero(row, 'No_CAPSULAS'),
+                estado_capsula=_texto(row, 'ESTADO DE CAPSULAS'),
+                entrega_capsulas=_texto(row, 'ENTREGA CAPSULAS'),
+                recibe_capsulas=_texto(row, 'RECIBE CAPSULAS'),
+                etapa_actual=_texto(row, 'Etapa'),
+                creado_por=admin_user
+            ))
+            importacion_service.marcar_origen(instance, archivo, numero)
+            yield instance
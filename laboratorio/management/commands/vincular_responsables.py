@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Completa la FK responsable_usuario de polinizaciones y germinaciones a
+partir del texto de `responsable` (nombre de usuario o nombre completo),
+con un UPDATE por cada valor distinto. Los registros nuevos se vinculan al
+guardarse; este comando hace la carga inicial y la de los registros
+insertados sin signals (importaciones masivas).
+
+Uso:
+    python manage.py vincular_responsables
+    python manage.py vincular_responsables --completo
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Vincula el texto de responsable de polinizaciones y germinaciones con su usuario.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo', action='store_true',
+            help='Revisa también los registros ya vinculados (y desvincula los que no resuelven).'
+        )
+
+    def handle(self, *args, **options):
+        from laboratorio.services.responsable_service import responsable_service
+
+        actualizados = responsable_service.vincular(completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(f'Responsables vinculados: {actualizados} registros actualizados.'))
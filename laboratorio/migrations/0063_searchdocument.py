@@ -0,0 +1,61 @@
+# Generated by Django 5.2.3 on 2026-10-16 18:57
+
+from django.db import migrations, models
+
+
+def crear_indice_y_documentos(apps, schema_editor):
+    """
+    Crea el índice de texto completo del motor y genera los documentos
+    de búsqueda de los registros existentes
+    """
+    from laboratorio.services.search_backend import (
+        CAMPOS_BUSQUEDA, ensure_search_schema, normalizar_texto, TAMANO_LOTE
+    )
+
+    ensure_search_schema(schema_editor.connection)
+
+    SearchDocument = apps.get_model('laboratorio', 'SearchDocument')
+    for etiqueta, campos in CAMPOS_BUSQUEDA.items():
+        Model = apps.get_model(etiqueta)
+        lote = []
+        for valores in Model.objects.values_list('pk', *campos).iterator(chunk_size=TAMANO_LOTE):
+            contenido = ' '.join(t for t in (normalizar_texto(v) for v in valores[1:]) if t)
+            lote.append(SearchDocument(modelo=etiqueta, object_id=valores[0], contenido=contenido))
+            if len(lote) >= TAMANO_LOTE:
+                SearchDocument.objects.bulk_create(lote)
+                lote = []
+        if lote:
+            SearchDocument.objects.bulk_create(lote)
+
+
+def eliminar_indice(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("DROP TABLE IF EXISTS laboratorio_searchdocument_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0062_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('contenido', models.TextField(blank=True, default='')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Documento de Búsqueda',
+                'verbose_name_plural': 'Documentos de Búsqueda',
+                'constraints': [models.UniqueConstraint(fields=('modelo', 'object_id'), name='searchdocument_modelo_objeto_uniq')],
+            },
+        ),
+        migrations.RunPython(crear_indice_y_documentos, eliminar_indice),
+    ]
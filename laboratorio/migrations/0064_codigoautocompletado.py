@@ -0,0 +1,74 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:01
+
+from django.db import migrations, models
+
+
+def crear_indice_y_catalogo(apps, schema_editor):
+    """
+    Crea el índice de trigramas y llena el catálogo de códigos con los
+    registros existentes (el más reciente de cada código prevalece)
+    """
+    from laboratorio.services.codigo_autocomplete_service import (
+        FUENTES, ensure_autocomplete_schema, normalizar_clave
+    )
+
+    ensure_autocomplete_schema(schema_editor.connection)
+
+    CodigoAutocompletado = apps.get_model('laboratorio', 'CodigoAutocompletado')
+    for fuente, (nombre_modelo, campos) in FUENTES.items():
+        Model = apps.get_model('laboratorio', nombre_modelo)
+        filas = {}
+        valores = (
+            Model.objects.exclude(codigo__isnull=True).exclude(codigo='')
+            .order_by('pk').values_list(*campos)
+        )
+        for codigo, genero, especie, clima in valores.iterator(chunk_size=2000):
+            codigo = codigo.strip()
+            if codigo:
+                filas[codigo] = CodigoAutocompletado(
+                    fuente=fuente, codigo=codigo,
+                    clave=normalizar_clave(codigo, 50),
+                    genero=(genero or '')[:100], especie=(especie or '')[:255],
+                    especie_clave=normalizar_clave(especie),
+                    clima=(clima or '')[:50],
+                )
+        CodigoAutocompletado.objects.bulk_create(list(filas.values()), batch_size=500)
+
+
+def eliminar_indice(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("DROP TABLE IF EXISTS laboratorio_codigoautocompletado_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0063_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodigoAutocompletado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fuente', models.CharField(choices=[('polinizacion', 'Polinización'), ('germinacion', 'Germinación')], max_length=20)),
+                ('codigo', models.CharField(max_length=50)),
+                ('clave', models.CharField(blank=True, default='', max_length=50)),
+                ('genero', models.CharField(blank=True, default='', max_length=100)),
+                ('especie', models.CharField(blank=True, default='', max_length=255)),
+                ('especie_clave', models.CharField(blank=True, default='', max_length=255)),
+                ('clima', models.CharField(blank=True, default='', max_length=50)),
+                ('activo', models.BooleanField(default=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Código de Autocompletado',
+                'verbose_name_plural': 'Códigos de Autocompletado',
+                'indexes': [models.Index(fields=['fuente', 'actualizado'], name='laboratorio_fuente_9371df_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fuente', 'codigo'), name='codigoautocompletado_fuente_codigo_uniq')],
+            },
+        ),
+        migrations.RunPython(crear_indice_y_catalogo, eliminar_indice),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:06
+
+from django.db import migrations, models
+
+
+def llenar_facetas(apps, schema_editor):
+    """Llena el catálogo de facetas con los registros existentes"""
+    from laboratorio.services.faceta_service import FACETAS, calcular_facetas, clave_orden
+
+    FacetaFiltro = apps.get_model('laboratorio', 'FacetaFiltro')
+    for modelo, (nombre_modelo, _) in FACETAS.items():
+        Model = apps.get_model('laboratorio', nombre_modelo)
+        FacetaFiltro.objects.bulk_create(
+            [
+                FacetaFiltro(modelo=modelo, campo=campo, contexto=contexto, valor=valor,
+                             total=total, orden=clave_orden(campo, valor))
+                for (campo, contexto, valor), total in calcular_facetas(Model, modelo).items() if total > 0
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0064_codigoautocompletado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetaFiltro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=20)),
+                ('campo', models.CharField(max_length=50)),
+                ('contexto', models.CharField(blank=True, default='', max_length=100)),
+                ('valor', models.CharField(blank=True, default='', max_length=255)),
+                ('total', models.IntegerField(default=0)),
+                ('orden', models.CharField(blank=True, default='', max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Faceta de Filtro',
+                'verbose_name_plural': 'Facetas de Filtros',
+                'indexes': [models.Index(fields=['modelo', 'contexto', 'campo', 'orden'], name='laboratorio_modelo_dca52e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('modelo', 'campo', 'contexto', 'valor'), name='facetafiltro_modelo_campo_valor_uniq')],
+            },
+        ),
+        migrations.RunPython(llenar_facetas, migrations.RunPython.noop),
+    ]
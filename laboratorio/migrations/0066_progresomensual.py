@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def llenar_progreso(apps, schema_editor):
+    """Calcula los contadores por usuario y mes de los registros existentes"""
+    from laboratorio.services.progreso_service import progreso_service
+
+    ProgresoMensual = apps.get_model('laboratorio', 'ProgresoMensual')
+    ProgresoMensual.objects.bulk_create(
+        [
+            ProgresoMensual(usuario_id=usuario_id, mes=mes, **valores)
+            for (usuario_id, mes), valores in progreso_service.calcular(apps=apps).items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0065_facetafiltro'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgresoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(verbose_name='Primer día del mes')),
+                ('polinizaciones', models.IntegerField(default=0)),
+                ('polinizaciones_exitosas', models.IntegerField(default=0)),
+                ('germinaciones', models.IntegerField(default=0)),
+                ('germinaciones_exitosas', models.IntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progreso_mensual', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Progreso Mensual',
+                'verbose_name_plural': 'Progresos Mensuales',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'mes'), name='progresomensual_usuario_mes_uniq')],
+            },
+        ),
+        migrations.RunPython(llenar_progreso, migrations.RunPython.noop),
+    ]
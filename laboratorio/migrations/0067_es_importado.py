@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def marcar_importados(apps, schema_editor):
+    """es_importado = archivo_origen no nulo ni vacío en los registros existentes"""
+    for nombre in ('Polinizacion', 'Germinacion'):
+        Model = apps.get_model('laboratorio', nombre)
+        Model.objects.exclude(archivo_origen__isnull=True).exclude(archivo_origen='').update(es_importado=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0066_progresomensual'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='germinacion',
+            name='es_importado',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Importado'),
+        ),
+        migrations.AddField(
+            model_name='polinizacion',
+            name='es_importado',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Importado'),
+        ),
+        migrations.RunPython(marcar_importados, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='germinacion',
+            index=models.Index(fields=['creado_por', 'es_importado', '-fecha_creacion'], name='laboratorio_creado__213eaf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='polinizacion',
+            index=models.Index(fields=['creado_por', 'es_importado', '-fecha_creacion'], name='laboratorio_creado__e3909c_idx'),
+        ),
+    ]
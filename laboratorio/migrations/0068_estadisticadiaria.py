@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def llenar_estadisticas(apps, schema_editor):
+    """Calcula las estadísticas diarias de los registros existentes"""
+    from laboratorio.services.estadistica_service import estadistica_service
+
+    EstadisticaDiaria = apps.get_model('laboratorio', 'EstadisticaDiaria')
+    EstadisticaDiaria.objects.bulk_create(
+        estadistica_service.construir_filas(estadistica_service.calcular(apps=apps), EstadisticaDiaria),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0067_es_importado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=20)),
+                ('dia', models.DateField(blank=True, null=True)),
+                ('genero', models.CharField(blank=True, max_length=100, null=True)),
+                ('especie', models.CharField(blank=True, max_length=255, null=True)),
+                ('estado', models.CharField(blank=True, max_length=20, null=True)),
+                ('es_importado', models.BooleanField(default=False)),
+                ('total', models.IntegerField(default=0)),
+                ('exitosas', models.IntegerField(default=0)),
+                ('completadas', models.IntegerField(default=0)),
+                ('suma_cantidad', models.BigIntegerField(default=0)),
+                ('con_cantidad', models.IntegerField(default=0)),
+                ('suma_dias', models.BigIntegerField(default=0)),
+                ('con_dias', models.IntegerField(default=0)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='estadisticas_diarias', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Estadística Diaria',
+                'verbose_name_plural': 'Estadísticas Diarias',
+                'indexes': [models.Index(fields=['modelo', 'es_importado', 'dia'], name='laboratorio_modelo_57de85_idx'), models.Index(fields=['usuario', 'modelo', 'es_importado'], name='laboratorio_usuario_766ce1_idx')],
+            },
+        ),
+        migrations.RunPython(llenar_estadisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0068_estadisticadiaria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='germinacion',
+            index=models.Index(condition=models.Q(('fecha_germinacion__isnull', True), ('prediccion_fecha_estimada__isnull', False)), fields=['creado_por', 'prediccion_fecha_estimada'], name='germ_alerta_pendiente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='polinizacion',
+            index=models.Index(condition=models.Q(('fechamad__isnull', True), ('prediccion_fecha_estimada__isnull', False)), fields=['creado_por', 'prediccion_fecha_estimada'], name='pol_alerta_pendiente_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0069_alertas_pendientes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaModeloDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(unique=True)),
+                ('total_germinaciones', models.IntegerField(default=0)),
+                ('con_prediccion', models.IntegerField(default=0)),
+                ('validadas', models.IntegerField(default=0)),
+                ('suma_error_abs', models.BigIntegerField(default=0)),
+                ('suma_error_cuadrado', models.BigIntegerField(default=0)),
+                ('hasta_3_dias', models.IntegerField(default=0)),
+                ('hasta_7_dias', models.IntegerField(default=0)),
+                ('hasta_14_dias', models.IntegerField(default=0)),
+                ('version', models.CharField(blank=True, max_length=64)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Métrica Diaria del Modelo',
+                'verbose_name_plural': 'Métricas Diarias del Modelo',
+                'ordering': ['-dia'],
+            },
+        ),
+    ]
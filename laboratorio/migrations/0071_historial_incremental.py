@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0070_metricamodelodiaria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historialpredicciones',
+            name='conteo_especies',
+            field=models.JSONField(blank=True, null=True, verbose_name='Predicciones por especie'),
+        ),
+        migrations.AddField(
+            model_name='historialpredicciones',
+            name='suma_confianza',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Suma de confianzas'),
+        ),
+        migrations.AddField(
+            model_name='historialpredicciones',
+            name='suma_precision',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True, verbose_name='Suma de precisiones'),
+        ),
+    ]
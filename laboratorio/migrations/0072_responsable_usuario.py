@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-16 19:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0071_historial_incremental'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='germinacion',
+            name='responsable_usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='germinaciones_a_cargo', to=settings.AUTH_USER_MODEL, verbose_name='Usuario responsable'),
+        ),
+        migrations.AddField(
+            model_name='polinizacion',
+            name='responsable_usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='polinizaciones_a_cargo', to=settings.AUTH_USER_MODEL, verbose_name='Usuario responsable'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def llenar_contadores(apps, schema_editor):
+    """Calcula los contadores de notificaciones de los usuarios existentes"""
+    from laboratorio.services.contador_notificacion_service import contador_notificacion_service
+
+    ContadorNotificaciones = apps.get_model('laboratorio', 'ContadorNotificaciones')
+    ContadorNotificaciones.objects.bulk_create(
+        [
+            ContadorNotificaciones(usuario_id=usuario_id, **valores)
+            for usuario_id, valores in contador_notificacion_service.calcular(apps=apps).items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0072_responsable_usuario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorNotificaciones',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0)),
+                ('no_leidas', models.IntegerField(default=0)),
+                ('favoritas', models.IntegerField(default=0)),
+                ('archivadas', models.IntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='contador_notificaciones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Contador de Notificaciones',
+                'verbose_name_plural': 'Contadores de Notificaciones',
+            },
+        ),
+        migrations.RunPython(llenar_contadores, migrations.RunPython.noop),
+    ]
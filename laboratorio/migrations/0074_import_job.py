@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0073_contador_notificaciones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('polinizacion', 'Polinizaciones'), ('germinacion', 'Germinaciones')], max_length=20)),
+                ('archivo', models.FileField(blank=True, upload_to='importaciones/%Y/%m/')),
+                ('nombre_archivo', models.CharField(blank=True, default='', max_length=255)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20)),
+                ('ultima_fila', models.IntegerField(default=1)),
+                ('creados', models.IntegerField(default=0)),
+                ('total_errores', models.IntegerField(default=0)),
+                ('errores', models.JSONField(blank=True, default=list)),
+                ('segundos', models.FloatField(default=0)),
+                ('intentos', models.IntegerField(default=0)),
+                ('mensaje_error', models.TextField(blank=True, default='')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('finalizado', models.DateTimeField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importaciones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Importación',
+                'verbose_name_plural': 'Importaciones',
+                'ordering': ['-creado'],
+                'indexes': [models.Index(fields=['estado', 'actualizado'], name='laboratorio_estado_76c712_idx')],
+            },
+        ),
+    ]
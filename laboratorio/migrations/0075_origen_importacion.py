@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0074_import_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='germinacion',
+            name='clave_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='germinacion',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='actualizados',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='sin_cambios',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='sincronizar',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='polinizacion',
+            name='clave_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='polinizacion',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='germinacion',
+            index=models.Index(fields=['clave_origen', 'creado_por', 'hash_origen'], name='laboratorio_clave_o_309238_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='polinizacion',
+            index=models.Index(fields=['clave_origen', 'creado_por', 'hash_origen'], name='laboratorio_clave_o_42b44d_idx'),
+        ),
+    ]
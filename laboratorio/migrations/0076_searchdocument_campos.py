@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def regenerar_documentos(apps, schema_editor):
+    """
+    Regenera el contenido de los documentos de búsqueda con los campos
+    agregados al documento (responsable, ubicación, tipo de polinización)
+    """
+    from laboratorio.services.search_backend import CAMPOS_BUSQUEDA, normalizar_texto, TAMANO_LOTE
+
+    SearchDocument = apps.get_model('laboratorio', 'SearchDocument')
+    for etiqueta, campos in CAMPOS_BUSQUEDA.items():
+        Model = apps.get_model(etiqueta)
+        lote = []
+        for valores in Model.objects.values_list('pk', *campos).iterator(chunk_size=TAMANO_LOTE):
+            contenido = ' '.join(t for t in (normalizar_texto(v) for v in valores[1:]) if t)
+            lote.append(SearchDocument(modelo=etiqueta, object_id=valores[0], contenido=contenido))
+            if len(lote) >= TAMANO_LOTE:
+                SearchDocument.objects.bulk_create(
+                    lote, update_conflicts=True, unique_fields=['modelo', 'object_id'], update_fields=['contenido']
+                )
+                lote = []
+        if lote:
+            SearchDocument.objects.bulk_create(
+                lote, update_conflicts=True, unique_fields=['modelo', 'object_id'], update_fields=['contenido']
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratorio', '0075_origen_importacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerar_documentos, migrations.RunPython.noop),
+    ]
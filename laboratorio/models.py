@@ -11,5 +11,8 @@ __all__ = [
     'Genero', 'Especie', 'Variedad', 'Ubicacion', 'Polinizacion',
     'Germinacion', 'SeguimientoGerminacion', 'Capsula', 'Siembra',
     'PersonalUsuario', 'Inventario', 'Notification', 'UserProfile',
-    'CondicionesClimaticas', 'HistorialPredicciones', 'PasswordResetToken'
+    'CondicionesClimaticas', 'HistorialPredicciones', 'PasswordResetToken',
+    'SearchDocument', 'CodigoAutocompletado', 'FacetaFiltro', 'ProgresoMensual',
+    'EstadisticaDiaria', 'MetricaModeloDiaria', 'ContadorNotificaciones',
+    'ImportJob'
 ]
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Servicio de alertas de polinizaciones y germinaciones próximas a vencer
+
+Todo el predicado de una alerta (sin terminar, con fecha estimada dentro
+de los próximos días o ya vencida) y el cálculo de los días restantes y
+del tipo de alerta se resuelven en la base de datos, sobre los índices
+parciales (creado_por, prediccion_fecha_estimada) de los registros sin
+terminar. Cada consulta devuelve solo las columnas de la alerta, ordenada
+por urgencia y acotada a una página, con el total en la misma consulta
+(Count sobre una ventana).
+
+Lo comparten las acciones alertas_polinizacion/alertas_germinacion de los
+viewsets, el resumen del dashboard, NotificationService.obtener_alertas_pendientes
+y la vista predicciones_alertas.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db.models import Case, Count, DateField, F, Q, QuerySet, Value, When, Window
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AlertaService:
+    """Consultas de alertas por fecha estimada calculadas en la base de datos"""
+
+    DIAS_ANTICIPACION = 7
+    PAGE_SIZE = 500
+    MAX_PAGE_SIZE = 1000
+
+    def consultar(self, queryset: QuerySet, campo_fecha: str = 'prediccion_fecha_estimada',
+                  dias: Optional[int] = None, hoy: Optional[date] = None) -> QuerySet:
+        """
+        Registros de `queryset` con `campo_fecha` vencido o dentro de los
+        próximos `dias`, anotados con dias_hasta (timedelta), tipo_alerta
+        ('vencida'/'proxima') y total_alertas, ordenados por urgencia
+        """
+        hoy = hoy or timezone.localdate()
+        dias = self.DIAS_ANTICIPACION if dias is None else dias
+        hoy_sql = Value(hoy, output_field=DateField())
+        return (
+            queryset
+            .filter(**{f'{campo_fecha}__isnull': False, f'{campo_fecha}__lte': hoy + timedelta(days=dias)})
+            .annotate(
+                dias_hasta=F(campo_fecha) - hoy_sql,
+                tipo_alerta=Case(
+                    When(**{f'{campo_fecha}__lt': hoy}, then=Value('vencida')),
+                    default=Value('proxima'),
+                ),
+                total_alertas=Window(Count('pk')),
+            )
+            .order_by(campo_fecha, 'pk')
+        )
+
+    def paginar(self, queryset: QuerySet, page=1, page_size=None,
+                columnas: Optional[Sequence[str]] = None) -> Tuple[list, Dict[str, object]]:
+        """
+        Página de una consulta de `consultar`: filas (diccionarios con las
+        `columnas`, o instancias si no se indican) y datos de paginación.
+        Los días restantes se devuelven como entero en `dias_restantes`
+        """
+        page, page_size = self.validar_pagina(page, page_size)
+        inicio = (page - 1) * page_size
+        if columnas is not None:
+            queryset = queryset.values(*columnas, 'dias_hasta', 'tipo_alerta', 'total_alertas')
+        filas = list(queryset[inicio:inicio + page_size])
+
+        total = self._valor(filas[0], 'total_alertas') if filas else (queryset.count() if inicio else 0)
+        for fila in filas:
+            dias = self._valor(fila, 'dias_hasta').days
+            if isinstance(fila, dict):
+                fila['dias_restantes'] = dias
+                del fila['dias_hasta'], fila['total_alertas']
+            else:
+                fila.dias_restantes = dias
+
+        total_pages = max(1, -(-total // page_size))
+        return filas, {
+            'total': total,
+            'current_page': page,
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'has_next': page < total_pages,
+            'has_previous': page > 1,
+        }
+
+    def validar_pagina(self, page, page_size) -> Tuple[int, int]:
+        try:
+            page = max(1, int(page or 1))
+            page_size = int(page_size or self.PAGE_SIZE)
+        except (TypeError, ValueError):
+            return 1, self.PAGE_SIZE
+        return page, min(max(1, page_size), self.MAX_PAGE_SIZE)
+
+    def _valor(self, fila, campo):
+        return fila[campo] if isinstance(fila, dict) else getattr(fila, campo)
+
+    # ------------------------------------------------------------------
+    # Alertas de maduración y germinación del usuario
+    # ------------------------------------------------------------------
+
+    def polinizaciones(self, usuario, queryset: Optional[QuerySet] = None, hoy: Optional[date] = None) -> QuerySet:
+        """Polinizaciones del usuario sin madurar, vencidas o próximas a madurar"""
+        from ..models import Polinizacion
+
+        queryset = Polinizacion.objects.all() if queryset is None else queryset
+        return self.consultar(queryset.filter(creado_por=usuario, fechamad__isnull=True), hoy=hoy)
+
+    def germinaciones(self, usuario, queryset: Optional[QuerySet] = None, hoy: Optional[date] = None) -> QuerySet:
+        """Germinaciones del usuario sin germinar, vencidas o próximas a germinar"""
+        from ..models import Germinacion
+
+        queryset = Germinacion.objects.all() if queryset is None else queryset
+        return self.consultar(queryset.filter(creado_por=usuario, fecha_germinacion__isnull=True), hoy=hoy)
+
+    def mensaje(self, modelo: str, tipo_alerta: str) -> str:
+        if modelo == 'germinacion':
+            return f"Germinación {'vencida' if tipo_alerta == 'vencida' else 'próxima a germinar'}"
+        return f"Polinización {'vencida' if tipo_alerta == 'vencida' else 'próxima a madurar'}"
+
+    def pendientes(self, usuario, limite: Optional[int] = None) -> List[Dict[str, object]]:
+        """
+        Alertas de germinaciones y polinizaciones creadas en el sistema (no
+        importadas), las más urgentes primero
+        """
+        limite = limite or self.PAGE_SIZE
+        germinaciones, _ = self.paginar(
+            self.germinaciones(usuario).filter(es_importado=False), page_size=limite,
+            columnas=('id', 'codigo', 'nombre', 'genero', 'especie_variedad', 'prediccion_fecha_estimada'),
+        )
+        polinizaciones, _ = self.paginar(
+            self.polinizaciones(usuario).filter(es_importado=False), page_size=limite,
+            columnas=('numero', 'codigo', 'madre_genero', 'madre_especie', 'tipo_polinizacion',
+                      'prediccion_fecha_estimada'),
+        )
+
+        alertas = [
+            {
+                'tipo': 'germinacion',
+                'id': g['id'],
+                'codigo': g['codigo'],
+                'nombre': g['nombre'],
+                'especie': f"{g['genero']} {g['especie_variedad']}",
+                'fecha_estimada': g['prediccion_fecha_estimada'],
+                'dias_restantes': g['dias_restantes'],
+                'tipo_alerta': g['tipo_alerta'],
+                'mensaje': self.mensaje('germinacion', g['tipo_alerta']),
+            }
+            for g in germinaciones
+        ] + [
+            {
+                'tipo': 'polinizacion',
+                'id': p['numero'],
+                'codigo': p['codigo'],
+                'especie': f"{p['madre_genero']} {p['madre_especie']}",
+                'tipo_polinizacion': p['tipo_polinizacion'],
+                'fecha_estimada': p['prediccion_fecha_estimada'],
+                'dias_restantes': p['dias_restantes'],
+                'tipo_alerta': p['tipo_alerta'],
+                'mensaje': self.mensaje('polinizacion', p['tipo_alerta']),
+            }
+            for p in polinizaciones
+        ]
+        # Ordenar por días restantes (las más urgentes primero)
+        alertas.sort(key=lambda alerta: alerta['dias_restantes'])
+        return alertas[:limite]
+
+    def pagina_polinizaciones(self, usuario, queryset: Optional[QuerySet] = None,
+                              page=None, page_size=None) -> Dict[str, object]:
+        """Respuesta de alertas_polinizacion: una página de alertas y la paginación"""
+        alertas, paginacion = self.paginar(
+            self.polinizaciones(usuario, queryset), page=page, page_size=page_size,
+            columnas=(
+                'numero', 'codigo', 'tipo_polinizacion', 'madre_especie', 'nueva_especie',
+                'madre_genero', 'nueva_genero', 'fechapol', 'prediccion_fecha_estimada',
+            ),
+        )
+        return {
+            'alertas': [
+                {
+                    'id': fila['numero'],
+                    'codigo': fila['codigo'],
+                    'tipo_polinizacion': fila['tipo_polinizacion'],
+                    'especie': fila['madre_especie'] or fila['nueva_especie'] or '',
+                    'genero': fila['madre_genero'] or fila['nueva_genero'] or '',
+                    'fecha_polinizacion': fila['fechapol'],
+                    'fecha_estimada': fila['prediccion_fecha_estimada'],
+                    'dias_restantes': fila['dias_restantes'],
+                    'tipo_alerta': fila['tipo_alerta'],
+                    'mensaje': self.mensaje('polinizacion', fila['tipo_alerta'])
+                }
+                for fila in alertas
+            ],
+            **paginacion
+        }
+
+    def pagina_germinaciones(self, usuario, queryset: Optional[QuerySet] = None,
+                             page=None, page_size=None) -> Dict[str, object]:
+        """Respuesta de alertas_germinacion: una página de alertas y la paginación"""
+        alertas, paginacion = self.paginar(
+            self.germinaciones(usuario, queryset), page=page, page_size=page_size,
+            columnas=('id', 'codigo', 'especie_variedad', 'genero', 'fecha_siembra', 'prediccion_fecha_estimada'),
+        )
+        return {
+            'alertas': [
+                {
+                    'id': fila['id'],
+                    'codigo': fila['codigo'],
+                    'especie': fila['especie_variedad'],
+                    'genero': fila['genero'],
+                    'fecha_siembra': fila['fecha_siembra'],
+                    'fecha_estimada': fila['prediccion_fecha_estimada'],
+                    'dias_restantes': fila['dias_restantes'],
+                    'tipo_alerta': fila['tipo_alerta'],
+                    'mensaje': self.mensaje('germinacion', fila['tipo_alerta'])
+                }
+                for fila in alertas
+            ],
+            **paginacion
+        }
+
+    # ------------------------------------------------------------------
+    # Polinizaciones próximas a cosecha (predicciones_alertas)
+    # ------------------------------------------------------------------
+
+    def cosechas(self, usuario, dias: int = 30, hoy: Optional[date] = None) -> QuerySet:
+        """
+        Polinizaciones en proceso con fecha de maduración vencida o dentro
+        de los próximos `dias`, creadas por el usuario o a su cargo
+        """
+        from ..models import Polinizacion
+
+        responsables = Q(creado_por=usuario) | Q(responsable_usuario=usuario) | Q(responsable__icontains=usuario.username)
+        nombre = f"{usuario.first_name} {usuario.last_name}".strip()
+        if nombre:
+            # Con el nombre vacío icontains coincidiría con cualquier responsable
+            responsables |= Q(responsable__icontains=nombre)
+        queryset = Polinizacion.objects.filter(estado__in=['EN_PROCESO', 'PENDIENTE']).filter(responsables)
+        return self.consultar(queryset, campo_fecha='fechamad', dias=dias, hoy=hoy)
+
+
+# Instancia global del servicio
+alerta_service = AlertaService()
@@ -20,9 +20,12 @@ class BaseService(ABC):
     def __init__(self, model: Type[models.Model]):
         self.model = model
     
-    def get_all(self, user: Optional[User] = None, **filters) -> List[models.Model]:
-        """Obtiene todos los registros con filtros opcionales"""
+    def get_all(self, user: Optional[User] = None, only: Optional[List[str]] = None, proyeccion=None, **filters) -> List[models.Model]:
+        """Obtiene todos los registros con filtros opcionales (only: columnas a leer;
+        proyeccion: devuelve las filas ya serializadas, ver ProyeccionValores)"""
         queryset = self.model.objects.all()
+        if only:
+            queryset = queryset.only(*only)
         
         if filters:
             queryset = queryset.filter(**filters)
@@ -31,7 +34,15 @@ class BaseService(ABC):
         if user and hasattr(self.model, 'creado_por'):
             queryset = self._apply_user_filter(queryset, user)
         
-        return list(queryset)
+        return self.materializar(self.aplicar_proyeccion(queryset, proyeccion), proyeccion)
+
+    def aplicar_proyeccion(self, queryset, proyeccion=None):
+        """Con una proyección, el queryset devuelve diccionarios (.values()) en lugar de instancias"""
+        return queryset if proyeccion is None else proyeccion.valores(queryset)
+
+    def materializar(self, filas, proyeccion=None) -> list:
+        """Lista de instancias, o de diccionarios ya serializados si hay proyección"""
+        return list(filas) if proyeccion is None else proyeccion.serializar(filas)
     
     def get_by_id(self, id: int, user: Optional[User] = None) -> Optional[models.Model]:
         """Obtiene un registro por ID"""
@@ -39,7 +50,7 @@ class BaseService(ABC):
             obj = self.model.objects.get(pk=id)
             
             # Verificar permisos si es necesario
-            if user and hasattr(obj, 'creado_por'):
+            if user and hasattr(self.model, 'creado_por'):
                 self._check_user_permission(obj, user)
             
             return obj
@@ -148,7 +159,6 @@ class PaginatedService(BaseService):
     def get_paginated(self, page: int = 1, page_size: int = 20, user: Optional[User] = None, **filters):
         """Obtiene registros paginados"""
         from django.core.paginator import Paginator
-        from django.db.models import Q
         
         queryset = self.model.objects.all()
         
@@ -158,12 +168,10 @@ class PaginatedService(BaseService):
             search = filters.pop('search', None)
             if search:
                 # Crear filtro de búsqueda dinámico basado en los campos del modelo
+                from .search_backend import get_search_backend
                 search_fields = self._get_search_fields()
                 if search_fields:
-                    search_query = Q()
-                    for field in search_fields:
-                        search_query |= Q(**{f"{field}__icontains": search})
-                    queryset = queryset.filter(search_query)
+                    queryset = get_search_backend().search(queryset, search, fields=search_fields)
             
             # Aplicar otros filtros
             for key, value in filters.items():
@@ -191,9 +199,109 @@ class PaginatedService(BaseService):
             'has_next': page_obj.has_next(),
             'has_previous': page_obj.has_previous()
         }
-    
+
+    def paginate_keyset(self, queryset, cursor: Optional[str] = None, page_size: int = 20, include_count: bool = False, proyeccion=None):
+        """Pagina un queryset por cursor sobre (fecha_creacion, pk) descendente.
+
+        A diferencia de Paginator no usa OFFSET ni COUNT(*): cada página es un
+        rango sobre el índice de fecha_creacion, por lo que el costo no crece
+        con la profundidad. El conteo total solo se calcula si include_count=True.
+
+        Args:
+            queryset: Queryset ya filtrado (se reemplaza su ordenamiento)
+            cursor: Token opaco devuelto como next_cursor/prev_cursor, o None para la primera página
+            page_size: Tamaño de página
+            include_count: Si es True, incluye el conteo total en el resultado
+            proyeccion: ProyeccionValores opcional; los resultados se devuelven ya serializados
+        """
+        from django.db.models import F, Q
+        from ..utils.pagination_utils import encode_cursor, decode_cursor, CURSOR_NEXT, CURSOR_PREV
+
+        pk_name = self.model._meta.pk.name
+        total = queryset.count() if include_count else None
+
+        posicion = decode_cursor(cursor) if cursor else None
+        hacia_atras = posicion is not None and posicion['direccion'] == CURSOR_PREV
+
+        # fecha_creacion admite NULL: se ordenan al final (nulls_last) en ambos motores
+        if posicion:
+            fecha, pk = posicion['fecha'], posicion['pk']
+            if hacia_atras:
+                if fecha is None:
+                    condicion = Q(fecha_creacion__isnull=False) | Q(fecha_creacion__isnull=True, **{f'{pk_name}__gt': pk})
+                else:
+                    condicion = Q(fecha_creacion__gt=fecha) | Q(fecha_creacion=fecha, **{f'{pk_name}__gt': pk})
+            else:
+                if fecha is None:
+                    condicion = Q(fecha_creacion__isnull=True, **{f'{pk_name}__lt': pk})
+                else:
+                    condicion = (
+                        Q(fecha_creacion__lt=fecha) |
+                        Q(fecha_creacion=fecha, **{f'{pk_name}__lt': pk}) |
+                        Q(fecha_creacion__isnull=True)
+                    )
+            queryset = queryset.filter(condicion)
+
+        # Con .only() el cursor necesita igualmente fecha_creacion
+        campos_cargados, es_defer = queryset.query.deferred_loading
+        if campos_cargados and not es_defer and 'fecha_creacion' not in campos_cargados:
+            queryset = queryset.only(*campos_cargados, 'fecha_creacion')
+
+        if hacia_atras:
+            queryset = queryset.order_by(F('fecha_creacion').asc(nulls_first=True), pk_name)
+        else:
+            queryset = queryset.order_by(F('fecha_creacion').desc(nulls_last=True), f'-{pk_name}')
+
+        if proyeccion is not None:
+            queryset = proyeccion.valores(queryset, extra=('fecha_creacion', pk_name))
+        registros = list(queryset[:page_size + 1])
+        hay_mas = len(registros) > page_size
+        registros = registros[:page_size]
+        if hacia_atras:
+            registros.reverse()
+
+        if hacia_atras:
+            has_next, has_previous = True, hay_mas
+        else:
+            has_next, has_previous = hay_mas, posicion is not None
+
+        next_cursor = prev_cursor = None
+        if registros:
+            if has_next:
+                ultimo = registros[-1]
+                next_cursor = encode_cursor(*self._posicion_cursor(ultimo, pk_name), CURSOR_NEXT)
+            if has_previous:
+                primero = registros[0]
+                prev_cursor = encode_cursor(*self._posicion_cursor(primero, pk_name), CURSOR_PREV)
+
+        result = {
+            'results': self.materializar(registros, proyeccion),
+            'page_size': page_size,
+            'has_next': has_next,
+            'has_previous': has_previous,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+        }
+        if include_count:
+            result['count'] = total
+        return result
+
+    @staticmethod
+    def _posicion_cursor(registro, pk_name):
+        """(fecha_creacion, pk) de una instancia o de una fila de .values()"""
+        if isinstance(registro, dict):
+            return registro['fecha_creacion'], registro[pk_name]
+        return registro.fecha_creacion, registro.pk
+
     def _get_search_fields(self):
         """Obtiene los campos de búsqueda para el modelo"""
+        from .search_backend import CAMPOS_BUSQUEDA, etiqueta_modelo
+
+        # Con documento de búsqueda, sus campos: así la búsqueda usa el índice
+        campos_indexados = CAMPOS_BUSQUEDA.get(etiqueta_modelo(self.model))
+        if campos_indexados:
+            return list(campos_indexados)
+
         # Campos comunes de búsqueda
         common_fields = ['codigo', 'especie', 'genero', 'responsable']
         
@@ -0,0 +1,440 @@
+"""
+Servicio de estadísticas y eventos del calendario de procesos
+
+Cada indicador del calendario (pendientes, en proceso, completados,
+retrasados y con predicción) es un Count condicional; todos los de un
+modelo se calculan en una sola consulta agregada, y los del año por mes
+en una consulta agrupada por modelo.
+
+Los resultados se guardan en la cache por día (los retrasados dependen
+de la fecha de hoy) y por versión de las tablas de polinizaciones y
+germinaciones: cualquier alta, cambio o baja renueva la versión (ver
+version_service) y la siguiente lectura vuelve a calcularlos.
+
+Los eventos se leen siempre por ventana de fechas y se arman desde las
+columnas proyectadas con .values(). Cada mes de eventos se guarda en la
+cache con su propia versión, que renuevan los signals de guardado/borrado
+de los registros cuya fecha de evento (actual o anterior) cae en ese mes,
+de modo que un cambio solo invalida los meses afectados.
+"""
+import calendar
+import logging
+import uuid
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .version_service import version_service
+
+logger = logging.getLogger(__name__)
+
+
+INDICADORES = ('pending', 'in_progress', 'completed', 'overdue', 'predicted')
+
+
+def _condiciones_polinizacion(hoy: date) -> Dict[str, Q]:
+    return {
+        'pending': Q(estado='INGRESADO'),
+        'in_progress': Q(estado='EN_PROCESO'),
+        'completed': Q(estado__in=['LISTA', 'LISTO']),
+        'overdue': Q(fechapol__lt=hoy, estado__in=['INGRESADO', 'EN_PROCESO']),
+        'predicted': Q(prediccion_fecha_estimada__isnull=False) | Q(prediccion_tipo__isnull=False),
+    }
+
+
+def _condiciones_germinacion(hoy: date) -> Dict[str, Q]:
+    return {
+        'pending': Q(etapa_actual='INGRESADO'),
+        'in_progress': Q(etapa_actual='EN_PROCESO'),
+        'completed': Q(etapa_actual='LISTA'),
+        'overdue': (
+            (Q(fecha_siembra__lt=hoy) | Q(fecha_polinizacion__lt=hoy))
+            & Q(etapa_actual__in=['INGRESADO', 'EN_PROCESO'])
+        ),
+        'predicted': Q(polinizacion__prediccion_fecha_estimada__isnull=False),
+    }
+
+
+# Columnas que proyecta el feed de eventos de cada modelo
+COLUMNAS_POLINIZACION = (
+    'numero', 'fechapol', 'tipo_polinizacion', 'nueva_especie', 'especie', 'responsable', 'estado',
+    'codigo', 'ubicacion', 'ubicacion_nombre', 'cantidad_capsulas', 'observaciones',
+    'prediccion_dias_estimados', 'prediccion_confianza', 'prediccion_fecha_estimada', 'prediccion_tipo',
+)
+COLUMNAS_GERMINACION = (
+    'id', 'fecha_siembra', 'fecha_polinizacion', 'fecha_ingreso', 'etapa_actual', 'especie_variedad',
+    'nombre', 'responsable', 'codigo', 'percha', 'finca', 'cantidad_solicitada', 'no_capsulas',
+    'observaciones', 'dias_polinizacion', 'prediccion_confianza', 'polinizacion_id',
+    'polinizacion__prediccion_dias_estimados', 'polinizacion__prediccion_confianza',
+    'polinizacion__prediccion_fecha_estimada', 'polinizacion__prediccion_tipo',
+)
+
+# Campos de la polinización que se muestran en los eventos de sus germinaciones
+PREDICCION_POLINIZACION = (
+    'prediccion_dias_estimados', 'prediccion_confianza', 'prediccion_fecha_estimada', 'prediccion_tipo',
+)
+
+# Fechas que definen el día del evento, en orden de preferencia
+FECHAS_EVENTO = {
+    'Polinizacion': ('fechapol',),
+    'Germinacion': ('fecha_siembra', 'fecha_polinizacion', 'fecha_ingreso'),
+}
+
+SUBTIPOS_GERMINACION = {'INGRESADO': 'sowing', 'EN_PROCESO': 'transfer', 'LISTA': 'adaptation'}
+
+
+def _inicio_mes(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def _fin_mes(mes: date) -> date:
+    return mes.replace(day=calendar.monthrange(mes.year, mes.month)[1])
+
+
+def _meses(inicio: date, fin: date) -> List[date]:
+    """Primer día de cada mes entre dos fechas (inclusive)"""
+    meses = []
+    mes = _inicio_mes(inicio)
+    while mes <= fin:
+        meses.append(mes)
+        mes = _fin_mes(mes) + timedelta(days=1)
+    return meses
+
+
+def _prioridad(fecha: Optional[date], confianza, hoy: date) -> str:
+    """Retrasados y próximos (7 días) o con predicción de confianza alta: high"""
+    if not fecha:
+        return 'low'
+    dias = (fecha - hoy).days
+    if dias < 0 or (confianza and confianza > 80) or dias <= 7:
+        return 'high'
+    if dias <= 30:
+        return 'medium'
+    return 'low'
+
+
+def _fecha_evento(modelo: str, valores) -> Optional[date]:
+    """Fecha del evento de un registro (instancia o diccionario de valores)"""
+    for campo in FECHAS_EVENTO[modelo]:
+        fecha = valores.get(campo) if isinstance(valores, dict) else getattr(valores, campo, None)
+        if fecha:
+            return fecha
+    return None
+
+
+class CalendarioService:
+    """Indicadores del calendario con agregados condicionales y cache diaria"""
+
+    CACHE_PREFIJO = 'calendario_stats'
+    CACHE_TIMEOUT = 60 * 60 * 24
+    EVENTOS_PREFIJO = 'calendario_eventos'
+
+    def _modelos(self, hoy: date):
+        from ..models import Polinizacion, Germinacion
+
+        # (modelo, condiciones, fecha del evento en el calendario)
+        return (
+            (Polinizacion, _condiciones_polinizacion(hoy), F('fechapol')),
+            (Germinacion, _condiciones_germinacion(hoy),
+             Coalesce('fecha_siembra', 'fecha_polinizacion', 'fecha_ingreso')),
+        )
+
+    def _clave(self, *partes) -> str:
+        firma = version_service.firma(('polinizacion', 'germinacion'))
+        return ':'.join(str(parte) for parte in (self.CACHE_PREFIJO, *partes, firma))
+
+    # ------------------------------------------------------------------
+    # Cálculo
+    # ------------------------------------------------------------------
+
+    def calcular(self, hoy: Optional[date] = None) -> Dict[str, int]:
+        """Indicadores totales: una consulta agregada por modelo"""
+        hoy = hoy or timezone.localdate()
+        totales = dict.fromkeys(INDICADORES, 0)
+        for Model, condiciones, _ in self._modelos(hoy):
+            conteos = Model.objects.aggregate(
+                **{indicador: Count('pk', filter=condicion) for indicador, condicion in condiciones.items()}
+            )
+            for indicador in INDICADORES:
+                totales[indicador] += conteos[indicador] or 0
+        return totales
+
+    def calcular_por_mes(self, anio: int, hoy: Optional[date] = None) -> List[Dict[str, object]]:
+        """
+        Indicadores de cada mes del año según la fecha del evento en el
+        calendario: una consulta agrupada por modelo
+        """
+        hoy = hoy or timezone.localdate()
+        meses = {mes: dict.fromkeys(INDICADORES, 0) for mes in range(1, 13)}
+        for Model, condiciones, fecha in self._modelos(hoy):
+            conteos = (
+                Model.objects.annotate(fecha_evento=fecha)
+                .filter(fecha_evento__gte=date(anio, 1, 1), fecha_evento__lte=date(anio, 12, 31))
+                .annotate(mes=TruncMonth('fecha_evento'))
+                .values('mes')
+                .annotate(**{indicador: Count('pk', filter=condicion) for indicador, condicion in condiciones.items()})
+                .order_by()
+            )
+            for fila in conteos:
+                for indicador in INDICADORES:
+                    meses[fila['mes'].month][indicador] += fila[indicador]
+        return [{'month': f'{anio}-{mes:02d}', **valores} for mes, valores in meses.items()]
+
+    # ------------------------------------------------------------------
+    # Lectura con cache
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        """Indicadores totales del día (con 'delayed' como alias de 'overdue')"""
+        hoy = timezone.localdate()
+        clave = self._clave(hoy.isoformat())
+        totales = cache.get(clave)
+        if totales is None:
+            totales = self.calcular(hoy)
+            cache.set(clave, totales, self.CACHE_TIMEOUT)
+        return {
+            'pending': totales['pending'],
+            'in_progress': totales['in_progress'],
+            'completed': totales['completed'],
+            'delayed': totales['overdue'],
+            'overdue': totales['overdue'],
+            'predicted': totales['predicted'],
+        }
+
+    def stats_por_mes(self, anio: int) -> List[Dict[str, object]]:
+        """Indicadores por mes de un año, con la misma cache diaria"""
+        hoy = timezone.localdate()
+        clave = self._clave(hoy.isoformat(), anio)
+        meses = cache.get(clave)
+        if meses is None:
+            meses = self.calcular_por_mes(anio, hoy)
+            cache.set(clave, meses, self.CACHE_TIMEOUT)
+        return meses
+
+    # ------------------------------------------------------------------
+    # Eventos por ventana de fechas
+    # ------------------------------------------------------------------
+
+    def _eventos_polinizaciones(self, inicio: date, fin: date, hoy: date) -> list:
+        from ..models import Polinizacion
+
+        filas = (
+            Polinizacion.objects.filter(fechapol__gte=inicio, fechapol__lte=fin)
+            .order_by('fechapol', 'numero')
+            .values(*COLUMNAS_POLINIZACION)
+        )
+        return [
+            (
+                {
+                    'id': f"pol_{f['numero']}",
+                    'type': 'pollination',
+                    'date': f['fechapol'].isoformat(),
+                    'subtype': f['tipo_polinizacion'],
+                    'title': f"Polinización {f['tipo_polinizacion']} - {f['nueva_especie'] or f['especie']}",
+                    'description': f"Polinización {f['tipo_polinizacion']} programada",
+                    'species': f['nueva_especie'] or f['especie'] or 'No especificada',
+                    'technician': f['responsable'] or 'No asignado',
+                    'status': f['estado'],
+                    'estimated_days': f['prediccion_dias_estimados'] or 180,
+                    'priority': _prioridad(f['fechapol'], f['prediccion_confianza'], hoy),
+                    'is_predicted': bool(f['prediccion_fecha_estimada'] or f['prediccion_tipo']),
+                    'codigo': f['codigo'],
+                    'responsable': f['responsable'],
+                    'ubicacion': f['ubicacion_nombre'] or f['ubicacion'],
+                    'cantidad': f['cantidad_capsulas'],
+                    'observaciones': f['observaciones'],
+                    'prediccion_dias_estimados': f['prediccion_dias_estimados'],
+                    'prediccion_confianza': float(f['prediccion_confianza']) if f['prediccion_confianza'] else None,
+                    'prediccion_fecha_estimada': (
+                        f['prediccion_fecha_estimada'].isoformat() if f['prediccion_fecha_estimada'] else None
+                    ),
+                    'prediccion_tipo': f['prediccion_tipo'],
+                },
+                f['estado'],
+                f['prediccion_fecha_estimada'] is not None or f['prediccion_tipo'] is not None,
+            )
+            for f in filas
+        ]
+
+    def _eventos_germinaciones(self, inicio: date, fin: date, hoy: date) -> list:
+        from ..models import Germinacion
+
+        filas = (
+            Germinacion.objects
+            .annotate(fecha_evento=Coalesce('fecha_siembra', 'fecha_polinizacion', 'fecha_ingreso'))
+            .filter(fecha_evento__gte=inicio, fecha_evento__lte=fin)
+            .order_by('fecha_evento', 'id')
+            .values('fecha_evento', *COLUMNAS_GERMINACION)
+        )
+        eventos = []
+        for f in filas:
+            subtipo = SUBTIPOS_GERMINACION.get(f['etapa_actual'] or 'INGRESADO', 'sowing')
+            con_polinizacion = f['polinizacion_id'] is not None
+            pol_fecha, pol_tipo = f['polinizacion__prediccion_fecha_estimada'], f['polinizacion__prediccion_tipo']
+            pol_confianza = f['polinizacion__prediccion_confianza']
+            eventos.append((
+                {
+                    'id': f"germ_{f['id']}",
+                    'type': 'germination',
+                    'date': f['fecha_evento'].isoformat(),
+                    'subtype': subtipo,
+                    'title': f"Germinación {subtipo} - {f['especie_variedad'] or f['nombre']}",
+                    'description': f"Proceso de germinación en etapa {subtipo}",
+                    'species': f['especie_variedad'] or f['nombre'] or 'No especificada',
+                    'technician': f['responsable'] or 'No asignado',
+                    'status': f['etapa_actual'] or 'INGRESADO',
+                    'estimated_days': f['dias_polinizacion'] or f['polinizacion__prediccion_dias_estimados'] or 90,
+                    'priority': _prioridad(f['fecha_siembra'], f['prediccion_confianza'], hoy),
+                    'is_predicted': con_polinizacion and bool(pol_fecha or pol_tipo),
+                    'codigo': f['codigo'],
+                    'responsable': f['responsable'],
+                    'ubicacion': f['percha'] or f['finca'],
+                    'cantidad': f['cantidad_solicitada'] or f['no_capsulas'],
+                    'observaciones': f['observaciones'],
+                    'prediccion_dias_estimados': f['polinizacion__prediccion_dias_estimados'],
+                    'prediccion_confianza': float(pol_confianza) if pol_confianza else None,
+                    'prediccion_fecha_estimada': pol_fecha.isoformat() if pol_fecha else None,
+                    'prediccion_tipo': pol_tipo,
+                },
+                f['etapa_actual'],
+                con_polinizacion and (pol_fecha is not None or pol_tipo is not None),
+            ))
+        return eventos
+
+    def calcular_eventos(self, inicio: date, fin: date, hoy: Optional[date] = None) -> Dict[date, list]:
+        """
+        Eventos de los meses entre dos fechas, agrupados por mes: una
+        consulta por modelo. Cada evento va con el estado y la marca de
+        predicción sin transformar, que usan los filtros del feed
+        """
+        hoy = hoy or timezone.localdate()
+        eventos = self._eventos_polinizaciones(inicio, fin, hoy) + self._eventos_germinaciones(inicio, fin, hoy)
+        # Orden estable: en el mismo día, polinizaciones antes que germinaciones
+        eventos.sort(key=lambda evento: evento[0]['date'])
+        por_mes = {mes: [] for mes in _meses(inicio, fin)}
+        for evento in eventos:
+            por_mes[_inicio_mes(date.fromisoformat(evento[0]['date']))].append(evento)
+        return por_mes
+
+    def _clave_version_mes(self, mes: date) -> str:
+        return f'{self.EVENTOS_PREFIJO}_version:{mes:%Y-%m}'
+
+    def eventos_por_mes(self, meses: Sequence[date]) -> Dict[date, list]:
+        """
+        Eventos de cada mes desde la cache; los meses que faltan se
+        calculan juntos y se guardan por separado
+        """
+        hoy = timezone.localdate()
+        versiones = version_service.versiones([self._clave_version_mes(mes) for mes in meses])
+        claves = {
+            mes: f'{self.EVENTOS_PREFIJO}:{mes:%Y-%m}:{hoy.isoformat()}:{version}'
+            for mes, version in zip(meses, versiones)
+        }
+        guardados = cache.get_many(claves.values())
+        por_mes = {mes: guardados[clave] for mes, clave in claves.items() if clave in guardados}
+        faltantes = [mes for mes in meses if mes not in por_mes]
+        if faltantes:
+            calculados = self.calcular_eventos(faltantes[0], _fin_mes(faltantes[-1]), hoy)
+            nuevos = {mes: calculados[mes] for mes in faltantes}
+            cache.set_many({claves[mes]: eventos for mes, eventos in nuevos.items()}, self.CACHE_TIMEOUT)
+            por_mes.update(nuevos)
+        return por_mes
+
+    def eventos(self, inicio: date, fin: date, estado: Optional[str] = None, solo_predichos: bool = False,
+                meses_por_bloque: Optional[int] = None) -> Iterator[dict]:
+        """
+        Eventos de la ventana [inicio, fin] ordenados por fecha, con los
+        filtros del feed. Con `meses_por_bloque` los meses se leen por
+        bloques, para recorrer rangos grandes sin tenerlos en memoria
+        """
+        meses = _meses(inicio, fin)
+        bloque = meses_por_bloque or len(meses)
+        desde, hasta = inicio.isoformat(), fin.isoformat()
+        for i in range(0, len(meses), bloque):
+            meses_bloque = meses[i:i + bloque]
+            por_mes = self.eventos_por_mes(meses_bloque)
+            for mes in meses_bloque:
+                for evento, estado_registro, predicho in por_mes[mes]:
+                    if not desde <= evento['date'] <= hasta:
+                        continue
+                    if estado and estado_registro != estado:
+                        continue
+                    if solo_predichos and not predicho:
+                        continue
+                    yield evento
+
+    # ------------------------------------------------------------------
+    # Invalidación de los meses de eventos
+    # ------------------------------------------------------------------
+
+    def campos(self, model) -> tuple:
+        """Campos previos que necesita la invalidación por mes al guardar"""
+        campos = FECHAS_EVENTO.get(model.__name__, ())
+        if model.__name__ == 'Polinizacion':
+            campos += PREDICCION_POLINIZACION
+        return campos
+
+    def columnas(self, model) -> set:
+        """Campos de un modelo que aparecen en sus eventos"""
+        if model.__name__ == 'Polinizacion':
+            return set(COLUMNAS_POLINIZACION)
+        columnas = {columna for columna in COLUMNAS_GERMINACION if '__' not in columna}
+        return columnas | {'polinizacion'}
+
+    def invalidar_meses(self, meses):
+        """Renueva la versión de los meses dados al confirmar la transacción"""
+        claves = [self._clave_version_mes(mes) for mes in set(meses)]
+        if claves:
+            transaction.on_commit(lambda: cache.set_many({clave: uuid.uuid4().hex for clave in claves}, None))
+
+    def registrar_cambio(self, instance, anteriores: Optional[dict] = None, update_fields=None):
+        """
+        Invalida los meses de eventos afectados por el alta, cambio o baja
+        de un registro: el de su fecha de evento actual y el de la anterior.
+        Si cambia la predicción de una polinización también se invalidan los
+        meses de sus germinaciones, que la muestran en sus eventos
+        """
+        modelo = type(instance).__name__
+        if modelo not in FECHAS_EVENTO:
+            return
+        if update_fields is not None and not self.columnas(type(instance)).intersection(update_fields):
+            return
+        anteriores = anteriores or {}
+        fechas = [_fecha_evento(modelo, instance)]
+        if any(campo in anteriores for campo in FECHAS_EVENTO[modelo]):
+            fechas.append(_fecha_evento(modelo, anteriores))
+        meses = {_inicio_mes(fecha) for fecha in fechas if fecha}
+
+        if modelo == 'Polinizacion' and instance.pk and any(
+            campo in anteriores and anteriores[campo] != getattr(instance, campo)
+            for campo in PREDICCION_POLINIZACION
+        ):
+            from ..models import Germinacion
+
+            meses.update(
+                _inicio_mes(fecha) for fecha in Germinacion.objects.filter(polinizacion_id=instance.pk)
+                .annotate(fecha_evento=Coalesce('fecha_siembra', 'fecha_polinizacion', 'fecha_ingreso'))
+                .exclude(fecha_evento__isnull=True)
+                .values_list('fecha_evento', flat=True)
+                .distinct()
+            )
+        self.invalidar_meses(meses)
+
+    def registrar_lote(self, instances: Iterable):
+        """Invalida de una vez los meses de eventos de los registros nuevos de una importación"""
+        meses = set()
+        for instance in instances:
+            modelo = type(instance).__name__
+            fecha = _fecha_evento(modelo, instance) if modelo in FECHAS_EVENTO else None
+            if fecha:
+                meses.add(_inicio_mes(fecha))
+        self.invalidar_meses(meses)
+
+
+# Instancia global del servicio
+calendario_service = CalendarioService()
@@ -0,0 +1,457 @@
+"""
+Servicio de autocompletado de códigos de plantas
+
+Mantiene en memoria, por proceso, un arreglo ordenado con los códigos de
+polinizaciones y germinaciones junto a su género, especie y clima. Las
+consultas por prefijo usan búsqueda binaria y las de subcadena recorren un
+único texto concatenado con str.find, sin tocar la base de datos.
+
+La fuente de verdad es la tabla compacta CodigoAutocompletado, que se
+actualiza desde los signals de guardado/borrado y desde las importaciones.
+Cada proceso se sincroniza de forma incremental (solo filas modificadas
+desde la última sincronización) cuando cambia la versión publicada en cache
+o cada INTERVALO_SINCRONIZACION segundos. `actualizado` se marca al escribir
+la fila, no al confirmar: una transacción larga (p. ej. una importación)
+confirma filas con una marca anterior a la última sincronización. Por eso,
+cuando cambia la versión (que se publica al confirmar), la sincronización
+relee también las filas de los últimos DURACION_MAXIMA_TRANSACCION. Si el catálogo supera
+AUTOCOMPLETADO_MAX_EN_MEMORIA se consulta la tabla directamente usando su
+índice de trigramas (pg_trgm en PostgreSQL, FTS5 trigram en SQLite).
+"""
+import logging
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .search_backend import normalizar_texto, crear_fts_sqlite, TAMANO_LOTE
+
+logger = logging.getLogger(__name__)
+
+
+# Campos (codigo, genero, especie, clima) de cada fuente
+FUENTES = {
+    'polinizacion': ('Polinizacion', ('codigo', 'genero', 'especie', 'nueva_clima')),
+    'germinacion': ('Germinacion', ('codigo', 'genero', 'especie_variedad', 'clima')),
+}
+
+TABLA_CODIGOS = 'laboratorio_codigoautocompletado'
+TABLA_CODIGOS_FTS = 'laboratorio_codigoautocompletado_fts'
+
+LIMITE_MAXIMO = 500
+INTERVALO_SINCRONIZACION = 30  # segundos
+MARGEN_SINCRONIZACION = timedelta(seconds=5)
+# Duración máxima esperada de una transacción que escribe códigos
+DURACION_MAXIMA_TRANSACCION = timedelta(minutes=30)
+MAX_EN_MEMORIA = getattr(settings, 'AUTOCOMPLETADO_MAX_EN_MEMORIA', 200000)
+
+# Posiciones de cada entrada: (codigo, genero, especie, clima, clave, especie_clave)
+CODIGO, GENERO, ESPECIE, CLIMA, CLAVE, ESPECIE_CLAVE = range(6)
+
+
+def normalizar_clave(texto, max_length: int = 255) -> str:
+    """Normaliza un código o especie para comparar sin mayúsculas ni tildes"""
+    return normalizar_texto(texto).replace('\x01', '').replace('\n', ' ')[:max_length]
+
+
+def ensure_autocomplete_schema(conn=None) -> bool:
+    """
+    Crea el índice de trigramas del catálogo de códigos (idempotente).
+    Devuelve True si el índice quedó disponible.
+    """
+    conn = conn or connection
+    try:
+        with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+            if conn.vendor == 'postgresql':
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {TABLA_CODIGOS}_clave_trgm "
+                    f"ON {TABLA_CODIGOS} USING GIN (clave gin_trgm_ops)"
+                )
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {TABLA_CODIGOS}_especie_trgm "
+                    f"ON {TABLA_CODIGOS} USING GIN (especie_clave gin_trgm_ops)"
+                )
+                return True
+            if conn.vendor == 'sqlite':
+                crear_fts_sqlite(cursor, TABLA_CODIGOS_FTS, TABLA_CODIGOS, ['clave', 'especie_clave'], tokenize='trigram')
+                return True
+    except Exception as e:
+        logger.warning(f"No se pudo crear el índice de trigramas de códigos: {e}")
+    return False
+
+
+class IndiceCodigos:
+    """
+    Arreglo ordenado en memoria de los códigos de una fuente.
+    Las entradas se ordenan por clave descendente (igual que el antiguo
+    order_by('-codigo')).
+    """
+
+    def __init__(self, fuente: str):
+        self.fuente = fuente
+        self.cargado = False
+        self.en_memoria = True
+        self.version = None
+        self.sincronizado_hasta = None
+        self.ultima_sincronizacion = 0.0
+        self._lock = threading.RLock()
+        self._entradas: Dict[str, tuple] = {}
+        self._sucio = True
+        self._orden: List[tuple] = []
+        self._claves_asc: List[str] = []
+        self._texto = ''
+        self._inicios: List[int] = []
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def aplicar(self, filas: Iterable[tuple]):
+        """Aplica filas (codigo, genero, especie, clima, clave, especie_clave, activo)"""
+        with self._lock:
+            for fila in filas:
+                if fila[6]:
+                    self._entradas[fila[CODIGO]] = tuple(fila[:6])
+                else:
+                    self._entradas.pop(fila[CODIGO], None)
+            self._sucio = True
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas = {}
+            self._sucio = True
+
+    def _reconstruir(self):
+        orden = sorted(self._entradas.values(), key=lambda e: (e[CLAVE], e[CODIGO]), reverse=True)
+        partes = []
+        inicios = []
+        posicion = 0
+        for entrada in orden:
+            linea = f"{entrada[CLAVE]}\x01{entrada[ESPECIE_CLAVE]}\n"
+            inicios.append(posicion)
+            partes.append(linea)
+            posicion += len(linea)
+        self._orden = orden
+        self._claves_asc = [e[CLAVE] for e in reversed(orden)]
+        self._texto = ''.join(partes)
+        self._inicios = inicios
+        self._sucio = False
+
+    def obtener(self, codigo: str) -> Optional[tuple]:
+        return self._entradas.get(codigo)
+
+    def buscar(self, q: str, limite: int, incluir_especie: bool = False, solo_prefijo: bool = False) -> List[tuple]:
+        with self._lock:
+            if self._sucio:
+                self._reconstruir()
+            orden, claves_asc, texto, inicios = self._orden, self._claves_asc, self._texto, self._inicios
+
+        if not q:
+            return orden[:limite]
+
+        if solo_prefijo:
+            # Rango [lo, hi) en orden ascendente -> posiciones equivalentes en orden descendente
+            lo = bisect_left(claves_asc, q)
+            hi = bisect_left(claves_asc, q + '\uffff')
+            total = len(orden)
+            return orden[total - hi:total - lo][:limite]
+
+        resultados = []
+        posicion = texto.find(q)
+        while posicion != -1 and len(resultados) < limite:
+            i = bisect_right(inicios, posicion) - 1
+            entrada = orden[i]
+            en_codigo = posicion + len(q) <= inicios[i] + len(entrada[CLAVE])
+            if en_codigo or incluir_especie:
+                resultados.append(entrada)
+            siguiente = inicios[i + 1] if i + 1 < len(inicios) else len(texto)
+            posicion = texto.find(q, siguiente)
+        return resultados
+
+
+class CodigoAutocompleteService:
+    """
+    Servicio de autocompletado de códigos para formularios
+    """
+
+    def __init__(self):
+        self._indices = {fuente: IndiceCodigos(fuente) for fuente in FUENTES}
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def buscar(self, fuente: str, termino: str = '', limite: Any = LIMITE_MAXIMO,
+               incluir_especie: bool = False, solo_prefijo: bool = False) -> List[Dict[str, str]]:
+        """
+        Devuelve hasta `limite` códigos que contienen (o empiezan con) el término.
+
+        Args:
+            fuente: 'polinizacion' o 'germinacion'
+            termino: Texto ingresado por el usuario (vacío = primeros códigos)
+            limite: Máximo de resultados (hasta 500)
+            incluir_especie: Si es True también busca el término en la especie
+            solo_prefijo: Si es True solo coincide al inicio del código
+        """
+        try:
+            limite = max(1, min(int(limite), LIMITE_MAXIMO))
+        except (TypeError, ValueError):
+            limite = LIMITE_MAXIMO
+        q = normalizar_clave(termino)
+
+        indice = self._asegurar_indice(fuente)
+        if indice.en_memoria:
+            entradas = indice.buscar(q, limite, incluir_especie=incluir_especie, solo_prefijo=solo_prefijo)
+        else:
+            entradas = self._buscar_en_bd(fuente, q, limite, incluir_especie, solo_prefijo)
+        return [self._formatear(e) for e in entradas]
+
+    def obtener(self, fuente: str, codigo: str) -> Optional[Dict[str, str]]:
+        """Devuelve la información de un código exacto, o None"""
+        indice = self._asegurar_indice(fuente)
+        if indice.en_memoria:
+            entrada = indice.obtener(codigo)
+        else:
+            from ..core.models import CodigoAutocompletado
+            entrada = CodigoAutocompletado.objects.filter(
+                fuente=fuente, codigo=codigo, activo=True
+            ).values_list('codigo', 'genero', 'especie', 'clima', 'clave', 'especie_clave').first()
+        return self._formatear(entrada) if entrada else None
+
+    def _formatear(self, entrada: tuple) -> Dict[str, str]:
+        return {
+            'codigo': entrada[CODIGO],
+            'genero': entrada[GENERO] or '',
+            'especie': entrada[ESPECIE] or '',
+            'clima': entrada[CLIMA] or 'I',
+        }
+
+    def _buscar_en_bd(self, fuente, q, limite, incluir_especie, solo_prefijo) -> List[tuple]:
+        """Consulta el catálogo usando su índice de trigramas (catálogos muy grandes)"""
+        from ..core.models import CodigoAutocompletado
+
+        queryset = CodigoAutocompletado.objects.filter(fuente=fuente, activo=True)
+        if q:
+            if solo_prefijo:
+                queryset = queryset.filter(clave__startswith=q)
+            elif connection.vendor == 'sqlite' and len(q) >= 3 and self._fts_disponible():
+                frase = '"' + q.replace('"', '""') + '"'
+                consulta = frase if incluir_especie else f'clave : {frase}'
+                queryset = queryset.filter(pk__in=RawSQL(
+                    f"SELECT rowid FROM {TABLA_CODIGOS_FTS} WHERE {TABLA_CODIGOS_FTS} MATCH %s", [consulta]
+                ))
+            else:
+                condicion = Q(clave__contains=q)
+                if incluir_especie:
+                    condicion |= Q(especie_clave__contains=q)
+                queryset = queryset.filter(condicion)
+        return list(
+            queryset.order_by('-clave', '-codigo')
+            .values_list('codigo', 'genero', 'especie', 'clima', 'clave', 'especie_clave')[:limite]
+        )
+
+    def _fts_disponible(self) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLA_CODIGOS_FTS])
+            return cursor.fetchone() is not None
+
+    # ------------------------------------------------------------------
+    # Sincronización del índice en memoria
+    # ------------------------------------------------------------------
+
+    def _clave_version(self, fuente: str) -> str:
+        return f'autocompletado_codigos_version_{fuente}'
+
+    def _asegurar_indice(self, fuente: str) -> IndiceCodigos:
+        if fuente not in self._indices:
+            raise ValueError(f"Fuente de códigos desconocida: {fuente}")
+        indice = self._indices[fuente]
+        if not indice.cargado:
+            self._cargar(indice)
+            return indice
+
+        version = cache.get(self._clave_version(fuente))
+        vencido = time.monotonic() - indice.ultima_sincronizacion > INTERVALO_SINCRONIZACION
+        if version != indice.version or vencido:
+            self._sincronizar(indice, version)
+        return indice
+
+    def _cargar(self, indice: IndiceCodigos):
+        """Carga completa del catálogo de una fuente"""
+        from ..core.models import CodigoAutocompletado
+
+        version = cache.get(self._clave_version(indice.fuente))
+        inicio = timezone.now()
+        queryset = CodigoAutocompletado.objects.filter(fuente=indice.fuente, activo=True)
+        indice.limpiar()
+        if queryset.count() > MAX_EN_MEMORIA:
+            indice.en_memoria = False
+        else:
+            indice.en_memoria = True
+            indice.aplicar(
+                fila + (True,) for fila in queryset.values_list(
+                    'codigo', 'genero', 'especie', 'clima', 'clave', 'especie_clave'
+                ).iterator(chunk_size=2000)
+            )
+        indice.version = version
+        indice.sincronizado_hasta = inicio - MARGEN_SINCRONIZACION
+        indice.ultima_sincronizacion = time.monotonic()
+        indice.cargado = True
+        logger.info(f"Índice de autocompletado '{indice.fuente}' cargado: {len(indice)} códigos")
+
+    def _sincronizar(self, indice: IndiceCodigos, version):
+        """
+        Aplica solo las filas modificadas desde la última sincronización; si
+        cambió la versión, también las escritas por transacciones que pudieron
+        confirmarse después (ver DURACION_MAXIMA_TRANSACCION)
+        """
+        from ..core.models import CodigoAutocompletado
+
+        inicio = timezone.now()
+        desde = indice.sincronizado_hasta
+        if version != indice.version:
+            desde = min(desde, inicio - DURACION_MAXIMA_TRANSACCION)
+        if indice.en_memoria:
+            cambios = CodigoAutocompletado.objects.filter(
+                fuente=indice.fuente, actualizado__gte=desde
+            ).values_list('codigo', 'genero', 'especie', 'clima', 'clave', 'especie_clave', 'activo')
+            indice.aplicar(cambios)
+        indice.version = version
+        indice.sincronizado_hasta = inicio - MARGEN_SINCRONIZACION
+        indice.ultima_sincronizacion = time.monotonic()
+
+    def _publicar_cambio(self, fuente: str, filas: List[tuple]):
+        """Aplica los cambios al índice local y avisa a los demás procesos"""
+        def publicar():
+            indice = self._indices[fuente]
+            if indice.cargado and indice.en_memoria:
+                indice.aplicar(filas)
+            cache.set(self._clave_version(fuente), uuid.uuid4().hex, None)
+        transaction.on_commit(publicar)
+
+    def reset(self):
+        """Descarta los índices en memoria (se recargan en la próxima consulta)"""
+        self._indices = {fuente: IndiceCodigos(fuente) for fuente in FUENTES}
+
+    # ------------------------------------------------------------------
+    # Mantenimiento del catálogo
+    # ------------------------------------------------------------------
+
+    def fuente_de(self, model) -> Optional[str]:
+        nombre = model.__name__
+        for fuente, (modelo, _) in FUENTES.items():
+            if modelo == nombre:
+                return fuente
+        return None
+
+    def _fila(self, codigo, genero, especie, clima) -> tuple:
+        codigo = (codigo or '').strip()
+        return (
+            codigo, (genero or '')[:100], (especie or '')[:255], (clima or '')[:50],
+            normalizar_clave(codigo, 50), normalizar_clave(especie), True
+        )
+
+    def _fila_desde_instancia(self, fuente: str, instance) -> tuple:
+        campos = FUENTES[fuente][1]
+        return self._fila(*(getattr(instance, campo, '') for campo in campos))
+
+    def _upsert(self, fuente: str, filas: List[tuple]):
+        from ..core.models import CodigoAutocompletado
+
+        objetos = [
+            CodigoAutocompletado(
+                fuente=fuente, codigo=f[CODIGO], genero=f[GENERO], especie=f[ESPECIE],
+                clima=f[CLIMA], clave=f[CLAVE], especie_clave=f[ESPECIE_CLAVE], activo=True
+            )
+            for f in filas
+        ]
+        for inicio in range(0, len(objetos), TAMANO_LOTE):
+            CodigoAutocompletado.objects.bulk_create(
+                objetos[inicio:inicio + TAMANO_LOTE],
+                update_conflicts=True,
+                unique_fields=['fuente', 'codigo'],
+                update_fields=['genero', 'especie', 'clima', 'clave', 'especie_clave', 'activo', 'actualizado'],
+            )
+
+    def registrar(self, instance):
+        """Registra (o actualiza) el código de una polinización/germinación guardada"""
+        self.registrar_lote([instance])
+
+    def registrar_lote(self, instances):
+        """Registra en lote los códigos de registros importados"""
+        por_fuente: Dict[str, Dict[str, tuple]] = {}
+        for instance in instances:
+            fuente = self.fuente_de(type(instance))
+            if not fuente:
+                continue
+            fila = self._fila_desde_instancia(fuente, instance)
+            if fila[CODIGO]:
+                por_fuente.setdefault(fuente, {})[fila[CODIGO]] = fila
+        for fuente, filas in por_fuente.items():
+            filas = list(filas.values())
+            self._upsert(fuente, filas)
+            self._publicar_cambio(fuente, filas)
+
+    def retirar(self, model, codigo: Optional[str], excluir_pk=None):
+        """
+        Retira un código que ya no usa el registro `excluir_pk` (borrado o
+        cambio de código). Si otro registro conserva el código, se toma su
+        información; si no, el código se marca inactivo.
+        """
+        from ..core.models import CodigoAutocompletado
+
+        fuente = self.fuente_de(model)
+        codigo = (codigo or '').strip()
+        if not fuente or not codigo:
+            return
+
+        restante = model.objects.filter(codigo=codigo).exclude(pk=excluir_pk).order_by('-pk').first()
+        if restante:
+            self.registrar(restante)
+            return
+
+        CodigoAutocompletado.objects.filter(fuente=fuente, codigo=codigo).update(activo=False, actualizado=timezone.now())
+        self._publicar_cambio(fuente, [(codigo, '', '', '', '', '', False)])
+
+    def rebuild(self, fuente: str) -> int:
+        """Regenera el catálogo de una fuente a partir de su tabla principal"""
+        from django.apps import apps
+        from ..core.models import CodigoAutocompletado
+
+        nombre_modelo, campos = FUENTES[fuente]
+        modelo = apps.get_model('laboratorio', nombre_modelo)
+
+        inicio = timezone.now()
+        filas: Dict[str, tuple] = {}
+        valores = (
+            modelo.objects.exclude(codigo__isnull=True).exclude(codigo='')
+            .order_by('pk').values_list(*campos)
+        )
+        for valor in valores.iterator(chunk_size=2000):
+            fila = self._fila(*valor)
+            if fila[CODIGO]:
+                filas[fila[CODIGO]] = fila  # el registro más reciente prevalece
+
+        self._upsert(fuente, list(filas.values()))
+        CodigoAutocompletado.objects.filter(
+            fuente=fuente, activo=True, actualizado__lt=inicio
+        ).update(activo=False, actualizado=timezone.now())
+
+        def recargar():
+            self._indices[fuente] = IndiceCodigos(fuente)
+            cache.set(self._clave_version(fuente), uuid.uuid4().hex, None)
+        transaction.on_commit(recargar)
+        return len(filas)
+
+
+# Instancia global del servicio
+codigo_autocomplete_service = CodigoAutocompleteService()
@@ -0,0 +1,184 @@
+"""
+Servicio de contadores de notificaciones por usuario
+
+Cada notificación aporta a la fila ContadorNotificaciones de su usuario:
++1 al total y +1 a no_leidas, favoritas o archivadas según sus banderas.
+Los signals aplican solo la diferencia entre los valores anteriores y los
+nuevos con deltas F(), y las operaciones masivas (marcar todas como
+leídas, inserción de recordatorios por lotes) aplican su delta en la misma
+transacción, de modo que las estadísticas y el contador de no leídas se
+leen de una fila en lugar de contar la tabla de notificaciones.
+
+La fila se crea contando la tabla la primera vez que se lee o se modifica.
+El comando rebuild_contador_notificaciones la reconcilia con la tabla y se
+ejecuta a diario desde el scheduler.
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+logger = logging.getLogger(__name__)
+
+
+CONTADORES = ('total', 'no_leidas', 'favoritas', 'archivadas')
+
+# Campos de la notificación de los que depende su aporte
+CAMPOS = ('usuario_id', 'leida', 'favorita', 'archivada')
+
+
+class ContadorNotificacionService:
+    """Mantenimiento y lectura de los contadores de notificaciones"""
+
+    def aporte(self, valores: dict) -> Counter:
+        """Aporte de una notificación con los `valores` dados: {(usuario_id, contador): 1}"""
+        resultado = Counter()
+        usuario_id = valores.get('usuario_id')
+        if not usuario_id:
+            return resultado
+        resultado[(usuario_id, 'total')] += 1
+        if not valores.get('leida'):
+            resultado[(usuario_id, 'no_leidas')] += 1
+        if valores.get('favorita'):
+            resultado[(usuario_id, 'favoritas')] += 1
+        if valores.get('archivada'):
+            resultado[(usuario_id, 'archivadas')] += 1
+        return resultado
+
+    def valores_instancia(self, instance) -> dict:
+        return {campo: getattr(instance, campo, None) for campo in CAMPOS}
+
+    # ------------------------------------------------------------------
+    # Mantenimiento incremental
+    # ------------------------------------------------------------------
+
+    def _aplicar(self, deltas: Counter, crear: bool = True):
+        """
+        Suma los deltas a las filas de cada usuario con UPDATE ... SET x = x + d.
+        Si la fila no existe y `crear`, se crea contando la tabla (el conteo
+        ya incluye el cambio); sin `crear` (bajas) se deja para la lectura
+        """
+        from ..core.models import ContadorNotificaciones
+
+        por_usuario: Dict[int, Dict[str, int]] = {}
+        for (usuario_id, contador), delta in deltas.items():
+            if delta:
+                por_usuario.setdefault(usuario_id, {})[contador] = delta
+
+        for usuario_id, cambios in por_usuario.items():
+            expresiones = {contador: F(contador) + delta for contador, delta in cambios.items()}
+            if ContadorNotificaciones.objects.filter(usuario_id=usuario_id).update(**expresiones) or not crear:
+                continue
+            _, creado = ContadorNotificaciones.objects.get_or_create(
+                usuario_id=usuario_id, defaults=self.calcular([usuario_id]).get(usuario_id, {})
+            )
+            if not creado:
+                # Otra transacción creó la fila sin ver este cambio
+                ContadorNotificaciones.objects.filter(usuario_id=usuario_id).update(**expresiones)
+
+    def actualizar(self, instance, anteriores: Optional[dict] = None):
+        """
+        Aplica el cambio de una notificación guardada. `anteriores` son los
+        valores previos de sus campos (None si es nueva).
+        """
+        deltas = self.aporte(self.valores_instancia(instance))
+        if anteriores is not None:
+            deltas.subtract(self.aporte(anteriores))
+        self._aplicar(deltas)
+
+    def retirar(self, instance):
+        """Descuenta una notificación borrada"""
+        deltas = Counter()
+        deltas.subtract(self.aporte(self.valores_instancia(instance)))
+        self._aplicar(deltas, crear=False)
+
+    def registrar_lote(self, notificaciones: Iterable):
+        """Suma en lote las notificaciones nuevas insertadas con bulk_create"""
+        deltas = Counter()
+        for notificacion in notificaciones:
+            deltas.update(self.aporte(self.valores_instancia(notificacion)))
+        self._aplicar(deltas)
+
+    def sumar(self, usuario_id, **deltas):
+        """Aplica deltas explícitos (p. ej. no_leidas=-n tras un update masivo)"""
+        self._aplicar(Counter({(usuario_id, contador): delta for contador, delta in deltas.items()}))
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def contadores(self, usuario_id) -> Dict[str, int]:
+        """Contadores del usuario; la primera lectura crea la fila contando la tabla"""
+        from ..core.models import ContadorNotificaciones
+
+        fila = ContadorNotificaciones.objects.filter(usuario_id=usuario_id).values(*CONTADORES).first()
+        if fila is None:
+            contador, _ = ContadorNotificaciones.objects.get_or_create(
+                usuario_id=usuario_id, defaults=self.calcular([usuario_id]).get(usuario_id, {})
+            )
+            fila = {campo: getattr(contador, campo) for campo in CONTADORES}
+        return {campo: max(valor or 0, 0) for campo, valor in fila.items()}
+
+    def no_leidas(self, usuario_id) -> int:
+        """Contador de notificaciones no leídas (badge)"""
+        return self.contadores(usuario_id)['no_leidas']
+
+    # ------------------------------------------------------------------
+    # Reconciliación
+    # ------------------------------------------------------------------
+
+    def calcular(self, usuarios: Optional[Iterable[int]] = None, apps=None) -> Dict[int, Dict[str, int]]:
+        """Cuenta desde la tabla de notificaciones: {usuario_id: contadores}"""
+        if apps is None:
+            from django.apps import apps
+
+        Notification = apps.get_model('laboratorio', 'Notification')
+        queryset = Notification.objects.all()
+        if usuarios is not None:
+            queryset = queryset.filter(usuario_id__in=list(usuarios))
+        return {
+            fila.pop('usuario_id'): fila
+            for fila in queryset.values('usuario_id').annotate(
+                total=Count('pk'),
+                no_leidas=Count('pk', filter=Q(leida=False)),
+                favoritas=Count('pk', filter=Q(favorita=True)),
+                archivadas=Count('pk', filter=Q(archivada=True)),
+            ).order_by()
+        }
+
+    def rebuild(self) -> int:
+        """
+        Reconcilia los contadores con la tabla de notificaciones: corrige
+        las filas que difieren, crea las que faltan y pone a cero las de
+        usuarios sin notificaciones. Devuelve el número de filas corregidas
+        """
+        from ..core.models import ContadorNotificaciones
+
+        vacio = dict.fromkeys(CONTADORES, 0)
+        corregidas = 0
+        with transaction.atomic():
+            # Bloquear las filas antes de contar: los deltas de transacciones
+            # en curso esperan y se aplican sobre el valor reconciliado
+            existentes = {
+                fila.pop('usuario_id'): fila
+                for fila in ContadorNotificaciones.objects.select_for_update().values('usuario_id', *CONTADORES)
+            }
+            filas = self.calcular()
+            for usuario_id, actual in existentes.items():
+                valores = filas.pop(usuario_id, vacio)
+                if actual != valores:
+                    ContadorNotificaciones.objects.filter(usuario_id=usuario_id).update(**valores)
+                    corregidas += 1
+            ContadorNotificaciones.objects.bulk_create(
+                [ContadorNotificaciones(usuario_id=usuario_id, **valores) for usuario_id, valores in filas.items()],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            corregidas += len(filas)
+        return corregidas
+
+
+# Instancia global del servicio
+contador_notificacion_service = ContadorNotificacionService()
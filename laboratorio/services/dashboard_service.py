@@ -0,0 +1,222 @@
+"""
+Servicio del resumen del dashboard (pantalla de inicio)
+
+La pantalla de inicio necesita las estadísticas del usuario, las métricas
+de germinaciones nuevas, las estadísticas de notificaciones, las alertas
+de polinización y de germinación y las metas del usuario. El resumen las
+arma en una sola respuesta (GET /api/dashboard/) y las guarda en una cache
+por usuario cuya clave incluye el día y las versiones de las tablas del
+usuario (ver version_service): cualquier alta, cambio o baja de un
+registro suyo, de sus notificaciones o de su perfil cambia la clave y el
+resumen anterior deja de usarse, sin borrar nada. Las métricas de
+germinaciones nuevas son globales y se guardan aparte con la versión
+global de la tabla, de modo que las escrituras de otros usuarios solo
+recalculan esa sección.
+
+Después de cada cambio confirmado, los signals calientan en segundo plano
+el resumen de los usuarios afectados que abrieron el dashboard hace poco,
+para que la siguiente apertura de la aplicación sea una lectura de cache.
+"""
+import logging
+import threading
+from datetime import date
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .alerta_service import alerta_service
+from .estadistica_service import estadistica_service
+from .notification_service import notification_service
+from .progreso_service import progreso_service
+from .version_service import version_service
+
+logger = logging.getLogger(__name__)
+
+
+# Tablas con versión por usuario de las que depende el resumen
+TABLAS_USUARIO = ('polinizacion', 'germinacion', 'notification', 'perfil')
+
+
+class DashboardService:
+    """Resumen de la pantalla de inicio en cache por usuario"""
+
+    CACHE_PREFIJO = 'dashboard'
+    CACHE_TIMEOUT = 60 * 60 * 24
+    # Solo se calienta el resumen de quien abrió el dashboard en este plazo
+    ACTIVO_TIMEOUT = 60 * 60 * 24 * 7
+    # Recalentados seguidos si las versiones cambian durante el cálculo
+    MAX_INTENTOS = 3
+
+    # ------------------------------------------------------------------
+    # Secciones
+    # ------------------------------------------------------------------
+
+    def estadisticas_usuario(self, usuario) -> Dict[str, object]:
+        """Estadísticas de los registros creados por el usuario (no importados)"""
+        from .contador_notificacion_service import contador_notificacion_service
+
+        # Germinaciones del usuario; actuales = en proceso, no finalizadas
+        germinaciones = estadistica_service.totales(
+            estadistica_service.filas('germinacion', usuario=usuario),
+            actuales=Sum('total', filter=Q(estado__in=['Verde', 'En Proceso', 'Sin Fecha'])),
+        )
+        polinizaciones = estadistica_service.totales(
+            estadistica_service.filas('polinizacion', usuario=usuario),
+            actuales=Sum('total', filter=Q(estado__in=['INGRESADO', 'EN_PROCESO', 'GERMINANDO'])),
+        )
+        notificaciones_no_leidas = contador_notificacion_service.no_leidas(usuario.pk)
+
+        return {
+            'total_polinizaciones': polinizaciones['total'],
+            'total_germinaciones': germinaciones['total'],
+            'polinizaciones_actuales': polinizaciones['actuales'],
+            'germinaciones_actuales': germinaciones['actuales'],
+            'polinizaciones_completadas': polinizaciones['completadas'],
+            'germinaciones_completadas': germinaciones['completadas'],
+            'usuario': usuario.username,
+            'notificaciones_no_leidas': notificaciones_no_leidas
+        }
+
+    def calcular_metricas_nuevos(self) -> Dict[str, int]:
+        """Métricas de las germinaciones creadas en el sistema (no importadas)"""
+        from ..models import Germinacion
+
+        stats = Germinacion.objects.filter(es_importado=False).aggregate(
+            total=Count('id'),
+            en_proceso=Count('id', filter=Q(
+                estado_germinacion__in=['EN_PROCESO', 'EN_PROCESO_TEMPRANO', 'EN_PROCESO_AVANZADO']
+            )),
+            finalizados=Count('id', filter=Q(estado_germinacion='FINALIZADO') | Q(etapa_actual='LISTA')),
+        )
+        total = stats['total'] or 0
+        finalizados = stats['finalizados'] or 0
+        return {
+            'en_proceso': stats['en_proceso'] or 0,
+            'finalizados': finalizados,
+            'exito_promedio': round((finalizados / total) * 100) if total > 0 else 0,
+            'total': total,
+        }
+
+    def metricas_nuevos(self) -> Dict[str, int]:
+        """calcular_metricas_nuevos en cache mientras no cambie la tabla de germinaciones"""
+        clave = f"{self.CACHE_PREFIJO}_metricas_nuevos:{version_service.version('germinacion')}"
+        metricas = cache.get(clave)
+        if metricas is None:
+            metricas = self.calcular_metricas_nuevos()
+            cache.set(clave, metricas, self.CACHE_TIMEOUT)
+        return metricas
+
+    def metas(self, usuario) -> Dict[str, object]:
+        """Metas del perfil del usuario y su progreso en el mes en curso"""
+        from ..models import UserProfile
+
+        perfil = UserProfile.objects.filter(user=usuario).first()
+        if perfil is None:
+            return {}
+        progreso = progreso_service.valores_perfil(perfil)
+        return {
+            'meta_polinizaciones': perfil.meta_polinizaciones,
+            'meta_germinaciones': perfil.meta_germinaciones,
+            'tasa_exito_objetivo': perfil.tasa_exito_objetivo,
+            'polinizaciones_actuales': progreso['polinizaciones_actuales'],
+            'germinaciones_actuales': progreso['germinaciones_actuales'],
+            'tasa_exito_actual': progreso['tasa_exito_actual'],
+        }
+
+    # ------------------------------------------------------------------
+    # Resumen
+    # ------------------------------------------------------------------
+
+    def calcular(self, usuario) -> Dict[str, object]:
+        """Secciones del usuario, sin cache"""
+        return {
+            'estadisticas': self.estadisticas_usuario(usuario),
+            'notificaciones': notification_service.obtener_estadisticas(usuario=usuario),
+            'alertas_polinizacion': alerta_service.pagina_polinizaciones(usuario),
+            'alertas_germinacion': alerta_service.pagina_germinaciones(usuario),
+            'metas': self.metas(usuario),
+        }
+
+    def resumen(self, usuario) -> Dict[str, object]:
+        """
+        Resumen completo del dashboard: las secciones del usuario desde su
+        cache (o recalculadas si cambió alguna de sus versiones) más las
+        métricas globales de germinaciones nuevas
+        """
+        cache.set(self._clave_activo(usuario.pk), True, self.ACTIVO_TIMEOUT)
+        return {**self._secciones_usuario(usuario), 'metricas_nuevos': self.metricas_nuevos()}
+
+    def _secciones_usuario(self, usuario) -> Dict[str, object]:
+        hoy = timezone.localdate()
+        clave = self._clave(usuario.pk, hoy)
+        secciones = cache.get(clave)
+        if secciones is None:
+            secciones = self.calcular(usuario)
+            cache.set(clave, secciones, self.CACHE_TIMEOUT)
+        return secciones
+
+    def _clave(self, usuario_id, hoy: date) -> str:
+        versiones = version_service.firma(TABLAS_USUARIO, usuario_id)
+        return f'{self.CACHE_PREFIJO}:{usuario_id}:{hoy.isoformat()}:{versiones}'
+
+    def _clave_activo(self, usuario_id) -> str:
+        return f'{self.CACHE_PREFIJO}_activo:{usuario_id}'
+
+    # ------------------------------------------------------------------
+    # Calentamiento en segundo plano
+    # ------------------------------------------------------------------
+
+    def calentar_al_confirmar(self, usuarios: Iterable):
+        """
+        Calienta el resumen de los `usuarios` (ids) cuando se confirme la
+        transacción en curso, después de renovar sus versiones
+        """
+        usuarios = [usuario_id for usuario_id in set(usuarios) if usuario_id is not None]
+        if usuarios:
+            transaction.on_commit(lambda: self.calentar(usuarios))
+
+    def calentar(self, usuarios: Iterable):
+        """Lanza el calentamiento de los usuarios activos (en un hilo, salvo configuración)"""
+        activos = cache.get_many([self._clave_activo(usuario_id) for usuario_id in usuarios])
+        usuarios = [usuario_id for usuario_id in usuarios if self._clave_activo(usuario_id) in activos]
+        if not usuarios:
+            return
+        if getattr(settings, 'DASHBOARD_CALENTAR_EN_SEGUNDO_PLANO', True):
+            threading.Thread(target=self._calentar_en_hilo, args=(usuarios,), daemon=True).start()
+        else:
+            self._calentar(usuarios)
+
+    def _calentar_en_hilo(self, usuarios):
+        try:
+            self._calentar(usuarios)
+        finally:
+            # El hilo abre sus propias conexiones; no deben quedar abiertas
+            connections.close_all()
+
+    def _calentar(self, usuarios):
+        from django.contrib.auth.models import User
+
+        for usuario in User.objects.filter(pk__in=usuarios):
+            # Un solo calentamiento por usuario a la vez; las escrituras de la
+            # misma transacción que llegan mientras tanto las recoge el reintento
+            candado = f'{self.CACHE_PREFIJO}_calentando:{usuario.pk}'
+            if not cache.add(candado, True, 60):
+                continue
+            try:
+                for _ in range(self.MAX_INTENTOS):
+                    clave = self._clave(usuario.pk, timezone.localdate())
+                    self._secciones_usuario(usuario)
+                    if self._clave(usuario.pk, timezone.localdate()) == clave:
+                        break
+            except Exception as e:
+                logger.error(f"Error calentando el dashboard del usuario {usuario.pk}: {e}")
+            finally:
+                cache.delete(candado)
+
+
+# Instancia global del servicio
+dashboard_service = DashboardService()
@@ -0,0 +1,324 @@
+"""
+Servicio de estadísticas diarias pre-agregadas (rollups)
+
+Cada polinización/germinación aporta a una fila de EstadisticaDiaria
+identificada por (modelo, día, usuario, género, especie, estado,
+importado): +1 al total y a las medidas que correspondan (exitosas,
+completadas, cantidad y días hasta germinar). Los signals aplican solo
+la diferencia entre los valores anteriores y los nuevos con deltas F(),
+como los contadores de progreso mensual.
+
+Las estadísticas globales y por usuario se responden sumando estas filas
+(una tabla pequeña, con una fila por combinación y día) en lugar de
+recorrer las tablas principales en cada petición. El comando
+rebuild_estadisticas_diarias reconcilia los últimos días con las tablas
+principales y compacta las filas repetidas o en cero; el scheduler lo
+ejecuta cada noche.
+"""
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+MEDIDAS = ('total', 'exitosas', 'completadas', 'suma_cantidad', 'con_cantidad', 'suma_dias', 'con_dias')
+DIMENSIONES = ('modelo', 'dia', 'usuario_id', 'genero', 'especie', 'estado', 'es_importado')
+
+
+def _aporte_polinizacion(valores: dict) -> Dict[str, int]:
+    cantidad = valores.get('cantidad_disponible') or 0
+    return {
+        'exitosas': int(valores.get('fechamad') is not None or cantidad > 0),
+        'completadas': int(valores.get('estado') in ('COMPLETADA', 'FINALIZADA', 'MADURO', 'LISTO')),
+        # Promedio de semillas solo de las polinizaciones cosechadas
+        'suma_cantidad': cantidad,
+        'con_cantidad': int(cantidad > 0),
+    }
+
+
+def _aporte_germinacion(valores: dict) -> Dict[str, int]:
+    medidas = {
+        'exitosas': int(valores.get('fecha_germinacion') is not None or bool(valores.get('semilla_en_stock'))),
+        'completadas': int(valores.get('estado_germinacion') == 'FINALIZADO'),
+        'suma_cantidad': valores.get('no_capsulas') or 0,
+        'con_cantidad': int(valores.get('no_capsulas') is not None),
+    }
+    if valores.get('fecha_siembra') and valores.get('fecha_germinacion'):
+        medidas['suma_dias'] = (valores['fecha_germinacion'] - valores['fecha_siembra']).days
+        medidas['con_dias'] = 1
+    return medidas
+
+
+# Definición de cada modelo: nombre en la tabla, campos de las dimensiones
+# (día, género, especie, estado), campos de las medidas y función de aporte
+MODELOS = {
+    'Polinizacion': {
+        'modelo': 'polinizacion',
+        'dimensiones': ('fechapol', 'genero', 'especie', 'estado'),
+        'medidas': ('fechamad', 'cantidad_disponible'),
+        'aporte': _aporte_polinizacion,
+    },
+    'Germinacion': {
+        'modelo': 'germinacion',
+        'dimensiones': ('fecha_creacion', 'genero', 'especie_variedad', 'estado_capsula'),
+        'medidas': ('fecha_germinacion', 'fecha_siembra', 'semilla_en_stock', 'no_capsulas', 'estado_germinacion'),
+        'aporte': _aporte_germinacion,
+    },
+}
+
+
+def _como_fecha(valor) -> Optional[date]:
+    """Día local de una fecha o fecha/hora (fecha_creacion es DateTimeField)"""
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).date() if timezone.is_aware(valor) else valor.date()
+    return valor
+
+
+class EstadisticaService:
+    """Mantenimiento y lectura de las estadísticas diarias pre-agregadas"""
+
+    def campos(self, model) -> Tuple[str, ...]:
+        """Campos del modelo de los que depende su aporte"""
+        definicion = MODELOS.get(model.__name__)
+        if not definicion:
+            return ()
+        return ('creado_por', 'es_importado', *definicion['dimensiones'], *definicion['medidas'])
+
+    def aporte(self, model, valores: dict) -> Counter:
+        """
+        Aporte de un registro con los `valores` dados:
+        {(clave de la fila, medida): delta}
+        """
+        resultado = Counter()
+        definicion = MODELOS.get(model.__name__)
+        if not definicion:
+            return resultado
+        campo_dia, campo_genero, campo_especie, campo_estado = definicion['dimensiones']
+        clave = (
+            definicion['modelo'], _como_fecha(valores.get(campo_dia)), valores.get('creado_por'),
+            valores.get(campo_genero), valores.get(campo_especie), valores.get(campo_estado),
+            bool(valores.get('es_importado')),
+        )
+        resultado[(clave, 'total')] += 1
+        for medida, valor in definicion['aporte'](valores).items():
+            if valor:
+                resultado[(clave, medida)] += valor
+        return resultado
+
+    def valores_instancia(self, instance) -> dict:
+        valores = {}
+        for campo in self.campos(type(instance)):
+            atributo = 'creado_por_id' if campo == 'creado_por' else campo
+            valores[campo] = getattr(instance, atributo, None)
+        return valores
+
+    # ------------------------------------------------------------------
+    # Mantenimiento incremental
+    # ------------------------------------------------------------------
+
+    def _aplicar(self, deltas: Counter):
+        """
+        Suma los deltas a las filas con UPDATE ... SET x = x + d. Las filas no
+        tienen restricción de unicidad (las dimensiones admiten NULL): si dos
+        altas concurrentes crean la misma fila, las lecturas las suman igual y
+        la compactación nocturna las une.
+        """
+        from ..core.models import EstadisticaDiaria
+
+        por_fila: Dict[tuple, Dict[str, int]] = {}
+        for (clave, medida), delta in deltas.items():
+            if delta:
+                por_fila.setdefault(clave, {})[medida] = delta
+
+        for clave, cambios in por_fila.items():
+            filtro = dict(zip(DIMENSIONES, clave))
+            pk = EstadisticaDiaria.objects.filter(**filtro).values_list('pk', flat=True).first()
+            if pk is None:
+                EstadisticaDiaria.objects.create(**filtro, **cambios)
+            else:
+                EstadisticaDiaria.objects.filter(pk=pk).update(
+                    **{medida: F(medida) + delta for medida, delta in cambios.items()}
+                )
+
+    def actualizar(self, instance, anteriores: Optional[dict] = None, update_fields=None):
+        """
+        Aplica el cambio de un registro guardado. `anteriores` son los
+        valores previos de sus campos (None si es nuevo).
+        """
+        model = type(instance)
+        nuevos = self.valores_instancia(instance)
+        if anteriores is not None and update_fields is not None:
+            # Los campos no incluidos en update_fields no cambiaron en la BD
+            nuevos = {
+                campo: (valor if campo in update_fields else anteriores.get(campo))
+                for campo, valor in nuevos.items()
+            }
+        deltas = self.aporte(model, nuevos)
+        if anteriores is not None:
+            deltas.subtract(self.aporte(model, anteriores))
+        self._aplicar(deltas)
+
+    def retirar(self, instance):
+        """Descuenta un registro borrado"""
+        deltas = Counter()
+        deltas.subtract(self.aporte(type(instance), self.valores_instancia(instance)))
+        self._aplicar(deltas)
+
+    def registrar_lote(self, instances: Iterable):
+        """Suma en lote los registros nuevos de una importación"""
+        deltas = Counter()
+        for instance in instances:
+            deltas.update(self.aporte(type(instance), self.valores_instancia(instance)))
+        self._aplicar(deltas)
+
+    def retirar_lote(self, instances: Iterable):
+        """Descuenta en lote los valores anteriores de los registros actualizados en una reimportación"""
+        deltas = Counter()
+        for instance in instances:
+            deltas.subtract(self.aporte(type(instance), self.valores_instancia(instance)))
+        self._aplicar(deltas)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def filas(self, modelo: str, usuario=None, desde: Optional[date] = None, hasta: Optional[date] = None,
+              incluir_importados: bool = False):
+        """Filas de un modelo ('polinizacion' / 'germinacion') con los filtros dados"""
+        from ..core.models import EstadisticaDiaria
+
+        queryset = EstadisticaDiaria.objects.filter(modelo=modelo)
+        if not incluir_importados:
+            queryset = queryset.filter(es_importado=False)
+        if usuario is not None:
+            queryset = queryset.filter(usuario=usuario)
+        if desde:
+            queryset = queryset.filter(dia__gte=desde)
+        if hasta:
+            queryset = queryset.filter(dia__lte=hasta)
+        return queryset
+
+    def totales(self, filas, **extra) -> Dict[str, int]:
+        """Suma de las medidas (más los agregados `extra`) en una sola consulta"""
+        # Alias con prefijo: un agregado llamado igual que la medida ocultaría
+        # el campo a los agregados `extra` (p. ej. Sum('total', filter=...))
+        sumas = filas.aggregate(**{f'_{medida}': Sum(medida) for medida in MEDIDAS}, **extra)
+        return {clave.removeprefix('_'): valor or 0 for clave, valor in sumas.items()}
+
+    def por_dimension(self, filas, dimension: str, limite: Optional[int] = None, nombre: Optional[str] = None) -> List[dict]:
+        """
+        Conteo por género, especie o estado: [{nombre: valor, 'count': n}].
+        Con `limite`, los más frecuentes; sin él, ordenado por valor.
+        """
+        nombre = nombre or dimension
+        conteos = filas.values(dimension).annotate(count=Sum('total')).filter(count__gt=0)
+        if limite:
+            conteos = conteos.order_by('-count')[:limite]
+        else:
+            conteos = conteos.order_by(dimension)
+        return [{nombre: fila[dimension], 'count': fila['count']} for fila in conteos]
+
+    def por_mes(self, filas) -> List[dict]:
+        """Totales por mes de `dia`: [{'mes': 'YYYY-MM-01', 'total': n}]"""
+        conteos = (
+            filas.filter(dia__isnull=False)
+            .annotate(mes=TruncMonth('dia'))
+            .values('mes')
+            .annotate(total=Sum('total'))
+            .filter(total__gt=0)
+            .order_by('mes')
+        )
+        return [{'mes': fila['mes'].strftime('%Y-%m-%d'), 'total': fila['total']} for fila in conteos]
+
+    # ------------------------------------------------------------------
+    # Reconciliación
+    # ------------------------------------------------------------------
+
+    def calcular(self, desde: Optional[date] = None, apps=None) -> Counter:
+        """
+        Calcula las filas desde las tablas principales con la misma función
+        de aporte que los signals: {(clave, medida): valor}
+        """
+        if apps is None:
+            from django.apps import apps
+
+        deltas = Counter()
+        for nombre_modelo, definicion in MODELOS.items():
+            Model = apps.get_model('laboratorio', nombre_modelo)
+            campos = self.campos(Model)
+            queryset = Model.objects.all()
+            if desde:
+                campo_dia = definicion['dimensiones'][0]
+                if campo_dia == 'fecha_creacion':
+                    inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()))
+                    queryset = queryset.filter(fecha_creacion__gte=inicio)
+                else:
+                    queryset = queryset.filter(**{f'{campo_dia}__gte': desde})
+            valores = queryset.values(*(('creado_por_id' if c == 'creado_por' else c) for c in campos))
+            for fila in valores.iterator(chunk_size=2000):
+                fila['creado_por'] = fila.pop('creado_por_id')
+                deltas.update(self.aporte(Model, fila))
+        return deltas
+
+    def construir_filas(self, valores: Counter, EstadisticaDiaria=None) -> list:
+        """Instancias (sin guardar) de EstadisticaDiaria a partir de calcular()"""
+        if EstadisticaDiaria is None:
+            from ..core.models import EstadisticaDiaria
+
+        por_fila: Dict[tuple, Dict[str, int]] = {}
+        for (clave, medida), valor in valores.items():
+            por_fila.setdefault(clave, {})[medida] = valor
+        return [EstadisticaDiaria(**dict(zip(DIMENSIONES, clave)), **medidas) for clave, medidas in por_fila.items()]
+
+    def compactar(self) -> int:
+        """
+        Une las filas repetidas (altas concurrentes) en una sola y borra las
+        que quedaron en cero. Devuelve el número de filas eliminadas.
+        """
+        from ..core.models import EstadisticaDiaria
+
+        eliminadas = 0
+        with transaction.atomic():
+            repetidas = (
+                EstadisticaDiaria.objects.values(*DIMENSIONES)
+                .annotate(filas=Count('pk'), primera=Min('pk'), **{f'suma_{m}': Sum(m) for m in MEDIDAS})
+                .filter(filas__gt=1)
+                .order_by()
+            )
+            for grupo in repetidas:
+                filtro = {dimension: grupo[dimension] for dimension in DIMENSIONES}
+                EstadisticaDiaria.objects.filter(pk=grupo['primera']).update(
+                    **{medida: grupo[f'suma_{medida}'] for medida in MEDIDAS}
+                )
+                eliminadas += EstadisticaDiaria.objects.filter(**filtro).exclude(pk=grupo['primera']).delete()[0]
+            eliminadas += EstadisticaDiaria.objects.filter(total__lte=0).delete()[0]
+        return eliminadas
+
+    def rebuild(self, dias: Optional[int] = None) -> int:
+        """
+        Regenera las filas desde las tablas principales. Con `dias` solo se
+        reconcilian los últimos N días (incluido hoy); las filas sin día
+        solo se regeneran en la reconstrucción completa.
+        """
+        from ..core.models import EstadisticaDiaria
+
+        desde = timezone.localdate() - timedelta(days=dias - 1) if dias else None
+        filas = self.construir_filas(self.calcular(desde))
+        with transaction.atomic():
+            existentes = EstadisticaDiaria.objects.all()
+            if desde:
+                existentes = existentes.filter(dia__gte=desde)
+            existentes.delete()
+            EstadisticaDiaria.objects.bulk_create(filas, batch_size=500)
+        return len(filas)
+
+
+# Instancia global del servicio
+estadistica_service = EstadisticaService()
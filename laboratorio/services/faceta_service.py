@@ -0,0 +1,306 @@
+"""
+Servicio del catálogo de facetas para los filtros
+
+Mantiene la tabla FacetaFiltro con los valores distintos de los campos que
+se ofrecen como filtro (estado, género, vivero, mesa...) y cuántos registros
+tiene cada uno. Los endpoints de opciones (filter-options, filtros-opciones,
+viveros, mesas, paredes, opciones-ubicacion) leen de esta tabla con una
+sola consulta indexada en lugar de hacer un DISTINCT por campo sobre las
+tablas principales y ordenar en Python.
+
+Los contadores se actualizan de forma incremental desde los signals de
+guardado/borrado (solo los valores que cambiaron) y en lote desde las
+importaciones; el comando rebuild_facetas los regenera desde cero.
+"""
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .search_backend import TAMANO_LOTE
+
+logger = logging.getLogger(__name__)
+
+
+# Campos con faceta de cada modelo
+FACETAS = {
+    'polinizacion': ('Polinizacion', (
+        'estado', 'tipo_polinizacion', 'responsable', 'genero', 'especie',
+        'ubicacion_nombre', 'ubicacion_tipo', 'vivero', 'mesa', 'pared',
+    )),
+    'germinacion': ('Germinacion', (
+        'responsable', 'percha', 'nivel', 'genero', 'estado_capsulas', 'clima',
+    )),
+}
+
+# Facetas acotadas por el valor de otro campo: (campo, campo_contexto)
+FACETAS_CON_CONTEXTO = {
+    'polinizacion': (('mesa', 'vivero'), ('pared', 'vivero')),
+    'germinacion': (),
+}
+
+# Pseudo-campo con el total de registros del modelo
+CAMPO_TOTAL = '_total'
+
+TABLA_FACETAS = 'laboratorio_facetafiltro'
+
+
+# ----------------------------------------------------------------------
+# Claves de ordenamiento natural (precalculadas en la columna `orden`)
+# ----------------------------------------------------------------------
+
+def _numero(n: int) -> str:
+    return f'{min(max(n, 0), 9999999999):010d}'
+
+
+def orden_vivero(valor: str) -> str:
+    """V-1, V-2, V-10, V-11...; los que no siguen el patrón van al final"""
+    try:
+        return _numero(int(valor.split('-')[1])) + valor
+    except (IndexError, ValueError):
+        return _numero(99999) + valor
+
+
+def orden_mesa(valor: str) -> str:
+    """M-1A, M-2A, M-10A, M-11A..."""
+    match = re.match(r'M-(\d+)([A-Z]+)', valor)
+    if match:
+        return _numero(int(match.group(1))) + match.group(2)
+    return _numero(99999) + valor
+
+
+def orden_pared(valor: str) -> str:
+    """P-0, P-100, P-101... luego P-A, P-B... y al final el resto"""
+    try:
+        if re.match(r'P-\d+', valor):
+            return '0' + _numero(int(valor.split('-')[1]))
+        if re.match(r'P-[A-Z]+', valor):
+            return '1' + _numero(0) + valor.split('-')[1]
+    except ValueError:
+        pass
+    return '2' + _numero(0) + valor
+
+
+CLAVES_ORDEN = {
+    'vivero': orden_vivero,
+    'mesa': orden_mesa,
+    'pared': orden_pared,
+}
+
+
+def clave_orden(campo: str, valor: str) -> str:
+    funcion = CLAVES_ORDEN.get(campo)
+    return (funcion(valor) if funcion else valor)[:255]
+
+
+def _limpiar(valor) -> str:
+    return '' if valor is None else str(valor)[:255]
+
+
+def facetas_de_valores(modelo: str, valores: dict) -> List[Tuple[str, str, str]]:
+    """
+    Devuelve las facetas (campo, contexto, valor) a las que aporta un registro
+    con los `valores` dados, incluido el total del modelo
+    """
+    facetas = [(CAMPO_TOTAL, '', '')]
+    for campo in FACETAS[modelo][1]:
+        valor = _limpiar(valores.get(campo))
+        if valor:
+            facetas.append((campo, '', valor))
+    for campo, campo_contexto in FACETAS_CON_CONTEXTO[modelo]:
+        valor = _limpiar(valores.get(campo))
+        contexto = _limpiar(valores.get(campo_contexto))[:100]
+        if valor and contexto:
+            facetas.append((campo, contexto, valor))
+    return facetas
+
+
+def calcular_facetas(Model, modelo: str) -> Counter:
+    """Cuenta las facetas de un modelo con un GROUP BY por campo"""
+    conteos: Counter = Counter()
+    conteos[(CAMPO_TOTAL, '', '')] = Model.objects.count()
+    for campo in FACETAS[modelo][1]:
+        filas = (
+            Model.objects.exclude(**{f'{campo}__isnull': True}).exclude(**{campo: ''})
+            .values_list(campo).annotate(n=Count('pk')).order_by()
+        )
+        for valor, n in filas:
+            conteos[(campo, '', _limpiar(valor))] += n
+    for campo, campo_contexto in FACETAS_CON_CONTEXTO[modelo]:
+        filas = (
+            Model.objects.exclude(**{campo: ''}).exclude(**{campo_contexto: ''})
+            .values_list(campo_contexto, campo).annotate(n=Count('pk')).order_by()
+        )
+        for contexto, valor, n in filas:
+            conteos[(campo, _limpiar(contexto)[:100], _limpiar(valor))] += n
+    return conteos
+
+
+class FacetaService:
+    """Lectura y mantenimiento del catálogo de facetas"""
+
+    def modelo_de(self, model) -> Optional[str]:
+        nombre = model.__name__
+        for modelo, (nombre_modelo, _) in FACETAS.items():
+            if nombre_modelo == nombre:
+                return modelo
+        return None
+
+    def campos(self, model) -> Tuple[str, ...]:
+        modelo = self.modelo_de(model)
+        return FACETAS[modelo][1] if modelo else ()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def opciones(self, modelo: str, limites: Dict[str, int], contexto: str = '',
+                 search: str = '') -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Devuelve, en una sola consulta, los valores de varios campos en su
+        orden natural: {campo: [(valor, total), ...]}. `limites` indica el
+        máximo de valores por campo.
+        """
+        from ..core.models import FacetaFiltro
+
+        resultado = {campo: [] for campo in limites}
+        if not limites:
+            return resultado
+
+        queryset = FacetaFiltro.objects.filter(
+            modelo=modelo, contexto=contexto, campo__in=list(limites), total__gt=0
+        )
+        if search:
+            queryset = queryset.filter(valor__icontains=search)
+
+        if all(limites.values()):
+            # Cortar en la BD los valores que sobran de cada campo
+            limite_maximo = max(limites.values())
+            queryset = queryset.annotate(
+                fila=Window(RowNumber(), partition_by=[F('campo')], order_by=[F('orden').asc(), F('valor').asc()])
+            ).filter(fila__lte=limite_maximo)
+
+        for campo, valor, total in queryset.order_by('campo', 'orden', 'valor').values_list('campo', 'valor', 'total'):
+            limite = limites[campo]
+            if not limite or len(resultado[campo]) < limite:
+                resultado[campo].append((valor, total))
+        return resultado
+
+    def valores(self, modelo: str, campo: str, contexto: str = '', search: str = '',
+                limite: Optional[int] = None) -> List[str]:
+        """Valores de un solo campo en su orden natural"""
+        opciones = self.opciones(modelo, {campo: limite}, contexto=contexto, search=search)
+        return [valor for valor, _ in opciones[campo]]
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def _aplicar(self, modelo: str, deltas: Counter):
+        """
+        Suma los deltas a los contadores con un UPSERT por lote
+        (INSERT ... ON CONFLICT DO UPDATE SET total = total + delta)
+        """
+        from ..core.models import FacetaFiltro
+
+        filas = [(clave, delta) for clave, delta in deltas.items() if delta]
+        if not filas:
+            return
+
+        sql_base = (
+            f"INSERT INTO {TABLA_FACETAS} (modelo, campo, contexto, valor, total, orden) VALUES {{}} "
+            f"ON CONFLICT (modelo, campo, contexto, valor) "
+            f"DO UPDATE SET total = {TABLA_FACETAS}.total + excluded.total"
+        )
+        with connection.cursor() as cursor:
+            for inicio in range(0, len(filas), TAMANO_LOTE):
+                lote = filas[inicio:inicio + TAMANO_LOTE]
+                params = []
+                for (campo, contexto, valor), delta in lote:
+                    params.extend([modelo, campo, contexto, valor, delta, clave_orden(campo, valor)])
+                cursor.execute(sql_base.format(', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(lote))), params)
+
+        if any(delta < 0 for _, delta in filas):
+            FacetaFiltro.objects.filter(modelo=modelo, total__lte=0).delete()
+
+    def _valores_instancia(self, modelo: str, instance) -> dict:
+        return {campo: getattr(instance, campo, None) for campo in FACETAS[modelo][1]}
+
+    def actualizar(self, instance, anteriores: Optional[dict] = None, update_fields=None):
+        """
+        Aplica el cambio de un registro guardado. `anteriores` son los
+        valores de sus campos antes de guardar (None si es nuevo).
+        """
+        modelo = self.modelo_de(type(instance))
+        if not modelo:
+            return
+
+        nuevos = self._valores_instancia(modelo, instance)
+        if anteriores is not None and update_fields is not None:
+            # Los campos no incluidos en update_fields no cambiaron en la BD
+            nuevos = {
+                campo: (valor if campo in update_fields else anteriores.get(campo))
+                for campo, valor in nuevos.items()
+            }
+
+        deltas = Counter(facetas_de_valores(modelo, nuevos))
+        if anteriores is not None:
+            deltas.subtract(facetas_de_valores(modelo, anteriores))
+        self._aplicar(modelo, deltas)
+
+    def retirar(self, instance):
+        """Descuenta un registro borrado"""
+        modelo = self.modelo_de(type(instance))
+        if not modelo:
+            return
+        deltas = Counter()
+        deltas.subtract(facetas_de_valores(modelo, self._valores_instancia(modelo, instance)))
+        self._aplicar(modelo, deltas)
+
+    def registrar_lote(self, instances: Iterable):
+        """Suma en lote los registros nuevos de una importación"""
+        por_modelo: Dict[str, Counter] = {}
+        for instance in instances:
+            modelo = self.modelo_de(type(instance))
+            if modelo:
+                por_modelo.setdefault(modelo, Counter()).update(
+                    facetas_de_valores(modelo, self._valores_instancia(modelo, instance))
+                )
+        for modelo, deltas in por_modelo.items():
+            self._aplicar(modelo, deltas)
+
+    def retirar_lote(self, instances: Iterable):
+        """Descuenta en lote los valores anteriores de los registros actualizados en una reimportación"""
+        por_modelo: Dict[str, Counter] = {}
+        for instance in instances:
+            modelo = self.modelo_de(type(instance))
+            if modelo:
+                por_modelo.setdefault(modelo, Counter()).subtract(
+                    facetas_de_valores(modelo, self._valores_instancia(modelo, instance))
+                )
+        for modelo, deltas in por_modelo.items():
+            self._aplicar(modelo, deltas)
+
+    def rebuild(self, modelo: str) -> int:
+        """Regenera desde cero las facetas de un modelo"""
+        from django.apps import apps
+        from ..core.models import FacetaFiltro
+
+        Model = apps.get_model('laboratorio', FACETAS[modelo][0])
+        facetas = [
+            FacetaFiltro(modelo=modelo, campo=campo, contexto=contexto, valor=valor,
+                         total=total, orden=clave_orden(campo, valor))
+            for (campo, contexto, valor), total in calcular_facetas(Model, modelo).items() if total > 0
+        ]
+        with transaction.atomic():
+            FacetaFiltro.objects.filter(modelo=modelo).delete()
+            FacetaFiltro.objects.bulk_create(facetas, batch_size=TAMANO_LOTE)
+        return len(facetas)
+
+
+# Instancia global del servicio
+faceta_service = FacetaService()
@@ -3,13 +3,13 @@ Servicio de negocio para Germinaciones
 """
 from typing import Dict, Any, List, Optional
 from django.contrib.auth.models import User
-from django.db.models import Q
 from datetime import date, datetime
 from django.core.exceptions import ValidationError
 import logging
 
 from ..models import Germinacion
 from .base_service import BaseService, PaginatedService, CacheableService
+from .search_backend import get_search_backend
 from ..utils.validation_utils import ValidationHelper, validate_codigo, validate_date_field, validate_positive_integer, validate_text_field
 from ..core.models import UserProfile
 
@@ -127,21 +127,22 @@ class GerminacionService(PaginatedService, CacheableService):
         # El filtrado por usuario propio se hace en get_mis_germinaciones para la página de perfil
         return queryset
     
-    def get_mis_germinaciones(self, user: User, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = False) -> List[Germinacion]:
-        """Obtiene las germinaciones del propio usuario (sección perfil).
-        Siempre filtra por creado_por=user, independientemente del rol.
-
-        Args:
-            user: Usuario actual
-            search: Término de búsqueda opcional
-            dias_recientes: Si se proporciona, filtra solo germinaciones de los últimos N días
-            excluir_importadas: Si es True, excluye las germinaciones importadas desde archivos CSV/Excel
-        """
+    def _build_mis_germinaciones_queryset(self, user: User, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = False, solo_historicos: bool = False, only: Optional[List[str]] = None):
+        """Construye el queryset filtrado de las germinaciones del usuario (sin ordenar)"""
         queryset = Germinacion.objects.filter(creado_por=user)
+        if only:
+            # Solo las columnas que se van a serializar (?fields= / ?preset=)
+            queryset = queryset.only(*only)
 
-        # Excluir germinaciones importadas desde CSV/Excel si se especifica
-        if excluir_importadas:
-            queryset = queryset.filter(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
+        # Filtrar por tipo de registro
+        if solo_historicos:
+            # Mostrar SOLO registros históricos (importados desde archivos)
+            queryset = queryset.filter(es_importado=True)
+            logger.info(f"Filtrando SOLO germinaciones historicas (importadas)")
+        elif excluir_importadas:
+            # Excluir germinaciones importadas desde CSV/Excel (mostrar solo nuevas)
+            queryset = queryset.filter(es_importado=False)
+            logger.info(f"Excluyendo germinaciones importadas (solo nuevas)")
 
         # Filtrar por fecha si se especifica
         if dias_recientes:
@@ -150,18 +151,29 @@ class GerminacionService(PaginatedService, CacheableService):
             fecha_limite = timezone.now() - timedelta(days=dias_recientes)
             queryset = queryset.filter(fecha_creacion__gte=fecha_limite)
 
-        # Aplicar búsqueda si se proporciona
+        # Aplicar búsqueda si se proporciona (índice de texto completo por prefijo)
         if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(genero__icontains=search) |
-                Q(especie_variedad__icontains=search) |
-                Q(observaciones__icontains=search)
-            )
+            queryset = get_search_backend().search(queryset, search)
+
+        return queryset
+
+    def get_mis_germinaciones(self, user: User, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = False, only: Optional[List[str]] = None, proyeccion=None) -> List[Germinacion]:
+        """Obtiene las germinaciones del propio usuario (sección perfil).
+        Siempre filtra por creado_por=user, independientemente del rol.
 
-        return list(queryset.order_by('-fecha_creacion'))
+        Args:
+            user: Usuario actual
+            search: Término de búsqueda opcional
+            dias_recientes: Si se proporciona, filtra solo germinaciones de los últimos N días
+            excluir_importadas: Si es True, excluye las germinaciones importadas desde archivos CSV/Excel
+        """
+        queryset = self._build_mis_germinaciones_queryset(
+            user, search=search, dias_recientes=dias_recientes, excluir_importadas=excluir_importadas, only=only
+        )
+        queryset = queryset.order_by('-fecha_creacion')
+        return self.materializar(self.aplicar_proyeccion(queryset, proyeccion), proyeccion)
     
-    def get_mis_germinaciones_paginated(self, user: User, page: int = 1, page_size: int = 20, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = False, solo_historicos: bool = False):
+    def get_mis_germinaciones_paginated(self, user: User, page: int = 1, page_size: int = 20, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = False, solo_historicos: bool = False, only: Optional[List[str]] = None, proyeccion=None):
         """Obtiene las germinaciones accesibles para el usuario actual con paginación
 
         Args:
@@ -172,46 +184,25 @@ class GerminacionService(PaginatedService, CacheableService):
             dias_recientes: Si se proporciona, filtra solo germinaciones de los últimos N días
             excluir_importadas: Si es True, excluye las germinaciones importadas desde archivos CSV/Excel
             solo_historicos: Si es True, muestra SOLO germinaciones importadas (históricos)
+            only: Columnas a leer (selección de campos)
+            proyeccion: ProyeccionValores opcional; los resultados se devuelven ya serializados
         """
         from django.core.paginator import Paginator
 
-        queryset = Germinacion.objects.filter(creado_por=user)
-
-        # Filtrar por tipo de registro
-        if solo_historicos:
-            # Mostrar SOLO registros históricos (importados desde archivos)
-            queryset = queryset.exclude(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
-            logger.info(f"Filtrando SOLO germinaciones historicas (importadas)")
-        elif excluir_importadas:
-            # Excluir germinaciones importadas desde CSV/Excel (mostrar solo nuevas)
-            queryset = queryset.filter(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
-            logger.info(f"Excluyendo germinaciones importadas (solo nuevas)")
-
-        # Filtrar por fecha si se especifica
-        if dias_recientes:
-            from datetime import timedelta
-            from django.utils import timezone
-            fecha_limite = timezone.now() - timedelta(days=dias_recientes)
-            queryset = queryset.filter(fecha_creacion__gte=fecha_limite)
-
-        # Aplicar búsqueda si se proporciona
-        if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(genero__icontains=search) |
-                Q(especie_variedad__icontains=search) |
-                Q(observaciones__icontains=search)
-            )
+        queryset = self._build_mis_germinaciones_queryset(
+            user, search=search, dias_recientes=dias_recientes,
+            excluir_importadas=excluir_importadas, solo_historicos=solo_historicos, only=only
+        )
 
         # Ordenar por fecha de creación descendente
         queryset = queryset.order_by('-fecha_creacion')
         
         # Paginar
-        paginator = Paginator(queryset, page_size)
+        paginator = Paginator(self.aplicar_proyeccion(queryset, proyeccion), page_size)
         page_obj = paginator.get_page(page)
         
         return {
-            'results': list(page_obj),
+            'results': self.materializar(page_obj, proyeccion),
             'count': paginator.count,
             'total_pages': paginator.num_pages,
             'current_page': page,
@@ -221,6 +212,24 @@ class GerminacionService(PaginatedService, CacheableService):
             'next': page if page_obj.has_next() else None,
             'previous': page - 1 if page_obj.has_previous() else None
         }
+
+    def get_mis_germinaciones_cursor(self, user: User, cursor: Optional[str] = None, page_size: int = 20, include_count: bool = False, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = False, solo_historicos: bool = False, only: Optional[List[str]] = None, proyeccion=None):
+        """Obtiene las germinaciones del usuario con paginación por cursor (keyset)
+
+        Args:
+            user: Usuario actual
+            cursor: Token devuelto en next_cursor/prev_cursor (None para la primera página)
+            page_size: Tamaño de página
+            include_count: Si es True, incluye el conteo total (COUNT adicional)
+            search, dias_recientes, excluir_importadas, solo_historicos, only, proyeccion: igual que get_mis_germinaciones_paginated
+        """
+        queryset = self._build_mis_germinaciones_queryset(
+            user, search=search, dias_recientes=dias_recientes,
+            excluir_importadas=excluir_importadas, solo_historicos=solo_historicos, only=only
+        )
+        return self.paginate_keyset(
+            queryset, cursor=cursor, page_size=page_size, include_count=include_count, proyeccion=proyeccion
+        )
     
     def get_codigos_unicos(self) -> List[str]:
         """Obtiene códigos únicos para autocompletado"""
@@ -301,14 +310,15 @@ class GerminacionService(PaginatedService, CacheableService):
         retorna la primera germinación encontrada con ese código (para autocompletado).
         """
         try:
-            # Usar .first() en lugar de .get() porque se permiten códigos duplicados
-            germinacion = Germinacion.objects.filter(codigo=codigo).first()
+            # Se consulta el índice de autocompletado en lugar de la tabla de germinaciones
+            from .codigo_autocomplete_service import codigo_autocomplete_service
+            entrada = codigo_autocomplete_service.obtener('germinacion', codigo)
             
-            if germinacion:
+            if entrada:
                 return {
-                    'codigo': germinacion.codigo,
-                    'especie': germinacion.especie_variedad or '',
-                    'genero': germinacion.genero or '',
+                    'codigo': entrada['codigo'],
+                    'especie': entrada['especie'],
+                    'genero': entrada['genero'],
                     'permite_duplicados': True  # Indicar que se permiten duplicados
                 }
             return None
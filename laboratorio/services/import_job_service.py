@@ -0,0 +1,235 @@
+"""
+Servicio de importaciones en segundo plano (ImportJob)
+
+Las cargas de CSV desde la API ya no se procesan dentro de la petición:
+
+1. Encolar: el archivo se guarda en el almacenamiento de archivos (MEDIA)
+   y se crea un ImportJob PENDIENTE; la API responde de inmediato con su id.
+2. Procesar: el job del scheduler (cada PERIODO_WORKER segundos) o el
+   comando procesar_importaciones --continuo reclaman los trabajos con un
+   UPDATE condicional, de modo que dos workers no toman el mismo.
+3. Puntos de control: el archivo se lee por bloques (lector_csv) y cada
+   lote de filas se inserta con el motor de importación en la misma
+   transacción que guarda la última fila procesada, los creados y los
+   errores. Si el proceso cae, el lote en curso se revierte y el siguiente
+   intento reanuda desde la última fila confirmada.
+   Cada registro guarda su fila de origen (nombre del archivo y número de
+   fila); con `sincronizar`, volver a subir el archivo omite las filas sin
+   cambios y actualiza las modificadas (ver ImportacionService.importar).
+4. Latido: cada lote confirmado renueva `actualizado`; un trabajo
+   EN_PROCESO sin latido durante LATIDO_VENCIDO se da por caído y se
+   reintenta, hasta MAX_INTENTOS.
+
+El avance (filas procesadas, filas por segundo, errores) se consulta en
+/api/importaciones/<id>/.
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# Un trabajo EN_PROCESO sin lotes confirmados en este tiempo se reintenta
+LATIDO_VENCIDO = timedelta(minutes=5)
+MAX_INTENTOS = 3
+PERIODO_WORKER = 15
+
+
+class ImportJobService:
+    """Cola de importaciones de CSV procesadas por lotes con reanudación"""
+
+    def destino(self, modelo: str):
+        """(modelo Django, constructor de csv_handler) de un tipo de importación"""
+        from ..core.models import Germinacion, Polinizacion
+        from ..integrations.csv_handler import construir_germinaciones, construir_polinizaciones
+
+        return {
+            'polinizacion': (Polinizacion, construir_polinizaciones),
+            'germinacion': (Germinacion, construir_germinaciones),
+        }[modelo]
+
+    # ------------------------------------------------------------------
+    # Cola
+    # ------------------------------------------------------------------
+
+    def crear(self, usuario, modelo: str, archivo, sincronizar: bool = False):
+        """Guarda el archivo subido (por bloques) y encola su importación"""
+        from ..core.models import ImportJob
+
+        job = ImportJob(usuario=usuario, modelo=modelo, nombre_archivo=archivo.name[:255], sincronizar=sincronizar)
+        job.archivo.save(archivo.name, archivo, save=False)
+        job.save()
+        logger.info(f"Importación #{job.pk} de {modelo} encolada por {usuario.username}")
+        return job
+
+    def _disponibles(self):
+        from ..core.models import ImportJob
+
+        vencidos = timezone.now() - LATIDO_VENCIDO
+        return ImportJob.objects.filter(
+            Q(estado='PENDIENTE') | Q(estado='EN_PROCESO', actualizado__lt=vencidos)
+        )
+
+    def pendientes(self) -> List[int]:
+        """Ids de los trabajos pendientes o caídos, del más antiguo al más nuevo"""
+        return list(self._disponibles().order_by('creado').values_list('pk', flat=True))
+
+    def reclamar(self, job_id):
+        """
+        Marca el trabajo EN_PROCESO si sigue disponible y lo devuelve; None si
+        otro worker lo tomó antes
+        """
+        from ..core.models import ImportJob
+
+        ahora = timezone.now()
+        if not self._disponibles().filter(pk=job_id).update(
+                estado='EN_PROCESO', intentos=F('intentos') + 1, actualizado=ahora):
+            return None
+        job = ImportJob.objects.select_related('usuario').get(pk=job_id)
+        if job.iniciado is None:
+            job.iniciado = ahora
+            job.save(update_fields=['iniciado'])
+        return job
+
+    def procesar_pendientes(self, limite: Optional[int] = None) -> int:
+        """Procesa los trabajos disponibles; devuelve cuántos reclamó este worker"""
+        procesados = 0
+        for job_id in self.pendientes()[:limite]:
+            job = self.reclamar(job_id)
+            if job is None:
+                continue
+            self.procesar(job)
+            procesados += 1
+        return procesados
+
+    # ------------------------------------------------------------------
+    # Procesamiento
+    # ------------------------------------------------------------------
+
+    def procesar(self, job):
+        """
+        Procesa un trabajo reclamado desde su última fila confirmada. Un
+        error deja el trabajo PENDIENTE para reintentarlo, o FALLIDO al
+        agotar MAX_INTENTOS; un trabajo FALLIDO no se reintenta, así que su
+        archivo se borra
+        """
+        try:
+            self._procesar(job)
+        except Exception as e:
+            logger.error(f"Error en la importación #{job.pk} (intento {job.intentos}): {e}")
+            job.estado = 'FALLIDO' if job.intentos >= MAX_INTENTOS else 'PENDIENTE'
+            job.mensaje_error = str(e)
+            campos = ['estado', 'mensaje_error', 'actualizado']
+            if job.estado == 'FALLIDO' and job.archivo:
+                job.archivo.delete(save=False)
+                campos.append('archivo')
+            job.save(update_fields=campos)
+            if job.estado == 'FALLIDO':
+                self._notificar(job, 'Importación fallida',
+                                f'No se pudo completar la importación de {job.nombre_archivo}: {e}')
+
+    def _procesar(self, job):
+        from ..integrations.lector_csv import MAX_ERRORES, ErroresFilas, leer_filas, lotes_de_filas
+        from .importacion_service import importacion_service
+
+        modelo, construir = self.destino(job.modelo)
+        responsable = job.usuario.get_full_name() or job.usuario.username
+        errores = ErroresFilas(maximo=max(MAX_ERRORES - len(job.errores), 0))
+        total_errores = job.total_errores
+        guardados = 0
+
+        def confirmar(marca: float, *campos) -> float:
+            """Guarda el avance y los errores nuevos del trabajo; renueva el latido"""
+            nonlocal guardados
+            job.errores = job.errores + errores.mensajes[guardados:]
+            guardados = len(errores.mensajes)
+            job.total_errores = total_errores + errores.total
+            ahora = time.monotonic()
+            job.segundos += ahora - marca
+            job.save(update_fields=[
+                'ultima_fila', 'creados', 'actualizados', 'sin_cambios', 'errores', 'total_errores', 'segundos', 'actualizado', *campos
+            ])
+            return ahora
+
+        with job.archivo.open('rb') as archivo:
+            filas = leer_filas(archivo, errores=errores, desde=job.ultima_fila)
+            marca = time.monotonic()
+            for lote in lotes_de_filas(filas):
+                with transaction.atomic():
+                    resultado = importacion_service.importar(
+                        modelo, construir([lote], responsable, job.usuario, errores, archivo=job.nombre_archivo),
+                        notificar=False, sincronizar=job.sincronizar,
+                    )
+                    job.ultima_fila = lote[-1][0]
+                    job.creados += resultado['total']
+                    job.actualizados += resultado['actualizados']
+                    job.sin_cambios += resultado['sin_cambios']
+                    marca = confirmar(marca)
+
+        # También guarda los errores de las filas posteriores al último lote
+        job.estado = 'COMPLETADO'
+        job.finalizado = timezone.now()
+        job.mensaje_error = ''
+        confirmar(marca, 'estado', 'finalizado', 'mensaje_error')
+        job.archivo.delete(save=False)
+        job.save(update_fields=['archivo'])
+
+        logger.info(f"Importación #{job.pk} completada: {job.creados} registros nuevos, "
+                    f"{job.actualizados} actualizados, {job.sin_cambios} sin cambios, "
+                    f"{job.total_errores} errores, {job.filas_por_segundo} filas/s")
+        nombre = modelo._meta.verbose_name_plural.lower()
+        mensaje = f'Se importaron {job.creados} {nombre} de {job.nombre_archivo}.'
+        if job.sincronizar:
+            mensaje += f' Actualizados: {job.actualizados}; sin cambios: {job.sin_cambios}.'
+        self._notificar(job, 'Importación completada', mensaje)
+
+    def _notificar(self, job, titulo: str, mensaje: str):
+        from .notification_service import notification_service
+
+        try:
+            notification_service.crear_notificacion_sistema(
+                usuario=job.usuario,
+                tipo='ACTUALIZACION',
+                titulo=titulo,
+                mensaje=mensaje,
+                detalles={'import_job': job.pk, 'creados': job.creados, 'actualizados': job.actualizados,
+                          'errores': job.total_errores},
+            )
+        except Exception as e:
+            logger.error(f"Error notificando la importación #{job.pk}: {e}")
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def resumen(self, job) -> Dict[str, object]:
+        """Estado y avance de un trabajo para el endpoint de consulta"""
+        return {
+            'id': job.pk,
+            'modelo': job.modelo,
+            'archivo': job.nombre_archivo,
+            'estado': job.estado,
+            'sincronizar': job.sincronizar,
+            'filas_procesadas': job.filas_procesadas,
+            'creados': job.creados,
+            'actualizados': job.actualizados,
+            'sin_cambios': job.sin_cambios,
+            'filas_por_segundo': job.filas_por_segundo,
+            'total_errores': job.total_errores,
+            'errores': job.errores,
+            'intentos': job.intentos,
+            'mensaje_error': job.mensaje_error,
+            'creado': job.creado,
+            'iniciado': job.iniciado,
+            'finalizado': job.finalizado,
+        }
+
+
+# Instancia global del servicio
+import_job_service = ImportJobService()
@@ -0,0 +1,431 @@
+"""
+Servicio de importación masiva de polinizaciones y germinaciones
+
+Las importaciones (carga de CSV desde la API, comandos import_csv_data e
+import_polinizaciones_csv y el script scripts/data/importar_germinaciones.py)
+pasan por este motor en lugar de crear registro por registro:
+
+1. Catálogos: Genero, Especie, Variedad y Ubicacion se cargan en memoria
+   una vez y las entradas que faltan se crean con un bulk_create por
+   catálogo (CatalogoImportacion).
+2. Inserción: los registros se insertan con bulk_create por lotes de
+   TAMANO_LOTE dentro de una transacción. bulk_create no dispara los
+   signals, así que no se crea una notificación ni se recalculan los
+   catálogos derivados por fila; responsable_usuario se resuelve con el
+   mapa en memoria de responsable_service.
+3. Refresco: tras cada lote, una pasada con registrar_lote actualiza el
+   índice de búsqueda, el autocompletado de códigos, las facetas, el
+   progreso mensual, las estadísticas diarias y los meses del calendario,
+   y renueva las versiones (ETags, métricas). Al final se calienta el
+   dashboard una vez y quien importa recibe una notificación de resumen
+   en lugar de una por registro.
+
+Las instancias pueden llegar de un generador (ver
+integrations/lector_csv.py): el motor no guarda los registros creados,
+así que la memoria no depende del tamaño del archivo.
+
+Reimportaciones (sincronizar=True): cada registro construido desde una
+fila lleva su clave de origen (archivo y número de fila) y el hash de su
+contenido normalizado (marcar_origen). Por lote, una consulta al índice
+(clave_origen, creado_por, hash_origen) separa las filas sin cambios, que
+se omiten, de las modificadas, que se actualizan con bulk_update solo en
+los campos que trae el archivo, y de las nuevas, que se insertan. Los
+catálogos derivados descuentan los valores anteriores de las modificadas
+(retirar) y suman los nuevos (refrescar). Volver a cargar el mismo
+archivo solo toca las filas que cambiaron.
+"""
+import copy
+import hashlib
+import json
+import logging
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .search_backend import TAMANO_LOTE
+
+logger = logging.getLogger(__name__)
+
+
+def entero(valor, defecto: int = 0) -> int:
+    """Convierte un valor de CSV a entero, con `defecto` si está vacío o no es numérico"""
+    try:
+        return int(str(valor).strip()) if valor not in (None, '') else defecto
+    except (TypeError, ValueError):
+        return defecto
+
+
+class CatalogoImportacion:
+    """
+    Catálogos Genero/Especie/Variedad/Ubicacion en memoria durante una
+    importación: una consulta por catálogo al empezar y un bulk_create por
+    catálogo con las entradas nuevas de cada grupo de filas
+    """
+
+    def __init__(self):
+        from ..core.models import Especie, Genero, Ubicacion, Variedad
+
+        self.generos = {genero.nombre: genero for genero in Genero.objects.all()}
+        self.especies = {especie.nombre: especie for especie in Especie.objects.all()}
+        self.variedades = {variedad.nombre: variedad for variedad in Variedad.objects.all()}
+        self.ubicaciones = {ubicacion.nombre: ubicacion for ubicacion in Ubicacion.objects.all()}
+        self.creados = 0
+
+    def _crear(self, modelo, existentes: dict, nuevos: Dict[str, object]):
+        """Inserta las entradas que faltan y las recarga con su id"""
+        nuevos = {nombre: objeto for nombre, objeto in nuevos.items() if nombre not in existentes}
+        if not nuevos:
+            return
+        modelo.objects.bulk_create(list(nuevos.values()), batch_size=TAMANO_LOTE, ignore_conflicts=True)
+        existentes.update({objeto.nombre: objeto for objeto in modelo.objects.filter(nombre__in=list(nuevos))})
+        self.creados += len(nuevos)
+
+    def preparar(self, filas: Iterable[dict]):
+        """
+        Crea las entradas de catálogo que usan las `filas` (columnas genero,
+        especie, variedad y ubicacion de la plantilla CSV) y aún no existen
+        """
+        from ..core.models import Especie, Genero, Ubicacion, Variedad
+
+        filas = [
+            {campo: str(valor).strip() if valor is not None else '' for campo, valor in fila.items()}
+            for fila in filas
+        ]
+        self._crear(Genero, self.generos, {
+            fila['genero']: Genero(nombre=fila['genero']) for fila in filas if fila.get('genero')
+        })
+        self._crear(Especie, self.especies, {
+            fila['especie']: Especie(nombre=fila['especie'], genero=self.generos[fila['genero']])
+            for fila in filas if fila.get('especie') and fila.get('genero') in self.generos
+        })
+        self._crear(Variedad, self.variedades, {
+            fila['variedad']: Variedad(
+                nombre=fila['variedad'],
+                especie=self.especies[fila['especie']],
+                temporada_inicio=fila.get('temporada_inicio') or 'PRIMAVERA',
+                temporada_polinizacion=fila.get('temporada_polinizacion') or 'PRIMAVERA',
+                dias_germinacion_min=entero(fila.get('dias_germinacion_min'), 30),
+                dias_germinacion_max=entero(fila.get('dias_germinacion_max'), 60),
+            )
+            for fila in filas if fila.get('variedad') and fila.get('especie') in self.especies
+        })
+        self._crear(Ubicacion, self.ubicaciones, {
+            fila['ubicacion']: Ubicacion(nombre=fila['ubicacion']) for fila in filas if fila.get('ubicacion')
+        })
+
+
+class ImportacionService:
+    """Motor de importación masiva con inserción y refresco por lotes"""
+
+    def catalogos(self) -> CatalogoImportacion:
+        return CatalogoImportacion()
+
+    def pks_por_codigo(self, modelo, codigos: Iterable[str]) -> Dict[str, List[int]]:
+        """Ids de los registros de `modelo` con cada código (consultas por lotes)"""
+        codigos = sorted({codigo.strip() for codigo in codigos if codigo and codigo.strip()})
+        resultado: Dict[str, List[int]] = {}
+        for inicio in range(0, len(codigos), TAMANO_LOTE):
+            for pk, codigo in modelo.objects.filter(
+                    codigo__in=codigos[inicio:inicio + TAMANO_LOTE]).values_list('pk', 'codigo').order_by('pk'):
+                resultado.setdefault(codigo, []).append(pk)
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Origen de las filas
+    # ------------------------------------------------------------------
+
+    def con_origen(self, modelo, datos: dict):
+        """Instancia (sin guardar) de `modelo` que recuerda qué campos trae el archivo"""
+        instance = modelo(**datos)
+        instance._campos_origen = tuple(datos)
+        return instance
+
+    def campos_origen(self, instance) -> List[str]:
+        """
+        Nombres de los campos que vienen del archivo (ver con_origen); sin
+        marca, todos los editables
+        """
+        opciones = type(instance)._meta
+        nombres = getattr(instance, '_campos_origen', None)
+        if nombres is None:
+            return [campo.name for campo in opciones.concrete_fields if campo.editable and not campo.primary_key]
+        return [opciones.get_field(nombre).name for nombre in nombres]
+
+    def marcar_origen(self, instance, archivo: str, numero: int):
+        """
+        Anota la clave de origen (archivo y fila) y el hash del contenido
+        normalizado de la fila: los valores de los campos del archivo, junto
+        con archivo_origen y el número de fila
+        """
+        opciones = type(instance)._meta
+        valores = {
+            nombre: getattr(instance, opciones.get_field(nombre).attname)
+            for nombre in self.campos_origen(instance)
+        }
+        contenido = json.dumps(
+            [getattr(instance, 'archivo_origen', ''), numero, valores], sort_keys=True, default=str
+        )
+        instance.clave_origen = f'{archivo[:280]}#{numero}'
+        instance.hash_origen = hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Inserción
+    # ------------------------------------------------------------------
+
+    def preparar(self, instance, mapa: Dict[str, int]):
+        """Lo que harían save() y el signal pre_save con cada registro"""
+        instance.preparar_guardado()
+        if instance.responsable_usuario_id is None:
+            from .responsable_service import responsable_service
+
+            instance.responsable_usuario_id = responsable_service.resolver(instance.responsable, mapa)
+
+    def lotes(self, instancias: Iterable) -> Iterator[list]:
+        """Prepara las instancias (como save()) y las agrupa en lotes de TAMANO_LOTE"""
+        from .responsable_service import responsable_service
+
+        mapa = responsable_service.mapa()
+        lote = []
+        for instance in instancias:
+            self.preparar(instance, mapa)
+            lote.append(instance)
+            if len(lote) >= TAMANO_LOTE:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    # ------------------------------------------------------------------
+    # Sincronización
+    # ------------------------------------------------------------------
+
+    def separar(self, modelo, lote: List) -> Tuple[list, Dict[int, object], int]:
+        """
+        Compara un lote con los registros ya cargados desde las mismas filas
+        (mismo creado_por y clave_origen). Devuelve las instancias nuevas,
+        {pk del registro: instancia} de las filas modificadas y cuántas no
+        cambiaron
+        """
+        claves = {instance.clave_origen for instance in lote if instance.clave_origen}
+        existentes = {}
+        if claves:
+            for pk, creado_por_id, clave, hash_origen in modelo.objects.filter(
+                    clave_origen__in=claves).values_list('pk', 'creado_por_id', 'clave_origen', 'hash_origen'):
+                existentes.setdefault((creado_por_id, clave), (pk, hash_origen))
+
+        nuevas, modificadas, sin_cambios = [], {}, 0
+        for instance in lote:
+            pk, hash_origen = existentes.get((instance.creado_por_id, instance.clave_origen), (None, None))
+            if not instance.clave_origen or pk is None:
+                nuevas.append(instance)
+            elif hash_origen == instance.hash_origen:
+                sin_cambios += 1
+            else:
+                modificadas[pk] = instance
+        return nuevas, modificadas, sin_cambios
+
+    def actualizar(self, modelo, modificadas: Dict[int, object]) -> Tuple[list, list]:
+        """
+        Copia a los registros guardados los campos que trae el archivo y los
+        guarda con un bulk_update de las columnas que cambiaron; el resto
+        (estado, predicciones, seguimientos) se conserva. Devuelve los
+        registros actualizados y copias con sus valores anteriores
+        """
+        ahora = timezone.now()
+        actualizados, anteriores, columnas = [], [], set()
+        for pk, registro in modelo.objects.in_bulk(list(modificadas)).items():
+            instance = modificadas[pk]
+            anterior = copy.copy(registro)
+            nombres = self.campos_origen(instance) + ['clave_origen', 'hash_origen']
+            if 'responsable' in nombres:
+                nombres.append('responsable_usuario')
+            for nombre in nombres:
+                attname = modelo._meta.get_field(nombre).attname
+                setattr(registro, attname, getattr(instance, attname))
+            registro.preparar_guardado()
+            registro.fecha_actualizacion = ahora
+            columnas.update(
+                campo.name for campo in modelo._meta.concrete_fields
+                if getattr(registro, campo.attname) != getattr(anterior, campo.attname)
+            )
+            actualizados.append(registro)
+            anteriores.append(anterior)
+        if actualizados:
+            modelo.objects.bulk_update(actualizados, sorted(columnas))
+        return actualizados, anteriores
+
+    def retirar(self, anteriores: List, actualizados: List) -> list:
+        """
+        Descuenta de los catálogos derivados los valores anteriores de los
+        registros actualizados y retira los códigos que dejaron de usar;
+        devuelve los usuarios dueños afectados
+        """
+        from .calendario_service import calendario_service
+        from .codigo_autocomplete_service import codigo_autocomplete_service
+        from .estadistica_service import estadistica_service
+        from .faceta_service import faceta_service
+        from .progreso_service import progreso_service
+        from .version_service import version_service
+
+        if not anteriores:
+            return []
+        codigos = {registro.pk: registro.codigo for registro in actualizados}
+
+        def codigos_retirados(anteriores):
+            for anterior in anteriores:
+                if anterior.codigo and anterior.codigo != codigos.get(anterior.pk):
+                    codigo_autocomplete_service.retirar(type(anterior), anterior.codigo, excluir_pk=anterior.pk)
+
+        pasos = (
+            ('autocompletado', codigos_retirados),
+            ('facetas', faceta_service.retirar_lote),
+            ('progreso mensual', progreso_service.retirar_lote),
+            ('estadísticas diarias', estadistica_service.retirar_lote),
+            ('calendario', calendario_service.registrar_lote),
+        )
+        for nombre, paso in pasos:
+            try:
+                with transaction.atomic():
+                    paso(anteriores)
+            except Exception as e:
+                logger.error(f"Error al descontar {nombre} en la reimportación: {e}")
+        return version_service.registrar_lote(anteriores)
+
+    # ------------------------------------------------------------------
+    # Refresco
+    # ------------------------------------------------------------------
+
+    def refrescar(self, instancias: List) -> list:
+        """
+        Aplica a los catálogos derivados un lote de registros insertados sin
+        signals, renueva las versiones de sus tablas y devuelve los usuarios
+        dueños afectados. Un paso que falla se registra y no aborta la
+        importación: los comandos rebuild_* lo reconcilian
+        """
+        from .calendario_service import calendario_service
+        from .codigo_autocomplete_service import codigo_autocomplete_service
+        from .estadistica_service import estadistica_service
+        from .faceta_service import faceta_service
+        from .progreso_service import progreso_service
+        from .search_backend import get_search_backend
+        from .version_service import version_service
+
+        sin_pk = sum(1 for instance in instancias if instance.pk is None)
+        if sin_pk:
+            logger.warning(f"{sin_pk} registros sin clave primaria no se aplican a los catálogos derivados")
+        instancias = [instance for instance in instancias if instance.pk is not None]
+        if not instancias:
+            return []
+        pasos = (
+            ('índice de búsqueda', get_search_backend().index_instances),
+            ('autocompletado', codigo_autocomplete_service.registrar_lote),
+            ('facetas', faceta_service.registrar_lote),
+            ('progreso mensual', progreso_service.registrar_lote),
+            ('estadísticas diarias', estadistica_service.registrar_lote),
+            ('calendario', calendario_service.registrar_lote),
+        )
+        for nombre, paso in pasos:
+            try:
+                with transaction.atomic():
+                    paso(instancias)
+            except Exception as e:
+                logger.error(f"Error al refrescar {nombre} tras la importación: {e}")
+        return version_service.registrar_lote(instancias)
+
+    def con_pks(self, modelo, creados: List) -> List:
+        """
+        Los registros insertados con su pk. Si el motor no devuelve las
+        claves de bulk_create, se recuperan por la fila de origen (ver
+        marcar_origen); sin ella no se podrían refrescar los catálogos
+        derivados y la importación falla
+        """
+        sin_pk = [instance for instance in creados if instance.pk is None]
+        if not sin_pk:
+            return creados
+        if any(not instance.clave_origen for instance in sin_pk):
+            logger.warning(f"bulk_create no devolvió las claves de {modelo.__name__} y los registros "
+                           f"no tienen fila de origen")
+            raise ValueError(
+                f'No se pueden refrescar los catálogos: el motor no devuelve las claves de {modelo.__name__} '
+                f'y los registros no tienen fila de origen'
+            )
+        pks = {}
+        for pk, creado_por_id, clave, hash_origen in modelo.objects.filter(
+                clave_origen__in={instance.clave_origen for instance in sin_pk}).order_by('pk').values_list(
+                'pk', 'creado_por_id', 'clave_origen', 'hash_origen'):
+            # Con cargas repetidas sin sincronizar, el último insertado
+            pks[(creado_por_id, clave, hash_origen)] = pk
+        for instance in sin_pk:
+            instance.pk = pks.get((instance.creado_por_id, instance.clave_origen, instance.hash_origen))
+            instance._state.adding = instance.pk is None
+        return creados
+
+    def importar(self, modelo, instancias: Iterable, usuario=None, notificar: bool = True,
+                 progreso: Optional[Callable[[int], None]] = None,
+                 sincronizar: bool = False) -> Dict[str, object]:
+        """
+        Inserta las instancias (sin guardar) de `modelo` en una transacción,
+        refrescando los catálogos derivados lote a lote; `instancias` puede
+        ser un generador, que se consume de a un lote para acotar la memoria.
+        Con `sincronizar`, las instancias marcadas con marcar_origen que ya
+        se cargaron se omiten si no cambiaron y se actualizan si cambiaron.
+        Devuelve el total creado, los actualizados, los sin cambios y los
+        tiempos (ms) de lectura (construcción de las instancias), inserción
+        y refresco; `progreso` recibe las filas procesadas tras cada lote.
+        Con `usuario` y `notificar`, le envía una notificación de resumen
+        """
+        from .dashboard_service import dashboard_service
+
+        total = actualizados = sin_cambios = 0
+        usuarios = set()
+        tiempos = dict.fromkeys(('lectura', 'insercion', 'refresco'), 0.0)
+        inicio = time.monotonic()
+        with transaction.atomic():
+            for lote in self.lotes(instancias):
+                marca = time.monotonic()
+                cambiados, anteriores = [], []
+                if sincronizar:
+                    lote, modificadas, iguales = self.separar(modelo, lote)
+                    cambiados, anteriores = self.actualizar(modelo, modificadas)
+                    sin_cambios += iguales
+                creados = self.con_pks(modelo, modelo.objects.bulk_create(lote)) if lote else []
+                tiempos['insercion'] += time.monotonic() - marca
+
+                marca = time.monotonic()
+                usuarios.update(self.retirar(anteriores, cambiados))
+                usuarios.update(self.refrescar(creados + cambiados))
+                tiempos['refresco'] += time.monotonic() - marca
+
+                total += len(creados)
+                actualizados += len(cambiados)
+                if progreso:
+                    progreso(total + actualizados + sin_cambios)
+
+            dashboard_service.calentar_al_confirmar(usuarios)
+            if usuario is not None and notificar and (total or actualizados):
+                from .notification_service import notification_service
+
+                nombre = modelo._meta.verbose_name_plural.lower()
+                mensaje = f'Se importaron {total} {nombre}.'
+                if sincronizar:
+                    mensaje += f' Actualizados: {actualizados}; sin cambios: {sin_cambios}.'
+                notification_service.crear_notificacion_sistema(
+                    usuario=usuario,
+                    tipo='ACTUALIZACION',
+                    titulo='Importación completada',
+                    mensaje=mensaje,
+                    detalles={'modelo': modelo.__name__, 'creados': total, 'actualizados': actualizados},
+                )
+
+        tiempos['lectura'] = time.monotonic() - inicio - tiempos['insercion'] - tiempos['refresco']
+        tiempos = {paso: round(segundos * 1000, 1) for paso, segundos in tiempos.items()}
+        logger.info(f"Importación de {modelo.__name__}: {total} registros nuevos, {actualizados} actualizados, "
+                    f"{sin_cambios} sin cambios (lectura {tiempos['lectura']} ms, "
+                    f"inserción {tiempos['insercion']} ms, refresco {tiempos['refresco']} ms)")
+        return {'total': total, 'actualizados': actualizados, 'sin_cambios': sin_cambios, 'tiempos': tiempos}
+
+
+# Instancia global del servicio
+importacion_service = ImportacionService()
@@ -0,0 +1,241 @@
+"""
+Servicio de métricas de precisión del modelo de predicción de germinación
+
+El error de cada predicción validada es la diferencia en días entre la
+fecha real de germinación y la fecha estimada (DiasEntre, calculada en la
+base de datos). MAE, RMSE, exactitud a ±7/±14 días y la distribución de
+precisión se derivan de conteos y sumas de ese error obtenidos con una
+sola consulta agregada, opcionalmente agrupada por especie, género o mes
+de germinación.
+
+Las métricas globales se guardan en un snapshot diario (MetricaModeloDiaria)
+junto con la versión de la tabla de germinaciones con la que se
+calcularon (ver version_service): mientras no cambien las germinaciones
+los endpoints leen el snapshot (o la cache) sin recorrer la tabla, y la
+serie de snapshots permite graficar la deriva del modelo. El comando
+registrar_metricas_modelo asegura un snapshot por día desde el scheduler.
+"""
+import logging
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, F, Func, IntegerField, Q, Sum
+from django.db.models.functions import Abs, TruncMonth
+from django.utils import timezone
+
+from .version_service import version_service
+
+logger = logging.getLogger(__name__)
+
+
+class DiasEntre(Func):
+    """Días entre dos fechas (fin - inicio) como entero, en la base de datos"""
+    arity = 2
+    output_field = IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL y Oracle: la resta de fechas ya es un número de días
+        return super().as_sql(compiler, connection, template='(%(expressions)s)', arg_joiner=' - ',
+                              **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(', **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='DATEDIFF', **extra_context)
+
+
+# Medidas del snapshot: conteos y sumas de las que se derivan las métricas
+MEDIDAS = (
+    'total_germinaciones', 'con_prediccion', 'validadas', 'suma_error_abs', 'suma_error_cuadrado',
+    'hasta_3_dias', 'hasta_7_dias', 'hasta_14_dias',
+)
+
+# Agrupaciones disponibles: nombre del parámetro -> expresión
+AGRUPACIONES = {
+    'especie': F('especie_variedad'),
+    'genero': F('genero'),
+    'mes': TruncMonth('fecha_germinacion'),
+}
+
+
+class MetricaService:
+    """Cálculo con agregados y snapshot diario de las métricas del modelo"""
+
+    CACHE_PREFIJO = 'metricas_modelo'
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    # ------------------------------------------------------------------
+    # Cálculo
+    # ------------------------------------------------------------------
+
+    def _medidas(self) -> Dict[str, object]:
+        validada = Q(prediccion_fecha_estimada__isnull=False, fecha_germinacion__isnull=False)
+        return {
+            'total_germinaciones': Count('pk'),
+            'con_prediccion': Count('pk', filter=Q(prediccion_fecha_estimada__isnull=False)),
+            'validadas': Count('pk', filter=validada),
+            'suma_error_abs': Sum('error_abs', filter=validada),
+            'suma_error_cuadrado': Sum(F('error_dias') * F('error_dias'), filter=validada),
+            'hasta_3_dias': Count('pk', filter=validada & Q(error_abs__lte=3)),
+            'hasta_7_dias': Count('pk', filter=validada & Q(error_abs__lte=7)),
+            'hasta_14_dias': Count('pk', filter=validada & Q(error_abs__lte=14)),
+        }
+
+    def _con_error(self, queryset=None):
+        from ..models import Germinacion
+
+        queryset = Germinacion.objects.all() if queryset is None else queryset
+        return queryset.annotate(
+            error_dias=DiasEntre('fecha_germinacion', 'prediccion_fecha_estimada'),
+            error_abs=Abs('error_dias'),
+        )
+
+    def calcular(self, queryset=None) -> Dict[str, int]:
+        """Medidas globales (o de `queryset`) con una sola consulta agregada"""
+        medidas = self._con_error(queryset).aggregate(**self._medidas())
+        return {medida: medidas[medida] or 0 for medida in MEDIDAS}
+
+    def calcular_por_grupo(self, agrupar: str, queryset=None) -> List[Dict[str, object]]:
+        """Métricas de las predicciones validadas por especie, género o mes"""
+        filas = (
+            self._con_error(queryset)
+            .filter(prediccion_fecha_estimada__isnull=False, fecha_germinacion__isnull=False)
+            .annotate(grupo=AGRUPACIONES[agrupar])
+            .values('grupo')
+            .annotate(**self._medidas())
+            .order_by('grupo')
+        )
+        grupos = []
+        for fila in filas:
+            grupo = fila['grupo']
+            grupos.append({
+                agrupar: grupo.strftime('%Y-%m') if isinstance(grupo, date) else grupo,
+                **self.rendimiento({medida: fila[medida] or 0 for medida in MEDIDAS}),
+            })
+        return grupos
+
+    # ------------------------------------------------------------------
+    # Métricas derivadas
+    # ------------------------------------------------------------------
+
+    def rendimiento(self, medidas) -> Dict[str, object]:
+        """MAE, RMSE y exactitud a ±7/±14 días (performance_metrics)"""
+        validadas = self._valor(medidas, 'validadas')
+        if not validadas:
+            return {
+                'mae': 0, 'rmse': 0,
+                'accuracy_7dias': 0, 'accuracy_14dias': 0,
+                'total_evaluadas': 0,
+                'mensaje': 'No hay suficientes datos para calcular métricas'
+            }
+        mae = self._valor(medidas, 'suma_error_abs') / validadas
+        rmse = math.sqrt(self._valor(medidas, 'suma_error_cuadrado') / validadas)
+        return {
+            'mae': round(mae, 2),
+            'rmse': round(rmse, 2),
+            'accuracy_7dias': round(self._valor(medidas, 'hasta_7_dias') / validadas * 100, 1),
+            'accuracy_14dias': round(self._valor(medidas, 'hasta_14_dias') / validadas * 100, 1),
+            'total_evaluadas': validadas,
+            'error_promedio_dias': round(mae, 1)
+        }
+
+    def precision(self, medidas) -> Dict[str, object]:
+        """Precisión promedio y distribución por rango de error (estadisticas_precision_modelo)"""
+        validadas = self._valor(medidas, 'validadas')
+        if not validadas:
+            return {
+                'total_predicciones': self._valor(medidas, 'con_prediccion'),
+                'predicciones_validadas': 0,
+                'precision_promedio': 0,
+                'error_promedio_dias': 0,
+                'distribucion_precision': {'excelente': 0, 'buena': 0, 'aceptable': 0, 'baja': 0},
+                'mensaje': 'No hay predicciones validadas aún'
+            }
+        error_promedio = self._valor(medidas, 'suma_error_abs') / validadas
+        hasta_3, hasta_7, hasta_14 = (
+            self._valor(medidas, medida) for medida in ('hasta_3_dias', 'hasta_7_dias', 'hasta_14_dias')
+        )
+        return {
+            'total_predicciones': self._valor(medidas, 'con_prediccion'),
+            'predicciones_validadas': validadas,
+            'precision_promedio': round(max(0, 100 - (error_promedio * 2)), 2),
+            'error_promedio_dias': round(error_promedio, 1),
+            'distribucion_precision': {
+                'excelente': hasta_3,
+                'buena': hasta_7 - hasta_3,
+                'aceptable': hasta_14 - hasta_7,
+                'baja': validadas - hasta_14,
+            }
+        }
+
+    def _valor(self, medidas, medida):
+        return medidas[medida] if isinstance(medidas, dict) else getattr(medidas, medida)
+
+    # ------------------------------------------------------------------
+    # Snapshot diario
+    # ------------------------------------------------------------------
+
+    def registrar(self, hoy: Optional[date] = None):
+        """Calcula las medidas y guarda (o reemplaza) el snapshot del día"""
+        from ..models import MetricaModeloDiaria
+
+        hoy = hoy or timezone.localdate()
+        # La versión se lee antes de calcular: si hay escrituras durante el
+        # cálculo, el snapshot queda con una versión vieja y se recalcula
+        version = version_service.version('germinacion')
+        snapshot, _ = MetricaModeloDiaria.objects.update_or_create(
+            dia=hoy, defaults={**self.calcular(), 'version': version}
+        )
+        cache.set(self._clave(hoy, version), {medida: getattr(snapshot, medida) for medida in MEDIDAS},
+                  self.CACHE_TIMEOUT)
+        return snapshot
+
+    def actuales(self) -> Dict[str, int]:
+        """
+        Medidas vigentes: desde la cache o el snapshot del día si la tabla
+        de germinaciones no cambió desde que se calcularon; si no, se
+        recalculan y se actualiza el snapshot
+        """
+        from ..models import MetricaModeloDiaria
+
+        hoy = timezone.localdate()
+        version = version_service.version('germinacion')
+        clave = self._clave(hoy, version)
+        medidas = cache.get(clave)
+        if medidas is not None:
+            return medidas
+
+        snapshot = MetricaModeloDiaria.objects.filter(dia=hoy, version=version).first()
+        if snapshot is None:
+            snapshot = self.registrar(hoy)
+        medidas = {medida: getattr(snapshot, medida) for medida in MEDIDAS}
+        cache.set(clave, medidas, self.CACHE_TIMEOUT)
+        return medidas
+
+    def historial(self, dias: int = 90) -> List[Dict[str, object]]:
+        """Serie diaria de métricas de los últimos `dias` días, para la deriva del modelo"""
+        from ..models import MetricaModeloDiaria
+
+        desde = timezone.localdate() - timedelta(days=dias - 1)
+        return [
+            {
+                'dia': snapshot.dia.isoformat(),
+                'total_germinaciones': snapshot.total_germinaciones,
+                'con_prediccion': snapshot.con_prediccion,
+                **self.rendimiento(snapshot),
+            }
+            for snapshot in MetricaModeloDiaria.objects.filter(dia__gte=desde).order_by('dia')
+        ]
+
+    def _clave(self, hoy: date, version: str) -> str:
+        return f'{self.CACHE_PREFIJO}:{hoy.isoformat()}:{version}'
+
+
+# Instancia global del servicio
+metrica_service = MetricaService()
@@ -3,6 +3,7 @@ Servicio de negocio para Notificaciones
 """
 from typing import Dict, Any, List, Optional
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils import timezone
 from datetime import date, timedelta
 import logging
@@ -181,66 +182,9 @@ class NotificationService:
     
     def obtener_alertas_pendientes(self, usuario: User) -> List[Dict[str, Any]]:
         """Obtiene alertas sobre germinaciones y polinizaciones próximas a vencer"""
-        alertas = []
-        hoy = date.today()
-        
-        # Alertas de germinaciones próximas a germinar
-        germinaciones = Germinacion.objects.filter(
-            creado_por=usuario,
-            prediccion_fecha_estimada__isnull=False,
-            archivo_origen=''  # Solo las creadas manualmente
-        )
-        
-        for germ in germinaciones:
-            if germ.prediccion_fecha_estimada:
-                dias_restantes = (germ.prediccion_fecha_estimada - hoy).days
-                
-                # Alertas para germinaciones próximas (dentro de 7 días) o vencidas
-                if dias_restantes <= 7:
-                    tipo_alerta = 'vencida' if dias_restantes < 0 else 'proxima'
-                    alertas.append({
-                        'tipo': 'germinacion',
-                        'id': germ.id,
-                        'codigo': germ.codigo,
-                        'nombre': germ.nombre,
-                        'especie': f"{germ.genero} {germ.especie_variedad}",
-                        'fecha_estimada': germ.prediccion_fecha_estimada,
-                        'dias_restantes': dias_restantes,
-                        'tipo_alerta': tipo_alerta,
-                        'mensaje': f"Germinación {'vencida' if dias_restantes < 0 else 'próxima a germinar'}"
-                    })
-        
-        # Alertas de polinizaciones próximas a madurar
-        polinizaciones = Polinizacion.objects.filter(
-            creado_por=usuario,
-            prediccion_fecha_estimada__isnull=False,
-            fechamad__isnull=True,  # Solo las que no han madurado
-            archivo_origen=''  # Solo las creadas manualmente
-        )
-        
-        for pol in polinizaciones:
-            if pol.prediccion_fecha_estimada:
-                dias_restantes = (pol.prediccion_fecha_estimada - hoy).days
-                
-                # Alertas para polinizaciones próximas (dentro de 7 días) o vencidas
-                if dias_restantes <= 7:
-                    tipo_alerta = 'vencida' if dias_restantes < 0 else 'proxima'
-                    alertas.append({
-                        'tipo': 'polinizacion',
-                        'id': pol.numero,
-                        'codigo': pol.codigo,
-                        'especie': f"{pol.madre_genero} {pol.madre_especie}",
-                        'tipo_polinizacion': pol.tipo_polinizacion,
-                        'fecha_estimada': pol.prediccion_fecha_estimada,
-                        'dias_restantes': dias_restantes,
-                        'tipo_alerta': tipo_alerta,
-                        'mensaje': f"Polinización {'vencida' if dias_restantes < 0 else 'próxima a madurar'}"
-                    })
-        
-        # Ordenar por días restantes (las más urgentes primero)
-        alertas.sort(key=lambda x: x['dias_restantes'])
-        
-        return alertas
+        from .alerta_service import alerta_service
+
+        return alerta_service.pendientes(usuario)
     
     def marcar_como_leida(self, notificacion_id: int, usuario: User) -> bool:
         """Marca una notificación como leída"""
@@ -254,13 +198,22 @@ class NotificationService:
     
     def marcar_todas_como_leidas(self, usuario: User) -> int:
         """Marca todas las notificaciones de un usuario como leídas"""
-        count = Notification.objects.filter(
-            usuario=usuario,
-            leida=False
-        ).update(
-            leida=True,
-            fecha_lectura=timezone.now()
-        )
+        from .contador_notificacion_service import contador_notificacion_service
+        from .version_service import version_service
+
+        with transaction.atomic():
+            count = Notification.objects.filter(
+                usuario=usuario,
+                leida=False
+            ).update(
+                leida=True,
+                fecha_lectura=timezone.now()
+            )
+            if count:
+                # update() no dispara signals: descontar las no leídas en la
+                # misma transacción e invalidar los ETags de notificaciones
+                contador_notificacion_service.sumar(usuario.pk, no_leidas=-count)
+                version_service.incrementar_al_confirmar('notification', [usuario.pk])
         return count
     
     def toggle_favorita(self, notificacion_id: int, usuario: User) -> bool:
@@ -284,18 +237,10 @@ class NotificationService:
             return False
     
     def obtener_estadisticas(self, usuario: User) -> Dict[str, int]:
-        """Obtiene estadísticas de notificaciones del usuario"""
-        total = Notification.objects.filter(usuario=usuario).count()
-        no_leidas = Notification.objects.filter(usuario=usuario, leida=False).count()
-        favoritas = Notification.objects.filter(usuario=usuario, favorita=True).count()
-        archivadas = Notification.objects.filter(usuario=usuario, archivada=True).count()
-        
-        return {
-            'total': total,
-            'no_leidas': no_leidas,
-            'favoritas': favoritas,
-            'archivadas': archivadas
-        }
+        """Obtiene estadísticas de notificaciones del usuario (de sus contadores)"""
+        from .contador_notificacion_service import contador_notificacion_service
+
+        return contador_notificacion_service.contadores(usuario.pk)
     
     def obtener_registros_pendientes_revision(self, usuario: User, dias_limite: int = 5) -> Dict[str, Any]:
         """
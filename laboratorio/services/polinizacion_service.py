@@ -3,13 +3,13 @@ Servicio de negocio para Polinizaciones
 """
 from typing import Dict, Any, List, Optional
 from django.contrib.auth.models import User
-from django.db.models import Q
 from datetime import date, datetime, timedelta
 from django.core.exceptions import ValidationError
 import logging
 
 from ..models import Polinizacion
 from .base_service import BaseService, PaginatedService, CacheableService
+from .search_backend import get_search_backend
 from ..utils.validation_utils import ValidationHelper, validate_codigo, validate_date_field, validate_positive_integer, validate_text_field
 from .ml_polinizacion_service import ml_polinizacion_service
 from ..core.models import UserProfile
@@ -119,21 +119,21 @@ class PolinizacionService(PaginatedService, CacheableService):
         # El filtrado por usuario propio se hace en get_mis_polinizaciones para la página de perfil
         return queryset
     
-    def get_mis_polinizaciones(self, user: User, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = True) -> List[Polinizacion]:
-        """Obtiene las polinizaciones del propio usuario (sección perfil).
-        Siempre filtra por creado_por=user, independientemente del rol.
-
-        Args:
-            user: Usuario actual
-            search: Término de búsqueda opcional
-            dias_recientes: Si se proporciona, filtra solo polinizaciones de los últimos N días
-            excluir_importadas: Si es True (por defecto), excluye las polinizaciones importadas desde archivos CSV/Excel
-        """
+    def _build_mis_polinizaciones_queryset(self, user: User, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = True, solo_historicos: bool = False, only: Optional[List[str]] = None):
+        """Construye el queryset filtrado de las polinizaciones del usuario (sin ordenar)"""
         queryset = Polinizacion.objects.filter(creado_por=user)
+        if only:
+            # Solo las columnas que se van a serializar (?fields= / ?preset=)
+            queryset = queryset.only(*only)
 
-        # Excluir datos importados del CSV si se especifica (por defecto True para mantener compatibilidad)
-        if excluir_importadas:
-            queryset = queryset.filter(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
+        # Filtrar por tipo de registro
+        if solo_historicos:
+            # Mostrar SOLO registros históricos (importados desde Excel/CSV)
+            queryset = queryset.filter(es_importado=True)
+        elif excluir_importadas:
+            # Mostrar SOLO registros nuevos (creados en el sistema)
+            queryset = queryset.filter(es_importado=False)
+        # Si ambos son False, mostrar todos los registros
 
         # Filtrar por fecha si se especifica
         if dias_recientes:
@@ -142,25 +142,29 @@ class PolinizacionService(PaginatedService, CacheableService):
             fecha_limite = timezone.now() - timedelta(days=dias_recientes)
             queryset = queryset.filter(fecha_creacion__gte=fecha_limite)
 
-        # Aplicar búsqueda si se proporciona
+        # Aplicar búsqueda si se proporciona (índice de texto completo por prefijo)
         if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(genero__icontains=search) |
-                Q(especie__icontains=search) |
-                Q(madre_genero__icontains=search) |
-                Q(madre_especie__icontains=search) |
-                Q(padre_genero__icontains=search) |
-                Q(padre_especie__icontains=search) |
-                Q(nueva_genero__icontains=search) |
-                Q(nueva_especie__icontains=search) |
-                Q(ubicacion_nombre__icontains=search) |
-                Q(observaciones__icontains=search)
-            )
+            queryset = get_search_backend().search(queryset, search)
+
+        return queryset
+
+    def get_mis_polinizaciones(self, user: User, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = True, only: Optional[List[str]] = None, proyeccion=None) -> List[Polinizacion]:
+        """Obtiene las polinizaciones del propio usuario (sección perfil).
+        Siempre filtra por creado_por=user, independientemente del rol.
 
-        return list(queryset.order_by('-fecha_creacion', '-fechapol'))
+        Args:
+            user: Usuario actual
+            search: Término de búsqueda opcional
+            dias_recientes: Si se proporciona, filtra solo polinizaciones de los últimos N días
+            excluir_importadas: Si es True (por defecto), excluye las polinizaciones importadas desde archivos CSV/Excel
+        """
+        queryset = self._build_mis_polinizaciones_queryset(
+            user, search=search, dias_recientes=dias_recientes, excluir_importadas=excluir_importadas, only=only
+        )
+        queryset = queryset.order_by('-fecha_creacion', '-fechapol')
+        return self.materializar(self.aplicar_proyeccion(queryset, proyeccion), proyeccion)
     
-    def get_mis_polinizaciones_paginated(self, user: User, page: int = 1, page_size: int = 20, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = True, solo_historicos: bool = False):
+    def get_mis_polinizaciones_paginated(self, user: User, page: int = 1, page_size: int = 20, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = True, solo_historicos: bool = False, only: Optional[List[str]] = None, proyeccion=None):
         """Obtiene las polinizaciones accesibles para el usuario actual con paginación
 
         Args:
@@ -171,52 +175,25 @@ class PolinizacionService(PaginatedService, CacheableService):
             dias_recientes: Si se proporciona, filtra solo polinizaciones de los últimos N días
             excluir_importadas: Si es True (por defecto), excluye las polinizaciones importadas desde archivos CSV/Excel
             solo_historicos: Si es True, muestra SOLO las polinizaciones importadas (registros históricos)
+            only: Columnas a leer (selección de campos)
+            proyeccion: ProyeccionValores opcional; los resultados se devuelven ya serializados
         """
         from django.core.paginator import Paginator
 
-        queryset = Polinizacion.objects.filter(creado_por=user)
-
-        # Filtrar por tipo de registro
-        if solo_historicos:
-            # Mostrar SOLO registros históricos (importados desde Excel/CSV)
-            queryset = queryset.exclude(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
-        elif excluir_importadas:
-            # Mostrar SOLO registros nuevos (creados en el sistema)
-            queryset = queryset.filter(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
-        # Si ambos son False, mostrar todos los registros
-
-        # Filtrar por fecha si se especifica
-        if dias_recientes:
-            from datetime import timedelta
-            from django.utils import timezone
-            fecha_limite = timezone.now() - timedelta(days=dias_recientes)
-            queryset = queryset.filter(fecha_creacion__gte=fecha_limite)
-
-        # Aplicar búsqueda si se proporciona
-        if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(genero__icontains=search) |
-                Q(especie__icontains=search) |
-                Q(madre_genero__icontains=search) |
-                Q(madre_especie__icontains=search) |
-                Q(padre_genero__icontains=search) |
-                Q(padre_especie__icontains=search) |
-                Q(nueva_genero__icontains=search) |
-                Q(nueva_especie__icontains=search) |
-                Q(ubicacion_nombre__icontains=search) |
-                Q(observaciones__icontains=search)
-            )
+        queryset = self._build_mis_polinizaciones_queryset(
+            user, search=search, dias_recientes=dias_recientes,
+            excluir_importadas=excluir_importadas, solo_historicos=solo_historicos, only=only
+        )
 
         # Ordenar por fecha de creación descendente
         queryset = queryset.order_by('-fecha_creacion', '-fechapol')
         
         # Paginar
-        paginator = Paginator(queryset, page_size)
+        paginator = Paginator(self.aplicar_proyeccion(queryset, proyeccion), page_size)
         page_obj = paginator.get_page(page)
         
         return {
-            'results': list(page_obj),
+            'results': self.materializar(page_obj, proyeccion),
             'count': paginator.count,
             'total_pages': paginator.num_pages,
             'current_page': page,
@@ -226,6 +203,24 @@ class PolinizacionService(PaginatedService, CacheableService):
             'next': page if page_obj.has_next() else None,
             'previous': page - 1 if page_obj.has_previous() else None
         }
+
+    def get_mis_polinizaciones_cursor(self, user: User, cursor: Optional[str] = None, page_size: int = 20, include_count: bool = False, search: Optional[str] = None, dias_recientes: Optional[int] = None, excluir_importadas: bool = True, solo_historicos: bool = False, only: Optional[List[str]] = None, proyeccion=None):
+        """Obtiene las polinizaciones del usuario con paginación por cursor (keyset)
+
+        Args:
+            user: Usuario actual
+            cursor: Token devuelto en next_cursor/prev_cursor (None para la primera página)
+            page_size: Tamaño de página
+            include_count: Si es True, incluye el conteo total (COUNT adicional)
+            search, dias_recientes, excluir_importadas, solo_historicos, only, proyeccion: igual que get_mis_polinizaciones_paginated
+        """
+        queryset = self._build_mis_polinizaciones_queryset(
+            user, search=search, dias_recientes=dias_recientes,
+            excluir_importadas=excluir_importadas, solo_historicos=solo_historicos, only=only
+        )
+        return self.paginate_keyset(
+            queryset, cursor=cursor, page_size=page_size, include_count=include_count, proyeccion=proyeccion
+        )
     
     def get_codigos_nuevas_plantas(self) -> List[str]:
         """Obtiene códigos de nuevas plantas para autocompletado"""
@@ -0,0 +1,268 @@
+"""
+Servicio de contadores de progreso mensual
+
+Cada polinización/germinación aporta a la fila (creado_por, mes) de
+ProgresoMensual: +1 al total y +1 a exitosas si está LISTA (polinización)
+o con la cápsula ABIERTA (germinación). Los signals aplican solo la
+diferencia entre los valores anteriores y los nuevos con deltas F(), en
+lugar de recontar todo el mes en cada guardado.
+
+El progreso del perfil (polinizaciones_actuales, germinaciones_actuales,
+tasa_exito_actual) se calcula a partir de estos contadores. El comando
+rebuild_progreso_mensual reconcilia los contadores con las tablas
+principales y se ejecuta a diario desde el scheduler.
+"""
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# Campos que determinan el aporte de cada modelo:
+# (campo de fecha, campo de estado, valor exitoso, contador, contador de exitosas)
+APORTES = {
+    'Polinizacion': ('fechapol', 'estado', 'LISTA', 'polinizaciones', 'polinizaciones_exitosas'),
+    'Germinacion': ('fecha_siembra', 'estado_capsula', 'ABIERTA', 'germinaciones', 'germinaciones_exitosas'),
+}
+
+CONTADORES = ('polinizaciones', 'polinizaciones_exitosas', 'germinaciones', 'germinaciones_exitosas')
+
+
+def primer_dia_mes(fecha: Optional[date] = None) -> date:
+    fecha = fecha or timezone.now().date()
+    return fecha.replace(day=1)
+
+
+class ProgresoService:
+    """Mantenimiento y lectura de los contadores de progreso mensual"""
+
+    def campos(self, model) -> Tuple[str, ...]:
+        """Campos del modelo de los que depende su aporte"""
+        aporte = APORTES.get(model.__name__)
+        return ('creado_por', aporte[0], aporte[1]) if aporte else ()
+
+    def aporte(self, model, valores: dict) -> Counter:
+        """
+        Aporte de un registro con los `valores` dados:
+        {(usuario_id, mes, contador): 1}
+        """
+        resultado = Counter()
+        aporte = APORTES.get(model.__name__)
+        if not aporte:
+            return resultado
+        campo_fecha, campo_estado, exitoso, contador, contador_exitosas = aporte
+        usuario_id = valores.get('creado_por')
+        fecha = valores.get(campo_fecha)
+        if not usuario_id or not fecha:
+            return resultado
+        mes = primer_dia_mes(fecha)
+        resultado[(usuario_id, mes, contador)] += 1
+        if valores.get(campo_estado) == exitoso:
+            resultado[(usuario_id, mes, contador_exitosas)] += 1
+        return resultado
+
+    def valores_instancia(self, instance) -> dict:
+        valores = {}
+        for campo in self.campos(type(instance)):
+            atributo = 'creado_por_id' if campo == 'creado_por' else campo
+            valores[campo] = getattr(instance, atributo, None)
+        return valores
+
+    # ------------------------------------------------------------------
+    # Mantenimiento incremental
+    # ------------------------------------------------------------------
+
+    def _aplicar(self, deltas: Counter):
+        """Suma los deltas a las filas (usuario, mes) con UPDATE ... SET x = x + d"""
+        from ..core.models import ProgresoMensual
+
+        por_fila: Dict[tuple, Dict[str, int]] = {}
+        for (usuario_id, mes, contador), delta in deltas.items():
+            if delta:
+                por_fila.setdefault((usuario_id, mes), {})[contador] = delta
+
+        for (usuario_id, mes), cambios in por_fila.items():
+            expresiones = {contador: F(contador) + delta for contador, delta in cambios.items()}
+            filtro = ProgresoMensual.objects.filter(usuario_id=usuario_id, mes=mes)
+            if not filtro.update(**expresiones):
+                ProgresoMensual.objects.bulk_create(
+                    [ProgresoMensual(usuario_id=usuario_id, mes=mes)], ignore_conflicts=True
+                )
+                filtro.update(**expresiones)
+
+        usuarios = {usuario_id for usuario_id, _ in por_fila}
+        if usuarios:
+            self.refrescar_perfiles(usuarios)
+
+    def actualizar(self, instance, anteriores: Optional[dict] = None, update_fields=None):
+        """
+        Aplica el cambio de un registro guardado. `anteriores` son los
+        valores previos de sus campos (None si es nuevo).
+        """
+        model = type(instance)
+        nuevos = self.valores_instancia(instance)
+        if anteriores is not None and update_fields is not None:
+            # Los campos no incluidos en update_fields no cambiaron en la BD
+            nuevos = {
+                campo: (valor if campo in update_fields else anteriores.get(campo))
+                for campo, valor in nuevos.items()
+            }
+        deltas = self.aporte(model, nuevos)
+        if anteriores is not None:
+            deltas.subtract(self.aporte(model, anteriores))
+        self._aplicar(deltas)
+
+    def retirar(self, instance):
+        """Descuenta un registro borrado"""
+        deltas = Counter()
+        deltas.subtract(self.aporte(type(instance), self.valores_instancia(instance)))
+        self._aplicar(deltas)
+
+    def registrar_lote(self, instances: Iterable):
+        """Suma en lote los registros nuevos de una importación"""
+        deltas = Counter()
+        for instance in instances:
+            deltas.update(self.aporte(type(instance), self.valores_instancia(instance)))
+        self._aplicar(deltas)
+
+    def retirar_lote(self, instances: Iterable):
+        """Descuenta en lote los valores anteriores de los registros actualizados en una reimportación"""
+        deltas = Counter()
+        for instance in instances:
+            deltas.subtract(self.aporte(type(instance), self.valores_instancia(instance)))
+        self._aplicar(deltas)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def contadores(self, usuario_id, desde: Optional[date] = None, hasta: Optional[date] = None) -> Dict[str, int]:
+        """Suma de los contadores de un usuario entre dos meses (inclusive)"""
+        from ..core.models import ProgresoMensual
+
+        queryset = ProgresoMensual.objects.filter(usuario_id=usuario_id)
+        if desde:
+            queryset = queryset.filter(mes__gte=primer_dia_mes(desde))
+        if hasta:
+            queryset = queryset.filter(mes__lte=primer_dia_mes(hasta))
+        sumas = queryset.aggregate(**{contador: Sum(contador) for contador in CONTADORES})
+        return {contador: max(sumas[contador] or 0, 0) for contador in CONTADORES}
+
+    def _calcular_perfil(self, perfil, sumas: Dict[str, int]) -> Dict[str, object]:
+        polinizaciones = sumas['polinizaciones'] if perfil.puede_tener_meta_polinizaciones() else 0
+        germinaciones = sumas['germinaciones'] if perfil.puede_tener_meta_germinaciones() else 0
+        total = polinizaciones + germinaciones
+        exitosas = sumas['polinizaciones_exitosas'] + sumas['germinaciones_exitosas']
+        tasa = min(round((exitosas / total) * 100, 2), 100) if total > 0 else 0.00
+        return {
+            'polinizaciones_actuales': polinizaciones,
+            'germinaciones_actuales': germinaciones,
+            'tasa_exito_actual': Decimal(str(tasa)),
+        }
+
+    def valores_perfil(self, perfil) -> Dict[str, object]:
+        """
+        Progreso actual de un perfil: actividades desde el primer día del
+        mes en curso (igual que el recuento anterior por fechapol/fecha_siembra)
+        """
+        return self._calcular_perfil(perfil, self.contadores(perfil.user_id, desde=primer_dia_mes()))
+
+    def refrescar_perfiles(self, usuarios: Optional[Iterable[int]] = None) -> int:
+        """
+        Recalcula el progreso guardado en los perfiles desde los contadores
+        (una consulta agrupada y un UPDATE por perfil que cambió)
+        """
+        from ..core.models import ProgresoMensual, UserProfile
+
+        perfiles = UserProfile.objects.only('id', 'user_id', 'rol', 'polinizaciones_actuales',
+                                            'germinaciones_actuales', 'tasa_exito_actual')
+        sumas_qs = ProgresoMensual.objects.filter(mes__gte=primer_dia_mes())
+        if usuarios is not None:
+            usuarios = list(usuarios)
+            perfiles = perfiles.filter(user_id__in=usuarios)
+            sumas_qs = sumas_qs.filter(usuario_id__in=usuarios)
+
+        sumas = {
+            fila.pop('usuario_id'): fila
+            for fila in sumas_qs.values('usuario_id').annotate(
+                **{contador: Sum(contador) for contador in CONTADORES}
+            ).order_by()
+        }
+        vacio = dict.fromkeys(CONTADORES, 0)
+
+        actualizados = 0
+        for perfil in perfiles:
+            fila = sumas.get(perfil.user_id, vacio)
+            valores = self._calcular_perfil(perfil, {c: max(fila[c] or 0, 0) for c in CONTADORES})
+            if any(getattr(perfil, campo) != valor for campo, valor in valores.items()):
+                UserProfile.objects.filter(pk=perfil.pk).update(**valores)
+                actualizados += 1
+        return actualizados
+
+    # ------------------------------------------------------------------
+    # Reconciliación
+    # ------------------------------------------------------------------
+
+    def calcular(self, desde: Optional[date] = None, apps=None) -> Dict[tuple, Dict[str, int]]:
+        """Cuenta desde las tablas principales: {(usuario_id, mes): contadores}"""
+        if apps is None:
+            from django.apps import apps
+
+        filas: Dict[tuple, Dict[str, int]] = {}
+        for nombre_modelo, (campo_fecha, campo_estado, exitoso, contador, contador_exitosas) in APORTES.items():
+            Model = apps.get_model('laboratorio', nombre_modelo)
+            queryset = Model.objects.filter(creado_por__isnull=False, **{f'{campo_fecha}__isnull': False})
+            if desde:
+                queryset = queryset.filter(**{f'{campo_fecha}__gte': desde})
+            conteos = (
+                queryset.annotate(mes=TruncMonth(campo_fecha))
+                .values('creado_por_id', 'mes')
+                .annotate(total=Count('pk'), exitosas=Count('pk', filter=Q(**{campo_estado: exitoso})))
+                .order_by()
+            )
+            for fila in conteos:
+                valores = filas.setdefault((fila['creado_por_id'], fila['mes']), dict.fromkeys(CONTADORES, 0))
+                valores[contador] += fila['total']
+                valores[contador_exitosas] += fila['exitosas']
+        return filas
+
+    def rebuild(self, meses: Optional[int] = None) -> int:
+        """
+        Regenera los contadores desde las tablas principales. Con `meses`
+        solo se reconcilian los últimos N meses (incluido el actual).
+        """
+        from ..core.models import ProgresoMensual
+
+        desde = None
+        if meses:
+            desde = primer_dia_mes()
+            for _ in range(meses - 1):
+                desde = primer_dia_mes(desde - timedelta(days=1))
+
+        filas = self.calcular(desde)
+        with transaction.atomic():
+            existentes = ProgresoMensual.objects.all()
+            if desde:
+                existentes = existentes.filter(mes__gte=desde)
+            existentes.delete()
+            ProgresoMensual.objects.bulk_create(
+                [
+                    ProgresoMensual(usuario_id=usuario_id, mes=mes, **valores)
+                    for (usuario_id, mes), valores in filas.items()
+                ],
+                batch_size=500,
+            )
+            self.refrescar_perfiles()
+        return len(filas)
+
+
+# Instancia global del servicio
+progreso_service = ProgresoService()
@@ -9,214 +9,408 @@ Este servicio maneja la lógica de:
 ESCENARIO CRÍTICO:
 - Usuario crea registro HOY con fecha_base = hace 10 días
 - La notificación debe enviarse INMEDIATAMENTE, no esperar al scheduler
+
+El envío trabaja por conjuntos, tanto desde el comando
+enviar_recordatorios_automaticos como al crear un registro:
+1. Selección: una consulta por fase con los candidatos, excluyendo con un
+   anti-join (NOT EXISTS) los que ya tienen el recordatorio de ese tipo
+2. Construcción: las notificaciones se arman en memoria
+3. Inserción: bulk_create por lotes y marcado de recordatorio_5_dias_enviado
+   con un UPDATE por lote, todo en una transacción
+
+Como bulk_create y update no disparan los signals, los contadores de
+notificaciones se actualizan en la misma transacción y las versiones de las
+tablas (ETags y dashboard) se renuevan explícitamente al confirmar.
 """
-from django.utils import timezone
-from django.conf import settings
-from datetime import date, timedelta
 import logging
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
 
 from ..core.models import Notification, Germinacion, Polinizacion
+from .contador_notificacion_service import contador_notificacion_service
+from .search_backend import TAMANO_LOTE
+from .version_service import version_service
 
 logger = logging.getLogger(__name__)
 
 # Días por defecto para recordatorio (puede configurarse en settings)
 DIAS_RECORDATORIO = getattr(settings, 'NOTIFICATION_REMINDER_DAYS', 5)
 
+# Fases del envío: nombre -> (modelo, tipo de notificación)
+FASES = {
+    'germinaciones': (Germinacion, 'RECORDATORIO_5_DIAS'),
+    'polinizaciones': (Polinizacion, 'RECORDATORIO_5_DIAS'),
+    'prediccion_germinaciones': (Germinacion, 'RECORDATORIO_PREDICCION'),
+    'prediccion_polinizaciones': (Polinizacion, 'RECORDATORIO_PREDICCION'),
+}
 
-class RecordatorioService:
-    """Servicio para manejo de recordatorios automáticos"""
-
-    def __init__(self, dias_recordatorio=None):
-        self.dias_recordatorio = dias_recordatorio or DIAS_RECORDATORIO
-
-    def verificar_y_notificar_germinacion(self, germinacion: Germinacion) -> bool:
-        """
-        Verifica si una germinación recién creada ya requiere notificación.
-
-        Args:
-            germinacion: Instancia de Germinacion recién creada
 
-        Returns:
-            True si se envió notificación, False si no era necesario
-        """
-        if not germinacion.fecha_siembra or not germinacion.creado_por:
-            logger.debug(f"Germinación {germinacion.id}: sin fecha_siembra o creado_por")
-            return False
+def _campo_notificacion(modelo) -> str:
+    return 'germinacion' if modelo is Germinacion else 'polinizacion'
 
-        hoy = timezone.now().date()
-        dias_transcurridos = (hoy - germinacion.fecha_siembra).days
 
-        logger.info(
-            f"Verificando germinación {germinacion.codigo}: "
-            f"fecha_siembra={germinacion.fecha_siembra}, "
-            f"días_transcurridos={dias_transcurridos}, "
-            f"umbral={self.dias_recordatorio}"
-        )
+def _fecha(valor) -> str:
+    return valor.strftime('%d/%m/%Y') if valor else 'N/A'
 
-        # Si ya pasaron más de X días desde la fecha de siembra
-        if dias_transcurridos >= self.dias_recordatorio:
-            # Verificar que no se haya enviado ya
-            if germinacion.recordatorio_5_dias_enviado:
-                logger.debug(f"Germinación {germinacion.id}: recordatorio ya enviado")
-                return False
-
-            # Verificar duplicado en notificaciones
-            if self._existe_notificacion(germinacion=germinacion):
-                logger.debug(f"Germinación {germinacion.id}: ya existe notificación")
-                return False
-
-            # Crear notificación inmediata
-            logger.info(
-                f"⚡ Germinación {germinacion.codigo}: creando notificación inmediata "
-                f"({dias_transcurridos} días desde siembra)"
-            )
 
-            self._crear_notificacion_germinacion(germinacion, dias_transcurridos)
+class RecordatorioService:
+    """Servicio para manejo de recordatorios automáticos"""
 
-            # Marcar como enviado
-            germinacion.recordatorio_5_dias_enviado = True
-            germinacion.save(update_fields=['recordatorio_5_dias_enviado'])
+    def __init__(self, dias_recordatorio=None):
+        self.dias_recordatorio = dias_recordatorio or DIAS_RECORDATORIO
 
-            return True
+    # ------------------------------------------------------------------
+    # Selección de candidatos
+    # ------------------------------------------------------------------
 
-        logger.debug(
-            f"Germinación {germinacion.id}: aún no requiere notificación "
-            f"({dias_transcurridos} < {self.dias_recordatorio} días)"
-        )
-        return False
+    def _sin_recordatorio(self, queryset: QuerySet, tipo: str) -> QuerySet:
+        """Anti-join: registros sin una notificación de `tipo` asociada enviada a su creador"""
+        campo = _campo_notificacion(queryset.model)
+        return queryset.filter(~Exists(Notification.objects.filter(
+            tipo=tipo, usuario_id=OuterRef('creado_por_id'), **{campo: OuterRef('pk')}
+        )))
 
-    def verificar_y_notificar_polinizacion(self, polinizacion: Polinizacion) -> bool:
+    def candidatos_revision(self, modelo, fecha_corte: date, queryset: Optional[QuerySet] = None) -> QuerySet:
         """
-        Verifica si una polinización recién creada ya requiere notificación.
-
-        Args:
-            polinizacion: Instancia de Polinizacion recién creada
-
-        Returns:
-            True si se envió notificación, False si no era necesario
+        Registros con fecha base (siembra o polinización) en o antes de
+        `fecha_corte`, sin recordatorio de 5 días enviado. Sin `queryset`,
+        solo los creados en el sistema que siguen en estado INICIAL
         """
-        if not polinizacion.fechapol or not polinizacion.creado_por:
-            logger.debug(f"Polinización {polinizacion.numero}: sin fechapol o creado_por")
-            return False
-
-        hoy = timezone.now().date()
-        dias_transcurridos = (hoy - polinizacion.fechapol).days
-
-        logger.info(
-            f"Verificando polinización {polinizacion.codigo}: "
-            f"fechapol={polinizacion.fechapol}, "
-            f"días_transcurridos={dias_transcurridos}, "
-            f"umbral={self.dias_recordatorio}"
+        if queryset is None:
+            estado = 'estado_germinacion' if modelo is Germinacion else 'estado_polinizacion'
+            queryset = modelo.objects.filter(**{estado: 'INICIAL'}, es_importado=False)
+        fecha_base = 'fecha_siembra' if modelo is Germinacion else 'fechapol'
+        queryset = queryset.filter(
+            **{f'{fecha_base}__lte': fecha_corte},
+            recordatorio_5_dias_enviado=False,
+            creado_por__isnull=False,
         )
+        return self._sin_recordatorio(queryset, 'RECORDATORIO_5_DIAS').select_related('creado_por')
 
-        # Si ya pasaron más de X días desde la fecha de polinización
-        if dias_transcurridos >= self.dias_recordatorio:
-            # Verificar que no se haya enviado ya
-            if polinizacion.recordatorio_5_dias_enviado:
-                logger.debug(f"Polinización {polinizacion.numero}: recordatorio ya enviado")
-                return False
-
-            # Verificar duplicado en notificaciones
-            if self._existe_notificacion(polinizacion=polinizacion):
-                logger.debug(f"Polinización {polinizacion.numero}: ya existe notificación")
-                return False
-
-            # Crear notificación inmediata
-            logger.info(
-                f"⚡ Polinización {polinizacion.codigo}: creando notificación inmediata "
-                f"({dias_transcurridos} días desde polinización)"
+    def candidatos_prediccion(self, modelo, fecha_prediccion: date) -> QuerySet:
+        """Registros sin finalizar cuya fecha estimada es `fecha_prediccion`"""
+        if modelo is Germinacion:
+            queryset = Germinacion.objects.filter(prediccion_fecha_estimada=fecha_prediccion).exclude(
+                estado_germinacion='FINALIZADO'
             )
-
-            self._crear_notificacion_polinizacion(polinizacion, dias_transcurridos)
-
-            # Marcar como enviado
-            polinizacion.recordatorio_5_dias_enviado = True
-            polinizacion.save(update_fields=['recordatorio_5_dias_enviado'])
-
-            return True
-
-        logger.debug(
-            f"Polinización {polinizacion.numero}: aún no requiere notificación "
-            f"({dias_transcurridos} < {self.dias_recordatorio} días)"
-        )
-        return False
-
-    def _existe_notificacion(self, germinacion=None, polinizacion=None) -> bool:
-        """Verifica si ya existe una notificación de recordatorio de 5 días"""
-        filtros = {'tipo': 'RECORDATORIO_5_DIAS'}
-
-        if germinacion:
-            filtros['germinacion'] = germinacion
-        elif polinizacion:
-            filtros['polinizacion'] = polinizacion
         else:
-            return False
-
-        return Notification.objects.filter(**filtros).exists()
-
-    def _crear_notificacion_germinacion(self, germinacion, dias_transcurridos):
-        """Crea notificación de recordatorio para germinación"""
-        titulo = f"📋 Revisa la germinación {germinacion.codigo}"
+            queryset = Polinizacion.objects.filter(
+                Q(prediccion_fecha_estimada=fecha_prediccion) | Q(fecha_maduracion_predicha=fecha_prediccion)
+            ).exclude(estado_polinizacion='FINALIZADO')
+        queryset = queryset.filter(creado_por__isnull=False, es_importado=False)
+        return self._sin_recordatorio(queryset, 'RECORDATORIO_PREDICCION').select_related('creado_por')
+
+    # ------------------------------------------------------------------
+    # Construcción de notificaciones (en memoria)
+    # ------------------------------------------------------------------
+
+    def notificacion_revision(self, registro, hoy: date, al_crear: bool = False) -> Notification:
+        """Recordatorio de revisión (5 días desde la fecha base), sin guardar"""
+        if isinstance(registro, Germinacion):
+            notificacion = self._revision_germinacion(registro, hoy)
+        else:
+            notificacion = self._revision_polinizacion(registro, hoy)
+        if al_crear:
+            notificacion.detalles_adicionales['enviado_al_crear'] = True
+        return notificacion
 
+    def _revision_germinacion(self, germinacion, hoy):
+        dias_transcurridos = (hoy - germinacion.fecha_siembra).days if germinacion.fecha_siembra else 0
         mensaje = (
             f"Han pasado {dias_transcurridos} días desde la siembra.\n\n"
             f"🌱 Especie: {germinacion.genero} {germinacion.especie_variedad}\n"
-            f"📅 Fecha de siembra: {germinacion.fecha_siembra.strftime('%d/%m/%Y') if germinacion.fecha_siembra else 'N/A'}\n"
-            f"📊 Estado actual: {germinacion.estado_germinacion}\n\n"
-            f"💡 Revisa la germinación y actualiza el estado del registro."
+            f"📅 Fecha de siembra: {_fecha(germinacion.fecha_siembra)}\n"
+            f"📊 Estado actual: {germinacion.estado_germinacion}\n"
+            f"📈 Progreso: {germinacion.progreso_germinacion}%\n\n"
         )
-
-        detalles = {
-            'germinacion_id': germinacion.id,
-            'codigo': germinacion.codigo,
-            'dias_transcurridos': dias_transcurridos,
-            'tipo_recordatorio': 'recordatorio_5_dias',
-            'enviado_al_crear': True,
-            'fecha_envio': str(timezone.now().date())
-        }
-
-        Notification.objects.create(
-            usuario=germinacion.creado_por,
+        if germinacion.prediccion_fecha_estimada:
+            dias_restantes = (germinacion.prediccion_fecha_estimada - hoy).days
+            if dias_restantes > 0:
+                mensaje += f"🔮 Fecha estimada: {_fecha(germinacion.prediccion_fecha_estimada)} ({dias_restantes} días restantes)\n\n"
+            else:
+                mensaje += f"⚠️ Fecha estimada ya pasó: {_fecha(germinacion.prediccion_fecha_estimada)}\n\n"
+        mensaje += "💡 Revisa la germinación y actualiza el estado del registro."
+
+        return Notification(
+            usuario_id=germinacion.creado_por_id,
             germinacion=germinacion,
             tipo='RECORDATORIO_5_DIAS',
-            titulo=titulo,
+            titulo=f"📋 Revisa la germinación {germinacion.codigo}",
             mensaje=mensaje,
-            detalles_adicionales=detalles
+            detalles_adicionales={
+                'germinacion_id': germinacion.id,
+                'codigo': germinacion.codigo,
+                'genero': germinacion.genero,
+                'especie': germinacion.especie_variedad,
+                'fecha_siembra': str(germinacion.fecha_siembra) if germinacion.fecha_siembra else None,
+                'dias_transcurridos': dias_transcurridos,
+                'estado': germinacion.estado_germinacion,
+                'tipo_recordatorio': 'recordatorio_5_dias',
+                'fecha_envio': str(hoy)
+            }
         )
 
-    def _crear_notificacion_polinizacion(self, polinizacion, dias_transcurridos):
-        """Crea notificación de recordatorio para polinización"""
-        titulo = f"📋 Revisa la polinización {polinizacion.codigo}"
-
+    def _revision_polinizacion(self, polinizacion, hoy):
+        dias_transcurridos = (hoy - polinizacion.fechapol).days if polinizacion.fechapol else 0
         mensaje = (
             f"Han pasado {dias_transcurridos} días desde la polinización.\n\n"
             f"🌸 Tipo: {polinizacion.tipo_polinizacion}\n"
-            f"📅 Fecha de polinización: {polinizacion.fechapol.strftime('%d/%m/%Y') if polinizacion.fechapol else 'N/A'}\n"
+            f"📅 Fecha de polinización: {_fecha(polinizacion.fechapol)}\n"
             f"📊 Estado actual: {polinizacion.estado_polinizacion}\n"
+            f"📈 Progreso: {polinizacion.progreso_polinizacion}%\n"
+        )
+        mensaje += self._progenitores(polinizacion) + "\n"
+
+        # Usar campos de predicción correctos
+        fecha_predicha = polinizacion.fecha_maduracion_predicha or polinizacion.prediccion_fecha_estimada
+        if fecha_predicha:
+            dias_restantes = (fecha_predicha - hoy).days
+            if dias_restantes > 0:
+                mensaje += f"🔮 Fecha estimada maduración: {_fecha(fecha_predicha)} ({dias_restantes} días restantes)\n\n"
+            else:
+                mensaje += f"⚠️ Fecha estimada ya pasó: {_fecha(fecha_predicha)}\n\n"
+        mensaje += "💡 Revisa la polinización y actualiza el estado del registro."
+
+        return Notification(
+            usuario_id=polinizacion.creado_por_id,
+            polinizacion=polinizacion,
+            tipo='RECORDATORIO_5_DIAS',
+            titulo=f"📋 Revisa la polinización {polinizacion.codigo}",
+            mensaje=mensaje,
+            detalles_adicionales={
+                'polinizacion_id': polinizacion.numero,
+                'codigo': polinizacion.codigo,
+                'tipo_polinizacion': polinizacion.tipo_polinizacion,
+                'madre_especie': polinizacion.madre_especie,
+                'padre_especie': polinizacion.padre_especie,
+                'fecha_polinizacion': str(polinizacion.fechapol) if polinizacion.fechapol else None,
+                'dias_transcurridos': dias_transcurridos,
+                'estado': polinizacion.estado_polinizacion,
+                'tipo_recordatorio': 'recordatorio_5_dias',
+                'fecha_envio': str(hoy)
+            }
         )
 
-        if polinizacion.madre_especie:
-            mensaje += f"🌱 Madre: {polinizacion.madre_genero} {polinizacion.madre_especie}\n"
-
-        mensaje += "\n💡 Revisa la polinización y actualiza el estado del registro."
+    def notificacion_prediccion(self, registro, hoy: date) -> Notification:
+        """Recordatorio de fecha estimada próxima, sin guardar"""
+        if isinstance(registro, Germinacion):
+            return self._prediccion_germinacion(registro, hoy)
+        return self._prediccion_polinizacion(registro, hoy)
 
-        detalles = {
-            'polinizacion_id': polinizacion.numero,
-            'codigo': polinizacion.codigo,
-            'dias_transcurridos': dias_transcurridos,
-            'tipo_recordatorio': 'recordatorio_5_dias',
-            'enviado_al_crear': True,
-            'fecha_envio': str(timezone.now().date())
-        }
+    def _prediccion_germinacion(self, germinacion, hoy):
+        dias_restantes = (germinacion.prediccion_fecha_estimada - hoy).days
+        mensaje = (
+            f"La fecha de germinación estimada está a {dias_restantes} días.\n\n"
+            f"🌱 Especie: {germinacion.genero} {germinacion.especie_variedad}\n"
+            f"📅 Fecha estimada: {_fecha(germinacion.prediccion_fecha_estimada)}\n"
+            f"📊 Estado actual: {germinacion.estado_germinacion}\n"
+            f"📈 Progreso: {germinacion.progreso_germinacion}%\n\n"
+            f"💡 Prepárate para revisar la germinación en los próximos días."
+        )
+        return Notification(
+            usuario_id=germinacion.creado_por_id,
+            germinacion=germinacion,
+            tipo='RECORDATORIO_PREDICCION',
+            titulo=f"🔮 Predicción próxima: {germinacion.codigo}",
+            mensaje=mensaje,
+            detalles_adicionales={
+                'germinacion_id': germinacion.id,
+                'codigo': germinacion.codigo,
+                'genero': germinacion.genero,
+                'especie': germinacion.especie_variedad,
+                'fecha_prediccion': str(germinacion.prediccion_fecha_estimada),
+                'dias_restantes': dias_restantes,
+                'estado': germinacion.estado_germinacion,
+                'tipo_recordatorio': 'recordatorio_prediccion',
+                'fecha_envio': str(hoy)
+            }
+        )
 
-        Notification.objects.create(
-            usuario=polinizacion.creado_por,
+    def _prediccion_polinizacion(self, polinizacion, hoy):
+        fecha_pred = polinizacion.fecha_maduracion_predicha or polinizacion.prediccion_fecha_estimada
+        tipo_pred = "maduración" if polinizacion.fecha_maduracion_predicha else "semillas"
+        dias_restantes = (fecha_pred - hoy).days
+        mensaje = (
+            f"La fecha de {tipo_pred} estimada está a {dias_restantes} días.\n\n"
+            f"🌸 Tipo: {polinizacion.tipo_polinizacion}\n"
+            f"📅 Fecha estimada: {_fecha(fecha_pred)}\n"
+            f"📊 Estado actual: {polinizacion.estado_polinizacion}\n"
+            f"📈 Progreso: {polinizacion.progreso_polinizacion}%\n"
+        )
+        mensaje += self._progenitores(polinizacion)
+        mensaje += "\n💡 Prepárate para revisar la polinización en los próximos días."
+        return Notification(
+            usuario_id=polinizacion.creado_por_id,
             polinizacion=polinizacion,
-            tipo='RECORDATORIO_5_DIAS',
-            titulo=titulo,
+            tipo='RECORDATORIO_PREDICCION',
+            titulo=f"🔮 Predicción próxima: {polinizacion.codigo}",
             mensaje=mensaje,
-            detalles_adicionales=detalles
+            detalles_adicionales={
+                'polinizacion_id': polinizacion.numero,
+                'codigo': polinizacion.codigo,
+                'tipo_polinizacion': polinizacion.tipo_polinizacion,
+                'madre_especie': polinizacion.madre_especie,
+                'padre_especie': polinizacion.padre_especie,
+                'fecha_prediccion': str(fecha_pred),
+                'dias_restantes': dias_restantes,
+                'estado': polinizacion.estado_polinizacion,
+                'tipo_recordatorio': 'recordatorio_prediccion',
+                'fecha_envio': str(hoy)
+            }
+        )
+
+    def _progenitores(self, polinizacion) -> str:
+        texto = ''
+        if polinizacion.madre_especie:
+            texto += f"🌱 Madre: {polinizacion.madre_genero} {polinizacion.madre_especie}\n"
+        if polinizacion.padre_especie and polinizacion.tipo_polinizacion != 'SELF':
+            texto += f"🌱 Padre: {polinizacion.padre_genero} {polinizacion.padre_especie}\n"
+        return texto
+
+    # ------------------------------------------------------------------
+    # Inserción
+    # ------------------------------------------------------------------
+
+    def guardar(self, notificaciones: List[Notification], enviados: Dict[type, Iterable] = None):
+        """
+        Inserta las notificaciones por lotes y marca recordatorio_5_dias_enviado
+        en los registros de `enviados` ({modelo: pks}) en una transacción
+        """
+        enviados = {modelo: list(pks) for modelo, pks in (enviados or {}).items()}
+        with transaction.atomic():
+            for inicio in range(0, len(notificaciones), TAMANO_LOTE):
+                Notification.objects.bulk_create(notificaciones[inicio:inicio + TAMANO_LOTE])
+            contador_notificacion_service.registrar_lote(notificaciones)
+            for modelo, pks in enviados.items():
+                for inicio in range(0, len(pks), TAMANO_LOTE):
+                    modelo.objects.filter(pk__in=pks[inicio:inicio + TAMANO_LOTE]).update(
+                        recordatorio_5_dias_enviado=True
+                    )
+
+            # Sin signals: renovar las versiones (ETags y dashboard) al confirmar
+            from .dashboard_service import dashboard_service
+
+            usuarios = {notificacion.usuario_id for notificacion in notificaciones}
+            if notificaciones:
+                version_service.incrementar_al_confirmar('notification', usuarios)
+            for modelo, pks in enviados.items():
+                if pks:
+                    version_service.incrementar_al_confirmar(version_service.tabla_de(modelo), usuarios)
+            dashboard_service.calentar_al_confirmar(usuarios)
+
+    def enviar(self, hoy: Optional[date] = None, dias: Optional[int] = None, dry_run: bool = False) -> Dict[str, object]:
+        """
+        Genera los recordatorios de todas las fases. Devuelve por fase los
+        registros notificados [(registro, días)] y los tiempos (ms) de
+        selección, construcción e inserción
+        """
+        hoy = hoy or timezone.localdate()
+        dias = dias or self.dias_recordatorio
+        fecha_corte = hoy - timedelta(days=dias)
+        fecha_prediccion = hoy + timedelta(days=dias)
+        tiempos = {}
+
+        inicio = time.perf_counter()
+        candidatos = {}
+        for fase, (modelo, tipo) in FASES.items():
+            if tipo == 'RECORDATORIO_5_DIAS':
+                candidatos[fase] = list(self.candidatos_revision(modelo, fecha_corte))
+            else:
+                candidatos[fase] = list(self.candidatos_prediccion(modelo, fecha_prediccion))
+        tiempos['seleccion'] = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        notificaciones = []
+        registros = {}
+        for fase, (modelo, tipo) in FASES.items():
+            construir = self.notificacion_revision if tipo == 'RECORDATORIO_5_DIAS' else self.notificacion_prediccion
+            fase_notificaciones = [construir(registro, hoy) for registro in candidatos[fase]]
+            clave_dias = 'dias_transcurridos' if tipo == 'RECORDATORIO_5_DIAS' else 'dias_restantes'
+            registros[fase] = [
+                (registro, notificacion.detalles_adicionales[clave_dias])
+                for registro, notificacion in zip(candidatos[fase], fase_notificaciones)
+            ]
+            notificaciones.extend(fase_notificaciones)
+        tiempos['construccion'] = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        if not dry_run:
+            self.guardar(notificaciones, {
+                Germinacion: [g.pk for g in candidatos['germinaciones']],
+                Polinizacion: [p.pk for p in candidatos['polinizaciones']],
+            })
+        tiempos['insercion'] = (time.perf_counter() - inicio) * 1000
+
+        logger.info(
+            f"Recordatorios: {len(notificaciones)} notificaciones "
+            f"({', '.join(f'{fase} {ms:.1f} ms' for fase, ms in tiempos.items())})"
+        )
+        return {'registros': registros, 'tiempos': tiempos, 'total': len(notificaciones)}
+
+    # ------------------------------------------------------------------
+    # Verificación al crear un registro
+    # ------------------------------------------------------------------
+
+    def verificar_y_notificar_germinacion(self, germinacion: Germinacion) -> bool:
+        """
+        Verifica si una germinación recién creada ya requiere notificación.
+
+        Args:
+            germinacion: Instancia de Germinacion recién creada
+
+        Returns:
+            True si se envió notificación, False si no era necesario
+        """
+        return self._verificar_y_notificar(germinacion, germinacion.fecha_siembra)
+
+    def verificar_y_notificar_polinizacion(self, polinizacion: Polinizacion) -> bool:
+        """
+        Verifica si una polinización recién creada ya requiere notificación.
+
+        Args:
+            polinizacion: Instancia de Polinizacion recién creada
+
+        Returns:
+            True si se envió notificación, False si no era necesario
+        """
+        return self._verificar_y_notificar(polinizacion, polinizacion.fechapol)
+
+    def _verificar_y_notificar(self, registro, fecha_base) -> bool:
+        if not fecha_base or not registro.creado_por_id:
+            logger.debug(f"{type(registro).__name__} {registro.pk}: sin fecha base o creado_por")
+            return False
+
+        hoy = timezone.localdate()
+        dias_transcurridos = (hoy - fecha_base).days
+        if dias_transcurridos < self.dias_recordatorio or registro.recordatorio_5_dias_enviado:
+            logger.debug(
+                f"{type(registro).__name__} {registro.pk}: no requiere notificación "
+                f"({dias_transcurridos} días, umbral {self.dias_recordatorio})"
+            )
+            return False
+
+        # El mismo filtro que el envío programado, acotado al registro (con el anti-join)
+        modelo = type(registro)
+        candidato = self.candidatos_revision(
+            modelo, hoy - timedelta(days=self.dias_recordatorio), modelo.objects.filter(pk=registro.pk)
+        ).exists()
+        if not candidato:
+            logger.debug(f"{modelo.__name__} {registro.pk}: ya existe notificación")
+            return False
+
+        logger.info(
+            f"⚡ {modelo.__name__} {registro.codigo}: creando notificación inmediata "
+            f"({dias_transcurridos} días desde la fecha base)"
         )
+        self.guardar([self.notificacion_revision(registro, hoy, al_crear=True)], {modelo: [registro.pk]})
+        registro.recordatorio_5_dias_enviado = True
+        return True
 
 
 # Instancia global del servicio
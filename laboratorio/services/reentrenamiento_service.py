@@ -40,14 +40,12 @@ class ReentrenamientoService:
 
     def contar_datos_polinizacion(self):
         """Cuenta registros de Polinizacion finalizados válidos para entrenamiento."""
-        from django.db.models import Q
         from ..models import Polinizacion
         return Polinizacion.objects.filter(
             estado_polinizacion='FINALIZADO',
             fechapol__isnull=False,
             fechamad__isnull=False,
-        ).filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
+            es_importado=False,
         ).extra(
             where=["(fechamad - fechapol) > 0",
                    "(fechamad - fechapol) < 600"]
@@ -55,14 +53,12 @@ class ReentrenamientoService:
 
     def contar_datos_germinacion(self):
         """Cuenta registros de Germinacion finalizados válidos para entrenamiento."""
-        from django.db.models import Q
         from ..models import Germinacion
         return Germinacion.objects.filter(
             estado_germinacion='FINALIZADO',
             fecha_siembra__isnull=False,
             fecha_germinacion__isnull=False,
-        ).filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
+            es_importado=False,
         ).extra(
             where=["(fecha_germinacion - fecha_siembra) > 0",
                    "(fecha_germinacion - fecha_siembra) < 800"]
@@ -92,13 +88,11 @@ class ReentrenamientoService:
         logger.info("Iniciando reentrenamiento del modelo de Polinización (XGBoost)...")
 
         # 1. Leer datos de la DB (solo registros creados en el sistema, no importados)
-        from django.db.models import Q
         qs = Polinizacion.objects.filter(
             estado_polinizacion='FINALIZADO',
             fechapol__isnull=False,
             fechamad__isnull=False,
-        ).filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
+            es_importado=False,
         ).values(
             'fechapol', 'genero', 'especie', 'ubicacion', 'responsable',
             'Tipo', 'cantidad', 'disponible', 'fechamad'
@@ -294,13 +288,11 @@ class ReentrenamientoService:
         ]
 
         # 1. Leer datos de la DB (solo registros creados en el sistema, no importados)
-        from django.db.models import Q
         qs = Germinacion.objects.filter(
             estado_germinacion='FINALIZADO',
             fecha_siembra__isnull=False,
             fecha_germinacion__isnull=False,
-        ).filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
+            es_importado=False,
         ).values(
             'fecha_siembra', 'especie_variedad', 'clima', 'estado_capsula',
             'semillas_stock', 'cantidad_solicitada', 'disponibles', 'fecha_germinacion'
@@ -0,0 +1,154 @@
+"""
+Servicio de resolución del campo de texto libre `responsable`
+
+Polinizaciones y germinaciones guardan el responsable como texto (nombre
+de usuario o nombre completo, según el origen del registro). Este servicio
+mantiene en memoria, por proceso, un mapa texto normalizado -> id de
+usuario construido con una sola consulta sobre la tabla de usuarios. El
+mapa se reconstruye cuando cambia la versión 'usuario' de version_service,
+que se renueva al crear, renombrar o borrar un usuario; así cada proceso
+detecta los cambios hechos en otro con una lectura de la cache.
+
+Con el mapa se completa la FK responsable_usuario de cada registro al
+guardarlo (signal pre_save) y, por lotes, con el comando
+vincular_responsables, de modo que las consultas por responsable usan un
+join en lugar de comparar cadenas.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+
+from .version_service import version_service
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_responsable(texto) -> str:
+    return ' '.join(str(texto or '').split()).casefold()
+
+
+class ResponsableService:
+    """Mapa nombre de usuario / nombre completo -> usuario, en memoria por proceso"""
+
+    TABLA = 'usuario'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._usuarios: Dict[str, int] = {}
+        self._nombres: Dict[int, str] = {}
+        self._claves_usuario: Dict[int, Tuple[str, str]] = {}
+
+    # ------------------------------------------------------------------
+    # Mapa
+    # ------------------------------------------------------------------
+
+    def _claves(self, username, first_name, last_name) -> Tuple[str, str]:
+        return normalizar_responsable(username), normalizar_responsable(f'{first_name} {last_name}')
+
+    def mapa(self) -> Dict[str, int]:
+        """
+        Mapa texto normalizado -> id de usuario vigente. Se pide una vez por
+        trabajo o petición y se consulta con resolver(texto, mapa)
+        """
+        version = version_service.version(self.TABLA)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._construir(version)
+        return self._usuarios
+
+    def _construir(self, version):
+        from django.contrib.auth.models import User
+
+        usuarios, nombres, claves_usuario, repetidos = {}, {}, {}, set()
+        por_nombre = {}
+        for pk, username, first_name, last_name in User.objects.values_list(
+                'pk', 'username', 'first_name', 'last_name'):
+            clave_usuario, clave_nombre = claves_usuario[pk] = self._claves(username, first_name, last_name)
+            usuarios[clave_usuario] = pk
+            nombres[pk] = username
+            if clave_nombre:
+                if clave_nombre in por_nombre:
+                    repetidos.add(clave_nombre)
+                por_nombre[clave_nombre] = pk
+        # El nombre completo solo resuelve si es de un único usuario; el
+        # nombre de usuario tiene prioridad
+        for clave, pk in por_nombre.items():
+            if clave not in repetidos:
+                usuarios.setdefault(clave, pk)
+        self._usuarios, self._nombres, self._claves_usuario = usuarios, nombres, claves_usuario
+        self._version = version
+
+    def resolver(self, texto, mapa: Optional[Dict[str, int]] = None) -> Optional[int]:
+        """Id del usuario al que corresponde `texto`, o None"""
+        clave = normalizar_responsable(texto)
+        if not clave:
+            return None
+        return (self.mapa() if mapa is None else mapa).get(clave)
+
+    def nombre_usuario(self, usuario_id) -> Optional[str]:
+        """Nombre de usuario de un id resuelto con el mapa vigente"""
+        self.mapa()
+        return self._nombres.get(usuario_id)
+
+    # ------------------------------------------------------------------
+    # Invalidación y vinculación
+    # ------------------------------------------------------------------
+
+    def registrar_cambio_usuario(self, usuario, eliminado: bool = False):
+        """
+        Renueva el mapa si el alta, baja o cambio de un usuario afecta sus
+        claves (un login que solo actualiza last_login no lo renueva) y
+        vincula los registros que lo nombran como responsable
+        """
+        claves = self._claves(usuario.username, usuario.first_name, usuario.last_name)
+        self.mapa()
+        if not eliminado and self._claves_usuario.get(usuario.pk) == claves:
+            return
+        self._version = None
+        version_service.incrementar_al_confirmar(self.TABLA)
+        if not eliminado:
+            transaction.on_commit(lambda: self.vincular(valores=claves))
+
+    def vincular(self, modelos: Iterable = None, valores: Iterable[str] = (), completo: bool = False) -> int:
+        """
+        Completa responsable_usuario de polinizaciones y germinaciones con
+        un UPDATE por valor distinto de `responsable`. Sin `completo`, solo
+        los registros aún sin vincular; con `valores`, solo los que tienen
+        esos responsables (normalizados)
+        """
+        from ..models import Germinacion, Polinizacion
+
+        modelos = modelos or (Polinizacion, Germinacion)
+        valores = {valor for valor in valores if valor}
+        mapa = self.mapa()
+        actualizados = 0
+        for modelo in modelos:
+            pendientes = modelo.objects.exclude(responsable__isnull=True).exclude(responsable='')
+            if not completo:
+                pendientes = pendientes.filter(responsable_usuario__isnull=True)
+            cambio = False
+            for texto in pendientes.values_list('responsable', flat=True).distinct().order_by():
+                clave = normalizar_responsable(texto)
+                if valores and clave not in valores:
+                    continue
+                usuario_id = mapa.get(clave)
+                if usuario_id is None and not completo:
+                    continue
+                cambiados = pendientes.filter(responsable=texto).exclude(
+                    responsable_usuario_id=usuario_id
+                ).update(responsable_usuario_id=usuario_id)
+                if cambiados:
+                    actualizados += cambiados
+                    cambio = True
+            if cambio:
+                # update() no dispara signals: renovar las versiones (ETags)
+                version_service.incrementar_al_confirmar(version_service.tabla_de(modelo))
+        return actualizados
+
+
+# Instancia global del servicio
+responsable_service = ResponsableService()
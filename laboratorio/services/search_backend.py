@@ -0,0 +1,350 @@
+"""
+Backend de búsqueda de texto completo para Polinizaciones y Germinaciones
+
+Cada registro buscable tiene un SearchDocument con el texto normalizado
+(minúsculas, sin tildes) de sus campos de búsqueda. Sobre esa tabla cada
+motor mantiene su propio índice:
+
+- PostgreSQL: columna generada `documento tsvector` con índice GIN
+- SQLite: tabla virtual FTS5 de contenido externo sincronizada por triggers
+
+Las consultas usan coincidencia por prefijo de cada término ("catt orq"
+encuentra "Cattleya orquídea") y pueden ordenarse por relevancia. Si el
+índice no existe, o los campos pedidos no están indexados, se usa la
+búsqueda icontains de siempre. El documento reúne todos los campos del
+modelo, así que solo responde búsquedas sobre ese conjunto completo; una
+búsqueda restringida a algunos campos usa icontains sobre esos campos.
+"""
+import logging
+import re
+import unicodedata
+from typing import Iterable, List, Optional
+
+from django.db import connection
+from django.db.models import Q, FloatField
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+
+# Campos incluidos en el documento de búsqueda de cada modelo
+CAMPOS_BUSQUEDA = {
+    'laboratorio.polinizacion': [
+        'codigo', 'genero', 'especie',
+        'madre_genero', 'madre_especie',
+        'padre_genero', 'padre_especie',
+        'nueva_genero', 'nueva_especie',
+        'ubicacion_nombre', 'observaciones',
+        'responsable', 'ubicacion', 'tipo_polinizacion',
+    ],
+    'laboratorio.germinacion': [
+        'codigo', 'genero', 'especie_variedad', 'observaciones', 'responsable',
+    ],
+}
+
+TABLA_DOCUMENTOS = 'laboratorio_searchdocument'
+TABLA_FTS = 'laboratorio_searchdocument_fts'
+INDICE_GIN = 'laboratorio_searchdocument_documento_gin'
+
+TAMANO_LOTE = 500
+
+
+def normalizar_texto(texto) -> str:
+    """Convierte a minúsculas y elimina tildes para indexar y consultar igual"""
+    if texto is None:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower().strip()
+
+
+def tokenizar(termino: str) -> List[str]:
+    """Divide un término de búsqueda en palabras alfanuméricas normalizadas"""
+    return re.findall(r'\w+', normalizar_texto(termino))
+
+
+def etiqueta_modelo(model) -> str:
+    return model._meta.label_lower
+
+
+def construir_contenido(instance) -> str:
+    """Arma el texto del documento de búsqueda de una instancia"""
+    campos = CAMPOS_BUSQUEDA.get(etiqueta_modelo(instance), [])
+    valores = (normalizar_texto(getattr(instance, campo, '')) for campo in campos)
+    return ' '.join(v for v in valores if v)
+
+
+def crear_fts_sqlite(cursor, tabla_fts: str, tabla_contenido: str, columnas: List[str], tokenize: str):
+    """
+    Crea una tabla FTS5 de contenido externo sobre `tabla_contenido` y los
+    triggers que la mantienen sincronizada. Si la tabla FTS no existía, la
+    llena con las filas actuales.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [tabla_fts])
+    existia = cursor.fetchone() is not None
+
+    lista = ', '.join(columnas)
+    nuevos = ', '.join(f'new.{c}' for c in columnas)
+    viejos = ', '.join(f'old.{c}' for c in columnas)
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla_fts} USING fts5("
+        f"{lista}, content='{tabla_contenido}', content_rowid='id', tokenize='{tokenize}')"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {tabla_fts}_ai AFTER INSERT ON {tabla_contenido} BEGIN "
+        f"INSERT INTO {tabla_fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {tabla_fts}_ad AFTER DELETE ON {tabla_contenido} BEGIN "
+        f"INSERT INTO {tabla_fts}({tabla_fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {tabla_fts}_au AFTER UPDATE ON {tabla_contenido} BEGIN "
+        f"INSERT INTO {tabla_fts}({tabla_fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {tabla_fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    )
+    if not existia:
+        # Indexar filas que ya existían antes de crear la tabla FTS
+        cursor.execute(f"INSERT INTO {tabla_fts}({tabla_fts}) VALUES ('rebuild')")
+
+
+def ensure_search_schema(conn=None):
+    """
+    Crea (si no existen) las estructuras del índice propias del motor.
+    Es idempotente; lo usan la migración y el comando rebuild_search_index.
+    Devuelve True si el índice quedó disponible.
+    """
+    conn = conn or connection
+    try:
+        with conn.cursor() as cursor:
+            if conn.vendor == 'postgresql':
+                cursor.execute(
+                    f"ALTER TABLE {TABLA_DOCUMENTOS} ADD COLUMN IF NOT EXISTS documento tsvector "
+                    f"GENERATED ALWAYS AS (to_tsvector('simple', contenido)) STORED"
+                )
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {INDICE_GIN} ON {TABLA_DOCUMENTOS} USING GIN (documento)"
+                )
+                return True
+
+            if conn.vendor == 'sqlite':
+                crear_fts_sqlite(
+                    cursor, TABLA_FTS, TABLA_DOCUMENTOS, ['contenido'],
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                return True
+    except Exception as e:
+        logger.warning(f"No se pudo crear el índice de búsqueda de texto completo: {e}")
+    return False
+
+
+class SearchBackend:
+    """
+    Búsqueda por subcadena (icontains). Es el comportamiento de respaldo y la
+    base de los backends de texto completo, que comparten el mantenimiento de
+    los SearchDocument.
+    """
+
+    def __init__(self):
+        self._disponible = None
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def search(self, queryset, termino: str, fields: Optional[Iterable[str]] = None, rank: bool = False):
+        """
+        Filtra el queryset por el término de búsqueda.
+
+        Args:
+            queryset: Queryset de Polinizacion, Germinacion u otro modelo
+            termino: Texto ingresado por el usuario
+            fields: Campos a buscar; por defecto los del documento del modelo
+            rank: Si es True, anota `search_rank` y ordena por relevancia
+        """
+        if not termino or not termino.strip():
+            return queryset
+
+        campos_indexados = CAMPOS_BUSQUEDA.get(etiqueta_modelo(queryset.model))
+        fields = list(fields) if fields else list(campos_indexados or [])
+        tokens = tokenizar(termino)
+
+        # El documento no distingue columnas: solo sirve si se piden todas
+        usar_indice = (
+            campos_indexados is not None
+            and set(fields) == set(campos_indexados)
+            and tokens
+            and self.is_available()
+        )
+        if usar_indice:
+            return self._search_documento(queryset, tokens, rank)
+        return self._search_icontains(queryset, termino.strip(), fields)
+
+    def _search_icontains(self, queryset, termino: str, fields: List[str]):
+        if not fields:
+            return queryset
+        condicion = Q()
+        for field in fields:
+            condicion |= Q(**{f"{field}__icontains": termino})
+        return queryset.filter(condicion)
+
+    def _search_documento(self, queryset, tokens: List[str], rank: bool):
+        raise NotImplementedError
+
+    def is_available(self) -> bool:
+        """Indica si el índice de texto completo existe en la base de datos"""
+        return False
+
+    def reset(self):
+        """Olvida el estado cacheado del índice (tras crearlo o eliminarlo)"""
+        self._disponible = None
+
+    def _columna_pk(self, model) -> str:
+        qn = connection.ops.quote_name
+        return f"{qn(model._meta.db_table)}.{qn(model._meta.pk.column)}"
+
+    # ------------------------------------------------------------------
+    # Mantenimiento de documentos
+    # ------------------------------------------------------------------
+
+    def is_indexed_model(self, model) -> bool:
+        return etiqueta_modelo(model) in CAMPOS_BUSQUEDA
+
+    def index_instance(self, instance):
+        """Crea o actualiza el documento de búsqueda de una instancia"""
+        self.index_instances([instance])
+
+    def index_instances(self, instances):
+        """Crea o actualiza en lote los documentos de búsqueda (un UPSERT por lote)"""
+        from ..core.models import SearchDocument
+
+        documentos = [
+            SearchDocument(
+                modelo=etiqueta_modelo(instance),
+                object_id=instance.pk,
+                contenido=construir_contenido(instance),
+            )
+            for instance in instances
+            if instance.pk is not None
+        ]
+        for inicio in range(0, len(documentos), TAMANO_LOTE):
+            SearchDocument.objects.bulk_create(
+                documentos[inicio:inicio + TAMANO_LOTE],
+                update_conflicts=True,
+                unique_fields=['modelo', 'object_id'],
+                update_fields=['contenido', 'fecha_actualizacion'],
+            )
+        return len(documentos)
+
+    def index_queryset(self, queryset) -> int:
+        """Indexa todos los registros de un queryset (p. ej. tras una importación masiva)"""
+        campos = CAMPOS_BUSQUEDA.get(etiqueta_modelo(queryset.model), [])
+        queryset = queryset.only(queryset.model._meta.pk.name, *campos).order_by()
+        total = 0
+        lote = []
+        for instance in queryset.iterator(chunk_size=TAMANO_LOTE):
+            lote.append(instance)
+            if len(lote) >= TAMANO_LOTE:
+                total += self.index_instances(lote)
+                lote = []
+        if lote:
+            total += self.index_instances(lote)
+        return total
+
+    def remove_instance(self, instance):
+        """Elimina el documento de búsqueda de una instancia borrada"""
+        from ..core.models import SearchDocument
+        SearchDocument.objects.filter(
+            modelo=etiqueta_modelo(instance), object_id=instance.pk
+        ).delete()
+
+    def rebuild(self, model) -> int:
+        """Regenera todos los documentos de un modelo y elimina los huérfanos"""
+        from ..core.models import SearchDocument
+
+        etiqueta = etiqueta_modelo(model)
+        SearchDocument.objects.filter(modelo=etiqueta).exclude(
+            object_id__in=model.objects.values('pk')
+        ).delete()
+        return self.index_queryset(model.objects.all())
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Búsqueda con tsvector + índice GIN (configuración 'simple')"""
+
+    def is_available(self) -> bool:
+        if self._disponible is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = %s AND column_name = 'documento'",
+                    [TABLA_DOCUMENTOS]
+                )
+                self._disponible = cursor.fetchone() is not None
+        return self._disponible
+
+    def _search_documento(self, queryset, tokens, rank):
+        consulta = ' & '.join(f"{token}:*" for token in tokens)
+        etiqueta = etiqueta_modelo(queryset.model)
+
+        queryset = queryset.filter(pk__in=RawSQL(
+            f"SELECT object_id FROM {TABLA_DOCUMENTOS} "
+            f"WHERE modelo = %s AND documento @@ to_tsquery('simple', %s)",
+            [etiqueta, consulta]
+        ))
+        if rank:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT ts_rank(d.documento, to_tsquery('simple', %s)) FROM {TABLA_DOCUMENTOS} d "
+                f"WHERE d.modelo = %s AND d.object_id = {self._columna_pk(queryset.model)}",
+                [consulta, etiqueta],
+                output_field=FloatField()
+            )).order_by('-search_rank')
+        return queryset
+
+
+class SqliteSearchBackend(SearchBackend):
+    """Búsqueda con tabla virtual FTS5 (ranking bm25)"""
+
+    def is_available(self) -> bool:
+        if self._disponible is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLA_FTS]
+                )
+                self._disponible = cursor.fetchone() is not None
+        return self._disponible
+
+    def _search_documento(self, queryset, tokens, rank):
+        consulta = ' '.join(f'"{token}"*' for token in tokens)
+        etiqueta = etiqueta_modelo(queryset.model)
+
+        queryset = queryset.filter(pk__in=RawSQL(
+            f"SELECT d.object_id FROM {TABLA_FTS} f JOIN {TABLA_DOCUMENTOS} d ON d.id = f.rowid "
+            f"WHERE {TABLA_FTS} MATCH %s AND d.modelo = %s",
+            [consulta, etiqueta]
+        ))
+        if rank:
+            # bm25 devuelve valores menores para mejores coincidencias
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT -bm25({TABLA_FTS}) FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s "
+                f"AND rowid = (SELECT d.id FROM {TABLA_DOCUMENTOS} d "
+                f"WHERE d.modelo = %s AND d.object_id = {self._columna_pk(queryset.model)})",
+                [consulta, etiqueta],
+                output_field=FloatField()
+            )).order_by('-search_rank')
+        return queryset
+
+
+_backend = None
+
+
+def get_search_backend() -> SearchBackend:
+    """Devuelve el backend de búsqueda adecuado para el motor configurado"""
+    global _backend
+    if _backend is None:
+        if connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        elif connection.vendor == 'sqlite':
+            _backend = SqliteSearchBackend()
+        else:
+            _backend = SearchBackend()
+    return _backend
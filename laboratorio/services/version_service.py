@@ -0,0 +1,155 @@
+"""
+Servicio de versiones por tabla para los GET condicionales (ETag)
+
+Cada tabla observada (polinizaciones, germinaciones, notificaciones y
+perfiles de usuario) tiene una versión global y una versión por usuario
+(dueño del registro) guardadas en la cache. Los signals de guardado/borrado y las actualizaciones masivas
+las renuevan al confirmar la transacción. El ETag de una respuesta se
+calcula a partir de la petición (ruta, parámetros, usuario) y de las
+versiones de las tablas de las que depende, de modo que comprobar si una
+respuesta cambió cuesta una lectura de la cache en lugar de la consulta y
+la serialización completas.
+
+Las versiones son tokens aleatorios en lugar de enteros: si la cache
+pierde una entrada se genera un token nuevo y nunca se repite un ETag
+anterior (un contador reiniciado podría devolver un 304 con datos viejos).
+En despliegues con varios procesos la cache debe ser compartida (Redis),
+igual que para el índice de autocompletado.
+"""
+import hashlib
+import logging
+import uuid
+from typing import Iterable, Optional, Sequence
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+logger = logging.getLogger(__name__)
+
+
+# Tablas observadas: modelo -> (tabla, campo del usuario dueño)
+TABLAS = {
+    'Polinizacion': ('polinizacion', 'creado_por_id'),
+    'Germinacion': ('germinacion', 'creado_por_id'),
+    'Notification': ('notification', 'usuario_id'),
+    'UserProfile': ('perfil', 'user_id'),
+}
+
+
+class VersionService:
+    """Versiones de tablas en cache y cálculo de ETags"""
+
+    PREFIJO = 'version_tabla'
+
+    def _clave(self, tabla: str, usuario_id=None) -> str:
+        if usuario_id is None:
+            return f'{self.PREFIJO}:{tabla}'
+        return f'{self.PREFIJO}:{tabla}:{usuario_id}'
+
+    def tabla_de(self, model) -> Optional[str]:
+        tabla = TABLAS.get(model.__name__)
+        return tabla[0] if tabla else None
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def versiones(self, claves: Sequence[str]) -> list:
+        """Versiones de varias claves con una sola lectura de la cache"""
+        guardadas = cache.get_many(claves)
+        faltantes = {clave: uuid.uuid4().hex for clave in claves if clave not in guardadas}
+        for clave, token in faltantes.items():
+            # add() no pisa el token que otro proceso haya creado entretanto
+            if not cache.add(clave, token, None):
+                faltantes[clave] = cache.get(clave) or token
+        guardadas.update(faltantes)
+        return [guardadas[clave] for clave in claves]
+
+    def version(self, tabla: str, usuario_id=None) -> str:
+        return self.versiones([self._clave(tabla, usuario_id)])[0]
+
+    def firma(self, tablas: Iterable[str], usuario_id=None) -> str:
+        """
+        Versiones globales de las tablas dadas (o las del usuario, con
+        `usuario_id`), para claves de cache derivadas
+        """
+        return '-'.join(self.versiones([self._clave(tabla, usuario_id) for tabla in tablas]))
+
+    def etag(self, request, tablas: Iterable[str] = (), tablas_usuario: Iterable[str] = ()) -> str:
+        """
+        ETag fuerte de una respuesta: ruta, parámetros GET, usuario, fecha
+        del día (para las respuestas que dependen de "hoy") y versiones de
+        las tablas globales (`tablas`) y de las del usuario (`tablas_usuario`)
+        """
+        usuario_id = getattr(request.user, 'pk', None)
+        claves = [self._clave(tabla) for tabla in tablas]
+        claves += [self._clave(tabla, usuario_id) for tabla in tablas_usuario]
+        parametros = sorted((clave, valor) for clave in request.GET for valor in request.GET.getlist(clave))
+        partes = [
+            request.path, repr(parametros), str(usuario_id), timezone.localdate().isoformat(),
+            *claves, *self.versiones(claves),
+        ]
+        return '"%s"' % hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+
+    def coincide(self, request, etag: str) -> bool:
+        """True si el cliente envió el ETag en If-None-Match (comparación débil)"""
+        cabecera = request.META.get('HTTP_IF_NONE_MATCH')
+        if not cabecera:
+            return False
+        etags = parse_etags(cabecera)
+        if etags == ['*']:
+            return True
+        return any((e[2:] if e.startswith('W/') else e) == etag for e in etags)
+
+    # ------------------------------------------------------------------
+    # Invalidación
+    # ------------------------------------------------------------------
+
+    def incrementar(self, tabla: str, usuarios: Iterable = ()):
+        """Renueva la versión global de la tabla y la de los usuarios dados"""
+        claves = [self._clave(tabla)]
+        claves += [self._clave(tabla, usuario_id) for usuario_id in set(usuarios) if usuario_id is not None]
+        cache.set_many({clave: uuid.uuid4().hex for clave in claves}, None)
+
+    def incrementar_al_confirmar(self, tabla: str, usuarios: Iterable = ()):
+        """
+        Renueva las versiones cuando se confirme la transacción en curso, para
+        que ninguna lectura asocie la versión nueva a datos aún no confirmados
+        """
+        usuarios = list(usuarios)
+        transaction.on_commit(lambda: self.incrementar(tabla, usuarios))
+
+    def registrar_cambio(self, instance, usuario_anterior=None) -> list:
+        """
+        Invalida las versiones afectadas por el alta, cambio o baja de un
+        registro y devuelve los ids de los usuarios dueños afectados
+        """
+        datos = TABLAS.get(type(instance).__name__)
+        if not datos:
+            return []
+        tabla, campo_usuario = datos
+        usuarios = [getattr(instance, campo_usuario, None), usuario_anterior]
+        self.incrementar_al_confirmar(tabla, usuarios)
+        return [usuario_id for usuario_id in usuarios if usuario_id is not None]
+
+    def registrar_lote(self, instances: Iterable) -> list:
+        """
+        Invalida una vez por tabla las versiones afectadas por los registros
+        de un lote (p. ej. una importación) y devuelve los usuarios dueños
+        """
+        por_tabla = {}
+        for instance in instances:
+            datos = TABLAS.get(type(instance).__name__)
+            if datos:
+                por_tabla.setdefault(datos[0], set()).add(getattr(instance, datos[1], None))
+        usuarios = set()
+        for tabla, usuarios_tabla in por_tabla.items():
+            self.incrementar_al_confirmar(tabla, usuarios_tabla)
+            usuarios.update(usuario_id for usuario_id in usuarios_tabla if usuario_id is not None)
+        return list(usuarios)
+
+
+# Instancia global del servicio
+version_service = VersionService()
@@ -1,10 +1,22 @@
 """
 Signals para crear notificaciones automáticas
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Germinacion, Polinizacion
+from django.db import transaction
+from django.contrib.auth.models import User
+from .models import Germinacion, Polinizacion, Notification, UserProfile
 from .services.notification_service import notification_service
+from .services.search_backend import get_search_backend
+from .services.codigo_autocomplete_service import codigo_autocomplete_service
+from .services.faceta_service import faceta_service
+from .services.progreso_service import progreso_service
+from .services.estadistica_service import estadistica_service
+from .services.version_service import version_service
+from .services.calendario_service import calendario_service
+from .services.dashboard_service import dashboard_service
+from .services.responsable_service import responsable_service
+from .services.contador_notificacion_service import CAMPOS as CAMPOS_CONTADOR, contador_notificacion_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,3 +52,324 @@ def crear_notificacion_polinizacion(sender, instance, created, **kwargs):
             logger.info(f"Notificacion creada para polinizacion {instance.codigo}")
         except Exception as e:
             logger.error(f"Error al crear notificacion de polinizacion: {e}")
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+def actualizar_documento_busqueda(sender, instance, **kwargs):
+    """
+    Mantiene actualizado el documento de búsqueda de texto completo
+    """
+    try:
+        with transaction.atomic():
+            get_search_backend().index_instance(instance)
+    except Exception as e:
+        logger.error(f"Error al indexar {sender.__name__} {instance.pk} para búsqueda: {e}")
+
+
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+def eliminar_documento_busqueda(sender, instance, **kwargs):
+    """
+    Elimina el documento de búsqueda de un registro borrado
+    """
+    try:
+        with transaction.atomic():
+            get_search_backend().remove_instance(instance)
+    except Exception as e:
+        logger.error(f"Error al eliminar documento de búsqueda de {sender.__name__} {instance.pk}: {e}")
+
+
+# Campos que alimentan el catálogo de autocompletado de códigos
+CAMPOS_AUTOCOMPLETADO = {
+    'codigo', 'genero', 'especie', 'nueva_clima', 'especie_variedad', 'clima',
+}
+
+
+@receiver(pre_save, sender=Germinacion)
+@receiver(pre_save, sender=Polinizacion)
+def vincular_responsable(sender, instance, update_fields=None, **kwargs):
+    """
+    Completa responsable_usuario con el usuario al que corresponde el texto
+    de `responsable`, resuelto con el mapa en memoria (sin consultar usuarios)
+    """
+    if update_fields is not None and 'responsable' not in update_fields:
+        return
+    try:
+        instance.responsable_usuario_id = responsable_service.resolver(instance.responsable)
+    except Exception as e:
+        logger.error(f"Error al resolver el responsable de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=User)
+def registrar_cambio_usuario(sender, instance, **kwargs):
+    """
+    Renueva el mapa de responsables si cambió el nombre de usuario o el
+    nombre completo, y vincula los registros que lo nombran
+    """
+    try:
+        responsable_service.registrar_cambio_usuario(instance)
+    except Exception as e:
+        logger.error(f"Error al registrar el cambio del usuario {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=User)
+def retirar_usuario(sender, instance, **kwargs):
+    """Renueva el mapa de responsables al borrar un usuario"""
+    try:
+        responsable_service.registrar_cambio_usuario(instance, eliminado=True)
+    except Exception as e:
+        logger.error(f"Error al retirar el usuario {instance.pk} del mapa de responsables: {e}")
+
+
+@receiver(pre_save, sender=Germinacion)
+@receiver(pre_save, sender=Polinizacion)
+def recordar_valores_anteriores(sender, instance, update_fields=None, **kwargs):
+    """
+    Guarda, con una sola consulta, los valores previos de un registro
+    existente que necesitan los catálogos derivados (código, campos con
+    faceta, campos del progreso mensual y de las estadísticas diarias, y
+    fechas de los eventos del calendario) para descontarlos al guardar
+    """
+    instance._codigo_anterior = None
+    instance._facetas_anteriores = None
+    instance._progreso_anterior = None
+    instance._estadistica_anterior = None
+    instance._calendario_anterior = None
+    if not instance.pk:
+        return
+
+    grupos = {
+        '_codigo_anterior': ('codigo',),
+        '_facetas_anteriores': faceta_service.campos(sender),
+        '_progreso_anterior': progreso_service.campos(sender),
+        '_estadistica_anterior': estadistica_service.campos(sender),
+        '_calendario_anterior': calendario_service.campos(sender),
+    }
+    if update_fields is not None:
+        grupos = {
+            atributo: campos for atributo, campos in grupos.items()
+            if set(campos).intersection(update_fields)
+        }
+    campos = {campo for campos_grupo in grupos.values() for campo in campos_grupo}
+    if not campos:
+        return
+
+    anteriores = sender.objects.filter(pk=instance.pk).values(*campos).first()
+    if anteriores is None:
+        return
+    for atributo, campos_grupo in grupos.items():
+        if campos_grupo:
+            setattr(instance, atributo, {campo: anteriores[campo] for campo in campos_grupo})
+    if instance._codigo_anterior is not None:
+        instance._codigo_anterior = instance._codigo_anterior['codigo']
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+def actualizar_codigo_autocompletado(sender, instance, update_fields=None, **kwargs):
+    """
+    Mantiene actualizado el catálogo de autocompletado de códigos
+    """
+    if update_fields is not None and not CAMPOS_AUTOCOMPLETADO.intersection(update_fields):
+        return
+    try:
+        with transaction.atomic():
+            codigo_autocomplete_service.registrar(instance)
+            anterior = getattr(instance, '_codigo_anterior', None)
+            if anterior and anterior != instance.codigo:
+                codigo_autocomplete_service.retirar(sender, anterior, excluir_pk=instance.pk)
+    except Exception as e:
+        logger.error(f"Error al actualizar autocompletado de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+def retirar_codigo_autocompletado(sender, instance, **kwargs):
+    """
+    Retira del autocompletado el código de un registro borrado
+    """
+    try:
+        with transaction.atomic():
+            codigo_autocomplete_service.retirar(sender, instance.codigo, excluir_pk=instance.pk)
+    except Exception as e:
+        logger.error(f"Error al retirar código de autocompletado de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+def actualizar_facetas(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Actualiza los contadores del catálogo de facetas de los filtros
+    """
+    anteriores = getattr(instance, '_facetas_anteriores', None)
+    if not created and anteriores is None:
+        return
+    try:
+        with transaction.atomic():
+            faceta_service.actualizar(
+                instance, anteriores=None if created else anteriores, update_fields=update_fields
+            )
+    except Exception as e:
+        logger.error(f"Error al actualizar facetas de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+def retirar_facetas(sender, instance, **kwargs):
+    """
+    Descuenta un registro borrado del catálogo de facetas
+    """
+    try:
+        with transaction.atomic():
+            faceta_service.retirar(instance)
+    except Exception as e:
+        logger.error(f"Error al retirar facetas de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+def actualizar_progreso_mensual(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Aplica a los contadores de progreso mensual el alta o el cambio de
+    usuario, fecha o estado de un registro
+    """
+    anteriores = getattr(instance, '_progreso_anterior', None)
+    if not created and anteriores is None:
+        return
+    try:
+        with transaction.atomic():
+            progreso_service.actualizar(
+                instance, anteriores=None if created else anteriores, update_fields=update_fields
+            )
+    except Exception as e:
+        logger.error(f"Error al actualizar progreso mensual de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+def retirar_progreso_mensual(sender, instance, **kwargs):
+    """
+    Descuenta un registro borrado de los contadores de progreso mensual
+    """
+    try:
+        with transaction.atomic():
+            progreso_service.retirar(instance)
+    except Exception as e:
+        logger.error(f"Error al descontar progreso mensual de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+def actualizar_estadisticas_diarias(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Aplica a las estadísticas diarias pre-agregadas el alta o el cambio de
+    un registro
+    """
+    anteriores = getattr(instance, '_estadistica_anterior', None)
+    if not created and anteriores is None:
+        return
+    try:
+        with transaction.atomic():
+            estadistica_service.actualizar(
+                instance, anteriores=None if created else anteriores, update_fields=update_fields
+            )
+    except Exception as e:
+        logger.error(f"Error al actualizar estadísticas diarias de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+def retirar_estadisticas_diarias(sender, instance, **kwargs):
+    """
+    Descuenta un registro borrado de las estadísticas diarias
+    """
+    try:
+        with transaction.atomic():
+            estadistica_service.retirar(instance)
+    except Exception as e:
+        logger.error(f"Error al descontar estadísticas diarias de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+def invalidar_eventos_calendario(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida en la cache los meses de eventos del calendario afectados por
+    el alta, el cambio o la baja de un registro
+    """
+    try:
+        calendario_service.registrar_cambio(
+            instance, anteriores=getattr(instance, '_calendario_anterior', None), update_fields=update_fields
+        )
+    except Exception as e:
+        logger.error(f"Error al invalidar eventos del calendario de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+def retirar_eventos_calendario(sender, instance, **kwargs):
+    """
+    Invalida el mes de eventos del calendario de un registro borrado
+    """
+    try:
+        calendario_service.registrar_cambio(instance)
+    except Exception as e:
+        logger.error(f"Error al invalidar eventos del calendario de {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(pre_save, sender=Notification)
+def recordar_estado_notificacion(sender, instance, **kwargs):
+    """
+    Guarda el usuario y las banderas previas de una notificación existente
+    para aplicar solo la diferencia a los contadores de notificaciones
+    """
+    instance._contador_anterior = None
+    if instance.pk:
+        instance._contador_anterior = sender.objects.filter(pk=instance.pk).values(*CAMPOS_CONTADOR).first()
+
+
+@receiver(post_save, sender=Notification)
+def actualizar_contador_notificaciones(sender, instance, created, **kwargs):
+    """
+    Aplica a los contadores del usuario la notificación creada o el cambio
+    de leída/favorita/archivada
+    """
+    try:
+        contador_notificacion_service.actualizar(
+            instance, anteriores=None if created else getattr(instance, '_contador_anterior', None)
+        )
+    except Exception as e:
+        logger.error(f"Error al actualizar contador de notificaciones {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=Notification)
+def retirar_contador_notificaciones(sender, instance, **kwargs):
+    """
+    Descuenta una notificación borrada de los contadores de su usuario
+    """
+    try:
+        contador_notificacion_service.retirar(instance)
+    except Exception as e:
+        logger.error(f"Error al descontar contador de notificaciones {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Germinacion)
+@receiver(post_save, sender=Polinizacion)
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Germinacion)
+@receiver(post_delete, sender=Polinizacion)
+@receiver(post_delete, sender=Notification)
+@receiver(post_save, sender=UserProfile)
+def invalidar_versiones(sender, instance, **kwargs):
+    """
+    Renueva las versiones de la tabla (y de los usuarios dueños, el actual
+    y el anterior si cambió) que usan los ETags de los GET condicionales y
+    el resumen del dashboard, y calienta el resumen de esos usuarios
+    """
+    try:
+        anteriores = getattr(instance, '_progreso_anterior', None) or {}
+        usuarios = version_service.registrar_cambio(instance, usuario_anterior=anteriores.get('creado_por'))
+        dashboard_service.calentar_al_confirmar(usuarios)
+    except Exception as e:
+        logger.error(f"Error al invalidar versiones de {sender.__name__} {instance.pk}: {e}")
@@ -0,0 +1,113 @@
+"""
+Tests para las alertas calculadas en la base de datos (AlertaService)
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from laboratorio.models import Polinizacion, Germinacion, UserProfile
+from laboratorio.services.notification_service import notification_service
+
+
+class AlertasTest(TestCase):
+    """El predicado, los días restantes y el orden se resuelven en una consulta"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alertas', password='testpass123')
+        cls.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        cls.user.profile.save()
+        otro = User.objects.create_user(username='alertas_otro', password='testpass123')
+        hoy = date.today()
+
+        def pol(codigo, dias, usuario=cls.user, **extra):
+            return Polinizacion.objects.create(
+                fechapol=hoy - timedelta(days=100), codigo=codigo, madre_genero='Cattleya',
+                madre_especie='aurantiaca', prediccion_fecha_estimada=hoy + timedelta(days=dias),
+                creado_por=usuario, **extra
+            )
+
+        pol('AL-VENCIDA', -3)
+        pol('AL-HOY', 0)
+        pol('AL-PROXIMA', 7)
+        pol('AL-LEJANA', 8)
+        pol('AL-MADURA', 1, fechamad=hoy)
+        pol('AL-OTRO', 1, usuario=otro)
+        pol('AL-IMPORTADA', 2, archivo_origen='historico.csv')
+
+        def germ(codigo, dias, **extra):
+            return Germinacion.objects.create(
+                codigo=codigo, genero='Stanhopea', especie_variedad='tigrina',
+                prediccion_fecha_estimada=hoy + timedelta(days=dias), creado_por=cls.user, **extra
+            )
+
+        germ('GAL-PROXIMA', 5)
+        germ('GAL-VENCIDA', -1)
+        germ('GAL-GERMINADA', 2, fecha_germinacion=hoy)
+        germ('GAL-LEJANA', 30)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_alertas_polinizacion(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/polinizaciones/alertas_polinizacion/')
+        self.assertEqual(response.status_code, 200)
+        alertas = response.data['alertas']
+        self.assertEqual(
+            [(a['codigo'], a['dias_restantes'], a['tipo_alerta']) for a in alertas],
+            [('AL-VENCIDA', -3, 'vencida'), ('AL-HOY', 0, 'proxima'),
+             ('AL-IMPORTADA', 2, 'proxima'), ('AL-PROXIMA', 7, 'proxima')]
+        )
+        self.assertEqual(alertas[0]['mensaje'], 'Polinización vencida')
+        self.assertEqual(alertas[0]['genero'], 'Cattleya')
+        self.assertEqual(response.data['total'], 4)
+        sql = [q['sql'] for q in consultas.captured_queries if 'laboratorio_polinizacion' in q['sql']]
+        self.assertEqual(len(sql), 1)
+
+    def test_paginacion(self):
+        response = self.client.get('/api/polinizaciones/alertas_polinizacion/', {'page': 2, 'page_size': 3})
+        self.assertEqual([a['codigo'] for a in response.data['alertas']], ['AL-PROXIMA'])
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['total_pages'], 2)
+        self.assertFalse(response.data['has_next'])
+
+        response = self.client.get('/api/polinizaciones/alertas_polinizacion/', {'page': 5, 'page_size': 3})
+        self.assertEqual(response.data['alertas'], [])
+        self.assertEqual(response.data['total'], 4)
+
+    def test_alertas_germinacion(self):
+        response = self.client.get('/api/germinaciones/alertas_germinacion/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(a['codigo'], a['dias_restantes']) for a in response.data['alertas']],
+            [('GAL-VENCIDA', -1), ('GAL-PROXIMA', 5)]
+        )
+
+    def test_alertas_pendientes(self):
+        alertas = notification_service.obtener_alertas_pendientes(self.user)
+        self.assertEqual(
+            [(a['tipo'], a['codigo']) for a in alertas],
+            [('polinizacion', 'AL-VENCIDA'), ('germinacion', 'GAL-VENCIDA'), ('polinizacion', 'AL-HOY'),
+             ('germinacion', 'GAL-PROXIMA'), ('polinizacion', 'AL-PROXIMA')]
+        )
+        self.assertEqual(alertas[0]['especie'], 'Cattleya aurantiaca')
+
+    def test_predicciones_alertas(self):
+        hoy = date.today()
+        Polinizacion.objects.create(fechapol=hoy, fechamad=hoy + timedelta(days=10), codigo='AL-COSECHA',
+                                    estado='EN_PROCESO', creado_por=self.user)
+        Polinizacion.objects.create(fechapol=hoy, fechamad=hoy + timedelta(days=60), codigo='AL-TARDE',
+                                    estado='EN_PROCESO', creado_por=self.user)
+        response = self.client.get('/api/predicciones/alertas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a['codigo'] for a in response.data['alertas']], ['AL-COSECHA'])
+        self.assertEqual(response.data['alertas'][0]['dias_restantes'], 10)
+        self.assertEqual(response.data['alertas'][0]['prioridad'], 'media')
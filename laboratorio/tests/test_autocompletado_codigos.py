@@ -0,0 +1,160 @@
+"""
+Tests para el autocompletado de códigos (índice en memoria + catálogo)
+"""
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from laboratorio.models import Polinizacion, Germinacion, CodigoAutocompletado
+from laboratorio.services import codigo_autocomplete_service as modulo
+from laboratorio.services.codigo_autocomplete_service import (
+    codigo_autocomplete_service, ensure_autocomplete_schema, IndiceCodigos
+)
+
+
+class IndiceCodigosTest(TestCase):
+    """Tests del arreglo ordenado en memoria"""
+
+    def setUp(self):
+        self.indice = IndiceCodigos('polinizacion')
+        self.indice.aplicar([
+            ('PC-100', 'Cattleya', 'aurantiaca', 'I', 'pc-100', 'aurantiaca', True),
+            ('PC-200', 'Cattleya', 'walkeriana', 'C', 'pc-200', 'walkeriana', True),
+            ('DN-010', 'Dendrobium', 'nobile', 'I', 'dn-010', 'nobile', True),
+            ('XPC-1', 'Stanhopea', 'tigrina', 'W', 'xpc-1', 'tigrina', True),
+        ])
+
+    def test_sin_termino_orden_descendente(self):
+        codigos = [e[0] for e in self.indice.buscar('', 10)]
+        self.assertEqual(codigos, ['XPC-1', 'PC-200', 'PC-100', 'DN-010'])
+
+    def test_prefijo(self):
+        codigos = [e[0] for e in self.indice.buscar('pc', 10, solo_prefijo=True)]
+        self.assertEqual(codigos, ['PC-200', 'PC-100'])
+
+    def test_subcadena_solo_en_codigo(self):
+        codigos = [e[0] for e in self.indice.buscar('pc', 10)]
+        self.assertEqual(codigos, ['XPC-1', 'PC-200', 'PC-100'])
+        # 'nobile' está en la especie, no en el código
+        self.assertEqual(self.indice.buscar('nobile', 10), [])
+
+    def test_subcadena_con_especie(self):
+        codigos = [e[0] for e in self.indice.buscar('walk', 10, incluir_especie=True)]
+        self.assertEqual(codigos, ['PC-200'])
+
+    def test_limite_y_bajas(self):
+        self.assertEqual(len(self.indice.buscar('pc', 1)), 1)
+        self.indice.aplicar([('PC-200', '', '', '', '', '', False)])
+        codigos = [e[0] for e in self.indice.buscar('pc', 10)]
+        self.assertEqual(codigos, ['XPC-1', 'PC-100'])
+
+
+class CodigoAutocompleteServiceTest(TestCase):
+    """Tests del servicio y su sincronización con los signals"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Crear el índice de trigramas fuera de la transacción de la clase
+        ensure_autocomplete_schema(connection)
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        codigo_autocomplete_service.reset()
+        self.user = User.objects.create_user(username='autocompletar', password='testpass123')
+        self.pol = Polinizacion.objects.create(
+            fechapol=date.today(), codigo="AUT-001", genero="Cattleya",
+            especie="aurantiaca", nueva_clima="C", creado_por=self.user
+        )
+
+    def test_catalogo_se_mantiene_con_signals(self):
+        entrada = CodigoAutocompletado.objects.get(fuente='polinizacion', codigo='AUT-001')
+        self.assertEqual(entrada.especie, 'aurantiaca')
+        self.assertEqual(entrada.clave, 'aut-001')
+
+        resultado = codigo_autocomplete_service.buscar('polinizacion', 'aut')
+        self.assertEqual(resultado, [
+            {'codigo': 'AUT-001', 'genero': 'Cattleya', 'especie': 'aurantiaca', 'clima': 'C'}
+        ])
+
+    def test_sincronizacion_incremental(self):
+        """Un índice ya cargado incorpora altas, cambios de código y bajas"""
+        codigo_autocomplete_service.buscar('polinizacion', '')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            otra = Polinizacion.objects.create(
+                fechapol=date.today(), codigo="AUT-002", genero="Dendrobium",
+                especie="nobile", creado_por=self.user
+            )
+        codigos = [r['codigo'] for r in codigo_autocomplete_service.buscar('polinizacion', 'aut')]
+        self.assertEqual(codigos, ['AUT-002', 'AUT-001'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            otra.codigo = 'AUT-003'
+            otra.save()
+        codigos = [r['codigo'] for r in codigo_autocomplete_service.buscar('polinizacion', 'aut')]
+        self.assertEqual(codigos, ['AUT-003', 'AUT-001'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pol.delete()
+        codigos = [r['codigo'] for r in codigo_autocomplete_service.buscar('polinizacion', 'aut')]
+        self.assertEqual(codigos, ['AUT-003'])
+
+    def test_otro_proceso_detecta_cambios(self):
+        """Un índice de otro proceso se sincroniza al cambiar la versión en cache"""
+        codigo_autocomplete_service.buscar('polinizacion', '')
+        CodigoAutocompletado.objects.create(
+            fuente='polinizacion', codigo='AUT-900', clave='aut-900', genero='Oncidium'
+        )
+        cache.set('autocompletado_codigos_version_polinizacion', 'otra-version', None)
+
+        codigos = [r['codigo'] for r in codigo_autocomplete_service.buscar('polinizacion', 'aut-9')]
+        self.assertEqual(codigos, ['AUT-900'])
+
+    def test_transaccion_larga(self):
+        """Una fila escrita antes de la última sincronización y confirmada después se incorpora"""
+        from django.utils import timezone
+
+        codigo_autocomplete_service.buscar('polinizacion', '')
+        fila = CodigoAutocompletado.objects.create(
+            fuente='polinizacion', codigo='AUT-800', clave='aut-800', genero='Oncidium'
+        )
+        escrita = timezone.now() - modulo.MARGEN_SINCRONIZACION * 60
+        CodigoAutocompletado.objects.filter(pk=fila.pk).update(actualizado=escrita)
+        cache.set('autocompletado_codigos_version_polinizacion', 'confirmada', None)
+
+        codigos = [r['codigo'] for r in codigo_autocomplete_service.buscar('polinizacion', 'aut-8')]
+        self.assertEqual(codigos, ['AUT-800'])
+
+    def test_buscar_por_codigo_germinacion(self):
+        Germinacion.objects.create(
+            codigo="GAUT-1", genero="Stanhopea", especie_variedad="tigrina",
+            responsable="Test", creado_por=self.user
+        )
+        from laboratorio.services.germinacion_service import germinacion_service
+        self.assertEqual(germinacion_service.get_germinacion_by_codigo('GAUT-1'), {
+            'codigo': 'GAUT-1', 'especie': 'tigrina', 'genero': 'Stanhopea', 'permite_duplicados': True
+        })
+        self.assertIsNone(germinacion_service.get_germinacion_by_codigo('NO-EXISTE'))
+
+    def test_rebuild(self):
+        CodigoAutocompletado.objects.all().delete()
+        CodigoAutocompletado.objects.create(fuente='polinizacion', codigo='HUERFANO', clave='huerfano')
+        total = codigo_autocomplete_service.rebuild('polinizacion')
+        self.assertEqual(total, 1)
+        self.assertFalse(CodigoAutocompletado.objects.get(codigo='HUERFANO').activo)
+        self.assertTrue(CodigoAutocompletado.objects.get(codigo='AUT-001').activo)
+
+    def test_consulta_en_bd_con_trigramas(self):
+        """Si el catálogo no cabe en memoria se usa el índice de trigramas"""
+        with mock.patch.object(modulo, 'MAX_EN_MEMORIA', 0):
+            codigo_autocomplete_service.reset()
+            resultado = codigo_autocomplete_service.buscar('polinizacion', 'ut-0')
+            self.assertEqual([r['codigo'] for r in resultado], ['AUT-001'])
+            resultado = codigo_autocomplete_service.buscar('polinizacion', 'auranti', incluir_especie=True)
+            self.assertEqual([r['codigo'] for r in resultado], ['AUT-001'])
+            self.assertEqual(codigo_autocomplete_service.buscar('polinizacion', 'auranti'), [])
@@ -0,0 +1,133 @@
+"""
+Tests para el backend de búsqueda de texto completo (SearchBackend)
+"""
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from laboratorio.models import Polinizacion, Germinacion, SearchDocument
+from laboratorio.services.polinizacion_service import polinizacion_service
+from laboratorio.services.germinacion_service import germinacion_service
+from laboratorio.services.search_backend import get_search_backend, ensure_search_schema
+from laboratorio.view_modules.base_views import SearchMixin
+
+
+class SearchBackendTest(TestCase):
+    """Tests de indexación y consulta del documento de búsqueda"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Crear el índice fuera de la transacción de la clase para que persista
+        ensure_search_schema(connection)
+        get_search_backend().reset()
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buscador', password='testpass123')
+        self.backend = get_search_backend()
+        self.cattleya = Polinizacion.objects.create(
+            fechapol=date.today(), codigo="BUS001", genero="Cattleya",
+            especie="aurantiaca", observaciones="Cápsula sana", creado_por=self.user
+        )
+        self.dendrobium = Polinizacion.objects.create(
+            fechapol=date.today(), codigo="BUS002", genero="Dendrobium",
+            especie="nobile", madre_genero="Cattleya", creado_por=self.user
+        )
+
+    def test_indice_disponible(self):
+        """El backend detecta el índice de texto completo"""
+        self.assertTrue(self.backend.is_available())
+
+    def test_documento_creado_al_guardar(self):
+        """Guardar un registro crea su documento de búsqueda"""
+        documento = SearchDocument.objects.get(
+            modelo='laboratorio.polinizacion', object_id=self.cattleya.pk
+        )
+        self.assertIn('cattleya', documento.contenido)
+        self.assertIn('capsula', documento.contenido)
+
+    def test_busqueda_por_prefijo_y_sin_tildes(self):
+        """Los términos coinciden por prefijo y sin distinguir tildes"""
+        resultado = polinizacion_service.get_mis_polinizaciones(self.user, search='catt')
+        self.assertEqual({p.pk for p in resultado}, {self.cattleya.pk, self.dendrobium.pk})
+
+        resultado = polinizacion_service.get_mis_polinizaciones(self.user, search='CAPSU')
+        self.assertEqual([p.pk for p in resultado], [self.cattleya.pk])
+
+        resultado = polinizacion_service.get_mis_polinizaciones(self.user, search='catt nob')
+        self.assertEqual([p.pk for p in resultado], [self.dendrobium.pk])
+
+    def test_actualizacion_y_borrado(self):
+        """Los cambios y eliminaciones se reflejan en el índice"""
+        self.cattleya.especie = 'walkeriana'
+        self.cattleya.save()
+        self.assertEqual(
+            [p.pk for p in polinizacion_service.get_mis_polinizaciones(self.user, search='walker')],
+            [self.cattleya.pk]
+        )
+
+        pk = self.dendrobium.pk
+        self.dendrobium.delete()
+        self.assertFalse(SearchDocument.objects.filter(
+            modelo='laboratorio.polinizacion', object_id=pk
+        ).exists())
+
+    def test_ranking(self):
+        """Con rank=True se anota la relevancia y se ordena por ella"""
+        Polinizacion.objects.create(
+            fechapol=date.today(), codigo="BUS003", genero="Cattleya",
+            especie="cattleya", nueva_genero="Cattleya", creado_por=self.user
+        )
+        resultado = list(self.backend.search(Polinizacion.objects.all(), 'cattleya', rank=True))
+        self.assertEqual(len(resultado), 3)
+        self.assertEqual(resultado[0].codigo, "BUS003")
+        rangos = [p.search_rank for p in resultado]
+        self.assertEqual(rangos, sorted(rangos, reverse=True))
+
+    def test_germinaciones(self):
+        """El servicio de germinaciones usa el mismo backend"""
+        germinacion = Germinacion.objects.create(
+            codigo="GBUS1", genero="Stanhopea", especie_variedad="tigrina",
+            responsable="Test", creado_por=self.user
+        )
+        resultado = germinacion_service.get_mis_germinaciones(self.user, search='stanh')
+        self.assertEqual([g.pk for g in resultado], [germinacion.pk])
+
+    def test_apply_search_campos_no_indexados(self):
+        """SearchMixin usa icontains si los campos no están en el documento"""
+        self.cattleya.responsable = 'Ana Pérez'
+        self.cattleya.save()
+        resultado = SearchMixin().apply_search(Polinizacion.objects.all(), 'ana p', ['responsable'])
+        self.assertEqual([p.pk for p in resultado], [self.cattleya.pk])
+
+    def test_apply_search_un_campo(self):
+        """Con algunos campos, solo coinciden esos campos y no el resto del documento"""
+        otra = Polinizacion.objects.create(
+            fechapol=date.today(), codigo="XX1", genero="Cattleya", observaciones="banana", creado_por=self.user
+        )
+        self.assertEqual(list(SearchMixin().apply_search(Polinizacion.objects.all(), 'banana', ['codigo'])), [])
+        resultado = SearchMixin().apply_search(Polinizacion.objects.all(), 'xx1', ['codigo'])
+        self.assertEqual([p.pk for p in resultado], [otra.pk])
+        resultado = self.backend.search(Polinizacion.objects.all(), 'banana')
+        self.assertEqual([p.pk for p in resultado], [otra.pk])
+
+    def test_get_paginated_usa_el_indice(self):
+        """La búsqueda de get_paginated cubre los campos del documento y usa el índice"""
+        self.cattleya.responsable = 'Ana Pérez'
+        self.cattleya.save()
+        with mock.patch.object(type(self.backend), '_search_documento',
+                               autospec=True, side_effect=type(self.backend)._search_documento) as documento:
+            resultado = polinizacion_service.get_paginated(search='perez')
+        documento.assert_called_once()
+        self.assertEqual([p.pk for p in resultado['results']], [self.cattleya.pk])
+
+    def test_rebuild(self):
+        """rebuild regenera los documentos perdidos"""
+        SearchDocument.objects.all().delete()
+        total = self.backend.rebuild(Polinizacion)
+        self.assertEqual(total, 2)
+        resultado = polinizacion_service.get_mis_polinizaciones(self.user, search='dendro')
+        self.assertEqual([p.pk for p in resultado], [self.dendrobium.pk])
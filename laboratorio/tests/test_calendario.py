@@ -0,0 +1,175 @@
+"""
+Tests para las estadísticas (agregados condicionales con cache diaria) y
+el feed de eventos por ventana del calendario
+"""
+import json
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from laboratorio.models import Polinizacion, Germinacion
+from laboratorio.services.calendario_service import calendario_service
+
+
+class CalendarioStatsTest(TestCase):
+    """Los indicadores coinciden con los conteos individuales y se invalidan al escribir"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='calendario', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.hoy = date.today()
+        ayer = self.hoy - timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            pol = Polinizacion.objects.create(fechapol=ayer, codigo='CAL-1', estado='INGRESADO',
+                                              prediccion_fecha_estimada=self.hoy, creado_por=self.user)
+            Polinizacion.objects.create(fechapol=self.hoy + timedelta(days=3), codigo='CAL-2',
+                                        estado='EN_PROCESO', creado_por=self.user)
+            Polinizacion.objects.create(fechapol=ayer, codigo='CAL-3', estado='LISTO', creado_por=self.user)
+            Germinacion.objects.create(codigo='GCAL-1', fecha_siembra=ayer, etapa_actual='INGRESADO',
+                                       polinizacion=pol, responsable='Ana', creado_por=self.user)
+            Germinacion.objects.create(codigo='GCAL-2', fecha_ingreso=self.hoy, etapa_actual='LISTA',
+                                       responsable='Ana', creado_por=self.user)
+
+    def esperado(self):
+        """Los diez conteos independientes de la implementación anterior"""
+        hoy = self.hoy
+        pol, germ = Polinizacion.objects, Germinacion.objects
+        retrasadas = (
+            pol.filter(fechapol__lt=hoy, estado__in=['INGRESADO', 'EN_PROCESO']).count()
+            + germ.filter(Q(fecha_siembra__lt=hoy) | Q(fecha_polinizacion__lt=hoy),
+                          etapa_actual__in=['INGRESADO', 'EN_PROCESO']).count()
+        )
+        return {
+            'pending': pol.filter(estado='INGRESADO').count() + germ.filter(etapa_actual='INGRESADO').count(),
+            'in_progress': pol.filter(estado='EN_PROCESO').count() + germ.filter(etapa_actual='EN_PROCESO').count(),
+            'completed': pol.filter(estado__in=['LISTA', 'LISTO']).count() + germ.filter(etapa_actual='LISTA').count(),
+            'delayed': retrasadas,
+            'overdue': retrasadas,
+            'predicted': (
+                pol.filter(Q(prediccion_fecha_estimada__isnull=False) | Q(prediccion_tipo__isnull=False)).count()
+                + germ.filter(polinizacion__prediccion_fecha_estimada__isnull=False).count()
+            ),
+        }
+
+    def test_paridad_y_una_consulta_por_modelo(self):
+        esperado = self.esperado()
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/calendar/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, esperado)
+
+        # Segunda lectura del día: desde la cache
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/calendar/stats/')
+        self.assertEqual(response.data, esperado)
+
+    def test_invalidacion_al_escribir(self):
+        calendario_service.stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            Polinizacion.objects.create(fechapol=self.hoy, codigo='CAL-4', estado='INGRESADO', creado_por=self.user)
+        self.assertEqual(calendario_service.stats(), self.esperado())
+
+    def test_por_mes(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/calendar/monthly-stats/', {'year': self.hoy.year})
+        meses = response.data['months']
+        self.assertEqual(len(meses), 12)
+        self.assertEqual(meses[0]['month'], f'{self.hoy.year}-01')
+
+        # Todos los eventos de los datos de prueba caen en este año, salvo
+        # que hoy sea 31 de diciembre (CAL-2 es dentro de tres días)
+        if (self.hoy + timedelta(days=3)).year == self.hoy.year:
+            for indicador in ('pending', 'in_progress', 'completed', 'overdue'):
+                self.assertEqual(sum(m[indicador] for m in meses), self.esperado()[indicador])
+
+        self.assertEqual(self.client.get('/api/calendar/monthly-stats/', {'year': 'x'}).status_code, 400)
+
+
+class CalendarioEventosTest(TestCase):
+    """Eventos por ventana proyectados con .values() y en cache por mes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='eventos', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pol = Polinizacion.objects.create(
+                fechapol=date(2026, 3, 10), codigo='EV-1', estado='INGRESADO', tipo_polinizacion='HIBRIDA',
+                especie='aurantiaca', responsable='Ana', prediccion_dias_estimados=120, creado_por=self.user
+            )
+            Polinizacion.objects.create(fechapol=date(2026, 4, 2), codigo='EV-2', estado='LISTO',
+                                        creado_por=self.user)
+            self.germ = Germinacion.objects.create(
+                codigo='GEV-1', fecha_ingreso=date(2026, 3, 20), etapa_actual='EN_PROCESO',
+                especie_variedad='tigrina', polinizacion=self.pol, creado_por=self.user
+            )
+
+    def eventos(self, **params):
+        response = self.client.get('/api/calendar/events/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ventana_y_campos(self):
+        eventos = self.eventos(start_date='2026-03-01', end_date='2026-03-31')
+        self.assertEqual([e['id'] for e in eventos], [f'pol_{self.pol.pk}', f'germ_{self.germ.pk}'])
+        pol, germ = eventos
+        self.assertEqual(pol['title'], 'Polinización HIBRIDA - aurantiaca')
+        self.assertEqual(pol['estimated_days'], 120)
+        self.assertEqual(pol['technician'], 'Ana')
+        self.assertEqual(germ['date'], '2026-03-20')
+        self.assertEqual(germ['subtype'], 'transfer')
+        self.assertEqual(germ['estimated_days'], 120)
+        self.assertEqual(germ['prediccion_dias_estimados'], 120)
+
+        self.assertEqual(len(self.eventos(date='2026-04-02')), 1)
+        self.assertEqual(len(self.eventos(start_date='2026-03-01', end_date='2026-04-30', status='LISTO')), 1)
+        # Sin end_date la ventana termina con el mes de start_date
+        self.assertEqual(len(self.eventos(start_date='2026-04-01')), 1)
+
+    def test_cache_por_mes(self):
+        with self.assertNumQueries(2):
+            self.eventos(start_date='2026-03-01', end_date='2026-04-30')
+        with self.assertNumQueries(0):
+            self.eventos(start_date='2026-03-05', end_date='2026-04-30')
+
+        # Un cambio en abril no invalida marzo
+        with self.captureOnCommitCallbacks(execute=True):
+            Polinizacion.objects.create(fechapol=date(2026, 4, 15), codigo='EV-3', creado_por=self.user)
+        with self.assertNumQueries(0):
+            self.eventos(start_date='2026-03-01', end_date='2026-03-31')
+        self.assertEqual(len(self.eventos(start_date='2026-04-01', end_date='2026-04-30')), 2)
+
+        # Mover un evento de mes invalida el mes anterior y el nuevo
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pol.fechapol = date(2026, 4, 20)
+            self.pol.save()
+        self.assertEqual(len(self.eventos(start_date='2026-03-01', end_date='2026-03-31')), 1)
+        self.assertEqual(len(self.eventos(start_date='2026-04-01', end_date='2026-04-30')), 3)
+
+        # La predicción de la polinización se muestra en el evento de su germinación
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pol.prediccion_dias_estimados = 200
+            self.pol.save()
+        germ = self.eventos(start_date='2026-03-01', end_date='2026-03-31')[0]
+        self.assertEqual(germ['prediccion_dias_estimados'], 200)
+
+    def test_streaming(self):
+        normal = self.eventos(start_date='2026-01-01', end_date='2026-12-31')
+        response = self.client.get('/api/calendar/events/', {
+            'start_date': '2020-01-01', 'end_date': '2030-12-31', 'stream': 'true'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), json.loads(json.dumps(normal)))
+
+    def test_ventana_invalida(self):
+        for params in ({'date': 'x'}, {'start_date': '2026-05-01', 'end_date': '2026-04-01'},
+                       {'start_date': '2020-01-01', 'end_date': '2026-12-31'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/calendar/events/', params).status_code, 400)
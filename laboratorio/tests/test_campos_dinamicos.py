@@ -0,0 +1,104 @@
+"""
+Tests para la selección dinámica de campos (?fields=, ?omit=, ?preset=)
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from laboratorio.api.serializers import PolinizacionSerializer, GerminacionSerializer
+from laboratorio.models import Polinizacion, Germinacion, UserProfile
+from laboratorio.view_modules.polinizacion_views import PolinizacionViewSet
+from laboratorio.view_modules.germinacion_views import GerminacionViewSet
+
+
+class ResolverCamposTest(TestCase):
+    """Resolución de presets, fields y omit"""
+
+    def test_sin_parametros_devuelve_todos(self):
+        self.assertIsNone(PolinizacionSerializer.resolver_campos())
+        self.assertIsNone(PolinizacionSerializer.resolver_campos(preset='full'))
+
+    def test_preset_y_omit(self):
+        campos = PolinizacionSerializer.resolver_campos(preset='card', omit=['especie'])
+        self.assertEqual(campos, [
+            'numero', 'codigo', 'fechapol', 'genero', 'estado_polinizacion',
+            'progreso_polinizacion', 'fecha_maduracion_predicha',
+        ])
+
+    def test_fields_se_suma_al_preset(self):
+        campos = GerminacionSerializer.resolver_campos(preset='card', fields=['clima'])
+        self.assertIn('clima', campos)
+        self.assertIn('codigo', campos)
+
+    def test_campo_o_preset_desconocido(self):
+        with self.assertRaises(serializers.ValidationError):
+            PolinizacionSerializer.resolver_campos(fields=['codigo', 'no_existe'])
+        with self.assertRaises(serializers.ValidationError):
+            PolinizacionSerializer.resolver_campos(preset='mini')
+
+    def test_columnas_del_modelo(self):
+        columnas = PolinizacionSerializer.campos_modelo(['codigo', 'creado_por', 'genero'])
+        self.assertEqual(columnas, ['numero', 'codigo', 'creado_por', 'genero'])
+
+
+class CamposDinamicosViewTest(TestCase):
+    """Los endpoints de listado serializan y leen solo los campos pedidos"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='campos', password='testpass123')
+        self.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        self.user.profile.save()
+        for i in range(3):
+            Polinizacion.objects.create(
+                fechapol=date.today(), codigo=f'CD-{i}', genero='Cattleya', especie='aurantiaca',
+                prediccion_parametros_usados={'modelo': 'xgboost'}, creado_por=self.user
+            )
+        Germinacion.objects.create(codigo='GCD-1', genero='Stanhopea', responsable='Ana',
+                                   creado_por=self.user)
+
+    def get(self, vista, accion, params):
+        request = self.factory.get('/', params)
+        request.user = self.user
+        viewset = vista()
+        viewset.request = request
+        viewset.format_kwarg = None
+        viewset.action = accion
+        return getattr(viewset, accion)(request)
+
+    def test_preset_card_en_mis_polinizaciones(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.get(PolinizacionViewSet, 'mis_polinizaciones', {'preset': 'card'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(set(response.data['results'][0]), set(PolinizacionSerializer.FIELD_PRESETS['card']))
+
+        sql = ' '.join(q['sql'] for q in consultas.captured_queries if 'laboratorio_polinizacion' in q['sql'])
+        self.assertNotIn('prediccion_parametros_usados', sql)
+        self.assertNotIn('observaciones', sql)
+
+    def test_fields_con_cursor(self):
+        response = self.get(PolinizacionViewSet, 'mis_polinizaciones',
+                            {'fields': 'codigo,genero', 'cursor': '', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([set(r) for r in response.data['results']], [{'codigo', 'genero'}] * 2)
+        self.assertIsNotNone(response.data['next_cursor'])
+
+    def test_omit_en_todas_admin(self):
+        response = self.get(GerminacionViewSet, 'todas_admin', {'omit': 'observaciones,etapa_actual'})
+        self.assertEqual(response.status_code, 200)
+        fila = response.data['results'][0]
+        self.assertNotIn('observaciones', fila)
+        self.assertEqual(fila['codigo'], 'GCD-1')
+
+    def test_campo_desconocido_400(self):
+        response = self.get(PolinizacionViewSet, 'mis_polinizaciones', {'fields': 'codigo,no_existe'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_sin_parametros_respuesta_completa(self):
+        response = self.get(PolinizacionViewSet, 'mis_polinizaciones', {})
+        self.assertIn('prediccion_parametros_usados', response.data['results'][0])
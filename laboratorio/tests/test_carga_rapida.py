@@ -0,0 +1,92 @@
+"""
+Tests para la carga rápida de históricos (carga_rapida_service, --fast)
+"""
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from laboratorio.models import Especie, Genero, Polinizacion, SearchDocument, Ubicacion
+from laboratorio.services.carga_rapida_service import CargaRapidaService, carga_rapida_service
+
+
+class CargaRapidaTest(TestCase):
+    """En SQLite, el modo --fast usa el motor por lotes del ORM con la misma semántica"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='historico', password='testpass123')
+
+    def polinizacion(self, codigo, **campos):
+        datos = {'codigo': codigo, 'fechapol': '2010-10-08', 'genero': 'Cattleya', 'especie': 'aurantiaca',
+                 'ubicacion': 'V-13 M-1A', 'creado_por': self.user}
+        datos.update(campos)
+        return Polinizacion(**datos)
+
+    def test_descarta_repetidas_y_etiqueta(self):
+        instancias = [
+            self.polinizacion('H-1'),
+            self.polinizacion('H-1'),
+            self.polinizacion('H-1', cantidad=3),
+            self.polinizacion('H-2', archivo_origen='otro.csv', genero='Masdevallia', especie='veitchiana'),
+        ]
+        resultado = carga_rapida_service.cargar(Polinizacion, instancias, etiqueta='historico.csv')
+        self.assertEqual((resultado['motor'], resultado['total']), ('orm', 3))
+        self.assertGreater(resultado['filas_por_segundo'], 0)
+
+        self.assertEqual(Polinizacion.objects.filter(codigo='H-1').count(), 2)
+        self.assertEqual(
+            set(Polinizacion.objects.values_list('archivo_origen', 'es_importado')),
+            {('historico.csv', True), ('otro.csv', True)},
+        )
+        self.assertEqual(Especie.objects.get(nombre='veitchiana').genero.nombre, 'Masdevallia')
+        self.assertTrue(Genero.objects.filter(nombre='Cattleya').exists())
+        self.assertTrue(Ubicacion.objects.filter(nombre='V-13 M-1A').exists())
+        self.assertEqual(SearchDocument.objects.filter(modelo='laboratorio.polinizacion').count(), 3)
+
+    def test_filas_distintas_con_el_mismo_hash(self):
+        class Colision(tuple):
+            def __hash__(self):
+                return 0
+
+        def valores(instance, campos):
+            return Colision(CargaRapidaService.valores(carga_rapida_service, instance, campos))
+
+        instancias = [self.polinizacion('H-1'), self.polinizacion('H-2'), self.polinizacion('H-2')]
+        with mock.patch.object(carga_rapida_service, 'valores', side_effect=valores):
+            resultado = carga_rapida_service.cargar(Polinizacion, instancias)
+        self.assertEqual(resultado['total'], 2)
+        self.assertEqual(sorted(Polinizacion.objects.values_list('codigo', flat=True)), ['H-1', 'H-2'])
+
+    def test_comando_fast(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as archivo:
+            archivo.write('codigo,genero,especie,ubicacion,fechapol\n')
+            archivo.write('HIST-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010\n')
+            archivo.write('HIST-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010\n')
+        self.addCleanup(os.remove, archivo.name)
+
+        out = StringIO()
+        call_command('import_polinizaciones_csv', file=archivo.name, user='historico', fast=True, stdout=out)
+        self.assertIn('1 polinizaciones nuevas importadas', out.getvalue())
+        self.assertIn('Carga rapida (orm)', out.getvalue())
+        self.assertEqual(Polinizacion.objects.get().archivo_origen, os.path.basename(archivo.name))
+
+    def test_comando_fast_dos_veces(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as archivo:
+            archivo.write('codigo,genero,especie,ubicacion,fechapol\n')
+            archivo.write('HIST-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010\n')
+            archivo.write('HIST-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010\n')
+            archivo.write('HIST-2,Masdevallia,veitchiana,V-2 M-1B P-A,09/10/2010\n')
+        self.addCleanup(os.remove, archivo.name)
+
+        call_command('import_polinizaciones_csv', file=archivo.name, user='historico', fast=True, stdout=StringIO())
+        self.assertEqual(Polinizacion.objects.count(), 2)
+
+        # Repetir la carga no inserta las filas ya cargadas (ni la repetida dentro del archivo)
+        out = StringIO()
+        call_command('import_polinizaciones_csv', file=archivo.name, user='historico', fast=True, stdout=out)
+        self.assertIn('0 polinizaciones nuevas importadas', out.getvalue())
+        self.assertEqual(Polinizacion.objects.count(), 2)
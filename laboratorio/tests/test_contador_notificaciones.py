@@ -0,0 +1,88 @@
+"""
+Tests para los contadores de notificaciones por usuario (ContadorNotificaciones)
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from laboratorio.models import ContadorNotificaciones, Notification
+from laboratorio.services.contador_notificacion_service import contador_notificacion_service
+
+
+class ContadorNotificacionesTest(TestCase):
+    """Los contadores siguen a la tabla con deltas y sirven las estadísticas"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='contador', password='testpass123')
+        self.otro = User.objects.create_user(username='contador_otro', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.notificaciones = [
+            Notification.objects.create(usuario=self.user, tipo='MENSAJE', titulo=f'N{i}', mensaje='x')
+            for i in range(4)
+        ]
+        Notification.objects.create(usuario=self.otro, tipo='MENSAJE', titulo='Otro', mensaje='x')
+
+    def contados(self, usuario):
+        return contador_notificacion_service.calcular([usuario.pk]).get(
+            usuario.pk, {'total': 0, 'no_leidas': 0, 'favoritas': 0, 'archivadas': 0}
+        )
+
+    def test_deltas_por_operacion(self):
+        primera, segunda, tercera, cuarta = self.notificaciones
+        primera.marcar_como_leida()
+        primera.marcar_como_leida()
+        segunda.toggle_favorita()
+        tercera.archivar()
+        cuarta.delete()
+        contadores = contador_notificacion_service.contadores(self.user.pk)
+        self.assertEqual(contadores, {'total': 3, 'no_leidas': 2, 'favoritas': 1, 'archivadas': 1})
+        self.assertEqual(contadores, self.contados(self.user))
+        self.assertEqual(contador_notificacion_service.contadores(self.otro.pk)['total'], 1)
+
+    def test_estadisticas_desde_el_contador(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/notifications/estadisticas/')
+        self.assertEqual(response.data, {'total': 4, 'no_leidas': 4, 'favoritas': 0, 'archivadas': 0})
+
+        # Sin fila (usuario previo al contador), la primera lectura la crea contando
+        ContadorNotificaciones.objects.filter(usuario=self.user).delete()
+        self.assertEqual(contador_notificacion_service.no_leidas(self.user.pk), 4)
+        self.assertTrue(ContadorNotificaciones.objects.filter(usuario=self.user).exists())
+
+    def test_marcar_todas_leidas(self):
+        response = self.client.post('/api/notifications/marcar-todas-leidas/')
+        self.assertEqual(response.data['count'], 4)
+        contadores = contador_notificacion_service.contadores(self.user.pk)
+        self.assertEqual(contadores['no_leidas'], 0)
+        self.assertEqual(contadores, self.contados(self.user))
+        self.assertEqual(contador_notificacion_service.no_leidas(self.otro.pk), 1)
+
+    def test_marcar_todas_leidas_viewset_legacy(self):
+        from laboratorio.views import NotificationViewSet
+
+        self.notificaciones[0].archivar()
+        request = APIRequestFactory().post('/notifications/marcar_todas_leidas/')
+        force_authenticate(request, user=self.user)
+        response = NotificationViewSet.as_view({'post': 'marcar_todas_leidas'})(request)
+        # Las archivadas no se marcan: quedan como no leídas en el contador
+        self.assertEqual(response.data['count'], 3)
+        contadores = contador_notificacion_service.contadores(self.user.pk)
+        self.assertEqual(contadores['no_leidas'], 1)
+        self.assertEqual(contadores, self.contados(self.user))
+
+    def test_rebuild(self):
+        # Escrituras sin signals desvían el contador; la reconciliación lo corrige
+        Notification.objects.filter(usuario=self.user).update(favorita=True)
+        ContadorNotificaciones.objects.filter(usuario=self.otro).delete()
+        tercero = User.objects.create_user(username='contador_tercero', password='testpass123')
+        ContadorNotificaciones.objects.create(usuario=tercero, total=2, no_leidas=2)
+
+        out = StringIO()
+        call_command('rebuild_contador_notificaciones', stdout=out)
+        self.assertIn('3 filas corregidas', out.getvalue())
+        for usuario in (self.user, self.otro, tercero):
+            self.assertEqual(contador_notificacion_service.contadores(usuario.pk), self.contados(usuario))
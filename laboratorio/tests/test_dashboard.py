@@ -0,0 +1,90 @@
+"""
+Tests para el resumen del dashboard en cache por usuario (/api/dashboard/)
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from laboratorio.models import Germinacion, Notification, Polinizacion, UserProfile
+
+
+@override_settings(DASHBOARD_CALENTAR_EN_SEGUNDO_PLANO=False)
+class DashboardTest(TestCase):
+    """El resumen coincide con los endpoints por separado y se invalida por usuario"""
+
+    ENDPOINTS = {
+        'estadisticas': '/api/estadisticas/usuario/',
+        'metricas_nuevos': '/api/germinaciones/metricas-nuevos/',
+        'notificaciones': '/api/notifications/estadisticas/',
+        'alertas_polinizacion': '/api/polinizaciones/alertas_polinizacion/',
+        'alertas_germinacion': '/api/germinaciones/alertas_germinacion/',
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dashboard', password='testpass123')
+        self.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        self.user.profile.meta_polinizaciones = 10
+        self.user.profile.save()
+        self.otro = User.objects.create_user(username='dashboard_otro', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        hoy = date.today()
+        with self.captureOnCommitCallbacks(execute=True):
+            Polinizacion.objects.create(
+                fechapol=hoy, codigo='DASH-1', madre_genero='Cattleya', madre_especie='aurantiaca',
+                prediccion_fecha_estimada=hoy + timedelta(days=3), creado_por=self.user
+            )
+            Germinacion.objects.create(
+                codigo='DASH-G1', genero='Stanhopea', especie_variedad='tigrina', fecha_siembra=hoy,
+                prediccion_fecha_estimada=hoy - timedelta(days=1), creado_por=self.user
+            )
+
+    def test_paridad_con_endpoints(self):
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        for seccion, url in self.ENDPOINTS.items():
+            with self.subTest(seccion=seccion):
+                self.assertEqual(response.data[seccion], self.client.get(url).data)
+        self.assertEqual(response.data['alertas_polinizacion']['alertas'][0]['codigo'], 'DASH-1')
+        self.assertEqual(response.data['metas']['meta_polinizaciones'], 10)
+        self.assertEqual(response.data['metas']['polinizaciones_actuales'], 1)
+
+    def test_cache_e_invalidacion_por_usuario(self):
+        self.client.get('/api/dashboard/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/')
+
+        # Una notificación de otro usuario no invalida el resumen
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(usuario=self.otro, tipo='MENSAJE', titulo='Otro', mensaje='x')
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(usuario=self.user, tipo='MENSAJE', titulo='Propia', mensaje='x')
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.data['notificaciones']['total'],
+                         Notification.objects.filter(usuario=self.user).count())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.meta_polinizaciones = 25
+            self.user.profile.save()
+        self.assertEqual(self.client.get('/api/dashboard/').data['metas']['meta_polinizaciones'], 25)
+
+    def test_calentamiento_tras_cambios(self):
+        self.client.get('/api/dashboard/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Polinizacion.objects.create(fechapol=date.today(), codigo='DASH-2', creado_por=self.user)
+        # El signal recalculó el resumen al confirmar: la apertura no consulta
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.data['estadisticas']['total_polinizaciones'], 2)
+
+    def test_etag(self):
+        response = self.client.get('/api/dashboard/')
+        respuesta = self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
@@ -0,0 +1,72 @@
+"""
+Tests para la marca es_importado (registros importados vs creados en el sistema)
+"""
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from laboratorio.models import Polinizacion, Germinacion
+from laboratorio.services.polinizacion_service import polinizacion_service
+from laboratorio.services.germinacion_service import germinacion_service
+
+
+class EsImportadoTest(TestCase):
+    """es_importado se deriva de archivo_origen y reemplaza el filtro por texto"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='importado', password='testpass123')
+        hoy = date.today()
+        self.nueva = Polinizacion.objects.create(fechapol=hoy, codigo='IMP-1', creado_por=self.user)
+        self.importada = Polinizacion.objects.create(
+            fechapol=hoy, codigo='IMP-2', archivo_origen='polinizaciones.csv', creado_por=self.user
+        )
+        self.germ_nueva = Germinacion.objects.create(codigo='GIMP-1', responsable='Ana', creado_por=self.user)
+        self.germ_importada = Germinacion.objects.create(
+            codigo='GIMP-2', responsable='Ana', archivo_origen='germinaciones.xlsx', creado_por=self.user
+        )
+
+    def test_save_calcula_la_marca(self):
+        self.assertFalse(self.nueva.es_importado)
+        self.assertTrue(self.importada.es_importado)
+        self.assertFalse(self.germ_nueva.es_importado)
+        self.assertTrue(self.germ_importada.es_importado)
+
+    def test_update_fields(self):
+        self.nueva.archivo_origen = 'tardio.csv'
+        self.nueva.save(update_fields=['archivo_origen'])
+        self.assertTrue(Polinizacion.objects.get(pk=self.nueva.pk).es_importado)
+
+        self.germ_importada.archivo_origen = ''
+        self.germ_importada.save(update_fields=['archivo_origen'])
+        self.assertFalse(Germinacion.objects.get(pk=self.germ_importada.pk).es_importado)
+
+    def test_filtros_de_tipo_registro(self):
+        nuevas = polinizacion_service.get_mis_polinizaciones(self.user, excluir_importadas=True)
+        historicas = polinizacion_service._build_mis_polinizaciones_queryset(self.user, solo_historicos=True)
+        self.assertEqual([p.pk for p in nuevas], [self.nueva.pk])
+        self.assertEqual([p.pk for p in historicas], [self.importada.pk])
+
+        nuevas = germinacion_service.get_mis_germinaciones(self.user, excluir_importadas=True)
+        self.assertEqual([g.pk for g in nuevas], [self.germ_nueva.pk])
+
+    def test_consulta_sin_archivo_origen(self):
+        """El filtro usa la columna indexada en lugar del OR sobre archivo_origen"""
+        with CaptureQueriesContext(connection) as consultas:
+            polinizacion_service.get_mis_polinizaciones(self.user, excluir_importadas=True)
+        sql = consultas.captured_queries[-1]['sql']
+        self.assertIn('es_importado', sql)
+        self.assertNotIn('archivo_origen" IS NULL', sql)
+
+    def test_marcar_datos_historicos(self):
+        corte = (timezone.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        call_command('marcar_datos_historicos', fecha_corte=corte, stdout=StringIO())
+        self.nueva.refresh_from_db()
+        self.assertEqual(self.nueva.archivo_origen, 'historico')
+        self.assertTrue(self.nueva.es_importado)
+        self.assertFalse(Polinizacion.objects.filter(es_importado=False).exists())
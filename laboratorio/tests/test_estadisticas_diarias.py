@@ -0,0 +1,148 @@
+"""
+Tests para las estadísticas diarias pre-agregadas (EstadisticaDiaria)
+"""
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Avg, Count, Q, Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from laboratorio.models import Polinizacion, Germinacion, EstadisticaDiaria, UserProfile
+from laboratorio.services.estadistica_service import estadistica_service, DIMENSIONES, MEDIDAS
+
+
+class EstadisticasDiariasTest(TestCase):
+    """Los rollups se mantienen con los signals y coinciden con las tablas"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='rollup', password='testpass123')
+        self.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        self.user.profile.save()
+        self.otro = User.objects.create_user(username='rollup_otro', password='testpass123')
+        hoy = date.today()
+
+        self.pols = [
+            Polinizacion.objects.create(fechapol=hoy - timedelta(days=40), codigo='R-1', genero='Cattleya',
+                                        especie='aurantiaca', estado='INGRESADO', creado_por=self.user),
+            Polinizacion.objects.create(fechapol=hoy - timedelta(days=10), fechamad=hoy, codigo='R-2',
+                                        genero='Cattleya', especie='maxima', estado='LISTO',
+                                        cantidad_disponible=12, creado_por=self.user),
+            Polinizacion.objects.create(fechapol=hoy - timedelta(days=400), codigo='R-3', genero='Oncidium',
+                                        especie='sp', estado='EN_PROCESO', cantidad_disponible=5, creado_por=self.otro),
+            Polinizacion.objects.create(fechapol=hoy, codigo='R-4', genero='Oncidium', especie='sp',
+                                        archivo_origen='viejo.csv', creado_por=self.user),
+        ]
+        self.germs = [
+            Germinacion.objects.create(codigo='GR-1', genero='Cattleya', especie_variedad='maxima',
+                                       estado_capsula='CERRADA', fecha_siembra=hoy - timedelta(days=30),
+                                       fecha_germinacion=hoy - timedelta(days=5), no_capsulas=3,
+                                       responsable='Ana', creado_por=self.user),
+            Germinacion.objects.create(codigo='GR-2', genero='Stanhopea', especie_variedad='tigrina',
+                                       estado_capsula='ABIERTA', semilla_en_stock=True, no_capsulas=None,
+                                       responsable='Ana', creado_por=self.otro),
+            Germinacion.objects.create(codigo='GR-3', genero='Stanhopea', especie_variedad='tigrina',
+                                       archivo_origen='viejo.xlsx', responsable='Ana', creado_por=self.user),
+        ]
+
+    def filas(self):
+        """Contenido de la tabla de rollups con las filas repetidas sumadas y sin filas en cero"""
+        conteos = EstadisticaDiaria.objects.values(*DIMENSIONES).annotate(
+            **{f'_{m}': Sum(m) for m in MEDIDAS}
+        ).order_by()
+        return sorted(
+            (tuple(str(fila[d]) for d in DIMENSIONES), tuple(fila[f'_{m}'] for m in MEDIDAS))
+            for fila in conteos if fila['_total']
+        )
+
+    def modificar(self):
+        pol = self.pols[0]
+        pol.estado = 'COMPLETADA'
+        pol.fechamad = date.today()
+        pol.save()
+        self.pols[1].creado_por = self.otro
+        self.pols[1].save(update_fields=['creado_por'])
+        self.pols[2].archivo_origen = 'tardio.csv'
+        self.pols[2].save(update_fields=['archivo_origen'])
+        self.germs[0].estado_germinacion = 'FINALIZADO'
+        self.germs[0].save()
+        self.germs[1].delete()
+
+    def test_incremental_igual_a_rebuild(self):
+        self.modificar()
+        incremental = self.filas()
+        estadistica_service.rebuild()
+        self.assertEqual(incremental, self.filas())
+
+    def test_endpoints_coinciden_con_las_tablas(self):
+        self.modificar()
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        pol = client.get('/api/estadisticas/polinizaciones/').data
+        base = Polinizacion.objects.filter(es_importado=False)
+        exitosas = base.filter(Q(fechamad__isnull=False) | Q(cantidad_disponible__gt=0)).count()
+        self.assertEqual(pol['total'], base.count())
+        self.assertEqual(pol['cosechas'], exitosas)
+        self.assertEqual(pol['activas'], base.count() - exitosas)
+        self.assertEqual(pol['promedio_semillas_fruto'],
+                         round(base.filter(cantidad_disponible__gt=0).aggregate(p=Avg('cantidad_disponible'))['p'], 1))
+        self.assertEqual(pol['estados'], list(base.values('estado').annotate(count=Count('numero')).order_by('estado')))
+        self.assertEqual(sum(m['total'] for m in pol['por_mes']), base.count())
+
+        germ = client.get('/api/estadisticas/germinaciones/').data
+        base = Germinacion.objects.filter(es_importado=False)
+        self.assertEqual(germ['total'], base.count())
+        self.assertEqual(germ['promedio_dias_germinar'], 25)
+        self.assertEqual(germ['promedio_capsulas'], round(base.aggregate(p=Avg('no_capsulas'))['p'], 2))
+        self.assertEqual(germ['top_especies'], [{'especie_variedad': 'maxima', 'count': 1}])
+
+        usuario = client.get('/api/estadisticas/usuario/').data
+        self.assertEqual(usuario['total_polinizaciones'], 1)
+        self.assertEqual(usuario['polinizaciones_completadas'], 1)
+        self.assertEqual(usuario['polinizaciones_actuales'], 0)
+        self.assertEqual(usuario['total_germinaciones'], 1)
+        self.assertEqual(usuario['germinaciones_completadas'], 1)
+
+    def test_rango_de_fechas(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        hoy = date.today()
+        por_defecto = client.get('/api/estadisticas/polinizaciones/').data['por_mes']
+        self.assertEqual(sum(m['total'] for m in por_defecto), 2)  # R-3 tiene más de un año
+
+        rango = client.get('/api/estadisticas/polinizaciones/', {
+            'fecha_inicio': (hoy - timedelta(days=500)).isoformat(),
+            'fecha_fin': (hoy - timedelta(days=20)).isoformat(),
+        }).data['por_mes']
+        self.assertEqual(sum(m['total'] for m in rango), 2)  # R-1 y R-3
+
+    def test_consultas_por_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        for url in ('/api/estadisticas/polinizaciones/', '/api/estadisticas/germinaciones/'):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as consultas:
+                    self.assertEqual(client.get(url).status_code, 200)
+                sql = [q['sql'] for q in consultas.captured_queries]
+                self.assertFalse([q for q in sql if 'laboratorio_polinizacion' in q or 'laboratorio_germinacion' in q])
+                self.assertLessEqual(len([q for q in sql if 'laboratorio_estadisticadiaria' in q]), 5)
+
+    def test_compactar(self):
+        fila = EstadisticaDiaria.objects.filter(modelo='polinizacion', es_importado=False).first()
+        duplicada = EstadisticaDiaria.objects.get(pk=fila.pk)
+        duplicada.pk = None
+        duplicada.save()
+        EstadisticaDiaria.objects.create(modelo='germinacion', total=0)
+        antes = self.filas()
+
+        salida = StringIO()
+        call_command('rebuild_estadisticas_diarias', solo_compactar=True, stdout=salida)
+        self.assertIn('2 filas eliminadas', salida.getvalue())
+        self.assertEqual(self.filas(), antes)
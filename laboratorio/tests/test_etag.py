@@ -0,0 +1,100 @@
+"""
+Tests para los GET condicionales (ETag / If-None-Match) con versiones por tabla
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from laboratorio.models import Polinizacion, Notification, UserProfile
+from laboratorio.services.notification_service import notification_service
+
+
+class GetCondicionalTest(TestCase):
+    """Las respuestas sin cambios devuelven 304 sin consultar las tablas"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='etag', password='testpass123')
+        self.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        self.user.profile.save()
+        self.otro = User.objects.create_user(username='etag_otro', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.pol = self.crear_polinizacion('ETAG-1', self.user)
+
+    def crear_polinizacion(self, codigo, usuario):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Polinizacion.objects.create(
+                fechapol=date.today(), codigo=codigo, genero='Cattleya', especie='aurantiaca', creado_por=usuario
+            )
+
+    def get(self, url, etag=None, **params):
+        cabeceras = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, params, **cabeceras)
+
+    def test_304_sin_consultas(self):
+        url = '/api/polinizaciones/mis-polinizaciones/'
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.get(url, etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+        sql = ' '.join(q['sql'] for q in consultas.captured_queries)
+        self.assertNotIn('laboratorio_polinizacion', sql)
+
+        # Los ETags débiles también se aceptan en If-None-Match
+        self.assertEqual(self.get(url, etag=f'W/{etag}').status_code, 304)
+
+    def test_cambios_invalidan(self):
+        url = '/api/polinizaciones/mis-polinizaciones/'
+        etag = self.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pol.observaciones = 'Cambio'
+            self.pol.save()
+        response = self.get(url, etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_version_por_usuario(self):
+        """Los cambios de otro usuario no invalidan mis-polinizaciones"""
+        url = '/api/polinizaciones/mis-polinizaciones/'
+        etag = self.get(url)['ETag']
+        etag_global = self.get('/api/estadisticas/polinizaciones/')['ETag']
+
+        self.crear_polinizacion('ETAG-2', self.otro)
+        self.assertEqual(self.get(url, etag=etag).status_code, 304)
+        self.assertEqual(self.get('/api/estadisticas/polinizaciones/', etag=etag_global).status_code, 200)
+
+    def test_parametros_distintos(self):
+        url = '/api/polinizaciones/mis-polinizaciones/'
+        etag = self.get(url, page=1)['ETag']
+        self.assertEqual(self.get(url, etag=etag, page=2).status_code, 200)
+
+    def test_notificaciones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(usuario=self.user, tipo='MENSAJE', titulo='Hola', mensaje='Prueba')
+        url = '/api/notifications/estadisticas/'
+        response = self.get(url)
+        self.assertGreater(response.data['no_leidas'], 0)
+        etag = response['ETag']
+        self.assertEqual(self.get(url, etag=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification_service.marcar_todas_como_leidas(self.user)
+        response = self.get(url, etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['no_leidas'], 0)
+
+    def test_sin_etag_en_errores_y_escrituras(self):
+        response = self.client.post('/api/notifications/marcar-todas-leidas/')
+        self.assertFalse(response.has_header('ETag'))
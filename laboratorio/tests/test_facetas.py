@@ -0,0 +1,133 @@
+"""
+Tests para el catálogo de facetas de los endpoints de opciones de filtros
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase, RequestFactory
+
+from laboratorio.models import Polinizacion, Germinacion, FacetaFiltro
+from laboratorio.services.faceta_service import (
+    faceta_service, orden_vivero, orden_mesa, orden_pared
+)
+from laboratorio.view_modules.polinizacion_views import PolinizacionViewSet
+from laboratorio.view_modules.germinacion_views import GerminacionViewSet
+
+
+class OrdenNaturalTest(TestCase):
+    """Las claves precalculadas reproducen el orden natural anterior"""
+
+    def test_viveros(self):
+        valores = ['V-10', 'OTRO', 'V-2', 'V-1']
+        self.assertEqual(sorted(valores, key=orden_vivero), ['V-1', 'V-2', 'V-10', 'OTRO'])
+
+    def test_mesas(self):
+        valores = ['M-10A', 'M-2B', 'X', 'M-2A', 'M-1A']
+        self.assertEqual(sorted(valores, key=orden_mesa), ['M-1A', 'M-2A', 'M-2B', 'M-10A', 'X'])
+
+    def test_paredes(self):
+        valores = ['P-B', 'P-101', 'Z', 'P-A', 'P-0', 'P-100']
+        self.assertEqual(sorted(valores, key=orden_pared), ['P-0', 'P-100', 'P-101', 'P-A', 'P-B', 'Z'])
+
+
+class FacetaServiceTest(TestCase):
+    """Mantenimiento incremental y lectura del catálogo"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='facetas', password='testpass123')
+
+    def crear_polinizacion(self, codigo, **campos):
+        datos = dict(fechapol=date.today(), codigo=codigo, genero='Cattleya', especie='aurantiaca',
+                     responsable='Ana', creado_por=self.user)
+        datos.update(campos)
+        return Polinizacion.objects.create(**datos)
+
+    def total(self, modelo, campo, valor, contexto=''):
+        faceta = FacetaFiltro.objects.filter(modelo=modelo, campo=campo, valor=valor, contexto=contexto).first()
+        return faceta.total if faceta else 0
+
+    def test_conteos_incrementales(self):
+        pol = self.crear_polinizacion('FAC-1', vivero='V-2', mesa='M-1A')
+        self.crear_polinizacion('FAC-2', vivero='V-2', mesa='M-3A')
+        self.assertEqual(self.total('polinizacion', 'vivero', 'V-2'), 2)
+        self.assertEqual(self.total('polinizacion', 'mesa', 'M-1A', contexto='V-2'), 1)
+        self.assertEqual(self.total('polinizacion', '_total', ''), 2)
+
+        pol.vivero = 'V-10'
+        pol.save()
+        self.assertEqual(self.total('polinizacion', 'vivero', 'V-2'), 1)
+        self.assertEqual(self.total('polinizacion', 'vivero', 'V-10'), 1)
+        self.assertEqual(self.total('polinizacion', 'mesa', 'M-1A', contexto='V-2'), 0)
+        self.assertEqual(self.total('polinizacion', 'mesa', 'M-1A', contexto='V-10'), 1)
+        self.assertEqual(self.total('polinizacion', 'genero', 'Cattleya'), 2)
+
+        pol.delete()
+        self.assertFalse(FacetaFiltro.objects.filter(modelo='polinizacion', valor='V-10').exists())
+        self.assertEqual(self.total('polinizacion', '_total', ''), 1)
+
+    def test_update_fields_parcial(self):
+        pol = self.crear_polinizacion('FAC-3', vivero='V-1')
+        pol.vivero = 'V-5'
+        pol.genero = 'Oncidium'  # no se guarda
+        pol.save(update_fields=['vivero'])
+        self.assertEqual(self.total('polinizacion', 'vivero', 'V-5'), 1)
+        self.assertEqual(self.total('polinizacion', 'genero', 'Cattleya'), 1)
+        self.assertEqual(self.total('polinizacion', 'genero', 'Oncidium'), 0)
+
+    def test_rebuild_coincide_con_incremental(self):
+        self.crear_polinizacion('FAC-4', vivero='V-1', pared='P-A')
+        self.crear_polinizacion('FAC-5', vivero='V-1', pared='P-0', estado='EN_PROCESO')
+        antes = set(FacetaFiltro.objects.values_list('modelo', 'campo', 'contexto', 'valor', 'total', 'orden'))
+
+        FacetaFiltro.objects.all().delete()
+        faceta_service.rebuild('polinizacion')
+        faceta_service.rebuild('germinacion')
+        despues = set(FacetaFiltro.objects.values_list('modelo', 'campo', 'contexto', 'valor', 'total', 'orden'))
+        self.assertEqual(antes, despues)
+
+    def test_opciones_en_una_consulta(self):
+        for i, vivero in enumerate(['V-10', 'V-2', 'V-1']):
+            self.crear_polinizacion(f'FAC-V{i}', vivero=vivero, mesa=f'M-{i + 1}A', pared='P-B')
+
+        with self.assertNumQueries(1):
+            opciones = faceta_service.opciones('polinizacion', {'vivero': 2, 'mesa': 200, 'pared': 200})
+        self.assertEqual([v for v, _ in opciones['vivero']], ['V-1', 'V-2'])
+        self.assertEqual(opciones['pared'], [('P-B', 3)])
+
+    def test_endpoints(self):
+        self.crear_polinizacion('FAC-6', vivero='V-10', mesa='M-10A', pared='P-1')
+        self.crear_polinizacion('FAC-7', vivero='V-2', mesa='M-2A', pared='P-A')
+
+        request = self.factory.get('/api/polinizaciones/mesas/', {'vivero': 'V-2'})
+        request.user = self.user
+        response = PolinizacionViewSet().mesas(request)
+        self.assertEqual(response.data['mesas'], ['M-2A'])
+
+        request = self.factory.get('/api/polinizaciones/viveros/', {'search': 'v-'})
+        request.user = self.user
+        response = PolinizacionViewSet().viveros(request)
+        self.assertEqual(response.data['viveros'], ['V-2', 'V-10'])
+
+        request = self.factory.get('/api/polinizaciones/filter-options/')
+        request.user = self.user
+        response = PolinizacionViewSet().filter_options(request)
+        self.assertEqual(response.data['opciones']['paredes'], ['P-1', 'P-A'])
+        self.assertEqual(response.data['opciones']['responsables'], ['Ana'])
+        self.assertEqual(response.data['estadisticas']['total'], 2)
+
+    def test_filtros_opciones_germinacion(self):
+        Germinacion.objects.create(codigo='GFAC-1', genero='Stanhopea', responsable='Luis', percha='P1',
+                                   clima='IW', estado_capsulas='ABIERTA', creado_por=self.user)
+        Germinacion.objects.create(codigo='GFAC-2', genero='Cattleya', responsable='Ana', percha=None,
+                                   clima='IW', creado_por=self.user)
+
+        request = self.factory.get('/api/germinaciones/filtros-opciones/')
+        request.user = self.user
+        response = GerminacionViewSet().filtros_opciones(request)
+        self.assertEqual(response.data['opciones']['responsables'], ['Ana', 'Luis'])
+        self.assertEqual(response.data['opciones']['perchas'], ['P1'])
+        self.assertEqual(response.data['estadisticas']['total'], 2)
+        self.assertEqual(response.data['estadisticas']['por_estado'],
+                         {'CERRADA': 1, 'ABIERTA': 1, 'SEMIABIERTA': 0})
+        self.assertEqual(response.data['estadisticas']['por_clima']['IW'], 2)
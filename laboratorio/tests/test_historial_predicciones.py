@@ -0,0 +1,94 @@
+"""
+Tests para HistorialPredicciones.generar_historial (agregado condicional y modo incremental)
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Avg, Count
+from django.test import TestCase
+from django.utils import timezone
+
+from laboratorio.models import HistorialPredicciones, PrediccionPolinizacion
+
+
+class GenerarHistorialTest(TestCase):
+    """El historial coincide con los conteos por separado y se puede extender"""
+
+    INICIO = date(2026, 1, 1)
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='historial', password='testpass123')
+        datos = [
+            # (día desde INICIO, especie, tipo, confianza, precisión)
+            (0, 'aurantiaca', 'inicial', 80, Decimal('95.50')),
+            (0, 'aurantiaca', 'refinada', 60, Decimal('80.00')),
+            (1, 'tigrina', 'inicial', 70, Decimal('61.25')),
+            (2, 'aurantiaca', 'inicial', 90, None),
+            (3, 'tigrina', 'refinada', 50, Decimal('40.00')),
+            (5, 'tigrina', 'inicial', 65, None),
+            (6, 'tigrina', 'inicial', 75, Decimal('90.00')),
+        ]
+        for i, (dia, especie, tipo, confianza, precision) in enumerate(datos):
+            prediccion = PrediccionPolinizacion.objects.create(
+                codigo=f'HIST-{i}', especie=especie, dias_estimados=120, tipo_prediccion=tipo,
+                confianza=confianza, precision=precision, estado='validada' if precision else 'activa',
+                usuario_creador=self.user
+            )
+            creada = timezone.make_aware(datetime.combine(self.INICIO + timedelta(days=dia), time(12)))
+            PrediccionPolinizacion.objects.filter(pk=prediccion.pk).update(fecha_creacion=creada)
+
+    def esperado(self, fecha_fin):
+        """Las once consultas de la implementación anterior"""
+        predicciones = PrediccionPolinizacion.objects.filter(
+            fecha_creacion__date__gte=self.INICIO, fecha_creacion__date__lte=fecha_fin
+        )
+        especie_top = predicciones.values('especie').annotate(count=Count('especie')).order_by('-count').first()
+        return {
+            'total_predicciones': predicciones.count(),
+            'predicciones_validadas': predicciones.filter(estado='validada').count(),
+            'precision_promedio': round(predicciones.filter(precision__isnull=False).aggregate(
+                Avg('precision'))['precision__avg'] or 0, 2),
+            'confianza_promedio': round(Decimal(predicciones.aggregate(Avg('confianza'))['confianza__avg'] or 0), 2),
+            'predicciones_iniciales': predicciones.filter(tipo_prediccion='inicial').count(),
+            'predicciones_refinadas': predicciones.filter(tipo_prediccion='refinada').count(),
+            'especie_mas_predicha': especie_top['especie'],
+            'cantidad_especie_top': especie_top['count'],
+            'predicciones_excelentes': predicciones.filter(precision__gte=90).count(),
+            'predicciones_buenas': predicciones.filter(precision__gte=75, precision__lt=90).count(),
+            'predicciones_aceptables': predicciones.filter(precision__gte=60, precision__lt=75).count(),
+            'predicciones_pobres': predicciones.filter(precision__lt=60, precision__isnull=False).count(),
+        }
+
+    def valores(self, historial):
+        historial.refresh_from_db()
+        return {campo: getattr(historial, campo) for campo in self.esperado(self.INICIO)}
+
+    def test_paridad_y_dos_consultas(self):
+        fin = self.INICIO + timedelta(days=6)
+        with self.assertNumQueries(3):  # agregado, agrupado por especie e INSERT
+            historial = HistorialPredicciones.generar_historial(self.INICIO, fin, self.user)
+        self.assertEqual(self.valores(historial), self.esperado(fin))
+
+    def test_incremental(self):
+        primero = HistorialPredicciones.generar_historial(self.INICIO, self.INICIO + timedelta(days=2), self.user)
+        fin = self.INICIO + timedelta(days=6)
+        extendido = HistorialPredicciones.generar_historial(self.INICIO, fin, self.user, incremental=True)
+        self.assertEqual(self.valores(extendido), self.esperado(fin))
+        self.assertEqual(extendido.conteo_especies, {'aurantiaca': 3, 'tigrina': 4})
+        self.assertEqual(HistorialPredicciones.anterior_extensible(self.INICIO, fin + timedelta(days=1)), extendido)
+        self.assertNotEqual(primero.pk, extendido.pk)
+
+    def test_no_extiende_dias_abiertos(self):
+        """Un historial que termina el día en que se generó no se extiende"""
+        hoy = timezone.localdate()
+        HistorialPredicciones.generar_historial(self.INICIO, hoy, self.user)
+        self.assertIsNone(HistorialPredicciones.anterior_extensible(self.INICIO, hoy + timedelta(days=1)))
+
+    def test_comando(self):
+        fin = self.INICIO + timedelta(days=6)
+        call_command('generar_historial_predicciones', hasta=fin, stdout=open('/dev/null', 'w'))
+        historial = HistorialPredicciones.objects.get()
+        self.assertEqual(historial.fecha_inicio, self.INICIO)
+        self.assertEqual(self.valores(historial), self.esperado(fin))
@@ -0,0 +1,114 @@
+"""
+Tests para las importaciones en segundo plano (ImportJob)
+"""
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from laboratorio.models import ImportJob, Polinizacion
+from laboratorio.services.import_job_service import LATIDO_VENCIDO, MAX_INTENTOS, import_job_service
+from laboratorio.services.importacion_service import importacion_service
+from laboratorio.services.search_backend import TAMANO_LOTE
+
+from .test_importacion import csv_polinizaciones
+
+
+class ImportJobTest(TestCase):
+    """Encolado, procesamiento por lotes con puntos de control y consulta del avance"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.user = User.objects.create_user(username='trabajos', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def encolar(self, contenido):
+        archivo = SimpleUploadedFile('datos.csv', contenido.encode('utf-8'), content_type='text/csv')
+        return self.client.post('/api/upload/polinizaciones/', {'file': archivo}, format='multipart')
+
+    def test_upload_encola_sin_importar(self):
+        response = self.encolar(csv_polinizaciones(3))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['estado'], 'PENDIENTE')
+        self.assertFalse(Polinizacion.objects.exists())
+
+        out = StringIO()
+        call_command('procesar_importaciones', stdout=out)
+        self.assertIn('Importaciones procesadas: 1', out.getvalue())
+
+        estado = self.client.get(response.data['status_url']).data
+        self.assertEqual(estado['estado'], 'COMPLETADO')
+        self.assertEqual((estado['filas_procesadas'], estado['creados'], estado['total_errores']), (3, 3, 0))
+        self.assertGreater(estado['filas_por_segundo'], 0)
+        # El archivo se borra al completar
+        self.assertFalse(ImportJob.objects.get(pk=response.data['job_id']).archivo)
+
+        otro = APIClient()
+        otro.force_authenticate(User.objects.create_user(username='ajeno', password='testpass123'))
+        self.assertEqual(otro.get(response.data['status_url']).status_code, 404)
+
+    def test_reanuda_desde_el_ultimo_lote_confirmado(self):
+        filas = TAMANO_LOTE + 20
+        job_id = self.encolar(csv_polinizaciones(filas)).data['job_id']
+        importar = importacion_service.importar
+        llamadas = []
+
+        def caida_en_el_segundo_lote(*args, **kwargs):
+            llamadas.append(1)
+            if len(llamadas) == 2:
+                raise RuntimeError('caída simulada')
+            return importar(*args, **kwargs)
+
+        with mock.patch.object(importacion_service, 'importar', side_effect=caida_en_el_segundo_lote):
+            import_job_service.procesar_pendientes()
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual((job.estado, job.ultima_fila, job.creados), ('PENDIENTE', TAMANO_LOTE + 1, TAMANO_LOTE))
+        self.assertEqual(job.mensaje_error, 'caída simulada')
+        self.assertEqual(Polinizacion.objects.count(), TAMANO_LOTE)
+
+        import_job_service.procesar_pendientes()
+        job.refresh_from_db()
+        self.assertEqual((job.estado, job.intentos, job.creados), ('COMPLETADO', 2, filas))
+        self.assertEqual(Polinizacion.objects.count(), filas)
+        self.assertEqual(Polinizacion.objects.values('codigo').distinct().count(), filas)
+
+    def test_trabajo_sin_latido_se_reintenta(self):
+        job_id = self.encolar(csv_polinizaciones(2)).data['job_id']
+        self.assertIsNotNone(import_job_service.reclamar(job_id))
+        # Reclamado por otro worker: no está disponible hasta que venza su latido
+        self.assertIsNone(import_job_service.reclamar(job_id))
+        self.assertEqual(import_job_service.procesar_pendientes(), 0)
+
+        ImportJob.objects.filter(pk=job_id).update(actualizado=timezone.now() - LATIDO_VENCIDO - timedelta(seconds=1))
+        self.assertEqual(import_job_service.procesar_pendientes(), 1)
+        self.assertEqual(ImportJob.objects.get(pk=job_id).estado, 'COMPLETADO')
+
+    def test_fallido_borra_el_archivo(self):
+        job_id = self.encolar(csv_polinizaciones(2)).data['job_id']
+        ruta = ImportJob.objects.get(pk=job_id).archivo.path
+        with mock.patch.object(importacion_service, 'importar', side_effect=RuntimeError('sin conexión')):
+            for intento in range(MAX_INTENTOS):
+                import_job_service.procesar_pendientes()
+                if intento < MAX_INTENTOS - 1:
+                    # Pendiente de reintento: el archivo se conserva
+                    self.assertTrue(os.path.exists(ruta))
+
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual((job.estado, job.intentos), ('FALLIDO', MAX_INTENTOS))
+        self.assertFalse(job.archivo)
+        self.assertFalse(os.path.exists(ruta))
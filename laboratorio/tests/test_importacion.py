@@ -0,0 +1,141 @@
+"""
+Tests para el motor de importación masiva (importacion_service)
+"""
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from laboratorio.models import (
+    CodigoAutocompletado, FacetaFiltro, Genero, Germinacion, Notification, Polinizacion,
+    ProgresoMensual, SearchDocument, Ubicacion, Variedad,
+)
+from laboratorio.services.faceta_service import faceta_service
+from laboratorio.services.import_job_service import import_job_service
+from laboratorio.services.progreso_service import progreso_service
+
+CABECERA_POLINIZACIONES = 'fecha_pol,codigo,genero,especie,variedad,ubicacion,cantidad,estado\n'
+
+
+def csv_polinizaciones(filas, inicio=0, dias=15):
+    lineas = [
+        f'2024-01-{10 + i % dias:02d},IMP-{inicio + i},Cattleya,aurantiaca,Roja,Invernadero A,2,LISTA\n'
+        for i in range(filas)
+    ]
+    return CABECERA_POLINIZACIONES + ''.join(lineas)
+
+
+class ImportacionTest(TestCase):
+    """Inserción por lotes sin signals por fila y refresco de los catálogos por lote"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.user = User.objects.create_user(username='importador', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def subir(self, url, contenido):
+        """Sube el archivo, procesa la cola y devuelve el estado del trabajo"""
+        archivo = SimpleUploadedFile('datos.csv', contenido.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(url, {'file': archivo}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        import_job_service.procesar_pendientes()
+        return self.client.get(response.data['status_url'])
+
+    def test_upload_polinizaciones(self):
+        contenido = csv_polinizaciones(3) + 'fecha-mala,IMP-X,Cattleya,aurantiaca,Roja,,1,LISTA\n'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.subir('/api/upload/polinizaciones/', contenido)
+        self.assertEqual(response.data['creados'], 3)
+        self.assertEqual(len(response.data['errores']), 1)
+        self.assertIn('fila 5', response.data['errores'][0])
+
+        polinizacion = Polinizacion.objects.get(codigo='IMP-0')
+        self.assertEqual(polinizacion.especie, 'aurantiaca Roja')
+        self.assertEqual(polinizacion.creado_por, self.user)
+        self.assertEqual(polinizacion.responsable_usuario, self.user)
+        self.assertEqual(Genero.objects.filter(nombre='Cattleya').count(), 1)
+        self.assertTrue(Variedad.objects.filter(nombre='Roja', especie__nombre='aurantiaca').exists())
+        self.assertTrue(Ubicacion.objects.filter(nombre='Invernadero A').exists())
+
+        # Una notificación de resumen en lugar de una por registro
+        self.assertFalse(Notification.objects.filter(tipo='NUEVA_POLINIZACION').exists())
+        resumen = Notification.objects.get(usuario=self.user)
+        self.assertEqual(resumen.detalles_adicionales['creados'], 3)
+        self.assertEqual(resumen.detalles_adicionales['import_job'], response.data['id'])
+
+    def test_refresco_de_catalogos(self):
+        self.subir('/api/upload/polinizaciones/', csv_polinizaciones(4))
+        pks = Polinizacion.objects.values_list('pk', flat=True)
+        self.assertEqual(SearchDocument.objects.filter(modelo='laboratorio.polinizacion', object_id__in=pks).count(), 4)
+        self.assertEqual(CodigoAutocompletado.objects.filter(codigo__startswith='IMP-').count(), 4)
+
+        progreso = {
+            (fila.usuario_id, fila.mes): {c: getattr(fila, c) for c in ('polinizaciones', 'polinizaciones_exitosas')}
+            for fila in ProgresoMensual.objects.all()
+        }
+        calculado = {
+            clave: {c: valores[c] for c in ('polinizaciones', 'polinizaciones_exitosas')}
+            for clave, valores in progreso_service.calcular().items()
+        }
+        self.assertEqual(progreso, calculado)
+
+        facetas = set(FacetaFiltro.objects.filter(modelo='polinizacion').values_list('campo', 'valor', 'total'))
+        faceta_service.rebuild('polinizacion')
+        self.assertEqual(
+            facetas, set(FacetaFiltro.objects.filter(modelo='polinizacion').values_list('campo', 'valor', 'total'))
+        )
+
+    def test_consultas_no_dependen_de_las_filas(self):
+        """
+        Las consultas dependen de los lotes y de los grupos (días, facetas),
+        no de las filas (12 filas caben en un INSERT de SQLite)
+        """
+        self.subir('/api/upload/polinizaciones/', csv_polinizaciones(2, dias=1))
+        with CaptureQueriesContext(connection) as pocas:
+            self.subir('/api/upload/polinizaciones/', csv_polinizaciones(5, inicio=100, dias=1))
+        with CaptureQueriesContext(connection) as muchas:
+            self.subir('/api/upload/polinizaciones/', csv_polinizaciones(12, inicio=200, dias=1))
+        self.assertEqual(len(pocas), len(muchas))
+
+    def test_upload_germinaciones(self):
+        Polinizacion.objects.create(codigo='POL-G', fechapol='2024-01-01')
+        contenido = (
+            'fecha_ingreso,fecha_polinizacion,nombre,codigo_polinizacion,numero_capsulas\n'
+            '2024-01-20,2024-01-15,Hibrido,POL-G,3\n'
+            '2024-01-21,2024-01-15,Sin polinizacion,,x\n'
+        )
+        response = self.subir('/api/upload/germinaciones/', contenido)
+        self.assertEqual(response.data['creados'], 2)
+        germinacion = Germinacion.objects.get(nombre='Hibrido')
+        self.assertEqual(germinacion.polinizacion.codigo, 'POL-G')
+        self.assertEqual(germinacion.dias_polinizacion, 5)
+        self.assertEqual(Germinacion.objects.get(nombre='Sin polinizacion').numero_capsulas, 0)
+        self.assertFalse(Notification.objects.filter(tipo='NUEVA_GERMINACION').exists())
+
+    def test_comando_import_polinizaciones_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as archivo:
+            archivo.write('codigo,genero,especie,ubicacion,fechapol,archivo_origen\n')
+            archivo.write('HIST-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010,historico.csv\n')
+            archivo.write(',Cattleya,aurantiaca,,,historico.csv\n')
+        self.addCleanup(os.remove, archivo.name)
+
+        out = StringIO()
+        call_command('import_polinizaciones_csv', file=archivo.name, user='importador', stdout=out)
+        self.assertIn('1 polinizaciones nuevas importadas', out.getvalue())
+        polinizacion = Polinizacion.objects.get(codigo='HIST-1')
+        self.assertTrue(polinizacion.es_importado)
+        self.assertEqual((polinizacion.vivero, polinizacion.mesa, polinizacion.pared), ('V-13', 'M-1A', 'P-C'))
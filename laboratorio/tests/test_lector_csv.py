@@ -0,0 +1,104 @@
+"""
+Tests para la lectura de CSV por bloques (integrations/lector_csv)
+"""
+import codecs
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from laboratorio.integrations.lector_csv import ErroresFilas, leer_filas, lotes_de_filas
+from laboratorio.models import ImportJob, Polinizacion
+from laboratorio.services.import_job_service import import_job_service
+
+
+class ArchivoContado(BytesIO):
+    """Archivo en memoria que cuenta los bytes leídos"""
+
+    def __init__(self, contenido):
+        super().__init__(contenido)
+        self.leidos = 0
+
+    def read(self, tamano=-1):
+        datos = super().read(tamano)
+        self.leidos += len(datos)
+        return datos
+
+
+class LectorCSVTest(SimpleTestCase):
+    """Decodificación incremental, detección del delimitador y filas numeradas"""
+
+    def filas(self, contenido, tamano_bloque=7, errores=None):
+        return list(leer_filas(BytesIO(contenido), tamano_bloque=tamano_bloque, errores=errores))
+
+    def test_bom_y_punto_y_coma(self):
+        contenido = codecs.BOM_UTF8 + 'codigo;especie\nPOL-1;Niña\nPOL-2;Ñandú\n'.encode('utf-8')
+        self.assertEqual(self.filas(contenido), [
+            (2, {'codigo': 'POL-1', 'especie': 'Niña'}),
+            (3, {'codigo': 'POL-2', 'especie': 'Ñandú'}),
+        ])
+
+    def test_caracter_partido_entre_bloques(self):
+        contenido = 'codigo,especie\nPOL-1,ñññññññ\n'.encode('utf-8')
+        for tamano in range(1, 8):
+            self.assertEqual(self.filas(contenido, tamano), [(2, {'codigo': 'POL-1', 'especie': 'ñññññññ'})])
+
+    def test_paso_a_cp1252(self):
+        # Un byte cp1252 después de varios bloques UTF-8 válidos
+        contenido = ('codigo,especie\n' + 'POL-0,x\n' * 20).encode('ascii') + 'POL-1,Año\n'.encode('cp1252')
+        filas = self.filas(contenido)
+        self.assertEqual(len(filas), 21)
+        self.assertEqual(filas[-1], (22, {'codigo': 'POL-1', 'especie': 'Año'}))
+
+    def test_comillas_con_salto_de_linea(self):
+        contenido = b'codigo,observaciones\nPOL-1,"primera\nsegunda"\nPOL-2,ok\n'
+        filas = self.filas(contenido, tamano_bloque=5)
+        self.assertEqual(filas[0][1], {'codigo': 'POL-1', 'observaciones': 'primera\nsegunda'})
+        self.assertEqual(filas[1][1]['codigo'], 'POL-2')
+
+    def test_columnas_de_mas(self):
+        errores = ErroresFilas()
+        filas = self.filas(b'codigo,especie\nPOL-1,a,extra\nPOL-2,b\n', errores=errores)
+        self.assertEqual(filas, [(3, {'codigo': 'POL-2', 'especie': 'b'})])
+        self.assertEqual(errores.total, 1)
+        self.assertIn('fila 2', errores.mensajes[0])
+
+    def test_lectura_incremental(self):
+        archivo = ArchivoContado(b'codigo,especie\n' + b'POL-1,aurantiaca\n' * 100000)
+        lotes = lotes_de_filas(leer_filas(archivo, tamano_bloque=1024), tamano=10)
+        self.assertEqual(len(next(lotes)), 10)
+        # Solo se leyó la muestra para el delimitador, no el archivo completo
+        self.assertLess(archivo.leidos, 32 * 1024)
+        self.assertEqual(sum(len(lote) for lote in lotes), 100000 - 10)
+
+
+class UploadPorBloquesTest(TestCase):
+    """Las importaciones de CSV subidos usan el lector por bloques"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.user = User.objects.create_user(username='lector', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_upload_cp1252_con_punto_y_coma(self):
+        contenido = (
+            'fecha_pol;codigo;genero;especie;ubicacion\n'
+            '2024-01-10;LEC-1;Cattleya;aurantiaca;Invernadero Añejo\n'
+            'fecha-mala;LEC-2;Cattleya;aurantiaca;\n'
+        ).encode('cp1252')
+        archivo = SimpleUploadedFile('datos.csv', contenido, content_type='text/csv')
+        self.client.post('/api/upload/polinizaciones/', {'file': archivo}, format='multipart')
+        import_job_service.procesar_pendientes()
+        job = ImportJob.objects.get(usuario=self.user)
+        self.assertEqual((job.creados, job.total_errores), (1, 1))
+        self.assertEqual(Polinizacion.objects.get(codigo='LEC-1').ubicacion, 'Invernadero Añejo')
@@ -0,0 +1,101 @@
+"""
+Tests para la lectura rápida de listados con .values() (ProyeccionValores)
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from laboratorio.api.serializers import PolinizacionSerializer, GerminacionSerializer
+from laboratorio.models import Polinizacion, Germinacion, UserProfile
+from laboratorio.view_modules.polinizacion_views import PolinizacionViewSet
+from laboratorio.view_modules.germinacion_views import GerminacionViewSet
+
+
+class ProyeccionValoresTest(TestCase):
+    """La proyección produce exactamente la misma salida que el serializer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='valores', password='testpass123')
+        cls.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        cls.user.profile.save()
+        hoy = date.today()
+        Polinizacion.objects.create(
+            fechapol=hoy, fechamad=hoy + timedelta(days=90), codigo='VAL-1', genero='Cattleya',
+            especie='aurantiaca', tipo_polinizacion='HIBRIDA', estado='EN_PROCESO', disponible=True,
+            confianza_prediccion=Decimal('87.50'), fecha_maduracion_predicha=hoy + timedelta(days=120),
+            prediccion_parametros_usados='{"modelo": "xgboost"}', cantidad_capsulas=3, creado_por=cls.user
+        )
+        Polinizacion.objects.create(fechapol=hoy, codigo='VAL-2', genero='Oncidium', creado_por=cls.user)
+        Germinacion.objects.create(
+            codigo='GVAL-1', genero='Stanhopea', especie_variedad='tigrina', clima='IW',
+            fecha_siembra=hoy, prediccion_confianza=Decimal('70.00'), semilla_en_stock=True,
+            responsable='Ana', creado_por=cls.user
+        )
+        Germinacion.objects.create(codigo='GVAL-2', genero='Cattleya', responsable='Luis', creado_por=cls.user)
+
+    def json(self, datos):
+        return JSONRenderer().render(datos)
+
+    def comparar(self, Model, serializer_class, campos=None):
+        queryset = Model.objects.order_by('-fecha_creacion')
+        esperado = serializer_class(list(queryset), many=True, fields=campos).data
+        proyeccion = serializer_class.proyeccion_valores(campos)
+        self.assertIsNotNone(proyeccion)
+        self.assertEqual(self.json(proyeccion.serializar(proyeccion.valores(queryset))), self.json(esperado))
+
+    def test_paridad_polinizaciones(self):
+        self.comparar(Polinizacion, PolinizacionSerializer)
+        for preset in PolinizacionSerializer.FIELD_PRESETS:
+            self.comparar(Polinizacion, PolinizacionSerializer, PolinizacionSerializer.resolver_campos(preset=preset))
+
+    def test_paridad_germinaciones(self):
+        self.comparar(Germinacion, GerminacionSerializer)
+        for preset in GerminacionSerializer.FIELD_PRESETS:
+            self.comparar(Germinacion, GerminacionSerializer, GerminacionSerializer.resolver_campos(preset=preset))
+
+    def get(self, vista, accion, params, rapido=True):
+        request = RequestFactory().get('/', params)
+        request.user = self.user
+        viewset = vista()
+        viewset.request = request
+        viewset.format_kwarg = None
+        viewset.action = accion
+        viewset.fast_list_serialization = rapido
+        return getattr(viewset, accion)(request)
+
+    def test_paridad_endpoints(self):
+        casos = [
+            (PolinizacionViewSet, 'mis_polinizaciones', {}),
+            (PolinizacionViewSet, 'mis_polinizaciones', {'cursor': '', 'page_size': 1}),
+            (PolinizacionViewSet, 'todas_admin', {'preset': 'list'}),
+            (GerminacionViewSet, 'mis_germinaciones', {'page_size': 5000}),
+            (GerminacionViewSet, 'todas_admin', {}),
+        ]
+        for vista, accion, params in casos:
+            with self.subTest(accion=accion, params=params):
+                rapido = self.get(vista, accion, params)
+                normal = self.get(vista, accion, params, rapido=False)
+                self.assertEqual(rapido.status_code, 200)
+                self.assertEqual(self.json(rapido.data), self.json(normal.data))
+
+    def test_listado_sin_instancias(self):
+        """El listado rápido no consulta las relaciones prefetch de germinaciones"""
+        request = APIRequestFactory().get('/api/germinaciones/')
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as consultas:
+            response = GerminacionViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.data['count'], 2)
+        sql = ' '.join(q['sql'] for q in consultas.captured_queries)
+        self.assertNotIn('laboratorio_seguimientogerminacion', sql)
+        self.assertNotIn('laboratorio_capsula', sql)
+
+    def test_benchmark(self):
+        call_command('benchmark_listados', filas=10, repeticiones=1, stdout=open('/dev/null', 'w'))
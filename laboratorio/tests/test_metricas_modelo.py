@@ -0,0 +1,100 @@
+"""
+Tests para las métricas del modelo de germinación con agregados y snapshot diario
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from laboratorio.models import Germinacion, MetricaModeloDiaria, UserProfile
+from laboratorio.services.metrica_service import metrica_service
+from laboratorio.services.version_service import version_service
+
+
+class MetricasModeloTest(TestCase):
+    """Las métricas coinciden con el cálculo en Python y se leen del snapshot"""
+
+    ERRORES = [0, 2, -5, 9, -20, 14]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='metricas', password='testpass123')
+        self.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        self.user.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        base = date(2026, 1, 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, error in enumerate(self.ERRORES):
+                Germinacion.objects.create(
+                    codigo=f'MET-{i}', genero='Cattleya' if i % 2 else 'Stanhopea',
+                    prediccion_fecha_estimada=base, fecha_germinacion=base + timedelta(days=error),
+                    creado_por=self.user
+                )
+            Germinacion.objects.create(codigo='MET-PRED', prediccion_fecha_estimada=base, creado_por=self.user)
+            Germinacion.objects.create(codigo='MET-SIN', creado_por=self.user)
+
+    def test_performance_metrics(self):
+        errores = self.ERRORES
+        response = self.client.get('/api/germinaciones/performance_metrics/')
+        self.assertEqual(response.status_code, 200)
+        mae = sum(abs(e) for e in errores) / len(errores)
+        self.assertEqual(response.data, {
+            'mae': round(mae, 2),
+            'rmse': round((sum(e ** 2 for e in errores) / len(errores)) ** 0.5, 2),
+            'accuracy_7dias': round(sum(1 for e in errores if abs(e) <= 7) / len(errores) * 100, 1),
+            'accuracy_14dias': round(sum(1 for e in errores if abs(e) <= 14) / len(errores) * 100, 1),
+            'total_evaluadas': len(errores),
+            'error_promedio_dias': round(mae, 1),
+        })
+
+    def test_precision_y_estado(self):
+        response = self.client.get('/api/germinaciones/estadisticas_precision_modelo/')
+        self.assertEqual(response.data['total_predicciones'], 7)
+        self.assertEqual(response.data['predicciones_validadas'], 6)
+        self.assertEqual(response.data['distribucion_precision'],
+                         {'excelente': 2, 'buena': 1, 'aceptable': 2, 'baja': 1})
+
+        estado = self.client.get('/api/germinaciones/estado_modelo/').data['estadisticas']
+        self.assertEqual(estado, {'total_germinaciones': 8, 'con_prediccion': 7, 'validadas': 6, 'cobertura': 87.5})
+
+    def test_snapshot_y_invalidacion(self):
+        self.client.get('/api/germinaciones/performance_metrics/')
+        self.assertEqual(MetricaModeloDiaria.objects.count(), 1)
+        with self.assertNumQueries(0):
+            self.client.get('/api/germinaciones/estado_modelo/')
+
+        # Sin la entrada en la cache se lee el snapshot del día, sin recorrer la tabla
+        cache.delete(metrica_service._clave(timezone.localdate(), version_service.version('germinacion')))
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/germinaciones/estado_modelo/')
+        self.assertEqual(response.data['estadisticas']['validadas'], 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            germinacion = Germinacion.objects.get(codigo='MET-PRED')
+            germinacion.fecha_germinacion = germinacion.prediccion_fecha_estimada
+            germinacion.save()
+        response = self.client.get('/api/germinaciones/estado_modelo/')
+        self.assertEqual(response.data['estadisticas']['validadas'], 7)
+        self.assertEqual(MetricaModeloDiaria.objects.count(), 1)
+
+    def test_agrupado(self):
+        response = self.client.get('/api/germinaciones/performance_metrics/', {'agrupar': 'genero'})
+        grupos = {g['genero']: g for g in response.data['grupos']}
+        self.assertEqual(grupos['Stanhopea']['total_evaluadas'], 3)
+        self.assertEqual(grupos['Stanhopea']['mae'], round((0 + 5 + 20) / 3, 2))
+        self.assertEqual(grupos['Cattleya']['accuracy_14dias'], 100.0)
+
+        meses = self.client.get('/api/germinaciones/performance_metrics/', {'agrupar': 'mes'}).data['grupos']
+        self.assertEqual([m['mes'] for m in meses], ['2025-12', '2026-01'])
+        self.assertEqual(self.client.get('/api/germinaciones/performance_metrics/', {'agrupar': 'x'}).status_code, 400)
+
+    def test_historial(self):
+        call_command('registrar_metricas_modelo', stdout=open('/dev/null', 'w'))
+        historial = self.client.get('/api/germinaciones/historial_metricas/').data['historial']
+        self.assertEqual(len(historial), 1)
+        self.assertEqual(historial[0]['total_evaluadas'], 6)
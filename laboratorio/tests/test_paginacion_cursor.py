@@ -0,0 +1,153 @@
+"""
+Tests para la paginación por cursor (keyset) de polinizaciones y germinaciones
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from laboratorio.models import Polinizacion, Germinacion
+from laboratorio.services.polinizacion_service import polinizacion_service
+from laboratorio.services.germinacion_service import germinacion_service
+from laboratorio.view_modules.polinizacion_views import PolinizacionViewSet
+
+
+class PaginacionCursorServiceTest(TestCase):
+    """Tests del recorrido por cursor en los servicios"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cursoruser', password='testpass123')
+        base = timezone.now()
+        for i in range(25):
+            pol = Polinizacion.objects.create(
+                fechapol=date.today(),
+                codigo=f"CUR{i:03d}",
+                genero="Cattleya",
+                especie="aurantiaca",
+                creado_por=self.user
+            )
+            # Forzar empates de fecha_creacion cada tres registros
+            Polinizacion.objects.filter(pk=pol.pk).update(
+                fecha_creacion=base - timedelta(minutes=i // 3)
+            )
+        # Un registro sin fecha de creación debe aparecer al final
+        self.sin_fecha = Polinizacion.objects.create(
+            fechapol=date.today(), codigo="CURNULL", creado_por=self.user
+        )
+        Polinizacion.objects.filter(pk=self.sin_fecha.pk).update(fecha_creacion=None)
+
+        self.orden_esperado = list(
+            Polinizacion.objects.filter(creado_por=self.user, fecha_creacion__isnull=False)
+            .order_by('-fecha_creacion', '-numero')
+            .values_list('numero', flat=True)
+        ) + [self.sin_fecha.pk]
+
+    def test_recorrido_completo_hacia_adelante(self):
+        """Recorrer todas las páginas con next_cursor devuelve cada registro una vez y en orden"""
+        vistos = []
+        cursor = None
+        while True:
+            result = polinizacion_service.get_mis_polinizaciones_cursor(
+                user=self.user, cursor=cursor, page_size=10
+            )
+            vistos.extend(p.pk for p in result['results'])
+            if not result['has_next']:
+                break
+            cursor = result['next_cursor']
+
+        self.assertEqual(vistos, self.orden_esperado)
+        self.assertIsNone(result['next_cursor'])
+
+    def test_prev_cursor_regresa_a_la_pagina_anterior(self):
+        """prev_cursor devuelve exactamente la página anterior"""
+        primera = polinizacion_service.get_mis_polinizaciones_cursor(user=self.user, page_size=10)
+        segunda = polinizacion_service.get_mis_polinizaciones_cursor(
+            user=self.user, cursor=primera['next_cursor'], page_size=10
+        )
+        self.assertFalse(primera['has_previous'])
+        self.assertIsNone(primera['prev_cursor'])
+        self.assertTrue(segunda['has_previous'])
+
+        anterior = polinizacion_service.get_mis_polinizaciones_cursor(
+            user=self.user, cursor=segunda['prev_cursor'], page_size=10
+        )
+        self.assertEqual(
+            [p.pk for p in anterior['results']],
+            [p.pk for p in primera['results']]
+        )
+        self.assertFalse(anterior['has_previous'])
+        self.assertTrue(anterior['has_next'])
+
+    def test_conteo_solo_bajo_demanda(self):
+        """El conteo total solo se incluye cuando se solicita"""
+        sin_conteo = polinizacion_service.get_mis_polinizaciones_cursor(user=self.user, page_size=5)
+        self.assertNotIn('count', sin_conteo)
+
+        con_conteo = polinizacion_service.get_mis_polinizaciones_cursor(
+            user=self.user, page_size=5, include_count=True
+        )
+        self.assertEqual(con_conteo['count'], 26)
+
+    def test_cursor_invalido(self):
+        """Un cursor manipulado lanza ValidationError"""
+        with self.assertRaises(ValidationError):
+            polinizacion_service.get_mis_polinizaciones_cursor(user=self.user, cursor='no-es-un-cursor')
+
+    def test_germinaciones_por_cursor(self):
+        """El servicio de germinaciones usa el mismo recorrido por cursor"""
+        for i in range(5):
+            Germinacion.objects.create(
+                codigo=f"GCUR{i}",
+                especie_variedad="aurantiaca",
+                responsable="Test",
+                creado_por=self.user
+            )
+        primera = germinacion_service.get_mis_germinaciones_cursor(user=self.user, page_size=3)
+        segunda = germinacion_service.get_mis_germinaciones_cursor(
+            user=self.user, cursor=primera['next_cursor'], page_size=3
+        )
+        self.assertEqual(len(primera['results']), 3)
+        self.assertEqual(len(segunda['results']), 2)
+        self.assertFalse(segunda['has_next'])
+
+
+class PaginacionCursorViewTest(TestCase):
+    """Tests del parámetro ?cursor= en mis-polinizaciones"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='cursorview', password='testpass123')
+        for i in range(3):
+            Polinizacion.objects.create(
+                fechapol=date.today(), codigo=f"VCUR{i}", creado_por=self.user
+            )
+        self.viewset = PolinizacionViewSet()
+
+    def _get(self, params):
+        request = self.factory.get('/api/polinizaciones/mis-polinizaciones/', params)
+        request.user = self.user
+        self.viewset.request = request
+        self.viewset.format_kwarg = None
+        return self.viewset.mis_polinizaciones(request)
+
+    def test_respuesta_con_cursor(self):
+        """Con ?cursor= la respuesta trae next_cursor/prev_cursor y no count"""
+        response = self._get({'cursor': '', 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next_cursor'])
+        self.assertIsNone(response.data['prev_cursor'])
+        self.assertNotIn('count', response.data)
+
+        siguiente = self._get({'cursor': response.data['next_cursor'], 'page_size': 2, 'include_count': 'true'})
+        self.assertEqual(len(siguiente.data['results']), 1)
+        self.assertEqual(siguiente.data['count'], 3)
+
+    def test_respuesta_sin_cursor_no_cambia(self):
+        """Sin ?cursor= se mantiene la paginación por número de página"""
+        response = self._get({'page': 1, 'page_size': 20})
+        self.assertIn('total_pages', response.data)
+        self.assertNotIn('next_cursor', response.data)
@@ -0,0 +1,101 @@
+"""
+Tests para el plan de consulta por acción (query_plans) de los viewsets
+de polinizaciones y germinaciones: el número de consultas no depende de
+la cantidad de registros ni de sus relaciones
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from laboratorio.models import Polinizacion, Germinacion, SeguimientoGerminacion, UserProfile
+from laboratorio.view_modules.polinizacion_views import PolinizacionViewSet
+from laboratorio.view_modules.germinacion_views import GerminacionViewSet
+
+
+class PlanConsultasTest(TestCase):
+    """Consultas por acción con el plan declarado en cada viewset"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='plan', password='testpass123')
+        cls.user.profile.rol = UserProfile.Roles.SYSTEM_MANAGER
+        cls.user.profile.save()
+        hoy = date.today()
+        for i in range(5):
+            pol = Polinizacion.objects.create(
+                fechapol=hoy - timedelta(days=60), codigo=f'PLAN-{i}', genero='Cattleya',
+                especie='aurantiaca', prediccion_fecha_estimada=hoy + timedelta(days=3),
+                fecha_proxima_revision=hoy, creado_por=cls.user
+            )
+            germinacion = Germinacion.objects.create(
+                codigo=f'GPLAN-{i}', genero='Cattleya', responsable='Ana', polinizacion=pol,
+                fecha_siembra=hoy - timedelta(days=30), prediccion_fecha_estimada=hoy + timedelta(days=3),
+                fecha_proxima_revision=hoy, creado_por=cls.user
+            )
+            SeguimientoGerminacion.objects.create(germinacion=germinacion, fecha=hoy, observaciones='ok')
+        cls.pol, cls.germinacion = pol, germinacion
+
+    def setUp(self):
+        cache.clear()
+        # El perfil queda en la instancia: las comprobaciones de rol no consultan
+        self.user.profile
+
+    def consultas(self, vista, accion, url='/', **kwargs):
+        request = APIRequestFactory().get(url)
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as consultas:
+            response = vista.as_view({'get': accion})(request, **kwargs)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [q['sql'] for q in consultas.captured_queries]
+
+    def test_consultas_por_accion(self):
+        # list: COUNT + página; el resto, un único SELECT
+        casos = [
+            (PolinizacionViewSet, 'list', {}, 2),
+            (PolinizacionViewSet, 'retrieve', {'pk': self.pol.pk}, 1),
+            (PolinizacionViewSet, 'alertas_polinizacion', {}, 1),
+            (PolinizacionViewSet, 'pendientes_revision', {}, 1),
+            (GerminacionViewSet, 'list', {}, 2),
+            (GerminacionViewSet, 'retrieve', {'pk': self.germinacion.pk}, 1),
+            (GerminacionViewSet, 'alertas_germinacion', {}, 1),
+            (GerminacionViewSet, 'pendientes_revision', {}, 1),
+        ]
+        for vista, accion, kwargs, esperadas in casos:
+            with self.subTest(vista=vista.__name__, accion=accion):
+                sql = self.consultas(vista, accion, **kwargs)
+                self.assertEqual(len(sql), esperadas)
+
+    def test_consultas_no_crecen_con_los_registros(self):
+        antes = len(self.consultas(GerminacionViewSet, 'pendientes_revision'))
+        for i in range(5):
+            Germinacion.objects.create(
+                codigo=f'GPLAN-X{i}', genero='Cattleya', responsable='Ana',
+                fecha_proxima_revision=date.today(), creado_por=self.user
+            )
+        self.assertEqual(len(self.consultas(GerminacionViewSet, 'pendientes_revision')), antes)
+
+    def test_listados_sin_relaciones(self):
+        """Los listados no hacen join con el usuario ni consultan seguimientos"""
+        for vista, accion in [
+            (PolinizacionViewSet, 'pendientes_revision'),
+            (GerminacionViewSet, 'pendientes_revision'),
+            (GerminacionViewSet, 'alertas_germinacion'),
+        ]:
+            with self.subTest(vista=vista.__name__, accion=accion):
+                sql = ' '.join(self.consultas(vista, accion))
+                self.assertNotIn('auth_user', sql)
+                self.assertNotIn('laboratorio_seguimientogerminacion', sql)
+
+    def test_plan_por_defecto(self):
+        viewset = GerminacionViewSet()
+        viewset.action = 'marcar_revisado'
+        self.assertEqual(viewset.get_query_plan(), GerminacionViewSet.query_plans['*'])
+        viewset.action = 'alertas_germinacion'
+        campos, _ = viewset.get_queryset().query.deferred_loading
+        self.assertIn('prediccion_fecha_estimada', campos)
+        self.assertNotIn('observaciones', campos)
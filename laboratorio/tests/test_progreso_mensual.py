@@ -0,0 +1,86 @@
+"""
+Tests para los contadores de progreso mensual por usuario
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from laboratorio.models import Polinizacion, Germinacion, ProgresoMensual, UserProfile
+from laboratorio.services.progreso_service import progreso_service, primer_dia_mes
+
+
+class ProgresoMensualTest(TestCase):
+    """Mantenimiento incremental de ProgresoMensual y del progreso del perfil"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='progreso', password='testpass123')
+        self.user.profile.rol = UserProfile.Roles.SENIOR_TECH
+        self.user.profile.meta_polinizaciones = 4
+        self.user.profile.save()
+        self.hoy = date.today()
+        self.mes = primer_dia_mes(self.hoy)
+
+    def fila(self, mes=None):
+        return ProgresoMensual.objects.filter(usuario=self.user, mes=mes or self.mes).first()
+
+    def crear_polinizacion(self, codigo, **campos):
+        datos = dict(fechapol=self.hoy, codigo=codigo, genero='Cattleya', especie='aurantiaca',
+                     creado_por=self.user)
+        datos.update(campos)
+        return Polinizacion.objects.create(**datos)
+
+    def test_alta_cambio_de_estado_y_baja(self):
+        pol = self.crear_polinizacion('PROG-1')
+        self.crear_polinizacion('PROG-2', estado='LISTA')
+        fila = self.fila()
+        self.assertEqual((fila.polinizaciones, fila.polinizaciones_exitosas), (2, 1))
+
+        pol.estado = 'LISTA'
+        pol.save()
+        self.assertEqual(self.fila().polinizaciones_exitosas, 2)
+
+        pol.delete()
+        fila = self.fila()
+        self.assertEqual((fila.polinizaciones, fila.polinizaciones_exitosas), (1, 1))
+
+    def test_cambio_de_mes(self):
+        pol = self.crear_polinizacion('PROG-3')
+        mes_anterior = primer_dia_mes(self.mes - timedelta(days=1))
+        pol.fechapol = mes_anterior
+        pol.save(update_fields=['fechapol'])
+        self.assertEqual(self.fila().polinizaciones, 0)
+        self.assertEqual(self.fila(mes_anterior).polinizaciones, 1)
+
+    def test_progreso_del_perfil(self):
+        self.crear_polinizacion('PROG-4', estado='LISTA')
+        self.crear_polinizacion('PROG-5')
+        Germinacion.objects.create(codigo='GPROG-1', genero='Stanhopea', fecha_siembra=self.hoy,
+                                   estado_capsula='ABIERTA', creado_por=self.user)
+
+        perfil = UserProfile.objects.get(user=self.user)
+        self.assertEqual(perfil.polinizaciones_actuales, 2)
+        self.assertEqual(perfil.germinaciones_actuales, 1)
+        self.assertEqual(float(perfil.tasa_exito_actual), round(2 / 3 * 100, 2))
+        self.assertEqual(perfil.obtener_progreso_meta_polinizaciones(), 50.0)
+
+    def test_guardar_sin_cambios_no_consulta_contadores(self):
+        pol = self.crear_polinizacion('PROG-6')
+        with CaptureQueriesContext(connection) as consultas:
+            pol.save(update_fields=['observaciones'])
+        sql = ' '.join(q['sql'] for q in consultas.captured_queries)
+        self.assertNotIn('progresomensual', sql)
+        self.assertNotIn('userprofile', sql)
+        self.assertNotIn('COUNT', sql)
+
+    def test_rebuild(self):
+        self.crear_polinizacion('PROG-7', estado='LISTA')
+        ProgresoMensual.objects.all().delete()
+        ProgresoMensual.objects.create(usuario=self.user, mes=self.mes, polinizaciones=99)
+
+        progreso_service.rebuild(meses=2)
+        fila = self.fila()
+        self.assertEqual((fila.polinizaciones, fila.polinizaciones_exitosas), (1, 1))
+        self.assertEqual(UserProfile.objects.get(user=self.user).polinizaciones_actuales, 1)
@@ -0,0 +1,98 @@
+"""
+Tests para el envío de recordatorios por conjuntos (RecordatorioService.enviar)
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from laboratorio.models import Germinacion, Notification, Polinizacion
+from laboratorio.services.recordatorio_service import recordatorio_service
+
+
+class EnvioRecordatoriosTest(TestCase):
+    """Selección con anti-join, inserción por lotes y sin duplicados"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='recordatorios', password='testpass123')
+        self.hoy = timezone.localdate()
+        hace = lambda dias: self.hoy - timedelta(days=dias)
+        for i in range(4):
+            Germinacion.objects.create(codigo=f'REC-G{i}', fecha_siembra=hace(6 + i), creado_por=self.user)
+        Germinacion.objects.create(codigo='REC-G-RECIENTE', fecha_siembra=hace(2), creado_por=self.user)
+        Germinacion.objects.create(codigo='REC-G-IMPORTADA', fecha_siembra=hace(9), creado_por=self.user,
+                                   archivo_origen='historico.csv')
+        Germinacion.objects.create(codigo='REC-G-PRED', fecha_siembra=hace(1), creado_por=self.user,
+                                   prediccion_fecha_estimada=self.hoy + timedelta(days=5))
+        for i in range(3):
+            Polinizacion.objects.create(codigo=f'REC-P{i}', fechapol=hace(10 + i), creado_por=self.user,
+                                        madre_genero='Cattleya', madre_especie='aurantiaca')
+        Polinizacion.objects.create(codigo='REC-P-PRED', fechapol=hace(1), creado_por=self.user,
+                                    fecha_maduracion_predicha=self.hoy + timedelta(days=5))
+        # Un registro con el recordatorio ya creado (sin marcar) no se repite
+        ya_avisada = Germinacion.objects.get(codigo='REC-G3')
+        Notification.objects.create(usuario=self.user, germinacion=ya_avisada, tipo='RECORDATORIO_5_DIAS',
+                                    titulo='Previo', mensaje='x')
+        Notification.objects.filter(tipo__startswith='RECORDATORIO').exclude(germinacion=ya_avisada).delete()
+        Germinacion.objects.update(recordatorio_5_dias_enviado=False)
+        Polinizacion.objects.update(recordatorio_5_dias_enviado=False)
+
+    def codigos(self, tipo):
+        return sorted(Notification.objects.filter(tipo=tipo).exclude(titulo='Previo').values_list(
+            'detalles_adicionales__codigo', flat=True))
+
+    def test_envio(self):
+        resultado = recordatorio_service.enviar(hoy=self.hoy)
+        self.assertEqual(resultado['total'], 8)
+        self.assertEqual(self.codigos('RECORDATORIO_5_DIAS'),
+                         ['REC-G0', 'REC-G1', 'REC-G2', 'REC-P0', 'REC-P1', 'REC-P2'])
+        self.assertEqual(self.codigos('RECORDATORIO_PREDICCION'), ['REC-G-PRED', 'REC-P-PRED'])
+        self.assertEqual(set(resultado['tiempos']), {'seleccion', 'construccion', 'insercion'})
+        self.assertEqual(
+            set(Germinacion.objects.filter(recordatorio_5_dias_enviado=True).values_list('codigo', flat=True)),
+            {'REC-G0', 'REC-G1', 'REC-G2'}
+        )
+        notificacion = Notification.objects.get(detalles_adicionales__codigo='REC-P0', tipo='RECORDATORIO_5_DIAS')
+        self.assertEqual(notificacion.usuario, self.user)
+        self.assertIn('Cattleya aurantiaca', notificacion.mensaje)
+        self.assertEqual(notificacion.detalles_adicionales['dias_transcurridos'], 10)
+
+        # Una segunda ejecución no duplica nada
+        self.assertEqual(recordatorio_service.enviar(hoy=self.hoy)['total'], 0)
+
+    def test_consultas_constantes(self):
+        """4 selecciones, 1 inserción, 1 contador, 2 marcados y el savepoint: no depende del número de registros"""
+        with self.assertNumQueries(10):
+            recordatorio_service.enviar(hoy=self.hoy)
+
+    def test_comando_dry_run(self):
+        out = StringIO()
+        total = call_command('enviar_recordatorios_automaticos', dry_run=True, stdout=out)
+        self.assertEqual(total, '8')
+        self.assertIn('Tiempos: selección', out.getvalue())
+        self.assertEqual(Notification.objects.filter(tipo__startswith='RECORDATORIO').count(), 1)
+
+    def test_al_crear(self):
+        polinizacion = Polinizacion.objects.create(
+            codigo='REC-NUEVA', fechapol=self.hoy - timedelta(days=8), creado_por=self.user
+        )
+        Notification.objects.filter(polinizacion=polinizacion).delete()
+        self.assertTrue(recordatorio_service.verificar_y_notificar_polinizacion(polinizacion))
+        notificacion = Notification.objects.get(polinizacion=polinizacion, tipo='RECORDATORIO_5_DIAS')
+        self.assertTrue(notificacion.detalles_adicionales['enviado_al_crear'])
+        polinizacion.refresh_from_db()
+        self.assertTrue(polinizacion.recordatorio_5_dias_enviado)
+        self.assertFalse(recordatorio_service.verificar_y_notificar_polinizacion(polinizacion))
+
+    def test_recordatorio_de_otro_usuario(self):
+        """Un recordatorio enviado a otro usuario no suprime el del creador"""
+        otro = User.objects.create_user(username='recordatorios_otro', password='testpass123')
+        germinacion = Germinacion.objects.get(codigo='REC-G0')
+        Notification.objects.create(usuario=otro, germinacion=germinacion, tipo='RECORDATORIO_5_DIAS',
+                                    titulo='Previo', mensaje='x')
+        candidatos = recordatorio_service.candidatos_revision(Germinacion, self.hoy - timedelta(days=5))
+        self.assertIn(germinacion, candidatos)
+        self.assertNotIn(Germinacion.objects.get(codigo='REC-G3'), candidatos)
@@ -0,0 +1,134 @@
+"""
+Tests para las reimportaciones idempotentes (clave y hash de la fila de origen)
+"""
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from laboratorio.models import CodigoAutocompletado, FacetaFiltro, ImportJob, Polinizacion, SearchDocument
+from laboratorio.services.faceta_service import faceta_service
+from laboratorio.services.importacion_service import importacion_service
+
+from .test_importacion import csv_polinizaciones
+
+CABECERA = 'codigo,genero,especie,ubicacion,fechapol,cantidad\n'
+
+
+class ReimportacionComandoTest(TestCase):
+    """import_polinizaciones_csv --update solo toca las filas que cambiaron"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='historico', password='testpass123')
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = os.path.join(directorio, 'mensual.csv')
+
+    def importar(self, *filas):
+        with open(self.ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(CABECERA + ''.join(filas))
+        out = StringIO()
+        call_command('import_polinizaciones_csv', file=self.ruta, user='historico', update=True, stdout=out)
+        return out.getvalue()
+
+    def facetas(self):
+        return set(FacetaFiltro.objects.values_list('modelo', 'campo', 'contexto', 'valor', 'total'))
+
+    def test_solo_el_delta(self):
+        filas = [
+            'R-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010,1\n',
+            'R-2,Cattleya,aurantiaca,V-13 M-1A P-C,09/10/2010,2\n',
+            'R-3,Masdevallia,veitchiana,V-2 M-1B P-A,10/10/2010,1\n',
+        ]
+        self.assertIn('3 polinizaciones nuevas importadas', self.importar(*filas))
+        r2 = Polinizacion.objects.get(codigo='R-2')
+        self.assertEqual(r2.clave_origen, 'mensual.csv#3')
+        self.assertEqual(len(r2.hash_origen), 64)
+        # Un campo que el archivo no trae y el laboratorio editó
+        Polinizacion.objects.filter(pk=r2.pk).update(observaciones='revisada')
+
+        salida = self.importar(*filas)
+        self.assertIn('0 polinizaciones nuevas importadas', salida)
+        self.assertIn('0 polinizaciones actualizadas', salida)
+        self.assertIn('3 polinizaciones sin cambios', salida)
+
+        filas[1] = 'R-2B,Oncidium,flexuosum,V-13 M-1A P-C,09/10/2010,5\n'
+        salida = self.importar(*filas, 'R-4,Cattleya,aurantiaca,V-13 M-1A P-C,11/10/2010,1\n')
+        self.assertIn('1 polinizaciones nuevas importadas', salida)
+        self.assertIn('1 polinizaciones actualizadas', salida)
+        self.assertIn('2 polinizaciones sin cambios', salida)
+
+        self.assertEqual(Polinizacion.objects.count(), 4)
+        r2.refresh_from_db()
+        self.assertEqual((r2.codigo, r2.genero, r2.cantidad), ('R-2B', 'Oncidium', 5))
+        self.assertEqual(r2.observaciones, 'revisada')
+        self.assertFalse(CodigoAutocompletado.objects.get(codigo='R-2').activo)
+        self.assertTrue(CodigoAutocompletado.objects.get(codigo='R-2B').activo)
+
+        # Las facetas descuentan los valores anteriores de la fila modificada
+        incrementales = self.facetas()
+        FacetaFiltro.objects.all().delete()
+        faceta_service.rebuild('polinizacion')
+        self.assertEqual(self.facetas(), incrementales)
+
+    def test_motor_sin_claves_de_bulk_create(self):
+        bulk_create = Polinizacion.objects.bulk_create
+
+        def sin_claves(lote, *args, **kwargs):
+            creados = bulk_create(lote, *args, **kwargs)
+            for instance in creados:
+                instance.pk = None
+            return creados
+
+        with mock.patch.object(Polinizacion.objects, 'bulk_create', side_effect=sin_claves):
+            self.importar('R-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010,1\n')
+            self.importar('R-1,Cattleya,aurantiaca,V-13 M-1A P-C,08/10/2010,1\n',
+                          'R-2,Cattleya,aurantiaca,V-13 M-1A P-C,09/10/2010,2\n')
+            r2 = Polinizacion.objects.get(codigo='R-2')
+            self.assertTrue(SearchDocument.objects.filter(modelo='laboratorio.polinizacion', object_id=r2.pk).exists())
+            self.assertTrue(CodigoAutocompletado.objects.get(codigo='R-2').activo)
+
+            # Sin fila de origen no hay cómo recuperarlas: la importación falla
+            with self.assertRaises(ValueError):
+                importacion_service.importar(Polinizacion, [Polinizacion(codigo='R-3')])
+        self.assertFalse(Polinizacion.objects.filter(codigo='R-3').exists())
+
+
+class ReimportacionUploadTest(TestCase):
+    """Las cargas desde la API sincronizan con la anterior del mismo archivo si se pide"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.user = User.objects.create_user(username='sincroniza', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def subir(self, contenido, **datos):
+        archivo = SimpleUploadedFile('mensual.csv', contenido.encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/api/upload/polinizaciones/', {'file': archivo, **datos}, format='multipart')
+        call_command('procesar_importaciones', stdout=StringIO())
+        return self.client.get(response.data['status_url']).data
+
+    def test_sincronizar(self):
+        self.assertEqual(self.subir(csv_polinizaciones(3))['creados'], 3)
+
+        estado = self.subir(csv_polinizaciones(4), sincronizar='true')
+        self.assertEqual(estado['estado'], 'COMPLETADO')
+        self.assertEqual((estado['creados'], estado['actualizados'], estado['sin_cambios']), (1, 0, 3))
+        self.assertEqual(Polinizacion.objects.count(), 4)
+
+        # Sin sincronizar, cada carga inserta todas sus filas
+        self.assertEqual(self.subir(csv_polinizaciones(4))['creados'], 4)
+        self.assertEqual(ImportJob.objects.filter(sincronizar=True).count(), 1)
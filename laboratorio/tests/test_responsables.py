@@ -0,0 +1,80 @@
+"""
+Tests para la resolución del responsable en texto libre (responsable_service)
+"""
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from laboratorio.models import Germinacion, Notification, Polinizacion
+from laboratorio.services.responsable_service import responsable_service
+
+
+class ResponsablesTest(TestCase):
+    """El mapa se carga una vez, se renueva con los usuarios y vincula la FK"""
+
+    def setUp(self):
+        self.ana = User.objects.create_user(username='ana', password='x', first_name='Ana', last_name='Pérez')
+        self.luis = User.objects.create_user(username='luis', password='x', first_name='Luis', last_name='Mora')
+
+    def test_resolver(self):
+        mapa = responsable_service.mapa()
+        with self.assertNumQueries(0):
+            self.assertEqual(responsable_service.resolver('ana', mapa), self.ana.pk)
+            self.assertEqual(responsable_service.resolver('  ANA  pérez ', mapa), self.ana.pk)
+            self.assertIsNone(responsable_service.resolver('desconocido', mapa))
+            self.assertIsNone(responsable_service.resolver('', mapa))
+
+        # Un nombre completo repetido no resuelve; el nombre de usuario sí
+        User.objects.create_user(username='ana2', password='x', first_name='Ana', last_name='Pérez')
+        self.assertIsNone(responsable_service.resolver('Ana Pérez'))
+        self.assertIsNotNone(responsable_service.resolver('ana2'))
+
+    def test_login_no_reconstruye(self):
+        responsable_service.mapa()
+        self.ana.last_login = self.ana.date_joined
+        self.ana.save()
+        with self.assertNumQueries(0):
+            responsable_service.mapa()
+
+    def test_vinculo_al_guardar_y_al_renombrar(self):
+        polinizacion = Polinizacion.objects.create(codigo='RESP-1', responsable='Luis Mora')
+        self.assertEqual(polinizacion.responsable_usuario_id, self.luis.pk)
+        germinacion = Germinacion.objects.create(codigo='RESP-G', responsable='marta')
+        self.assertIsNone(germinacion.responsable_usuario_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            marta = User.objects.create_user(username='marta', password='x')
+        germinacion.refresh_from_db()
+        self.assertEqual(germinacion.responsable_usuario_id, marta.pk)
+
+    def test_update_fields_responsable(self):
+        polinizacion = Polinizacion.objects.create(codigo='RESP-2', responsable='Luis Mora')
+        germinacion = Germinacion.objects.create(codigo='RESP-G2', responsable='luis')
+        for registro in (polinizacion, germinacion):
+            registro.responsable = 'ana'
+            registro.save(update_fields=['responsable'])
+            registro.refresh_from_db()
+            self.assertEqual(registro.responsable_usuario_id, self.ana.pk)
+
+    def test_comando_vincular(self):
+        Polinizacion.objects.create(codigo='RESP-2', responsable='ana')
+        Germinacion.objects.create(codigo='RESP-G2', responsable='Ana Pérez')
+        Germinacion.objects.update(responsable_usuario=None)
+        Polinizacion.objects.update(responsable_usuario=None)
+
+        call_command('vincular_responsables', stdout=StringIO())
+        self.assertEqual(Polinizacion.objects.get(codigo='RESP-2').responsable_usuario, self.ana)
+        self.assertEqual(Germinacion.objects.get(codigo='RESP-G2').responsable_usuario, self.ana)
+
+    def test_alertas_revision_por_responsable(self):
+        hoy = date.today()
+        Germinacion.objects.create(
+            codigo='RESP-REV', responsable='luis', fecha_proxima_revision=hoy - timedelta(days=1),
+            estado_germinacion='INICIAL'
+        )
+        call_command('generar_alertas_revision', stdout=StringIO())
+        notificacion = Notification.objects.get(tipo='RECORDATORIO_REVISION')
+        self.assertEqual(notificacion.usuario, self.luis)
@@ -0,0 +1,46 @@
+"""
+Utilidades de paginación por cursor (keyset)
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_datetime
+
+
+CURSOR_NEXT = 'n'
+CURSOR_PREV = 'p'
+
+
+def encode_cursor(fecha: Optional[datetime], pk: Any, direccion: str = CURSOR_NEXT) -> str:
+    """
+    Codifica la posición (fecha_creacion, pk) de un registro en un token opaco
+    """
+    payload = {
+        'f': fecha.isoformat() if fecha else None,
+        'k': pk,
+        'd': direccion,
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """
+    Decodifica un token generado por encode_cursor.
+    Lanza ValidationError si el token no es válido.
+    """
+    try:
+        padding = '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(token + padding).decode('utf-8'))
+        fecha = parse_datetime(payload['f']) if payload.get('f') else None
+        if payload.get('f') and fecha is None:
+            raise ValueError('fecha inválida')
+        direccion = payload.get('d', CURSOR_NEXT)
+        if direccion not in (CURSOR_NEXT, CURSOR_PREV):
+            raise ValueError('dirección inválida')
+        return {'fecha': fecha, 'pk': int(payload['k']), 'direccion': direccion}
+    except (ValueError, TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValidationError("Cursor de paginación inválido")
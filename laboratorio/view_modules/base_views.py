@@ -8,6 +8,7 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from functools import wraps
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,13 +21,93 @@ class OptimizedPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class BaseServiceViewSet(viewsets.ModelViewSet):
+def respuesta_no_modificada(etag):
+    """Respuesta 304 sin cuerpo con el ETag vigente"""
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def etag_condicional(tablas=(), tablas_usuario=()):
+    """
+    Decorador para vistas de función (debajo de @api_view/@permission_classes):
+    calcula el ETag de la petición con las versiones de `tablas` (globales) y
+    `tablas_usuario` (del usuario autenticado) y responde 304 si el cliente
+    ya tiene esa versión en If-None-Match, sin ejecutar la vista
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            from ..services.version_service import version_service
+
+            etag = version_service.etag(request, tablas, tablas_usuario)
+            if version_service.coincide(request, etag):
+                return respuesta_no_modificada(etag)
+            response = vista(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+            return response
+        return envoltura
+    return decorador
+
+
+class NoModificado(Exception):
+    """Corta la ejecución de una acción cuyo ETag coincide con If-None-Match"""
+
+    def __init__(self, etag):
+        super().__init__(etag)
+        self.etag = etag
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / If-None-Match -> 304) para ViewSets.
+
+    etag_actions indica, por acción, de qué tablas depende la respuesta:
+    {'accion': (tablas_globales, tablas_del_usuario)}. El ETag se calcula
+    después de autenticar y verificar permisos y antes de ejecutar la
+    acción, de modo que una respuesta sin cambios no consulta ni serializa
+    nada.
+    """
+    etag_actions = {}
+
+    def initial(self, request, *args, **kwargs):
+        self._etag = None
+        super().initial(request, *args, **kwargs)
+        dependencias = self.etag_actions.get(getattr(self, 'action', None))
+        if request.method != 'GET' or not dependencias:
+            return
+
+        from ..services.version_service import version_service
+
+        self._etag = version_service.etag(request, *dependencias)
+        if version_service.coincide(request, self._etag):
+            raise NoModificado(self._etag)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NoModificado):
+            return respuesta_no_modificada(exc.etag)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+        if etag and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+
+class BaseServiceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet base que utiliza servicios de negocio
     """
     service_class = None
     pagination_class = OptimizedPagination
     permission_classes = [IsAuthenticated]
+    # Serializar los listados con .values() cuando el serializer lo permite
+    fast_list_serialization = True
+    # Plan de consulta por acción: {accion: {'select': (...), 'prefetch': (...),
+    # 'only': (...) o 'serializer'}}; '*' es el plan por defecto. Sin plan
+    # para la acción se usa el queryset tal como lo arma get_queryset().
+    query_plans = {}
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -39,10 +120,168 @@ class BaseServiceViewSet(viewsets.ModelViewSet):
             return self.service.get_all(user=self.request.user)
         return super().get_queryset()
     
+    def get_query_plan(self):
+        """Plan de consulta de la acción actual (o el plan '*'), o None"""
+        return self.query_plans.get(getattr(self, 'action', None), self.query_plans.get('*'))
+
+    def apply_query_plan(self, queryset):
+        """
+        Aplica al queryset los joins, prefetch y columnas del plan de la
+        acción. Con 'only': 'serializer' se leen solo las columnas del
+        modelo que usa el serializer de la acción.
+        """
+        plan = self.get_query_plan()
+        if plan is None:
+            return queryset
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if plan.get('select'):
+            queryset = queryset.select_related(*plan['select'])
+        if plan.get('prefetch'):
+            queryset = queryset.prefetch_related(*plan['prefetch'])
+        only = plan.get('only')
+        if only == 'serializer':
+            serializer_class = self.get_serializer_class()
+            only = None
+            if hasattr(serializer_class, 'campos_modelo'):
+                only = serializer_class.campos_modelo(serializer_class.Meta.fields)
+        if only:
+            queryset = queryset.only(*only)
+        return queryset
+
+    def get_field_selection(self):
+        """
+        Campos pedidos con ?fields=, ?omit= o ?preset= (solo en peticiones GET
+        y con serializers que usan DynamicFieldsMixin), o None para todos
+        """
+        request = getattr(self, 'request', None)
+        if request is None or request.method != 'GET':
+            return None
+        cacheado = getattr(self, '_field_selection', None)
+        if cacheado is not None and cacheado[0] is request:
+            return cacheado[1]
+
+        serializer_class = self.get_serializer_class()
+        seleccion = None
+        if hasattr(serializer_class, 'resolver_campos_request'):
+            seleccion = serializer_class.resolver_campos_request(request)
+        self._field_selection = (request, seleccion)
+        return seleccion
+
+    def get_serializer(self, *args, **kwargs):
+        """Aplica la selección de campos a los serializers de lectura"""
+        if 'data' not in kwargs and 'fields' not in kwargs:
+            seleccion = self.get_field_selection()
+            if seleccion is not None:
+                kwargs['fields'] = seleccion
+        return super().get_serializer(*args, **kwargs)
+
+    def apply_field_selection(self, queryset):
+        """Lee de la BD solo las columnas de los campos seleccionados (.only())"""
+        seleccion = self.get_field_selection()
+        if seleccion is None or not hasattr(queryset, 'only'):
+            return queryset
+        return self.get_serializer_class().optimizar_queryset(queryset, seleccion)
+
+    def get_field_selection_columns(self):
+        """Columnas del modelo para la selección de campos, o None (todas)"""
+        seleccion = self.get_field_selection()
+        if seleccion is None:
+            return None
+        return self.get_serializer_class().campos_modelo(seleccion)
+
+    def get_values_projection(self):
+        """
+        ProyeccionValores equivalente al serializer (con la selección de
+        campos aplicada) para los listados de solo lectura, o None
+        """
+        request = getattr(self, 'request', None)
+        if not self.fast_list_serialization or request is None or request.method != 'GET':
+            return None
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'proyeccion_valores'):
+            return None
+        return serializer_class.proyeccion_valores(self.get_field_selection())
+
+    def serialize_list(self, registros, proyeccion=None):
+        """Datos de una lista: ya vienen serializados si se leyeron con la proyección"""
+        if proyeccion is not None:
+            return registros
+        return self.get_serializer(registros, many=True).data
+
+    def filter_queryset(self, queryset):
+        return self.apply_field_selection(super().filter_queryset(queryset))
+
+    def get_cursor_params(self, request):
+        """
+        Devuelve (cursor, page_size, include_count) si la petición solicita
+        paginación por cursor (?cursor=, vacío para la primera página), o None
+        """
+        if 'cursor' not in request.GET:
+            return None
+
+        cursor = request.GET.get('cursor', '').strip() or None
+        try:
+            page_size = int(request.GET.get('page_size', OptimizedPagination.page_size))
+        except (TypeError, ValueError):
+            raise ValidationError("page_size debe ser un número entero")
+        page_size = max(1, min(page_size, OptimizedPagination.max_page_size))
+        include_count = request.GET.get('include_count', 'false').lower() == 'true'
+        return cursor, page_size, include_count
+
+    def cursor_response(self, result, data):
+        """Construye la respuesta estándar de paginación por cursor"""
+        payload = {
+            'results': data,
+            'page_size': result['page_size'],
+            'has_next': result['has_next'],
+            'has_previous': result['has_previous'],
+            'next_cursor': result['next_cursor'],
+            'prev_cursor': result['prev_cursor'],
+        }
+        if 'count' in result:
+            payload['count'] = result['count']
+        return Response(payload)
+
+    def list_cursor(self, queryset, cursor_params, serializer_class=None):
+        """Pagina un queryset por cursor usando el servicio y serializa la página"""
+        cursor, page_size, include_count = cursor_params
+        proyeccion = self.get_values_projection() if serializer_class is None else None
+        result = self.service.paginate_keyset(
+            queryset, cursor=cursor, page_size=page_size, include_count=include_count, proyeccion=proyeccion
+        )
+        if serializer_class is not None:
+            data = serializer_class(result['results'], many=True, context=self.get_serializer_context()).data
+        else:
+            data = self.serialize_list(result['results'], proyeccion)
+        return self.cursor_response(result, data)
+
+    def list_values(self, queryset, proyeccion):
+        """Listado con paginación DRF leyendo filas con .values() en lugar de instancias"""
+        filas = proyeccion.valores(queryset)
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(proyeccion.serializar(page))
+        return Response(proyeccion.serializar(filas))
+
     def list(self, request, *args, **kwargs):
-        """Lista registros usando paginación DRF nativa"""
+        """Lista registros usando paginación DRF nativa (o por cursor si se envía ?cursor=)"""
         try:
+            cursor_params = self.get_cursor_params(request)
+            if cursor_params is not None and hasattr(self.service, 'paginate_keyset'):
+                return self.list_cursor(self.filter_queryset(self.get_queryset()), cursor_params)
+            proyeccion = self.get_values_projection()
+            if proyeccion is not None:
+                queryset = self.filter_queryset(self.get_queryset())
+                if hasattr(queryset, 'values'):
+                    return self.list_values(queryset, proyeccion)
             return super().list(request, *args, **kwargs)
+        except ValidationError as e:
+            return Response(
+                {'error': e.messages[0] if e.messages else str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error en list: {e}")
             return Response(
@@ -238,14 +477,14 @@ class SearchMixin:
     """
     
     def apply_search(self, queryset, search_term, search_fields):
-        """Aplica búsqueda en múltiples campos"""
+        """
+        Aplica búsqueda en múltiples campos usando el backend de búsqueda.
+        Si los campos están en el documento de texto completo del modelo, los
+        resultados se ordenan por relevancia; si no, se usa icontains.
+        """
         if not search_term or not search_fields:
             return queryset
         
-        from django.db.models import Q
-        
-        search_query = Q()
-        for field in search_fields:
-            search_query |= Q(**{f"{field}__icontains": search_term})
+        from ..services.search_backend import get_search_backend
         
-        return queryset.filter(search_query)
\ No newline at end of file
+        return get_search_backend().search(queryset, search_term, fields=search_fields, rank=True)
\ No newline at end of file
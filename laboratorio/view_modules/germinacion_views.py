@@ -21,6 +21,11 @@ from ..models import Germinacion, Polinizacion
 from ..serializers import GerminacionSerializer
 from ..api.serializers import GerminacionHistoricaSerializer
 from ..services.germinacion_service import germinacion_service
+from ..services.codigo_autocomplete_service import codigo_autocomplete_service
+from ..services.faceta_service import faceta_service, CAMPO_TOTAL
+from ..services.alerta_service import alerta_service
+from ..services.dashboard_service import dashboard_service
+from ..services.metrica_service import metrica_service, AGRUPACIONES
 from ..services.prediccion_service import prediccion_service
 from ..permissions import CanViewGerminaciones, CanCreateGerminaciones, CanEditGerminaciones, RoleBasedViewSetMixin
 from .base_views import BaseServiceViewSet, ErrorHandlerMixin, SearchMixin
@@ -43,6 +48,29 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
     queryset = Germinacion.objects.all()
     serializer_class = GerminacionSerializer
     service_class = type(germinacion_service)
+
+    # Plan de consulta por acción: el serializer solo usa columnas propias
+    # (creado_por como PK), así que ninguna acción necesita el prefetch de
+    # seguimientos/cápsulas/siembras. Las acciones de detalle (get_object)
+    # traen creado_por para el permiso de objeto; los listados, no.
+    query_plans = {
+        '*': {'select': ('creado_por',)},
+        'list': {'only': 'serializer'},
+        'todas_admin': {'only': 'serializer'},
+        'pendientes_revision': {'only': 'serializer'},
+        'alertas_germinacion': {'only': (
+            'id', 'codigo', 'especie_variedad', 'genero', 'fecha_siembra',
+            'fecha_germinacion', 'prediccion_fecha_estimada',
+        )},
+    }
+
+    # GET condicional: tablas de las que depende cada listado (globales, del usuario)
+    etag_actions = {
+        'list': (('germinacion',), ()),
+        'todas_admin': (('germinacion',), ()),
+        'mis_germinaciones': ((), ('germinacion',)),
+        'filtros_opciones': (('germinacion',), ()),
+    }
     # NO definir permission_classes aquí - dejar que RoleBasedViewSetMixin lo maneje
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -86,6 +114,7 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
         'completar_predicciones_faltantes': CanEditGerminaciones,
         'estado_modelo': CanViewGerminaciones,
         'performance_metrics': CanViewGerminaciones,
+        'historial_metricas': CanViewGerminaciones,
         'validar_prediccion': CanEditGerminaciones,
     }
     
@@ -94,12 +123,8 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
         self.service = germinacion_service
     
     def get_queryset(self):
-        """Optimizar consulta con select_related y prefetch_related"""
-        return Germinacion.objects.select_related(
-            'creado_por', 'polinizacion'
-        ).prefetch_related(
-            'seguimientos', 'capsulas', 'siembras'
-        ).order_by('-fecha_creacion')
+        """Queryset base con el plan de consulta de la acción (query_plans)"""
+        return self.apply_query_plan(Germinacion.objects.order_by('-fecha_creacion'))
 
     def list(self, request, *args, **kwargs):
         """
@@ -112,12 +137,22 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
 
             logger.info(f"Listando TODAS las germinaciones para usuario: {user.username}")
 
+            # Paginación por cursor (opcional): ?cursor= en lugar de ?page=
+            cursor_params = self.get_cursor_params(request)
+            if cursor_params is not None:
+                return self.list_cursor(self.filter_queryset(self.get_queryset()), cursor_params)
+
             # Obtener el queryset base - SIN filtrar por usuario
             # Todos los usuarios con permiso CanViewGerminaciones pueden ver todas las germinaciones
             queryset = self.filter_queryset(self.get_queryset())
 
             logger.info(f"Mostrando todas las germinaciones del sistema (usuario tiene permiso CanViewGerminaciones)")
 
+            # Lectura rápida con .values() (misma salida que el serializer)
+            proyeccion = self.get_values_projection()
+            if proyeccion is not None:
+                return self.list_values(queryset, proyeccion)
+
             # Aplicar paginación
             page = self.paginate_queryset(queryset)
 
@@ -251,6 +286,33 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
             logger.info(f"Parametros recibidos: page={page}, page_size={page_size}, search='{search}', dias_recientes={dias_recientes}, tipo_registro={tipo_registro}")
             logger.info(f"Usuario autenticado: {request.user.is_authenticated}, Usuario staff: {request.user.is_staff}")
 
+            # Columnas para ?fields= / ?omit= / ?preset= (los históricos usan su propio serializer)
+            only = None if tipo_registro == 'historicos' else self.get_field_selection_columns()
+            # Lectura rápida con .values() (misma salida que el serializer)
+            proyeccion = None if tipo_registro == 'historicos' else self.get_values_projection()
+
+            # Paginación por cursor (opcional): ?cursor= en lugar de ?page=
+            cursor_params = self.get_cursor_params(request)
+            if cursor_params is not None:
+                cursor, cursor_page_size, include_count = cursor_params
+                result = self.service.get_mis_germinaciones_cursor(
+                    user=request.user,
+                    cursor=cursor,
+                    page_size=cursor_page_size,
+                    include_count=include_count,
+                    search=search,
+                    dias_recientes=dias_recientes,
+                    excluir_importadas=excluir_importadas,
+                    solo_historicos=solo_historicos,
+                    only=only,
+                    proyeccion=proyeccion
+                )
+                if tipo_registro == 'historicos':
+                    data = GerminacionHistoricaSerializer(result['results'], many=True).data
+                else:
+                    data = self.serialize_list(result['results'], proyeccion)
+                return self.cursor_response(result, data)
+
             # Si se solicita paginación, usar método paginado
             if request.GET.get('paginated', 'false').lower() == 'true' or page_size < 1000:
                 logger.info(f"Usando metodo paginado para usuario {request.user.username}")
@@ -262,7 +324,9 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
                     search=search,
                     dias_recientes=dias_recientes,
                     excluir_importadas=excluir_importadas,
-                    solo_historicos=solo_historicos if tipo_registro == 'historicos' else False
+                    solo_historicos=solo_historicos if tipo_registro == 'historicos' else False,
+                    only=only,
+                    proyeccion=proyeccion
                 )
 
                 logger.info(f"Resultado del servicio: {result['count']} germinaciones totales, pagina {result['current_page']}/{result['total_pages']}")
@@ -270,17 +334,17 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
                 # Usar serializer diferente según el tipo de registro
                 if tipo_registro == 'historicos':
                     # Para registros históricos, usar serializer sin estados
-                    serializer = GerminacionHistoricaSerializer(result['results'], many=True)
+                    data = GerminacionHistoricaSerializer(result['results'], many=True).data
                     logger.info("Usando GerminacionHistoricaSerializer (sin estados)")
                 else:
                     # Para registros nuevos o todos, usar serializer completo
-                    serializer = self.get_serializer(result['results'], many=True)
+                    data = self.serialize_list(result['results'], proyeccion)
                     logger.info("Usando GerminacionSerializer completo (con estados)")
 
-                logger.info(f"Retornando {len(serializer.data)} germinaciones serializadas al frontend")
+                logger.info(f"Retornando {len(data)} germinaciones serializadas al frontend")
 
                 return Response({
-                    'results': serializer.data,
+                    'results': data,
                     'count': result['count'],
                     'total_pages': result['total_pages'],
                     'current_page': result['current_page'],
@@ -295,21 +359,23 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
                 germinaciones = self.service.get_mis_germinaciones(
                     user=request.user,
                     search=search,
-                    dias_recientes=dias_recientes
+                    dias_recientes=dias_recientes,
+                    only=only,
+                    proyeccion=proyeccion
                 )
                 
                 # Usar serializer diferente según el tipo de registro
                 if tipo_registro == 'historicos':
                     # Para registros históricos, usar serializer sin estados
-                    serializer = GerminacionHistoricaSerializer(germinaciones, many=True)
+                    data = GerminacionHistoricaSerializer(germinaciones, many=True).data
                     logger.info("Usando GerminacionHistoricaSerializer (sin estados)")
                 else:
                     # Para registros nuevos o todos, usar serializer completo
-                    serializer = self.get_serializer(germinaciones, many=True)
+                    data = self.serialize_list(germinaciones, proyeccion)
                     logger.info("Usando GerminacionSerializer completo (con estados)")
                 
-                logger.info(f"Retornando {len(serializer.data)} germinaciones")
-                return Response(serializer.data)
+                logger.info(f"Retornando {len(data)} germinaciones")
+                return Response(data)
             
         except Exception as e:
             return self.handle_error(e, "Error obteniendo mis germinaciones")
@@ -329,12 +395,19 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
             
             logger.info(f"Obteniendo todas las germinaciones para admin: {user.username}")
             
-            germinaciones = self.service.get_all(user=user)
-            serializer = self.get_serializer(germinaciones, many=True)
+            cursor_params = self.get_cursor_params(request)
+            if cursor_params is not None:
+                return self.list_cursor(self.apply_field_selection(self.get_queryset()), cursor_params)
+
+            proyeccion = self.get_values_projection()
+            germinaciones = self.service.get_all(
+                user=user, only=self.get_field_selection_columns(), proyeccion=proyeccion
+            )
+            data = self.serialize_list(germinaciones, proyeccion)
             
             return Response({
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(data),
+                'results': data
             })
             
         except Exception as e:
@@ -344,34 +417,7 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
     def metricas_nuevos(self, request):
         """Obtiene métricas solo de registros creados en el sistema (no importados)"""
         try:
-
-            queryset = Germinacion.objects.filter(
-                Q(archivo_origen__isnull=True) | Q(archivo_origen='')
-            )
-
-            stats = queryset.aggregate(
-                total=Count('id'),
-                en_proceso=Count('id', filter=Q(
-                    Q(estado_germinacion='EN_PROCESO') |
-                    Q(estado_germinacion='EN_PROCESO_TEMPRANO') |
-                    Q(estado_germinacion='EN_PROCESO_AVANZADO')
-                )),
-                finalizados=Count('id', filter=Q(
-                    Q(estado_germinacion='FINALIZADO') |
-                    Q(etapa_actual='LISTA')
-                )),
-            )
-
-            total = stats['total'] or 0
-            finalizados = stats['finalizados'] or 0
-            exito_promedio = round((finalizados / total) * 100) if total > 0 else 0
-
-            return Response({
-                'en_proceso': stats['en_proceso'] or 0,
-                'finalizados': finalizados,
-                'exito_promedio': exito_promedio,
-                'total': total,
-            })
+            return Response(dashboard_service.metricas_nuevos())
         except Exception as e:
             return self.handle_error(e, "Error obteniendo métricas de germinaciones")
 
@@ -379,55 +425,42 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
     def filtros_opciones(self, request):
         """Obtiene opciones disponibles para filtros y estadísticas de TODAS las germinaciones"""
         try:
-
-            user = request.user
-
-            # Usar Germinacion.objects directamente en lugar de get_queryset() para evitar select_related innecesarios
-            queryset = Germinacion.objects.all()
             logger.info(f"Obteniendo opciones de filtros para todas las germinaciones del sistema")
 
-            # Obtener valores únicos para filtros usando only() para cargar solo campos necesarios
-            responsables = list(queryset.exclude(responsable__isnull=True).exclude(responsable='').values_list('responsable', flat=True).distinct()[:100])
-            perchas = list(queryset.exclude(percha__isnull=True).exclude(percha='').values_list('percha', flat=True).distinct()[:100])
-            niveles = list(queryset.exclude(nivel__isnull=True).exclude(nivel='').values_list('nivel', flat=True).distinct()[:100])
-            generos = list(queryset.exclude(genero__isnull=True).exclude(genero='').values_list('genero', flat=True).distinct()[:100])
-
-            # Usar agregación para estadísticas en una sola query
-            stats = queryset.aggregate(
-                total=Count('id'),
-                cerrada=Count('id', filter=Q(estado_capsulas='CERRADA')),
-                abierta=Count('id', filter=Q(estado_capsulas='ABIERTA')),
-                semiabierta=Count('id', filter=Q(estado_capsulas='SEMIABIERTA')),
-                clima_i=Count('id', filter=Q(clima='I')),
-                clima_iw=Count('id', filter=Q(clima='IW')),
-                clima_ic=Count('id', filter=Q(clima='IC')),
-                clima_w=Count('id', filter=Q(clima='W')),
-                clima_c=Count('id', filter=Q(clima='C')),
-            )
+            # Valores únicos y conteos desde el catálogo de facetas en una sola consulta
+            facetas = faceta_service.opciones('germinacion', {
+                'responsable': 100,
+                'percha': 100,
+                'nivel': 100,
+                'genero': 100,
+                'estado_capsulas': 50,
+                'clima': 50,
+                CAMPO_TOTAL: 1,
+            })
+            por_estado = dict(facetas['estado_capsulas'])
+            por_clima = dict(facetas['clima'])
+            total = facetas[CAMPO_TOTAL][0][1] if facetas[CAMPO_TOTAL] else 0
+
+            def valores(campo):
+                return [valor for valor, _ in facetas[campo]]
 
             return Response({
                 'opciones': {
-                    'responsables': sorted(responsables),
-                    'perchas': sorted(perchas),
-                    'niveles': sorted(niveles),
-                    'generos': sorted(generos),
+                    'responsables': valores('responsable'),
+                    'perchas': valores('percha'),
+                    'niveles': valores('nivel'),
+                    'generos': valores('genero'),
                     'estados': ['CERRADA', 'ABIERTA', 'SEMIABIERTA'],
                     'climas': ['I', 'IW', 'IC', 'W', 'C'],
                     'tipos_polinizacion': ['SELF', 'HIBRIDA', 'SIBLING']
                 },
                 'estadisticas': {
-                    'total': stats['total'],
+                    'total': total,
                     'por_estado': {
-                        'CERRADA': stats['cerrada'],
-                        'ABIERTA': stats['abierta'],
-                        'SEMIABIERTA': stats['semiabierta'],
+                        estado: por_estado.get(estado, 0) for estado in ('CERRADA', 'ABIERTA', 'SEMIABIERTA')
                     },
                     'por_clima': {
-                        'I': stats['clima_i'],
-                        'IW': stats['clima_iw'],
-                        'IC': stats['clima_ic'],
-                        'W': stats['clima_w'],
-                        'C': stats['clima_c'],
+                        clima: por_clima.get(clima, 0) for clima in ('I', 'IW', 'IC', 'W', 'C')
                     }
                 }
             })
@@ -463,44 +496,19 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
         """
         Obtiene códigos disponibles desde la tabla Polinizacion con su información
         Usado para autocompletar en formularios de polinización
-        Limitado a 500 resultados más recientes para performance
+        Se sirve desde el índice de autocompletado en memoria (máximo 500 resultados)
+        Parámetros: search (subcadena del código), modo=prefijo, limit
         """
         try:
-
-            # Parámetro de búsqueda opcional para filtrar
             search = request.GET.get('search', '').strip()
 
-            logger.info(f"Obteniendo códigos disponibles desde polinizaciones (búsqueda: '{search}')")
-
-            # Construir query base con índices
-            queryset = Polinizacion.objects.exclude(
-                codigo__isnull=True
-            ).exclude(
-                codigo__exact=''
+            codigos_disponibles = codigo_autocomplete_service.buscar(
+                'polinizacion',
+                search,
+                limite=request.GET.get('limit', 500),
+                solo_prefijo=request.GET.get('modo') == 'prefijo'
             )
 
-            # Si hay búsqueda, filtrar
-            if search:
-                queryset = queryset.filter(codigo__icontains=search)
-
-            # Limitar a 500 resultados más recientes usando only() para cargar menos campos
-            # IMPORTANTE: distinct() debe ir ANTES del slice [:500]
-            polinizaciones = queryset.values(
-                'codigo', 'genero', 'especie', 'nueva_clima'
-            ).distinct().order_by('-codigo')[:500]
-
-            # Formatear respuesta
-            codigos_disponibles = []
-            for pol in polinizaciones:
-                codigos_disponibles.append({
-                    'codigo': pol['codigo'],
-                    'genero': pol['genero'] or '',
-                    'especie': pol['especie'] or '',
-                    'clima': pol['nueva_clima'] or 'I'
-                })
-
-            logger.info(f"Se encontraron {len(codigos_disponibles)} códigos disponibles desde polinizaciones")
-
             return Response(codigos_disponibles)
 
         except Exception as e:
@@ -1158,44 +1166,17 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
     
     @action(detail=False, methods=['get'], url_path='alertas_germinacion')
     def alertas_germinacion(self, request):
-        """Obtener alertas de germinaciones próximas a vencer"""
+        """
+        Obtener alertas de germinaciones próximas a vencer, las más
+        urgentes primero (paginadas con ?page= y ?page_size=)
+        """
         try:
-            
-            # Obtener germinaciones del usuario
-            germinaciones = self.get_queryset().filter(creado_por=request.user)
-            
-            # Filtrar germinaciones con predicción y que no hayan germinado
-            alertas = []
-            hoy = timezone.now().date()
-            
-            for germinacion in germinaciones:
-                # Solo considerar germinaciones que no han germinado aún
-                if not germinacion.fecha_germinacion:
-                    # Si tiene predicción de fecha estimada
-                    if germinacion.prediccion_fecha_estimada:
-                        fecha_estimada = germinacion.prediccion_fecha_estimada
-                        dias_restantes = (fecha_estimada - hoy).days
-                        
-                        # Alertas para germinaciones próximas (dentro de 7 días) o vencidas
-                        if dias_restantes <= 7:
-                            tipo_alerta = 'vencida' if dias_restantes < 0 else 'proxima'
-                            alertas.append({
-                                'id': germinacion.id,
-                                'codigo': germinacion.codigo,
-                                'especie': germinacion.especie_variedad,
-                                'genero': germinacion.genero,
-                                'fecha_siembra': germinacion.fecha_siembra,
-                                'fecha_estimada': fecha_estimada,
-                                'dias_restantes': dias_restantes,
-                                'tipo_alerta': tipo_alerta,
-                                'mensaje': f"Germinación {'vencida' if dias_restantes < 0 else 'próxima a germinar'}"
-                            })
-            
-            return Response({
-                'alertas': alertas,
-                'total': len(alertas)
-            })
-            
+            return Response(alerta_service.pagina_germinaciones(
+                request.user, self.get_queryset(),
+                page=request.GET.get('page'),
+                page_size=request.GET.get('page_size'),
+            ))
+
         except Exception as e:
             logger.error(f"Error obteniendo alertas de germinación: {e}")
             return Response(
@@ -1331,47 +1312,12 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
 
     @action(detail=False, methods=['get'], url_path='estadisticas_precision_modelo')
     def estadisticas_precision_modelo(self, request):
-        """Obtiene estadísticas de precisión del modelo de predicción de germinación"""
+        """
+        Obtiene estadísticas de precisión del modelo de predicción de
+        germinación (desde el snapshot diario de métricas)
+        """
         try:
-            validadas = Germinacion.objects.filter(
-                prediccion_fecha_estimada__isnull=False,
-                fecha_germinacion__isnull=False
-            )
-            total_validadas = validadas.count()
-            total_predicciones = Germinacion.objects.filter(
-                prediccion_fecha_estimada__isnull=False
-            ).count()
-
-            if total_validadas == 0:
-                return Response({
-                    'total_predicciones': total_predicciones,
-                    'predicciones_validadas': 0,
-                    'precision_promedio': 0,
-                    'error_promedio_dias': 0,
-                    'distribucion_precision': {'excelente': 0, 'buena': 0, 'aceptable': 0, 'baja': 0},
-                    'mensaje': 'No hay predicciones validadas aún'
-                })
-
-            errores = [
-                abs((g.fecha_germinacion - g.prediccion_fecha_estimada).days)
-                for g in validadas
-                if g.fecha_germinacion and g.prediccion_fecha_estimada
-            ]
-            error_promedio = sum(errores) / len(errores) if errores else 0
-            precision_promedio = max(0, 100 - (error_promedio * 2))
-
-            return Response({
-                'total_predicciones': total_predicciones,
-                'predicciones_validadas': total_validadas,
-                'precision_promedio': round(precision_promedio, 2),
-                'error_promedio_dias': round(error_promedio, 1),
-                'distribucion_precision': {
-                    'excelente': sum(1 for d in errores if d <= 3),
-                    'buena': sum(1 for d in errores if 3 < d <= 7),
-                    'aceptable': sum(1 for d in errores if 7 < d <= 14),
-                    'baja': sum(1 for d in errores if d > 14),
-                }
-            })
+            return Response(metrica_service.precision(metrica_service.actuales()))
         except Exception as e:
             return self.handle_error(e, "Error obteniendo estadísticas de precisión del modelo")
 
@@ -1569,12 +1515,9 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
                 os.path.join(settings.BASE_DIR, 'laboratorio', 'ml', 'modelos', 'germinacion.pkl'),
             ]
             model_disponible = any(os.path.exists(p) for p in model_paths)
-            total = Germinacion.objects.count()
-            con_prediccion = Germinacion.objects.filter(prediccion_fecha_estimada__isnull=False).count()
-            validadas = Germinacion.objects.filter(
-                prediccion_fecha_estimada__isnull=False,
-                fecha_germinacion__isnull=False
-            ).count()
+            medidas = metrica_service.actuales()
+            total = medidas['total_germinaciones']
+            con_prediccion = medidas['con_prediccion']
 
             return Response({
                 'modelo_disponible': model_disponible,
@@ -1583,7 +1526,7 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
                 'estadisticas': {
                     'total_germinaciones': total,
                     'con_prediccion': con_prediccion,
-                    'validadas': validadas,
+                    'validadas': medidas['validadas'],
                     'cobertura': round(con_prediccion / total * 100, 1) if total > 0 else 0
                 }
             })
@@ -1592,43 +1535,38 @@ class GerminacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandler
 
     @action(detail=False, methods=['get'], url_path='performance_metrics')
     def performance_metrics(self, request):
-        """Obtiene métricas de rendimiento del modelo de germinación"""
-        try:
-            validadas = Germinacion.objects.filter(
-                prediccion_fecha_estimada__isnull=False,
-                fecha_germinacion__isnull=False
+        """
+        Obtiene métricas de rendimiento del modelo de germinación (desde el
+        snapshot diario). Con ?agrupar=especie|genero|mes agrega las
+        métricas de cada grupo
+        """
+        agrupar = request.GET.get('agrupar')
+        if agrupar and agrupar not in AGRUPACIONES:
+            return Response(
+                {'error': f"agrupar debe ser uno de: {', '.join(AGRUPACIONES)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            total = validadas.count()
-
-            if total == 0:
-                return Response({
-                    'mae': 0, 'rmse': 0,
-                    'accuracy_7dias': 0, 'accuracy_14dias': 0,
-                    'total_evaluadas': 0,
-                    'mensaje': 'No hay suficientes datos para calcular métricas'
-                })
-
-            errores = [
-                (g.fecha_germinacion - g.prediccion_fecha_estimada).days
-                for g in validadas
-                if g.fecha_germinacion and g.prediccion_fecha_estimada
-            ]
-            mae = sum(abs(e) for e in errores) / len(errores)
-            rmse = (sum(e ** 2 for e in errores) / len(errores)) ** 0.5
-            acc_7 = sum(1 for e in errores if abs(e) <= 7) / len(errores) * 100
-            acc_14 = sum(1 for e in errores if abs(e) <= 14) / len(errores) * 100
-
-            return Response({
-                'mae': round(mae, 2),
-                'rmse': round(rmse, 2),
-                'accuracy_7dias': round(acc_7, 1),
-                'accuracy_14dias': round(acc_14, 1),
-                'total_evaluadas': total,
-                'error_promedio_dias': round(mae, 1)
-            })
+        try:
+            metricas = metrica_service.rendimiento(metrica_service.actuales())
+            if agrupar:
+                metricas['agrupado_por'] = agrupar
+                metricas['grupos'] = metrica_service.calcular_por_grupo(agrupar)
+            return Response(metricas)
         except Exception as e:
             return self.handle_error(e, "Error obteniendo métricas de rendimiento")
 
+    @action(detail=False, methods=['get'], url_path='historial_metricas')
+    def historial_metricas(self, request):
+        """Serie diaria de métricas del modelo (?dias=, por defecto 90) para graficar su deriva"""
+        try:
+            dias = min(max(int(request.GET.get('dias', 90)), 1), 3650)
+        except ValueError:
+            return Response({'error': 'El parámetro dias debe ser un entero'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response({'dias': dias, 'historial': metrica_service.historial(dias)})
+        except Exception as e:
+            return self.handle_error(e, "Error obteniendo historial de métricas del modelo")
+
     @action(detail=True, methods=['post'], url_path='validar-prediccion')
     def validar_prediccion(self, request, pk=None):
         """Valida la predicción comparando con la fecha real de germinación"""
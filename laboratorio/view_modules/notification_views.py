@@ -11,11 +11,12 @@ from ..models import Notification
 from ..serializers import NotificationSerializer
 from ..services.notification_service import notification_service
 from ..api.pagination import StandardResultsSetPagination
+from .base_views import ConditionalGetMixin
 
 logger = logging.getLogger(__name__)
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet para Notificaciones
     """
@@ -23,6 +24,12 @@ class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+
+    # GET condicional: el listado incluye códigos de germinaciones/polinizaciones
+    etag_actions = {
+        'list': (('germinacion', 'polinizacion'), ('notification',)),
+        'estadisticas': ((), ('notification',)),
+    }
     
     def get_queryset(self):
         """Filtrar notificaciones por usuario"""
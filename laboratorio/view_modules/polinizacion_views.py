@@ -22,6 +22,9 @@ from ..models import Polinizacion, Germinacion
 from ..serializers import PolinizacionSerializer
 from ..api.serializers import PolinizacionHistoricaSerializer
 from ..services.polinizacion_service import polinizacion_service
+from ..services.codigo_autocomplete_service import codigo_autocomplete_service
+from ..services.faceta_service import faceta_service, CAMPO_TOTAL
+from ..services.alerta_service import alerta_service
 from ..permissions import CanViewPolinizaciones, CanCreatePolinizaciones, CanEditPolinizaciones, RoleBasedViewSetMixin
 from .base_views import BaseServiceViewSet, ErrorHandlerMixin, SearchMixin
 from ..renderers import BinaryFileRenderer
@@ -37,6 +40,28 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
     queryset = Polinizacion.objects.all()
     serializer_class = PolinizacionSerializer
     service_class = type(polinizacion_service)
+
+    # Plan de consulta por acción: las acciones de detalle (get_object) traen
+    # creado_por para el permiso de objeto; los listados no necesitan el join
+    # porque el serializer expone creado_por como PK
+    query_plans = {
+        '*': {'select': ('creado_por',)},
+        'list': {'only': 'serializer'},
+        'todas_admin': {'only': 'serializer'},
+        'pendientes_revision': {'only': 'serializer'},
+        'alertas_polinizacion': {'only': (
+            'numero', 'codigo', 'tipo_polinizacion', 'madre_especie', 'nueva_especie',
+            'madre_genero', 'nueva_genero', 'fechapol', 'fechamad', 'prediccion_fecha_estimada',
+        )},
+    }
+
+    # GET condicional: tablas de las que depende cada listado (globales, del usuario)
+    etag_actions = {
+        'list': (('polinizacion',), ()),
+        'todas_admin': (('polinizacion',), ()),
+        'mis_polinizaciones': ((), ('polinizacion',)),
+        'filter_options': (('polinizacion',), ()),
+    }
     # NO definir permission_classes aquí - dejar que RoleBasedViewSetMixin lo maneje
     
     # Definir permisos por acción
@@ -76,16 +101,13 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
         self.service = polinizacion_service
     
     def get_queryset(self):
-        """Optimizar consulta con select_related"""
-        from django.db.models import Q
-        queryset = Polinizacion.objects.select_related(
-            'creado_por'
-        ).order_by('-fecha_creacion')
+        """Queryset base con el plan de consulta de la acción (query_plans)"""
+        queryset = self.apply_query_plan(Polinizacion.objects.order_by('-fecha_creacion'))
         tipo_registro = self.request.query_params.get('tipo_registro')
         if tipo_registro == 'nuevos':
-            queryset = queryset.filter(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
+            queryset = queryset.filter(es_importado=False)
         elif tipo_registro == 'historicos':
-            queryset = queryset.exclude(Q(archivo_origen__isnull=True) | Q(archivo_origen=''))
+            queryset = queryset.filter(es_importado=True)
         return queryset
     
     def perform_create(self, serializer):
@@ -173,6 +195,33 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
             
             logger.info(f"Obteniendo mis polinizaciones para usuario: {request.user.username}, página: {page}, días recientes: {dias_recientes}, tipo_registro: {tipo_registro}")
             
+            # Columnas para ?fields= / ?omit= / ?preset= (los históricos usan su propio serializer)
+            only = None if tipo_registro == 'historicos' else self.get_field_selection_columns()
+            # Lectura rápida con .values() (misma salida que el serializer)
+            proyeccion = None if tipo_registro == 'historicos' else self.get_values_projection()
+
+            # Paginación por cursor (opcional): ?cursor= en lugar de ?page=
+            cursor_params = self.get_cursor_params(request)
+            if cursor_params is not None:
+                cursor, cursor_page_size, include_count = cursor_params
+                result = self.service.get_mis_polinizaciones_cursor(
+                    user=request.user,
+                    cursor=cursor,
+                    page_size=cursor_page_size,
+                    include_count=include_count,
+                    search=search,
+                    dias_recientes=dias_recientes,
+                    excluir_importadas=excluir_importadas,
+                    solo_historicos=solo_historicos,
+                    only=only,
+                    proyeccion=proyeccion
+                )
+                if tipo_registro == 'historicos':
+                    data = PolinizacionHistoricaSerializer(result['results'], many=True).data
+                else:
+                    data = self.serialize_list(result['results'], proyeccion)
+                return self.cursor_response(result, data)
+
             # Si se solicita paginación, usar método paginado
             if request.GET.get('paginated', 'false').lower() == 'true' or page_size < 1000:
                 logger.info("Usando método paginado")
@@ -184,7 +233,9 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
                         search=search,
                         dias_recientes=dias_recientes,
                         excluir_importadas=excluir_importadas,
-                        solo_historicos=solo_historicos if tipo_registro == 'historicos' else False
+                        solo_historicos=solo_historicos if tipo_registro == 'historicos' else False,
+                        only=only,
+                        proyeccion=proyeccion
                     )
                     
                     logger.info(f"Resultado paginado obtenido: {result['count']} registros")
@@ -192,15 +243,15 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
                     # Usar serializer diferente según el tipo de registro
                     if tipo_registro == 'historicos':
                         # Para registros históricos, usar serializer sin estados
-                        serializer = PolinizacionHistoricaSerializer(result['results'], many=True)
+                        data = PolinizacionHistoricaSerializer(result['results'], many=True).data
                         logger.info("Usando PolinizacionHistoricaSerializer (sin estados)")
                     else:
                         # Para registros nuevos o todos, usar serializer completo
-                        serializer = self.get_serializer(result['results'], many=True)
+                        data = self.serialize_list(result['results'], proyeccion)
                         logger.info("Usando PolinizacionSerializer completo (con estados)")
                     
                     return Response({
-                        'results': serializer.data,
+                        'results': data,
                         'count': result['count'],
                         'total_pages': result['total_pages'],
                         'current_page': result['current_page'],
@@ -219,21 +270,23 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
                 polinizaciones = self.service.get_mis_polinizaciones(
                     user=request.user,
                     search=search,
-                    dias_recientes=dias_recientes
+                    dias_recientes=dias_recientes,
+                    only=only,
+                    proyeccion=proyeccion
                 )
                 
                 # Usar serializer diferente según el tipo de registro
                 if tipo_registro == 'historicos':
                     # Para registros históricos, usar serializer sin estados
-                    serializer = PolinizacionHistoricaSerializer(polinizaciones, many=True)
+                    data = PolinizacionHistoricaSerializer(polinizaciones, many=True).data
                     logger.info("Usando PolinizacionHistoricaSerializer (sin estados)")
                 else:
                     # Para registros nuevos o todos, usar serializer completo
-                    serializer = self.get_serializer(polinizaciones, many=True)
+                    data = self.serialize_list(polinizaciones, proyeccion)
                     logger.info("Usando PolinizacionSerializer completo (con estados)")
                 
-                logger.info(f"Retornando {len(serializer.data)} polinizaciones")
-                return Response(serializer.data)
+                logger.info(f"Retornando {len(data)} polinizaciones")
+                return Response(data)
             
         except Exception as e:
             logger.error(f"Error general en mis_polinizaciones: {e}")
@@ -254,12 +307,19 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
             
             logger.info(f"Obteniendo todas las polinizaciones para admin: {user.username}")
             
-            polinizaciones = self.service.get_all(user=user)
-            serializer = self.get_serializer(polinizaciones, many=True)
+            cursor_params = self.get_cursor_params(request)
+            if cursor_params is not None:
+                return self.list_cursor(self.apply_field_selection(self.get_queryset()), cursor_params)
+
+            proyeccion = self.get_values_projection()
+            polinizaciones = self.service.get_all(
+                user=user, only=self.get_field_selection_columns(), proyeccion=proyeccion
+            )
+            data = self.serialize_list(polinizaciones, proyeccion)
             
             return Response({
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(data),
+                'results': data
             })
             
         except Exception as e:
@@ -646,26 +706,14 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
         Accesible para roles con permiso CanViewPolinizaciones.
         """
         try:
-            from django.db.models import Q
             search = request.GET.get('search', '').strip()
-            queryset = Polinizacion.objects.exclude(
-                codigo__isnull=True
-            ).exclude(
-                codigo__exact=''
+            result = codigo_autocomplete_service.buscar(
+                'polinizacion',
+                search,
+                limite=request.GET.get('limit', 500),
+                incluir_especie=True,
+                solo_prefijo=request.GET.get('modo') == 'prefijo'
             )
-            if search:
-                queryset = queryset.filter(
-                    Q(codigo__icontains=search) | Q(especie__icontains=search)
-                )
-            plantas = queryset.values(
-                'codigo', 'genero', 'especie', 'nueva_clima'
-            ).distinct().order_by('-codigo')[:500]
-            result = [{
-                'codigo': p['codigo'],
-                'genero': p['genero'] or '',
-                'especie': p['especie'] or '',
-                'clima': p['nueva_clima'] or 'I'
-            } for p in plantas]
             return Response(result)
         except Exception as e:
             logger.error(f"Error obteniendo códigos con especies: {e}")
@@ -673,45 +721,17 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
 
     @action(detail=False, methods=['get'], url_path='alertas_polinizacion')
     def alertas_polinizacion(self, request):
-        """Obtener alertas de polinizaciones próximas a madurar"""
+        """
+        Obtener alertas de polinizaciones próximas a madurar, las más
+        urgentes primero (paginadas con ?page= y ?page_size=)
+        """
         try:
-            
-            # Obtener polinizaciones del usuario
-            polinizaciones = self.get_queryset().filter(creado_por=request.user)
-            
-            # Filtrar polinizaciones con predicción y que no hayan madurado
-            alertas = []
-            hoy = timezone.now().date()
-            
-            for polinizacion in polinizaciones:
-                # Solo considerar polinizaciones que no han madurado aún
-                if not polinizacion.fechamad:
-                    # Si tiene predicción de fecha estimada
-                    if polinizacion.prediccion_fecha_estimada:
-                        fecha_estimada = polinizacion.prediccion_fecha_estimada
-                        dias_restantes = (fecha_estimada - hoy).days
-                        
-                        # Alertas para polinizaciones próximas (dentro de 7 días) o vencidas
-                        if dias_restantes <= 7:
-                            tipo_alerta = 'vencida' if dias_restantes < 0 else 'proxima'
-                            alertas.append({
-                                'id': polinizacion.numero,
-                                'codigo': polinizacion.codigo,
-                                'tipo_polinizacion': polinizacion.tipo_polinizacion,
-                                'especie': polinizacion.madre_especie or polinizacion.nueva_especie or '',
-                                'genero': polinizacion.madre_genero or polinizacion.nueva_genero or '',
-                                'fecha_polinizacion': polinizacion.fechapol,
-                                'fecha_estimada': fecha_estimada,
-                                'dias_restantes': dias_restantes,
-                                'tipo_alerta': tipo_alerta,
-                                'mensaje': f"Polinización {'vencida' if dias_restantes < 0 else 'próxima a madurar'}"
-                            })
-            
-            return Response({
-                'alertas': alertas,
-                'total': len(alertas)
-            })
-            
+            return Response(alerta_service.pagina_polinizaciones(
+                request.user, self.get_queryset(),
+                page=request.GET.get('page'),
+                page_size=request.GET.get('page_size'),
+            ))
+
         except Exception as e:
             logger.error(f"Error obteniendo alertas de polinización: {e}")
             return Response(
@@ -723,30 +743,40 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
     def filter_options(self, request):
         """Obtiene opciones para filtros de TODAS las polinizaciones del sistema"""
         try:
+            logger.info(f"Obteniendo opciones de filtros para todas las polinizaciones del sistema")
 
-            user = request.user
+            # Una sola consulta al catálogo de facetas (limitado a los valores más comunes)
+            facetas = faceta_service.opciones('polinizacion', {
+                'estado': 50,
+                'tipo_polinizacion': 50,
+                'responsable': 100,
+                'genero': 100,
+                'especie': 100,
+                'ubicacion_nombre': 100,
+                'ubicacion_tipo': 50,
+                'vivero': 100,
+                'mesa': 100,
+                'pared': 100,
+                CAMPO_TOTAL: 1,
+            })
 
-            # Obtener queryset base - TODAS las polinizaciones del sistema
-            queryset = Polinizacion.objects.all()
-            logger.info(f"Obteniendo opciones de filtros para todas las polinizaciones del sistema")
+            def valores(campo):
+                return [valor for valor, _ in facetas[campo]]
 
-            # Limitar resultados a 100 más comunes para evitar sobrecarga
             options = {
-                'estados': list(queryset.exclude(estado='').values_list('estado', flat=True).distinct().order_by('estado')[:50]),
-                'tipos_polinizacion': list(queryset.exclude(tipo_polinizacion='').values_list('tipo_polinizacion', flat=True).distinct().order_by('tipo_polinizacion')[:50]),
-                'responsables': list(queryset.exclude(responsable='').values_list('responsable', flat=True).distinct().order_by('responsable')[:100]),
-                'generos': list(queryset.exclude(genero='').values_list('genero', flat=True).distinct().order_by('genero')[:100]),
-                'especies': list(queryset.exclude(especie='').values_list('especie', flat=True).distinct().order_by('especie')[:100]),
-                'ubicacion_nombres': list(queryset.exclude(ubicacion_nombre='').values_list('ubicacion_nombre', flat=True).distinct().order_by('ubicacion_nombre')[:100]),
-                'ubicacion_tipos': list(queryset.exclude(ubicacion_tipo='').values_list('ubicacion_tipo', flat=True).distinct().order_by('ubicacion_tipo')[:50]),
+                'estados': valores('estado'),
+                'tipos_polinizacion': valores('tipo_polinizacion'),
+                'responsables': valores('responsable'),
+                'generos': valores('genero'),
+                'especies': valores('especie'),
+                'ubicacion_nombres': valores('ubicacion_nombre'),
+                'ubicacion_tipos': valores('ubicacion_tipo'),
                 # Nuevos campos de ubicación detallada
-                'viveros': list(queryset.exclude(vivero='').values_list('vivero', flat=True).distinct().order_by('vivero')[:100]),
-                'mesas': list(queryset.exclude(mesa='').values_list('mesa', flat=True).distinct().order_by('mesa')[:100]),
-                'paredes': list(queryset.exclude(pared='').values_list('pared', flat=True).distinct().order_by('pared')[:100]),
+                'viveros': valores('vivero'),
+                'mesas': valores('mesa'),
+                'paredes': valores('pared'),
             }
-
-            # Usar aggregate para count en vez de queryset.count() separado
-            total_count = queryset.aggregate(total=Count('numero'))['total']
+            total_count = facetas[CAMPO_TOTAL][0][1] if facetas[CAMPO_TOTAL] else 0
 
             return Response({
                 'opciones': options,
@@ -823,25 +853,8 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
             # Parámetro de búsqueda opcional
             search = request.GET.get('search', '').strip()
 
-            # Obtener todos los viveros únicos
-            queryset = Polinizacion.objects.exclude(vivero='')
-
-            # Filtrar por búsqueda si se proporciona
-            if search:
-                queryset = queryset.filter(vivero__icontains=search)
-
-            viveros = queryset.values_list('vivero', flat=True).distinct()
-            viveros_list = list(viveros)
-
-            # Ordenar numéricamente: V-1, V-2, V-10, V-11, etc.
-            def ordenar_codigo(codigo):
-                try:
-                    numero = int(codigo.split('-')[1])
-                    return numero
-                except:
-                    return 99999
-
-            viveros_list.sort(key=ordenar_codigo)
+            # Catálogo de facetas, ya en orden natural: V-1, V-2, V-10, V-11, etc.
+            viveros_list = faceta_service.valores('polinizacion', 'vivero', search=search)
 
             return Response({
                 'viveros': viveros_list,
@@ -859,33 +872,9 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
             vivero = request.GET.get('vivero', '').strip()
             search = request.GET.get('search', '').strip()
 
-            queryset = Polinizacion.objects.exclude(mesa='')
-
-            # Filtrar por vivero si se proporciona
-            if vivero:
-                queryset = queryset.filter(vivero=vivero)
-
-            # Filtrar por búsqueda si se proporciona
-            if search:
-                queryset = queryset.filter(mesa__icontains=search)
-
-            mesas = queryset.values_list('mesa', flat=True).distinct()
-            mesas_list = list(mesas)
-
-            # Ordenar numéricamente: M-1A, M-2A, M-10A, M-11A, etc.
-            def ordenar_mesa(codigo):
-                try:
-                    # Extraer número de M-XY
-                    match = re.match(r'M-(\d+)([A-Z]+)', codigo)
-                    if match:
-                        numero = int(match.group(1))
-                        letra = match.group(2)
-                        return (numero, letra)
-                    return (99999, codigo)
-                except:
-                    return (99999, codigo)
-
-            mesas_list.sort(key=ordenar_mesa)
+            # Catálogo de facetas (acotado al vivero si se indica),
+            # ya en orden natural: M-1A, M-2A, M-10A, M-11A, etc.
+            mesas_list = faceta_service.valores('polinizacion', 'mesa', contexto=vivero, search=search)
 
             return Response({
                 'mesas': mesas_list,
@@ -999,35 +988,9 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
             vivero = request.GET.get('vivero', '').strip()
             search = request.GET.get('search', '').strip()
 
-            queryset = Polinizacion.objects.exclude(pared='')
-
-            # Filtrar por vivero si se proporciona
-            if vivero:
-                queryset = queryset.filter(vivero=vivero)
-
-            # Filtrar por búsqueda si se proporciona
-            if search:
-                queryset = queryset.filter(pared__icontains=search)
-
-            paredes = queryset.values_list('pared', flat=True).distinct()
-            paredes_list = list(paredes)
-
-            # Ordenar numéricamente: P-A, P-B, P-0, P-100, P-101, etc.
-            def ordenar_pared(codigo):
-                try:
-                    # P-X o P-XY donde X puede ser número o letra
-                    if re.match(r'P-\d+', codigo):
-                        numero = int(codigo.split('-')[1])
-                        return (0, numero, '')
-                    elif re.match(r'P-[A-Z]+', codigo):
-                        letra = codigo.split('-')[1]
-                        return (1, 0, letra)
-                    else:
-                        return (2, 0, codigo)
-                except:
-                    return (2, 0, codigo)
-
-            paredes_list.sort(key=ordenar_pared)
+            # Catálogo de facetas (acotado al vivero si se indica),
+            # ya en orden natural: P-0, P-100, P-101, ..., P-A, P-B, etc.
+            paredes_list = faceta_service.valores('polinizacion', 'pared', contexto=vivero, search=search)
 
             return Response({
                 'paredes': paredes_list,
@@ -1042,51 +1005,11 @@ class PolinizacionViewSet(RoleBasedViewSetMixin, BaseServiceViewSet, ErrorHandle
     def opciones_ubicacion(self, request):
         """Obtiene todas las opciones de ubicación (viveros, mesas, paredes) en una sola llamada - limitado para performance"""
         try:
-
-            # Funciones de ordenamiento
-            def ordenar_codigo(codigo):
-                try:
-                    numero = int(codigo.split('-')[1])
-                    return numero
-                except:
-                    return 99999
-
-            def ordenar_mesa(codigo):
-                try:
-                    match = re.match(r'M-(\d+)([A-Z]+)', codigo)
-                    if match:
-                        numero = int(match.group(1))
-                        letra = match.group(2)
-                        return (numero, letra)
-                    return (99999, codigo)
-                except:
-                    return (99999, codigo)
-
-            def ordenar_pared(codigo):
-                try:
-                    if re.match(r'P-\d+', codigo):
-                        numero = int(codigo.split('-')[1])
-                        return (0, numero, '')
-                    elif re.match(r'P-[A-Z]+', codigo):
-                        letra = codigo.split('-')[1]
-                        return (1, 0, letra)
-                    else:
-                        return (2, 0, codigo)
-                except:
-                    return (2, 0, codigo)
-
-            # Limitar a 200 opciones cada uno para no sobrecargar
-            # Obtener viveros
-            viveros = list(Polinizacion.objects.exclude(vivero='').values_list('vivero', flat=True).distinct()[:200])
-            viveros.sort(key=ordenar_codigo)
-
-            # Obtener mesas
-            mesas = list(Polinizacion.objects.exclude(mesa='').values_list('mesa', flat=True).distinct()[:200])
-            mesas.sort(key=ordenar_mesa)
-
-            # Obtener paredes
-            paredes = list(Polinizacion.objects.exclude(pared='').values_list('pared', flat=True).distinct()[:200])
-            paredes.sort(key=ordenar_pared)
+            # Limitar a 200 opciones cada uno para no sobrecargar (una sola consulta)
+            facetas = faceta_service.opciones('polinizacion', {'vivero': 200, 'mesa': 200, 'pared': 200})
+            viveros = [valor for valor, _ in facetas['vivero']]
+            mesas = [valor for valor, _ in facetas['mesa']]
+            paredes = [valor for valor, _ in facetas['pared']]
 
             return Response({
                 'viveros': {
@@ -7,12 +7,13 @@ from ..permissions import IsAdministrator
 from rest_framework.response import Response
 from django.http import JsonResponse
 from django.db.models.expressions import RawSQL
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
 from ..models import Polinizacion, Germinacion
 from ..serializers import PolinizacionSerializer
 from ..services.prediccion_service import prediccion_service
+from ..services.alerta_service import alerta_service
 from ..permissions import require_germinacion_access, require_polinizacion_access
 
 logger = logging.getLogger(__name__)
@@ -97,24 +98,17 @@ def predicciones_alertas(request):
         user = request.user
         logger.info(f"Obteniendo alertas para usuario: {user.username}")
         
-        # Obtener polinizaciones del usuario que necesitan atención
-        fecha_limite = datetime.now().date() + timedelta(days=30)
-        
-        # Filtrar por usuario (creado_por o responsable)
-        from django.db.models import Q
-        
-        polinizaciones_alertas = Polinizacion.objects.filter(
-            fechamad__lte=fecha_limite,
-            estado__in=['EN_PROCESO', 'PENDIENTE']
-        ).filter(
-            Q(creado_por=user) | 
-            Q(responsable__icontains=user.username) |
-            Q(responsable__icontains=f"{user.first_name} {user.last_name}".strip())
-        ).order_by('fechamad')
+        # Polinizaciones del usuario (creado_por o responsable) con maduración
+        # vencida o dentro de 30 días, acotadas a una página
+        polinizaciones_alertas, paginacion = alerta_service.paginar(
+            alerta_service.cosechas(user, dias=30),
+            page=request.GET.get('page'),
+            page_size=request.GET.get('page_size'),
+        )
         
         alertas = []
         for pol in polinizaciones_alertas:
-            dias_restantes = (pol.fechamad - datetime.now().date()).days if pol.fechamad else None
+            dias_restantes = pol.dias_restantes
             
             alertas.append({
                 'id': pol.numero,
@@ -122,7 +116,7 @@ def predicciones_alertas(request):
                 'tipo': 'polinizacion',
                 'mensaje': f'Polinización {pol.codigo} lista para cosecha',
                 'dias_restantes': dias_restantes,
-                'fecha_estimada': pol.fechamad.isoformat() if pol.fechamad else None,
+                'fecha_estimada': pol.fechamad.isoformat(),
                 'prioridad': 'alta' if dias_restantes and dias_restantes <= 7 else 'media',
                 'datos': PolinizacionSerializer(pol).data
             })
@@ -130,7 +124,7 @@ def predicciones_alertas(request):
         logger.info(f"Encontradas {len(alertas)} alertas para el usuario")
         return Response({
             'alertas': alertas,
-            'total': len(alertas),
+            **paginacion,
             'usuario': user.username
         })
         
@@ -19,6 +19,7 @@ from ..serializers import (
     CreateUserWithProfileSerializer, UpdateUserProfileSerializer,
     UpdateUserMetasSerializer, PermissionsSerializer
 )
+from ..services.progreso_service import progreso_service
 from ..permissions import RoleBasedViewSetMixin, IsAdministrator, require_admin
 from .base_views import BaseServiceViewSet, ErrorHandlerMixin
 
@@ -469,20 +470,16 @@ class UserMetasViewSet(viewsets.ModelViewSet):
             profile = self.get_object()
             user = profile.user
             ahora = timezone.now()
-            inicio_mes = ahora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-            germinaciones_mes = Germinacion.objects.filter(
-                creado_por=user,
-                fecha_creacion__gte=inicio_mes
-            ).count()
-            polinizaciones_mes = Polinizacion.objects.filter(
-                creado_por=user,
-                fecha_creacion__gte=inicio_mes
-            ).count() if hasattr(Polinizacion, 'creado_por') else 0
+            # Contadores del mes en curso (ProgresoMensual) en lugar de recontar
+            contadores = progreso_service.contadores(user.id, desde=ahora.date(), hasta=ahora.date())
+            germinaciones_mes = contadores['germinaciones']
+            polinizaciones_mes = contadores['polinizaciones']
+            progreso_service.refrescar_perfiles([user.id])
 
-            meta_germ = profile.meta_germinaciones_mes or 1
-            meta_pol = profile.meta_polinizaciones_mes or 1
-            meta_ef = profile.meta_eficiencia or 1
+            meta_germ = profile.meta_germinaciones or 1
+            meta_pol = profile.meta_polinizaciones or 1
+            meta_ef = profile.tasa_exito_objetivo or 1
 
             progreso_germ = min(100, round(germinaciones_mes / meta_germ * 100, 1))
             progreso_pol = min(100, round(polinizaciones_mes / meta_pol * 100, 1))
@@ -496,17 +493,17 @@ class UserMetasViewSet(viewsets.ModelViewSet):
                 'progreso': {
                     'germinaciones': {
                         'actual': germinaciones_mes,
-                        'meta': profile.meta_germinaciones_mes,
+                        'meta': profile.meta_germinaciones,
                         'porcentaje': progreso_germ
                     },
                     'polinizaciones': {
                         'actual': polinizaciones_mes,
-                        'meta': profile.meta_polinizaciones_mes,
+                        'meta': profile.meta_polinizaciones,
                         'porcentaje': progreso_pol
                     },
                     'eficiencia': {
                         'actual': eficiencia,
-                        'meta': profile.meta_eficiencia,
+                        'meta': profile.tasa_exito_objetivo,
                         'porcentaje': min(100, round(eficiencia / meta_ef * 100, 1))
                     }
                 }
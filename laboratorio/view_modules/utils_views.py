@@ -5,7 +5,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.http import JsonResponse, HttpResponse
-from django.db.models import Avg, Count, Q, F, ExpressionWrapper, fields
+from django.db.models import Q, Sum
 from datetime import datetime, timedelta
 import json
 import logging
@@ -13,6 +13,9 @@ import logging
 from ..models import Germinacion, Polinizacion, Notification
 from ..serializers import GerminacionSerializer, PolinizacionSerializer
 from ..permissions import CanViewGerminaciones, CanViewPolinizaciones, CanViewReportes, CanGenerateReportes
+from .base_views import etag_condicional
+from ..services.estadistica_service import estadistica_service
+from ..services.dashboard_service import dashboard_service, TABLAS_USUARIO
 
 logger = logging.getLogger(__name__)
 
@@ -284,82 +287,67 @@ def generar_reporte_basico_polinizaciones(request):
         return JsonResponse({"error": f"Error generando reporte básico: {str(e)}"}, status=500)
 
 
+def _rango_tendencia(request):
+    """
+    (desde, hasta) de la tendencia por mes: fecha_inicio/fecha_fin del
+    query string o, si no se envía ninguna, los últimos 12 meses
+    """
+    from django.utils import timezone
+    from django.utils.dateparse import parse_date
+
+    fecha_inicio = request.GET.get('fecha_inicio')
+    fecha_fin = request.GET.get('fecha_fin')
+    if not fecha_inicio and not fecha_fin:
+        return timezone.localdate() - timedelta(days=365), None
+
+    rango = []
+    for nombre, valor in (('fecha_inicio', fecha_inicio), ('fecha_fin', fecha_fin)):
+        fecha = None
+        if valor:
+            try:
+                fecha = parse_date(valor)
+            except ValueError as e:
+                logger.warning(f"Error parseando {nombre}: {e}")
+        rango.append(fecha)
+    return tuple(rango)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, CanViewGerminaciones])
+@etag_condicional(tablas=('germinacion',))
 def estadisticas_germinaciones(request):
-    """Estadísticas de germinaciones (solo registros creados en el sistema)"""
+    """
+    Estadísticas de germinaciones (solo registros creados en el sistema),
+    calculadas sobre las estadísticas diarias pre-agregadas
+    """
     try:
-        # Base queryset - excluir registros importados
-        base_qs = Germinacion.objects.filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
-        )
+        filas = estadistica_service.filas('germinacion')
+        sumas = estadistica_service.totales(filas)
 
-        # Totales por estado
-        estados_count = base_qs.values('estado_capsula').annotate(
-            count=Count('id')
-        ).order_by('estado_capsula')
-
-        # Totales por mes (últimos 12 meses)
-        from django.db.models.functions import TruncMonth
-        fecha_limite = datetime.now() - timedelta(days=365)
-        por_mes_raw = base_qs.filter(
-            fecha_creacion__gte=fecha_limite
-        ).annotate(
-            mes=TruncMonth('fecha_creacion')
-        ).values('mes').annotate(
-            total=Count('id')
-        ).order_by('mes')
-        
-        # Formatear datos por mes para el frontend
-        por_mes = []
-        for item in por_mes_raw:
-            por_mes.append({
-                'mes': item['mes'].strftime('%Y-%m-%d') if item['mes'] else '',
-                'total': item['total']
-            })
-        
-        # Promedio de cápsulas
-        promedio_capsulas = base_qs.aggregate(
-            promedio=Avg('no_capsulas')
-        )['promedio'] or 0
-
-        # Calcular tasa de éxito (germinaciones completadas vs total)
         # Una germinación es exitosa si tiene fecha de germinación o semilla en stock
-        total_germinaciones = base_qs.count()
-        germinaciones_exitosas = base_qs.filter(
-            Q(fecha_germinacion__isnull=False) | Q(semilla_en_stock=True)
-        ).count()
+        total_germinaciones = sumas['total']
+        germinaciones_exitosas = sumas['exitosas']
         tasa_exito = round((germinaciones_exitosas / total_germinaciones * 100), 2) if total_germinaciones > 0 else 0
 
-        # Log para debugging
-        logger.info(f"Total germinaciones: {total_germinaciones}, Exitosas: {germinaciones_exitosas}, Tasa: {tasa_exito}%")
-        
+        # Promedio de cápsulas (registros con no_capsulas)
+        promedio_capsulas = sumas['suma_cantidad'] / sumas['con_cantidad'] if sumas['con_cantidad'] else 0
+
         # Promedio real de días entre siembra y germinación (solo registros completados)
-        resultado_dias = base_qs.filter(
-            fecha_siembra__isnull=False,
-            fecha_germinacion__isnull=False
-        ).annotate(
-            duracion=ExpressionWrapper(
-                F('fecha_germinacion') - F('fecha_siembra'),
-                output_field=fields.DurationField()
-            )
-        ).aggregate(promedio=Avg('duracion'))
-        duracion_promedio = resultado_dias['promedio']
+        duracion_promedio = timedelta(days=sumas['suma_dias'] / sumas['con_dias']) if sumas['con_dias'] else None
         promedio_dias_germinar = round(duracion_promedio.days, 1) if duracion_promedio else None
-        
-        # Top especies
-        top_especies = base_qs.values('especie_variedad').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-        
+
+        # Totales por mes de creación (por defecto, últimos 12 meses)
+        desde, hasta = _rango_tendencia(request)
+        por_mes = estadistica_service.por_mes(estadistica_service.filas('germinacion', desde=desde, hasta=hasta))
+
         return Response({
             'total': total_germinaciones,
             'tasa_exito': tasa_exito,
             'promedio_dias_germinar': promedio_dias_germinar,
             'promedio_capsulas': round(promedio_capsulas, 2),
-            'estados': list(estados_count),
+            'estados': estadistica_service.por_dimension(filas, 'estado', nombre='estado_capsula'),
             'por_mes': por_mes,
-            'top_especies': list(top_especies)
+            'top_especies': estadistica_service.por_dimension(filas, 'especie', limite=10, nombre='especie_variedad')
         })
         
     except Exception as e:
@@ -369,105 +357,31 @@ def estadisticas_germinaciones(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, CanViewPolinizaciones])
+@etag_condicional(tablas=('polinizacion',))
 def estadisticas_polinizaciones(request):
-    """Estadísticas de polinizaciones"""
+    """
+    Estadísticas de polinizaciones (solo registros creados en el sistema),
+    calculadas sobre las estadísticas diarias pre-agregadas
+    """
     try:
-        # Obtener filtros de fecha si existen
-        fecha_inicio = request.GET.get('fecha_inicio')
-        fecha_fin = request.GET.get('fecha_fin')
-        solo_nuevos = request.GET.get('solo_nuevos', 'false').lower() == 'true'
-
-        # Base queryset - excluir registros importados por defecto
-        base_qs = Polinizacion.objects.filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
-        )
-
-        # Totales por estado
-        estados_count = base_qs.values('estado').annotate(
-            count=Count('numero')
-        ).order_by('estado')
-        
-        # Totales por mes basado en fechapol (fecha de polinización) o fechamad (fecha de maduración) como respaldo
-        from django.db.models.functions import TruncMonth, Coalesce
-        from django.utils.dateparse import parse_date
-        
-        # Usar fechapol para la tendencia
-        query = base_qs.filter(fechapol__isnull=False)
-
-        # Aplicar filtros de fecha si existen
-        if fecha_inicio:
-            try:
-                fecha_inicio_parsed = parse_date(fecha_inicio)
-                if fecha_inicio_parsed:
-                    query = query.filter(fechapol__gte=fecha_inicio_parsed)
-            except Exception as e:
-                logger.warning(f"Error parseando fecha_inicio: {e}")
+        filas = estadistica_service.filas('polinizacion')
+        sumas = estadistica_service.totales(filas)
 
-        if fecha_fin:
-            try:
-                fecha_fin_parsed = parse_date(fecha_fin)
-                if fecha_fin_parsed:
-                    query = query.filter(fechapol__lte=fecha_fin_parsed)
-            except Exception as e:
-                logger.warning(f"Error parseando fecha_fin: {e}")
-
-        # Si no hay filtros de fecha, usar los últimos 12 meses
-        if not fecha_inicio and not fecha_fin:
-            fecha_limite = datetime.now().date() - timedelta(days=365)
-            query = query.filter(fechapol__gte=fecha_limite)
-
-        # Log para debugging - contar antes de agrupar
-        total_con_fecha = query.count()
-        logger.info(f"Estadísticas polinizaciones - Total registros con fechapol: {total_con_fecha}")
-        logger.info(f"Filtros aplicados - fecha_inicio: {fecha_inicio}, fecha_fin: {fecha_fin}")
-
-        # Agrupar por mes usando fechapol
-        por_mes_raw = query.annotate(
-            mes=TruncMonth('fechapol')
-        ).values('mes').annotate(
-            total=Count('numero')
-        ).order_by('mes')
-        
-        # Log para debugging
-        logger.info(f"Estadísticas polinizaciones - Meses encontrados: {len(por_mes_raw)}")
-        if por_mes_raw:
-            logger.info(f"Estadísticas polinizaciones - Primeros meses: {list(por_mes_raw[:3])}")
-        
-        # Formatear datos por mes para el frontend
-        por_mes = []
-        for item in por_mes_raw:
-            por_mes.append({
-                'mes': item['mes'].strftime('%Y-%m-%d') if item['mes'] else '',
-                'total': item['total']
-            })
-        
-        # Calcular tasa de éxito (polinizaciones exitosas vs total)
         # Una polinización es exitosa si tiene fecha de maduración (fechamad) o cantidad disponible > 0
-        total_polinizaciones = base_qs.count()
-        polinizaciones_exitosas = base_qs.filter(
-            Q(fechamad__isnull=False) | Q(cantidad_disponible__gt=0)
-        ).count()
+        total_polinizaciones = sumas['total']
+        polinizaciones_exitosas = sumas['exitosas']
         polinizaciones_activas = total_polinizaciones - polinizaciones_exitosas
         tasa_exito = round((polinizaciones_exitosas / total_polinizaciones * 100), 2) if total_polinizaciones > 0 else 0
 
-        # Log para debugging
-        logger.info(f"Total polinizaciones: {total_polinizaciones}, Exitosas: {polinizaciones_exitosas}, Activas: {polinizaciones_activas}, Tasa: {tasa_exito}%")
-
         # Promedio real de semillas disponibles por polinización cosechada
-        resultado_semillas = base_qs.filter(
-            cantidad_disponible__gt=0
-        ).aggregate(promedio=Avg('cantidad_disponible'))
-        promedio_semillas_fruto = round(resultado_semillas['promedio'], 1) if resultado_semillas['promedio'] else None
-
-        # Top géneros
-        top_generos = base_qs.values('genero').annotate(
-            count=Count('numero')
-        ).order_by('-count')[:10]
+        promedio_semillas_fruto = (
+            round(sumas['suma_cantidad'] / sumas['con_cantidad'], 1) if sumas['con_cantidad'] else None
+        )
 
-        # Top especies
-        top_especies = base_qs.values('especie').annotate(
-            count=Count('numero')
-        ).order_by('-count')[:10]
+        # Totales por mes de fechapol (fecha_inicio/fecha_fin o últimos 12 meses)
+        desde, hasta = _rango_tendencia(request)
+        por_mes = estadistica_service.por_mes(estadistica_service.filas('polinizacion', desde=desde, hasta=hasta))
+        logger.info(f"Estadísticas polinizaciones - desde: {desde}, hasta: {hasta}, meses: {len(por_mes)}")
 
         return Response({
             'total': total_polinizaciones,
@@ -475,10 +389,10 @@ def estadisticas_polinizaciones(request):
             'cosechas': polinizaciones_exitosas,
             'tasa_exito': tasa_exito,
             'promedio_semillas_fruto': promedio_semillas_fruto,
-            'estados': list(estados_count),
+            'estados': estadistica_service.por_dimension(filas, 'estado'),
             'por_mes': por_mes,
-            'top_generos': list(top_generos),
-            'top_especies': list(top_especies)
+            'top_generos': estadistica_service.por_dimension(filas, 'genero', limite=10),
+            'top_especies': estadistica_service.por_dimension(filas, 'especie', limite=10)
         })
         
     except Exception as e:
@@ -488,74 +402,34 @@ def estadisticas_polinizaciones(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_condicional(tablas_usuario=('polinizacion', 'germinacion', 'notification'))
 def estadisticas_usuario(request):
     """Estadísticas específicas del usuario logueado - Solo registros creados por el usuario"""
     try:
-        user = request.user
-
-        # Estadísticas de germinaciones creadas por el usuario (excluyendo importadas)
-        mis_germinaciones = Germinacion.objects.filter(
-            creado_por=user
-        ).filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
-        )
-        total_germinaciones = mis_germinaciones.count()
-
-        # Germinaciones actuales (en proceso, no finalizadas)
-        germinaciones_actuales = mis_germinaciones.filter(
-            estado_capsula__in=['Verde', 'En Proceso', 'Sin Fecha']
-        ).exclude(
-            estado_capsula__in=['Germinado', 'Finalizado']
-        ).count()
-
-        # Estadísticas de polinizaciones creadas por el usuario (excluyendo importadas)
-        mis_polinizaciones = Polinizacion.objects.filter(
-            creado_por=user
-        ).filter(
-            Q(archivo_origen__isnull=True) | Q(archivo_origen='')
-        )
-        total_polinizaciones = mis_polinizaciones.count()
-
-        # Polinizaciones actuales (en proceso, no finalizadas)
-        polinizaciones_actuales = mis_polinizaciones.filter(
-            estado__in=['INGRESADO', 'EN_PROCESO', 'GERMINANDO']
-        ).exclude(
-            estado__in=['COMPLETADA', 'FINALIZADA']
-        ).count()
-
-        # Polinizaciones completadas (para cálculo de éxito promedio)
-        polinizaciones_completadas = mis_polinizaciones.filter(
-            estado__in=['COMPLETADA', 'FINALIZADA', 'MADURO', 'LISTO']
-        ).count()
-
-        # Germinaciones completadas (para cálculo de éxito promedio)
-        germinaciones_completadas = mis_germinaciones.filter(
-            estado_germinacion='FINALIZADO'
-        ).count()
-
-        # Notificaciones no leídas
-        notificaciones_no_leidas = Notification.objects.filter(
-            usuario=user,
-            leida=False
-        ).count()
-
-        # Respuesta en el formato esperado por el frontend
-        return Response({
-            'total_polinizaciones': total_polinizaciones,
-            'total_germinaciones': total_germinaciones,
-            'polinizaciones_actuales': polinizaciones_actuales,
-            'germinaciones_actuales': germinaciones_actuales,
-            'polinizaciones_completadas': polinizaciones_completadas,
-            'germinaciones_completadas': germinaciones_completadas,
-            'usuario': user.username,
-            'notificaciones_no_leidas': notificaciones_no_leidas
-        })
+        return Response(dashboard_service.estadisticas_usuario(request.user))
 
     except Exception as e:
         logger.error(f"Error obteniendo estadísticas del usuario: {e}")
         return Response({'error': str(e)}, status=500)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@etag_condicional(tablas=('germinacion',), tablas_usuario=TABLAS_USUARIO)
+def dashboard(request):
+    """
+    Resumen de la pantalla de inicio en una sola petición: estadísticas del
+    usuario, métricas de germinaciones nuevas, estadísticas de notificaciones,
+    alertas de polinización y germinación y metas, desde la cache por usuario
+    """
+    try:
+        return Response(dashboard_service.resumen(request.user))
+
+    except Exception as e:
+        logger.error(f"Error obteniendo el resumen del dashboard: {e}")
+        return Response({'error': str(e)}, status=500)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, CanGenerateReportes])
 def generar_reporte_con_estadisticas(request):
@@ -20,7 +20,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.http import JsonResponse, HttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from datetime import datetime
 import json
@@ -57,6 +57,8 @@ from .api.serializers import (
     CapsulaSerializer, SiembraSerializer, PersonalUsuarioSerializer, 
     InventarioSerializer, NotificationSerializer
 )
+from .services.contador_notificacion_service import contador_notificacion_service
+from .services.version_service import version_service
 
 # Mantener importaciones legacy para compatibilidad
 from .models import *  # Importación legacy
@@ -181,11 +183,16 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def marcar_todas_leidas(self, request):
         """Marca todas las notificaciones del usuario como leídas"""
-        count = Notification.objects.filter(
-            usuario=request.user,
-            leida=False,
-            archivada=False
-        ).update(leida=True, fecha_lectura=timezone.now())
+        with transaction.atomic():
+            count = Notification.objects.filter(
+                usuario=request.user,
+                leida=False,
+                archivada=False
+            ).update(leida=True, fecha_lectura=timezone.now())
+            if count:
+                # update() no dispara signals: descontar las no leídas en la misma transacción
+                contador_notificacion_service.sumar(request.user.pk, no_leidas=-count)
+                version_service.incrementar_al_confirmar('notification', [request.user.pk])
         return Response({'status': 'todas marcadas como leídas', 'count': count})
     
     @action(detail=True, methods=['post'])
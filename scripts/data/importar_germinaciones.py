@@ -105,14 +105,64 @@ def normalizar_estado_capsula(estado_str):
 
     return 'CERRADA'  # Default
 
+def entero_csv(row, columna):
+    """Valor numérico de una columna; 0 si está vacío o no es numérico"""
+    try:
+        return int(row.get(columna, 0)) if (row.get(columna) or '').strip() else 0
+    except (TypeError, ValueError):
+        return 0
+
+def datos_desde_fila(row):
+    """Campos de la germinación de una fila del CSV (sin guardar)"""
+    estado_capsulas = normalizar_estado_capsula(row.get('E.CAPSU'))
+    percha, nivel = parsear_ubicacion(row.get('UBICACI'))
+    return {
+        'codigo': limpiar_valor(row.get('CODIGO')),
+        'fecha_siembra': parsear_fecha(row.get('F.SIEMBRA')),
+        'fecha_germinacion': parsear_fecha(row.get('F.GERMI')),
+        'percha': percha,
+        'nivel': nivel,
+        'especie_variedad': limpiar_valor(row.get('ESPECIE')),
+        'clima': normalizar_clima(row.get('CLIMA')),
+        'responsable': limpiar_valor(row.get('RESPONSABLE')),
+        'semilla_vana': entero_csv(row, 'S.VANA'),
+        'semillas_stock': entero_csv(row, 'S.STOCK'),
+        'cantidad_solicitada': entero_csv(row, 'C.SOLIC'),
+        'disponibles': entero_csv(row, 'DISPONE'),
+        'estado_capsulas': estado_capsulas,
+        'estado_capsula': estado_capsulas,  # También llenar el campo sin 's'
+    }
+
+def actualizar_germinacion(germinacion, datos):
+    """Aplica una fila a un registro con el mismo código, fecha y ubicación"""
+    germinacion.especie_variedad = datos['especie_variedad'] or germinacion.especie_variedad
+    germinacion.clima = datos['clima']
+    germinacion.responsable = datos['responsable'] or germinacion.responsable
+    germinacion.semilla_vana = datos['semilla_vana']
+    germinacion.semillas_stock = datos['semillas_stock']
+    germinacion.cantidad_solicitada = datos['cantidad_solicitada']
+    germinacion.disponibles = datos['disponibles']
+    germinacion.fecha_germinacion = datos['fecha_germinacion'] or germinacion.fecha_germinacion
+    germinacion.estado_capsulas = datos['estado_capsulas']
+    germinacion.estado_capsula = datos['estado_capsula']
+
+def clave_germinacion(codigo, fecha_siembra, percha, nivel):
+    return (codigo, fecha_siembra, percha, nivel)
+
 def importar_germinaciones(archivo_csv, limpiar_existentes=False):
     """
     Importa germinaciones desde un archivo CSV
 
+    Los registros nuevos se insertan por lotes con el motor de importación
+    (sin signals por fila y con un único refresco de catálogos al final);
+    los que ya existen (mismo código, fecha y ubicación) se actualizan.
+
     Args:
         archivo_csv: Ruta al archivo CSV
         limpiar_existentes: Si es True, elimina todas las germinaciones existentes
     """
+    from laboratorio.services.importacion_service import importacion_service
+    from laboratorio.services.search_backend import TAMANO_LOTE
 
     if limpiar_existentes:
         respuesta = input("[!] ¿Estás seguro de que quieres eliminar TODAS las germinaciones existentes? (si/no): ")
@@ -134,121 +184,79 @@ def importar_germinaciones(archivo_csv, limpiar_existentes=False):
 
     print(f"[*] Abriendo archivo: {archivo_csv}")
 
-    registros_creados = 0
     registros_actualizados = 0
     registros_error = 0
 
     with open(archivo_csv, 'r', encoding='utf-8-sig') as f:
         # Leer CSV con delimitador punto y coma
-        reader = csv.DictReader(f, delimiter=';')
-
-        total_lineas = sum(1 for _ in open(archivo_csv, 'r', encoding='utf-8-sig')) - 1
-        print(f"[*] Total de registros a procesar: {total_lineas}")
+        filas = list(csv.DictReader(f, delimiter=';'))
+    total_lineas = len(filas)
+    print(f"[*] Total de registros a procesar: {total_lineas}")
+
+    # Registros existentes de los códigos del archivo: una consulta por lote
+    codigos = sorted({limpiar_valor(row.get('CODIGO')) for row in filas} - {None})
+    existentes = {}
+    for inicio in range(0, len(codigos), TAMANO_LOTE):
+        for pk, *clave in Germinacion.objects.filter(
+                codigo__in=codigos[inicio:inicio + TAMANO_LOTE]
+        ).values_list('pk', 'codigo', 'fecha_siembra', 'percha', 'nivel').order_by('pk'):
+            existentes.setdefault(clave_germinacion(*clave), pk)
+
+    nuevos = {}
+    por_actualizar = {}
+    for idx, row in enumerate(filas, start=1):
+        try:
+            datos = datos_desde_fila(row)
+            if not datos['codigo']:
+                print(f"[!] Línea {idx}: Sin código, omitiendo...")
+                registros_error += 1
+                continue
 
-        for idx, row in enumerate(reader, start=1):
+            clave = clave_germinacion(datos['codigo'], datos['fecha_siembra'], datos['percha'], datos['nivel'])
+            if clave in existentes:
+                # Mismo código, misma fecha, misma ubicación: actualizar
+                por_actualizar.setdefault(existentes[clave], []).append(datos)
+            elif clave in nuevos:
+                # Repetido en el archivo: la última fila actualiza el registro pendiente
+                actualizar_germinacion(nuevos[clave], datos)
+            else:
+                # Nuevo registro (permite múltiples siembras del mismo código)
+                nuevos[clave] = Germinacion(creado_por=usuario_sistema, **datos)
+
+            if idx % 500 == 0:
+                print(f"[*] Procesados {idx}/{total_lineas} registros...")
+
+        except Exception as e:
+            print(f"[ERROR] Línea {idx}: {e}")
+            registros_error += 1
+            continue
+
+    # Actualizaciones: se cargan por lotes y se guardan con save() (signals)
+    pks = list(por_actualizar)
+    for inicio in range(0, len(pks), TAMANO_LOTE):
+        for pk, germinacion in Germinacion.objects.in_bulk(pks[inicio:inicio + TAMANO_LOTE]).items():
             try:
-                # Extraer datos del CSV
-                codigo = limpiar_valor(row.get('CODIGO'))
-
-                if not codigo:
-                    print(f"[!] Línea {idx}: Sin código, omitiendo...")
-                    registros_error += 1
-                    continue
-
-                # Parsear fechas
-                fecha_siembra = parsear_fecha(row.get('F.SIEMBRA'))
-                fecha_germinacion = parsear_fecha(row.get('F.GERMI'))
-
-                # Parsear ubicación
-                percha, nivel = parsear_ubicacion(row.get('UBICACI'))
-
-                # Extraer otros campos
-                especie_variedad = limpiar_valor(row.get('ESPECIE'))
-                clima = normalizar_clima(row.get('CLIMA'))
-                responsable = limpiar_valor(row.get('RESPONSABLE'))
-                estado_capsulas = normalizar_estado_capsula(row.get('E.CAPSU'))
-
-                # Convertir valores numéricos
-                try:
-                    semilla_vana = int(row.get('S.VANA', 0)) if row.get('S.VANA', '').strip() else 0
-                except:
-                    semilla_vana = 0
-
-                try:
-                    semillas_stock = int(row.get('S.STOCK', 0)) if row.get('S.STOCK', '').strip() else 0
-                except:
-                    semillas_stock = 0
-
-                try:
-                    cantidad_solicitada = int(row.get('C.SOLIC', 0)) if row.get('C.SOLIC', '').strip() else 0
-                except:
-                    cantidad_solicitada = 0
-
-                try:
-                    disponibles = int(row.get('DISPONE', 0)) if row.get('DISPONE', '').strip() else 0
-                except:
-                    disponibles = 0
-
-                # Verificar si ya existe este registro específico (mismo código, fecha y ubicación)
-                germinacion_existe = Germinacion.objects.filter(
-                    codigo=codigo,
-                    fecha_siembra=fecha_siembra,
-                    percha=percha,
-                    nivel=nivel
-                ).first()
-
-                if germinacion_existe:
-                    # Actualizar registro existente (mismo código, misma fecha, misma ubicación)
-                    germinacion_existe.especie_variedad = especie_variedad or germinacion_existe.especie_variedad
-                    germinacion_existe.clima = clima
-                    germinacion_existe.responsable = responsable or germinacion_existe.responsable
-                    germinacion_existe.semilla_vana = semilla_vana
-                    germinacion_existe.semillas_stock = semillas_stock
-                    germinacion_existe.cantidad_solicitada = cantidad_solicitada
-                    germinacion_existe.disponibles = disponibles
-                    germinacion_existe.fecha_germinacion = fecha_germinacion or germinacion_existe.fecha_germinacion
-                    germinacion_existe.estado_capsulas = estado_capsulas
-                    germinacion_existe.estado_capsula = estado_capsulas
-
-                    germinacion_existe.save()
-                    registros_actualizados += 1
-
-                    if idx % 500 == 0:
-                        print(f"[*] Procesados {idx}/{total_lineas} registros... (Actualizado: {codigo})")
-                else:
-                    # Crear nuevo registro (permite múltiples siembras del mismo código)
-                    germinacion = Germinacion.objects.create(
-                        codigo=codigo,
-                        fecha_siembra=fecha_siembra,
-                        especie_variedad=especie_variedad,
-                        clima=clima,
-                        percha=percha,
-                        nivel=nivel,
-                        responsable=responsable,
-                        semilla_vana=semilla_vana,
-                        semillas_stock=semillas_stock,
-                        cantidad_solicitada=cantidad_solicitada,
-                        disponibles=disponibles,
-                        fecha_germinacion=fecha_germinacion,
-                        estado_capsulas=estado_capsulas,
-                        estado_capsula=estado_capsulas,  # También llenar el campo sin 's'
-                        creado_por=usuario_sistema,
-                    )
-                    registros_creados += 1
-
-                    if idx % 500 == 0:
-                        print(f"[*] Procesados {idx}/{total_lineas} registros... (Creado: {codigo})")
-
+                for datos in por_actualizar[pk]:
+                    actualizar_germinacion(germinacion, datos)
+                germinacion.save()
+                registros_actualizados += 1
             except Exception as e:
-                print(f"[ERROR] Línea {idx}: {e}")
+                print(f"[ERROR] Germinación {germinacion.codigo}: {e}")
                 registros_error += 1
-                continue
+
+    resultado = importacion_service.importar(
+        Germinacion, nuevos.values(),
+        progreso=lambda total: print(f"[*] Insertados {total}/{len(nuevos)} registros nuevos..."),
+    )
+    registros_creados = resultado['total']
 
     print("\n" + "="*60)
     print("[OK] Importación completada")
     print(f"    - Registros creados: {registros_creados}")
     print(f"    - Registros actualizados: {registros_actualizados}")
     print(f"    - Errores: {registros_error}")
+    print(f"    - Tiempos: inserción {resultado['tiempos']['insercion']} ms, "
+          f"refresco {resultado['tiempos']['refresco']} ms")
     print(f"    - Total en BD: {Germinacion.objects.count()}")
     print("="*60)
 